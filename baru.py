@@ -1,10 +1,21 @@
-import mysql.connector
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from tkcalendar import Calendar
+import bisect
+import concurrent.futures
 import datetime
+import itertools
+import queue
 from PIL import Image, ImageTk # Dihapus ImageFilter karena tidak digunakan
 
+from entitas import Entitas, Pengguna, Kegiatan, KegiatanBatch, parse_tanggal, format_tanggal, parse_jam, format_jam
+from database import (DatabaseError, DatabaseManager, MySQLBackend, SQLiteBackend, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE,
+                      DEFAULT_LOG_LIMIT, DEFAULT_RETENSI_LOG_HARI, AKSI_LOG, PenggunaSudahAdaError,
+                      JadwalBentrokError)
+from impor_kegiatan import ImporKegiatan
+from cache_entitas import EntitasCache, JUMLAH_SARAN_PENGGUNA
+import ekspor_data
+
 # --- Warna & Gaya Global ---
 BG_COLOR = "#f0f8ff"
 FONT_STYLE = ("Segoe UI", 10)
@@ -12,563 +23,564 @@ FONT_BOLD = ("Segoe UI", 10, "bold")
 BTN_COLOR = "#4a90e2"
 BTN_HOVER = "#357ABD"
 
-# --- Kelas Entitas ---
-class Entitas:
-    """Kelas dasar untuk semua entitas data (Pengguna, Kegiatan)."""
-    def __init__(self, id_entitas):
-        self._id_entitas = id_entitas # Enkapsulasi: _id_entitas bersifat protected
-
-    @property
-    def id_entitas(self):
-        return self._id_entitas
-
-    # Metode ini akan di-override oleh subclass (Polimorfisme)
-    def get_details_string(self):
-        """Mengembalikan representasi string dari detail entitas."""
-        return f"ID: {self._id_entitas}"
-
-class Pengguna(Entitas):
-    """Merepresentasikan entitas Pengguna."""
-    def __init__(self, id_pengguna, nama, role_id=None, nim_nip=None, username=None, password=None):
-        super().__init__(id_pengguna) # Pewarisan: memanggil constructor kelas induk
-        self._nama = nama
-        self._role_id = role_id
-        self._nim_nip = nim_nip
-        self._username = username
-        self._password = password # Dalam aplikasi nyata, ini harus di-hash
-
-    # Enkapsulasi melalui properties
-    @property
-    def nama(self):
-        return self._nama
+INTERVAL_POLL_PERUBAHAN_MS = 3000 # Jeda polling change feed (perubahan dari terminal lain)
+JEDA_PENCARIAN_MS = 300 # Pencarian dijalankan setelah pengguna berhenti mengetik selama ini
+
+# --- Widget Tabel Virtual ---
+class VirtualTreeview(ttk.Frame):
+    """Tabel virtual di atas ttk.Treeview.
+
+    Semua baris disimpan di memori sebagai (key, values), tetapi hanya baris yang
+    sedang terlihat (plus sedikit overscan) yang dibuat sebagai item Treeview.
+    Dengan begitu biaya insert dan scroll tidak bergantung pada jumlah total baris.
+    Saat pilihan berubah oleh pengguna, widget ini membangkitkan <<TreeviewSelect>>
+    pada dirinya sendiri, sehingga bisa di-bind seperti Treeview biasa.
+    Jika row_formatter(values) diberikan, values disimpan mentah dan baru diformat
+    menjadi tuple kolom saat barisnya pertama kali terlihat (hasilnya di-cache per key).
+    """
+    def __init__(self, parent, columns_info, overscan=2, on_near_end=None, near_end_threshold=20,
+                 show_xscroll=False, default_order_key=None, row_formatter=None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self._columns_info = columns_info
+        self._columns = list(columns_info.keys())
+        self._rows = [] # Sumber data: list [key, values]
+        self._index = {} # Map: key -> posisi di self._rows
+        self._offset = 0 # Indeks baris teratas yang terlihat
+        self._visible_count = 20 # Diperbarui saat ukuran widget berubah
+        self._overscan = overscan
+        self._on_near_end = on_near_end # Callback saat viewport mendekati akhir data (mis. memuat halaman berikutnya)
+        self._near_end_threshold = near_end_threshold
+        self._near_end_pending = False
+        self._selected_key = None
+        self._iid_to_key = {}
+        self._sort_column = None
+        self._sort_descending = False
+        # Fungsi key(values) untuk urutan bawaan sumber data (mis. urutan query DB),
+        # dipakai untuk menempatkan baris baru tanpa mengurutkan ulang semuanya
+        self._default_order_key = default_order_key
+        self._row_formatter = row_formatter
+        self._formatted = {} # Cache key -> values terformat (hanya baris yang pernah terlihat)
+
+        self.tree = ttk.Treeview(self, columns=self._columns, show="headings", selectmode="browse", height=1)
+        for col_id, info in columns_info.items():
+            self.tree.heading(col_id, text=info["text"], command=lambda c=col_id: self.sort_by(c))
+            self.tree.column(col_id, anchor=info.get("anchor", "w"), width=info.get("width", 100),
+                             minwidth=info.get("minwidth", 20),
+                             stretch=info.get("stretch", tk.YES))
+
+        self.scrollbar_y = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar_y.grid(row=0, column=1, sticky="ns")
+        if show_xscroll:
+            scrollbar_x = ttk.Scrollbar(self, orient="horizontal", command=self.tree.xview)
+            self.tree.configure(xscrollcommand=scrollbar_x.set)
+            scrollbar_x.grid(row=1, column=0, sticky="ew")
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.tree.bind("<<TreeviewSelect>>", self._on_native_select)
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel) # Windows / macOS
+        self.tree.bind("<Button-4>", lambda e: self._scroll_units(-3)) # Linux
+        self.tree.bind("<Button-5>", lambda e: self._scroll_units(3))
+        for key_name, delta in (("<Up>", -1), ("<Down>", 1)):
+            self.tree.bind(key_name, lambda e, d=delta: self._move_selection(d))
+        self.tree.bind("<Prior>", lambda e: self._move_selection(-self._visible_count))
+        self.tree.bind("<Next>", lambda e: self._move_selection(self._visible_count))
+        self.tree.bind("<Home>", lambda e: self._move_selection(-len(self._rows)))
+        self.tree.bind("<End>", lambda e: self._move_selection(len(self._rows)))
+
+    # --- Sumber data ---
+    def __len__(self):
+        return len(self._rows)
+
+    def keys(self):
+        """Semua key baris sesuai urutan tampilan saat ini."""
+        return [key for key, _ in self._rows]
+
+    def _rebuild_index(self):
+        self._index = {key: pos for pos, (key, _) in enumerate(self._rows)}
+
+    def set_rows(self, rows):
+        """Mengganti seluruh isi tabel. rows: iterable (key, values)."""
+        self._rows = [[key, tuple(values)] for key, values in rows]
+        self._formatted = {}
+        self._offset = 0
+        self._selected_key = None
+        self._apply_sort()
+        self._render()
+
+    def append_rows(self, rows):
+        """Menambah baris di akhir (urutan sort yang aktif tetap dijaga).
+
+        Key yang sudah ada (mis. baris yang sebelumnya disisipkan secara inkremental)
+        hanya diperbarui nilainya, tidak diduplikasi.
+        """
+        start = len(self._rows)
+        for key, values in rows:
+            pos = self._index.get(key)
+            if pos is not None:
+                self._rows[pos][1] = tuple(values)
+                self._formatted.pop(key, None)
+            else:
+                self._index[key] = len(self._rows)
+                self._rows.append([key, tuple(values)])
+        if self._sort_column is not None:
+            self._apply_sort()
+        else:
+            for pos in range(start, len(self._rows)):
+                self._index[self._rows[pos][0]] = pos
+        self._render()
+
+    def clear(self):
+        self.set_rows([])
+
+    def upsert_row(self, key, values):
+        """Menyisipkan atau memperbarui satu baris di tempatnya, tanpa memuat ulang tabel."""
+        values = tuple(values)
+        pos = self._index.get(key)
+        if pos is not None:
+            if self._rows[pos][1] == values:
+                return
+            del self._rows[pos]
+        self._formatted.pop(key, None)
+        row = [key, values]
+        if self._sort_column is not None:
+            self._rows.append(row)
+            self._apply_sort() # Timsort pada list yang hampir terurut: ~O(n) tanpa sentuhan ke Tk
+        else:
+            if self._default_order_key is not None:
+                new_pos = bisect.bisect_right(self._rows, self._default_order_key(values),
+                                              key=lambda r: self._default_order_key(r[1]))
+            else:
+                new_pos = pos if pos is not None else len(self._rows)
+            self._rows.insert(new_pos, row)
+            self._rebuild_index()
+        self._render()
+
+    def delete_row(self, key):
+        """Menghapus satu baris dari sumber data."""
+        pos = self._index.get(key)
+        if pos is None:
+            return
+        del self._rows[pos]
+        self._formatted.pop(key, None)
+        self._rebuild_index()
+        if self._selected_key == key:
+            self._selected_key = None
+        self._render()
+
+    def reconcile(self, rows):
+        """Menyamakan isi tabel dengan rows (key, values) lewat diff per baris.
+
+        Urutan mengikuti rows (atau sort aktif), posisi scroll dan seleksi
+        dipertahankan, dan Treeview hanya digambar ulang jika ada perubahan.
+        Mengembalikan dict jumlah baris added/updated/removed.
+        """
+        new_rows = [[key, tuple(values)] for key, values in rows]
+        new_keys = {key for key, _ in new_rows}
+        added = updated = 0
+        for key, values in new_rows:
+            pos = self._index.get(key)
+            if pos is None:
+                added += 1
+            elif self._rows[pos][1] != values:
+                updated += 1
+        removed = sum(1 for key in self._index if key not in new_keys)
+        order_changed = [key for key, _ in new_rows] != [key for key, _ in self._rows]
+        if not (added or updated or removed or order_changed):
+            return {"added": 0, "updated": 0, "removed": 0}
+        self._rows = new_rows
+        self._formatted = {}
+        if self._selected_key not in new_keys:
+            self._selected_key = None
+        self._apply_sort()
+        self._render()
+        return {"added": added, "updated": updated, "removed": removed}
+
+    def get_values(self, key):
+        pos = self._index.get(key)
+        return self._rows[pos][1] if pos is not None else None
+
+    def exists(self, key):
+        return key in self._index
+
+    def _display_values(self, key, values):
+        """Nilai kolom yang ditampilkan; row_formatter hanya dipanggil sekali per versi baris."""
+        if self._row_formatter is None:
+            return values
+        display = self._formatted.get(key)
+        if display is None:
+            display = self._formatted[key] = tuple(self._row_formatter(values))
+        return display
+
+    # --- Sorting ---
+    def _sort_key_func(self, column):
+        col_idx = self._columns.index(column)
+        custom_key = self._columns_info[column].get("sort_key")
+        def key_func(row):
+            values = self._display_values(row[0], row[1])
+            value = values[col_idx] if col_idx < len(values) else None
+            if custom_key is not None:
+                try:
+                    value = custom_key(value)
+                except (ValueError, TypeError):
+                    value = None
+            return (value is None or value == "", value if value is not None else "")
+        return key_func
+
+    def _apply_sort(self):
+        if self._sort_column is not None:
+            self._rows.sort(key=self._sort_key_func(self._sort_column), reverse=self._sort_descending)
+        self._rebuild_index()
+
+    def sort_by(self, column, descending=None):
+        """Mengurutkan sumber data berdasarkan kolom (klik heading membalik arah)."""
+        if descending is None:
+            descending = not self._sort_descending if self._sort_column == column else False
+        self._sort_column = column
+        self._sort_descending = descending
+        for col_id, info in self._columns_info.items():
+            indicator = (" ▼" if descending else " ▲") if col_id == column else ""
+            self.tree.heading(col_id, text=info["text"] + indicator)
+        self._apply_sort()
+        if self._selected_key is not None:
+            self.see(self._selected_key)
+        self._render()
+
+    # --- Seleksi ---
+    def selection(self):
+        return (self._selected_key,) if self._selected_key is not None else ()
+
+    def selection_set(self, key, see=True):
+        if key not in self._index:
+            return
+        self._selected_key = key
+        if see:
+            self.see(key)
+        self._render()
+
+    def selection_remove(self, *keys):
+        self._selected_key = None
+        self._render()
+
+    def see(self, key):
+        """Menggeser viewport agar baris key terlihat."""
+        pos = self._index.get(key)
+        if pos is None:
+            return
+        if pos < self._offset:
+            self._offset = pos
+        elif pos >= self._offset + self._visible_count:
+            self._offset = pos - self._visible_count + 1
+        self._render()
+
+    def _on_native_select(self, event=None):
+        selected = self.tree.selection()
+        if not selected:
+            return # Item terpilih hanya keluar dari viewport, bukan dibatalkan
+        key = self._iid_to_key.get(selected[0])
+        if key is None or key == self._selected_key:
+            return # Seleksi hasil render ulang, bukan aksi pengguna
+        self._selected_key = key
+        self.event_generate("<<TreeviewSelect>>")
+
+    def _move_selection(self, delta):
+        if not self._rows:
+            return "break"
+        pos = self._index.get(self._selected_key, self._offset - 1 if delta > 0 else self._offset)
+        new_pos = min(max(pos + delta, 0), len(self._rows) - 1)
+        new_key = self._rows[new_pos][0]
+        if new_key != self._selected_key:
+            self._selected_key = new_key
+            self.see(new_key)
+            self._render()
+            self.event_generate("<<TreeviewSelect>>")
+        return "break"
+
+    # --- Scrolling & rendering ---
+    def _on_configure(self, event=None):
+        row_height, heading_height = self._row_metrics()
+        new_visible = max(1, (self.tree.winfo_height() - heading_height) // row_height)
+        if new_visible != self._visible_count:
+            self._visible_count = new_visible
+            self._render()
+
+    def _row_metrics(self):
+        """Tinggi baris dan heading; diukur dari item pertama jika ada."""
+        children = self.tree.get_children()
+        if children:
+            bbox = self.tree.bbox(children[0])
+            if bbox:
+                return max(1, bbox[3]), bbox[1]
+        style_height = ttk.Style().lookup(self.tree.cget("style") or "Treeview", "rowheight")
+        row_height = int(style_height) if style_height else 20
+        return row_height, row_height
+
+    def _on_mousewheel(self, event):
+        if event.delta:
+            step = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+            self._scroll_units(-step * 3)
+        return "break"
+
+    def _scroll_units(self, units):
+        self._offset += units
+        self._render()
+        return "break"
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self._offset = int(float(amount) * len(self._rows))
+        elif action == "scroll":
+            step = self._visible_count if unit == "pages" else 1
+            self._offset += int(amount) * step
+        self._render()
+
+    def _render(self):
+        """Membuat ulang item Treeview hanya untuk jendela baris yang terlihat."""
+        total = len(self._rows)
+        self._offset = min(max(0, self._offset), max(0, total - self._visible_count))
+        end = min(total, self._offset + self._visible_count + self._overscan)
+
+        existing = self.tree.get_children()
+        if existing:
+            self.tree.delete(*existing)
+        self._iid_to_key = {}
+        selected_iid = None
+        for pos in range(self._offset, end):
+            key, values = self._rows[pos]
+            iid = str(key)
+            self.tree.insert("", "end", iid=iid, values=self._display_values(key, values))
+            self._iid_to_key[iid] = key
+            if key == self._selected_key:
+                selected_iid = iid
+        if selected_iid is not None:
+            self.tree.selection_set(selected_iid)
+
+        if total:
+            self.scrollbar_y.set(self._offset / total, min(1.0, (self._offset + self._visible_count) / total))
+        else:
+            self.scrollbar_y.set(0.0, 1.0)
+
+        if (self._on_near_end is not None and not self._near_end_pending
+                and total - end <= self._near_end_threshold):
+            self._near_end_pending = True
+            self.after_idle(self._fire_near_end)
+
+    def _fire_near_end(self):
+        self._near_end_pending = False
+        self._on_near_end()
+
+class PickerPengguna(ttk.Combobox):
+    """Combobox type-ahead untuk memilih pengguna dari nama atau NIM/NIP.
+
+    Daftar pilihan hanya berisi hasil teratas cari_func(teks, limit) untuk teks
+    yang sedang diketik, bukan seluruh pengguna, sehingga dropdown tetap cepat
+    dibuka walau penggunanya ribuan. Pilihan disimpan sebagai ID_Pengguna
+    (id_terpilih) berdasarkan posisinya di daftar, bukan lewat teks tampilan.
+    """
+    TOMBOL_NAVIGASI = {"Up", "Down", "Return", "KP_Enter", "Escape", "Tab", "ISO_Left_Tab",
+                       "Shift_L", "Shift_R", "Control_L", "Control_R", "Alt_L", "Alt_R"}
+
+    def __init__(self, parent, cari_func, limit=JUMLAH_SARAN_PENGGUNA, **kwargs):
+        super().__init__(parent, postcommand=self.perbarui_saran, **kwargs)
+        self._cari_func = cari_func # cari_func(teks, limit) -> list Pengguna (mis. EntitasCache.cari_pengguna)
+        self._limit = limit
+        self._hasil = [] # Objek Pengguna yang sedang tampil di values, urutannya sama
+        self._id_terpilih = None
+        self.bind("<KeyRelease>", self._on_ketik)
+        self.bind("<Return>", self._on_enter)
+        self.bind("<<ComboboxSelected>>", self._on_pilih)
+
+    @staticmethod
+    def label_pengguna(p_obj):
+        return f"{p_obj.get_display_name()} - {p_obj.nim_nip}" if p_obj.nim_nip else p_obj.get_display_name()
+
+    def perbarui_saran(self):
+        """Mengisi values dengan hasil teratas untuk teks saat ini (juga dipanggil saat dropdown dibuka)."""
+        if self._id_terpilih is not None:
+            return # Teks berisi label pilihan, bukan kata pencarian
+        self._hasil = self._cari_func(self.get(), self._limit)
+        self["values"] = [self.label_pengguna(p_obj) for p_obj in self._hasil]
+
+    def _on_ketik(self, event):
+        if event.keysym in self.TOMBOL_NAVIGASI:
+            return
+        self._id_terpilih = None # Teks diubah: pilihan sebelumnya tidak berlaku lagi
+        self.perbarui_saran()
 
-    @property
-    def role_id(self):
-        return self._role_id
+    def _on_enter(self, event=None):
+        if self._id_terpilih is None and self._hasil:
+            self.current(0) # Enter memilih hasil teratas
+            self._on_pilih()
 
-    @property
-    def nim_nip(self):
-        return self._nim_nip
+    def _on_pilih(self, event=None):
+        pos = self.current()
+        if 0 <= pos < len(self._hasil):
+            self._id_terpilih = self._hasil[pos].id_entitas
 
     @property
-    def username(self):
-        return self._username
-    
-    # Contoh metode untuk enkapsulasi data
-    def get_display_name(self):
-        return f"{self._nama} (ID: {self.id_entitas})"
-
-    # Polimorfisme: Override metode dari kelas Entitas
-    def get_details_string(self):
-        return f"ID Pengguna: {self.id_entitas}, Nama: {self._nama}, Username: {self._username}, Role ID: {self._role_id}"
-
-class Kegiatan(Entitas):
-    """Merepresentasikan entitas Kegiatan."""
-    def __init__(self, id_kegiatan, nama_kegiatan, tanggal, tempat, jenis_kegiatan, id_penanggung_jawab=None):
-        super().__init__(id_kegiatan) # Pewarisan
-        self._nama_kegiatan = nama_kegiatan
-        self._tanggal = tanggal # Bisa berupa string atau objek date
-        self._tempat = tempat
-        self._jenis_kegiatan = jenis_kegiatan
-        self._id_penanggung_jawab = id_penanggung_jawab
-
-    # Enkapsulasi melalui properties
-    @property
-    def nama_kegiatan(self):
-        return self._nama_kegiatan
+    def id_terpilih(self):
+        """ID_Pengguna pilihan; jika belum memilih, teks yang cocok dengan tepat satu pengguna juga diterima."""
+        if self._id_terpilih is None and self.get().strip():
+            hasil = self._cari_func(self.get(), 2)
+            if len(hasil) == 1:
+                return hasil[0].id_entitas
+        return self._id_terpilih
+
+    def set_pengguna(self, p_obj):
+        """Menampilkan pengguna tertentu sebagai pilihan (mis. saat form diisi dari tabel); None mengosongkan."""
+        self._hasil = [p_obj] if p_obj else []
+        self["values"] = [self.label_pengguna(p_obj)] if p_obj else []
+        self._id_terpilih = p_obj.id_entitas if p_obj else None
+        self.set(self.label_pengguna(p_obj) if p_obj else "")
+
+    def kosongkan(self):
+        self.set_pengguna(None)
+
+
+# --- Eksekutor Database Latar Belakang ---
+class DbTask:
+    """Handle untuk satu operasi database yang dijalankan di thread worker."""
+    def __init__(self, key=None, on_success=None, on_error=None):
+        self.key = key
+        self.on_success = on_success
+        self.on_error = on_error
+        self.future = None
+        self.cancelled = False
+
+    def cancel(self):
+        """Membatalkan task: jika belum berjalan tidak akan dieksekusi, jika sudah hasilnya diabaikan."""
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+
+
+class DbExecutor:
+    """Menjalankan operasi DatabaseManager di thread worker agar mainloop Tk tidak pernah terblokir.
+
+    Hasil dikirim kembali ke thread Tk lewat queue yang dibaca dengan after(),
+    karena widget Tk tidak boleh disentuh dari thread lain. Task dengan key yang
+    sama (mis. "muat_kegiatan") menggantikan task sebelumnya yang belum selesai.
+    """
+    POLL_INTERVAL_MS = 30
+
+    def __init__(self, tk_root, max_workers=2, on_busy_change=None):
+        self._root = tk_root
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-worker")
+        self._results = queue.Queue()
+        self._latest_by_key = {}
+        self._in_flight = 0
+        self._polling = False
+        self._busy_listeners = []
+        if on_busy_change is not None:
+            self._busy_listeners.append(on_busy_change)
+        self._closed = False
 
     @property
-    def tanggal(self):
-        return self._tanggal
-    
-    @tanggal.setter
-    def tanggal(self, value):
-        self._tanggal = value
+    def in_flight(self):
+        """Jumlah task yang belum dikirim hasilnya ke thread Tk."""
+        return self._in_flight
 
-    @property
-    def tempat(self):
-        return self._tempat
+    def add_busy_listener(self, callback):
+        """callback(jumlah_in_flight) dipanggil di thread Tk setiap kali jumlah task berubah."""
+        self._busy_listeners.append(callback)
 
-    @property
-    def jenis_kegiatan(self):
-        return self._jenis_kegiatan
+    def remove_busy_listener(self, callback):
+        if callback in self._busy_listeners:
+            self._busy_listeners.remove(callback)
 
-    @property
-    def id_penanggung_jawab(self):
-        return self._id_penanggung_jawab
-
-    # Polimorfisme: Override metode dari kelas Entitas
-    def get_details_string(self):
-        return (f"ID Kegiatan: {self.id_entitas}, Nama: {self._nama_kegiatan}, "
-                f"Tanggal: {self._tanggal}, Tempat: {self._tempat}, "
-                f"Jenis: {self._jenis_kegiatan}, PJ ID: {self._id_penanggung_jawab}")
-
-    def to_tuple_for_display(self, nama_pj="N/A"):
-        """Mengembalikan tuple data kegiatan untuk ditampilkan di Treeview."""
-        return (
-            self.id_entitas,
-            self._nama_kegiatan,
-            self._tanggal, # Asumsikan sudah dalam format string yang benar
-            self._tempat,
-            self._jenis_kegiatan,
-            nama_pj,
-            self._id_penanggung_jawab
-        )
-
-# --- Kelas untuk Manajemen Database ---
-# --- Kelas untuk Manajemen Database ---
-class DatabaseManager:
-    def __init__(self, host, user, password, database_name):
-        # Enkapsulasi: Atribut instance bersifat private-like
-        self._host = host
-        self._user = user
-        self._password = password
-        self._database_name = database_name
-
-    def _get_connection(self):
-        """Membuat dan mengembalikan koneksi database."""
-        try:
-            return mysql.connector.connect(
-                host=self._host,
-                user=self._user,
-                password=self._password,
-                database=self._database_name
-            )
-        except mysql.connector.Error as err:
-            if err.errno == mysql.connector.errorcode.ER_BAD_DB_ERROR:
-                try:
-                    temp_conn = mysql.connector.connect(host=self._host, user=self._user, password=self._password)
-                    temp_cursor = temp_conn.cursor()
-                    temp_cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self._database_name} CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
-                    temp_conn.commit()
-                    temp_cursor.close()
-                    temp_conn.close()
-                    return mysql.connector.connect(
-                        host=self._host, user=self._user, password=self._password, database=self._database_name
-                    )
-                except mysql.connector.Error as create_err:
-                    raise mysql.connector.Error(f"Gagal membuat atau terhubung ke database '{self._database_name}': {create_err}") from create_err
-            else:
-                raise mysql.connector.Error(f"Koneksi database gagal: {err}") from err
+    def _notify_busy(self):
+        for callback in list(self._busy_listeners):
+            try:
+                callback(self._in_flight)
+            except tk.TclError:
+                self.remove_busy_listener(callback) # Widget indikator sudah dihancurkan
 
-    def execute_query(self, query, params=None, fetch_one=False, fetch_all=False, is_many=False, is_ddl=False): # Mengganti is_ddl_multi menjadi is_ddl
-        """Mengeksekusi query SQL dan mengelola koneksi."""
-        conn = None
-        try:
-            conn = self._get_connection()
-            cursor = conn.cursor() # Buat cursor di awal
+    def submit(self, func, *args, on_success=None, on_error=None, key=None, **kwargs):
+        """Menjalankan func(*args, **kwargs) di worker; callback dipanggil di thread Tk.
 
-            if is_ddl: # Jika ini adalah query DDL tunggal (seperti CREATE TABLE, TRIGGER, SP)
-                # Ekstensi C MySQL Connector mungkin tidak suka 'multi=True' untuk DDL tunggal.
-                # Kita akan mencoba mengeksekusinya sebagai statement tunggal.
-                # Konektor biasanya dapat menangani blok BEGIN...END dalam SP/Trigger.
-                try:
-                    cursor.execute(query, params) # Tanpa multi=True
-                except mysql.connector.Error as e:
-                    # Jika errornya karena query mengandung multiple statements yang *tidak bisa*
-                    # ditangani sebagai satu blok oleh execute() biasa (jarang untuk DDL standar),
-                    # maka kita bisa coba dengan 'multi=True' sebagai fallback,
-                    # atau memecah query jika memungkinkan (di luar scope fungsi ini).
-                    # Untuk sekarang, kita re-raise errornya.
-                    # print(f"Info: Mencoba eksekusi DDL dengan multi=True karena error awal: {e}")
-                    # for _ in cursor.execute(query, params, multi=True): # Loop untuk consume semua hasil
-                    #     pass
-                    # Untuk DDL, loop di atas tidak diperlukan jika multi=True berhasil
-                    # cursor.execute(query, params, multi=True) # Coba jika versi mendukung
-                    # Namun, karena error aslinya adalah `unexpected keyword argument 'multi'`,
-                    # kita hindari penggunaan `multi=True` di sini.
-                    raise e # Re-raise error jika eksekusi DDL tunggal gagal
-            elif is_many and params: # Untuk executemany
-                cursor.executemany(query, params)
-            else: # Untuk query DML standar (SELECT, INSERT, UPDATE, DELETE non-batch)
-                cursor.execute(query, params)
-
-            # Commit jika query adalah DML yang mengubah data atau DDL
-            if query.strip().upper().startswith(("INSERT", "UPDATE", "DELETE")) or is_ddl:
-                conn.commit()
-
-            # Fetch results jika diperlukan (biasanya bukan untuk DDL)
-            if fetch_one:
-                result = cursor.fetchone()
-                cursor.close()
-                return result
-            if fetch_all:
-                result = cursor.fetchall()
-                cursor.close()
-                return result
-            
-            # Return lastrowid untuk INSERT atau rowcount untuk operasi lain
-            if cursor.lastrowid and query.strip().upper().startswith("INSERT"):
-                last_id = cursor.lastrowid
-                cursor.close()
-                return last_id
-            
-            rowcount = cursor.rowcount
-            cursor.close()
-            return rowcount
-
-        except mysql.connector.Error as err:
-            if conn:
-                conn.rollback()
-            raise err # Re-raise error untuk ditangani di level lebih tinggi
-        finally:
-            if conn and conn.is_connected():
-                conn.close()
-
-
-    def call_stored_procedure(self, proc_name, args=()):
-        conn = None
-        cursor = None
-        try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.callproc(proc_name, args)
-            conn.commit()
-            
-            # Mengambil hasil jika SP mengembalikan sesuatu (opsional, tergantung SP)
-            # results = []
-            # for result in cursor.stored_results():
-            #     results.extend(result.fetchall())
-            # if results:
-            #     return results
-
-            rowcount = cursor.rowcount # Berguna untuk SP non-SELECT atau untuk mengetahui status
-            return rowcount
-        except mysql.connector.Error as err:
-            if conn:
-                conn.rollback()
-            raise err
-        finally:
-            if cursor:
-                cursor.close()
-            if conn and conn.is_connected():
-                conn.close()
-
-    def _execute_ddl_block(self, ddl_string):
-        """Mengeksekusi satu blok DDL string."""
-        try:
-            ddl_string = ddl_string.strip()
-            if ddl_string: # Pastikan string tidak kosong
-                 # Tandai sebagai DDL agar execute_query menanganinya dengan tepat
-                self.execute_query(ddl_string, is_ddl=True)
-        except mysql.connector.Error as e:
-            # Daftar error number yang umum untuk objek yang sudah ada
-            existing_object_errors = [
-                mysql.connector.errorcode.ER_TABLE_EXISTS_ERROR,
-                mysql.connector.errorcode.ER_VIEW_EXISTS,
-                mysql.connector.errorcode.ER_SP_ALREADY_EXISTS, # Stored Procedure
-                mysql.connector.errorcode.ER_TRG_ALREADY_EXISTS, # Trigger
-                mysql.connector.errorcode.ER_DB_CREATE_EXISTS, # Database
-                mysql.connector.errorcode.ER_INDEX_EXISTS # Jika ada CREATE INDEX eksplisit
-                # Mungkin ada error lain terkait "already exists"
-            ]
-            if e.errno in existing_object_errors or "already exists" in e.msg.lower(): # Periksa juga pesan error
-                print(f"Info: Objek DDL sudah ada atau operasi serupa sudah dilakukan, dilewati. Detail: {str(e)[:150]}")
-            else:
-                # Cetak query yang bermasalah untuk debugging
-                print(f"Error saat eksekusi DDL block: {e}\nQuery Bermasalah:\n{ddl_string[:500]}{'...' if len(ddl_string) > 500 else ''}")
-                raise # Re-raise error jika bukan karena objek sudah ada
-
-    # ... sisa kelas DatabaseManager (initialize_database, dll.) tetap sama ...
-    # Pastikan metode initialize_database memanggil _execute_ddl_block untuk setiap DDL
-    def initialize_database(self):
-        """Membuat tabel, view, trigger, dan stored procedure."""
-        # DDL untuk Tabel
-        base_tables_ddl = [
-            """CREATE TABLE IF NOT EXISTS Role (
-                Role_ID INT PRIMARY KEY,
-                Nama_Role VARCHAR(100) NOT NULL
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci""",
-            """CREATE TABLE IF NOT EXISTS Pengguna (
-                ID_Pengguna INT PRIMARY KEY,
-                Nama VARCHAR(100) NOT NULL,
-                Role_ID INT,
-                NIM_NIP VARCHAR(50) UNIQUE,
-                Username VARCHAR(50) UNIQUE NOT NULL,
-                Password VARCHAR(255) NOT NULL,
-                FOREIGN KEY (Role_ID) REFERENCES Role(Role_ID) ON DELETE SET NULL ON UPDATE CASCADE
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci""",
-            """CREATE TABLE IF NOT EXISTS Kegiatan (
-                ID_Kegiatan VARCHAR(10) PRIMARY KEY,
-                Nama_Kegiatan VARCHAR(100) NOT NULL,
-                Tanggal VARCHAR(20),
-                Tempat VARCHAR(100),
-                Jenis_Kegiatan VARCHAR(50),
-                ID_Penanggung_Jawab INT,
-                FOREIGN KEY (ID_Penanggung_Jawab) REFERENCES Pengguna(ID_Pengguna) ON DELETE SET NULL ON UPDATE CASCADE
-            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci"""
-        ]
-        for ddl in base_tables_ddl:
-            self._execute_ddl_block(ddl)
-
-        # DDL untuk Log Table
-        log_table_ddl = """
-        CREATE TABLE IF NOT EXISTS Log_Perubahan_Kegiatan (
-            ID_Log INT AUTO_INCREMENT PRIMARY KEY,
-            ID_Kegiatan_Ref VARCHAR(10),
-            Aksi VARCHAR(50) NOT NULL,
-            Timestamp_Aksi TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            Detail_Lama TEXT,
-            Detail_Baru TEXT
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci"""
-        self._execute_ddl_block(log_table_ddl)
-
-        # DDL untuk View
-        view_ddl = """
-        CREATE OR REPLACE VIEW View_Detail_Kegiatan AS
-        SELECT
-            K.ID_Kegiatan, K.Nama_Kegiatan, K.Tanggal, K.Tempat, K.Jenis_Kegiatan,
-            P.Nama AS Nama_Penanggung_Jawab, R.Nama_Role AS Role_Penanggung_Jawab,
-            K.ID_Penanggung_Jawab
-        FROM Kegiatan K
-        LEFT JOIN Pengguna P ON K.ID_Penanggung_Jawab = P.ID_Pengguna
-        LEFT JOIN Role R ON P.Role_ID = R.Role_ID
-        """
-        self._execute_ddl_block(view_ddl)
-
-        # DDL untuk Triggers dan Stored Procedures
-        # Setiap DDL ini akan dieksekusi sebagai satu blok/perintah
-        trigger_insert_ddl = """
-        CREATE TRIGGER IF NOT EXISTS TRG_Kegiatan_After_Insert
-        AFTER INSERT ON Kegiatan
-        FOR EACH ROW
-        BEGIN
-            INSERT INTO Log_Perubahan_Kegiatan (ID_Kegiatan_Ref, Aksi, Detail_Baru)
-            VALUES (NEW.ID_Kegiatan, 'INSERT',
-                    CONCAT('ID: ', NEW.ID_Kegiatan,
-                           ', Nama: ', NEW.Nama_Kegiatan,
-                           ', Tanggal: ', NEW.Tanggal,
-                           ', Tempat: ', NEW.Tempat,
-                           ', Jenis: ', NEW.Jenis_Kegiatan,
-                           ', PJ_ID: ', IFNULL(NEW.ID_Penanggung_Jawab, 'NULL'))
-                   );
-        END
-        """
-        self._execute_ddl_block(trigger_insert_ddl)
-
-        trigger_update_ddl = """
-        CREATE TRIGGER IF NOT EXISTS TRG_Kegiatan_After_Update
-        AFTER UPDATE ON Kegiatan
-        FOR EACH ROW
-        BEGIN
-            DECLARE detail_lama_str TEXT;
-            DECLARE detail_baru_str TEXT;
-            SET detail_lama_str = CONCAT('ID: ', OLD.ID_Kegiatan, ', Nama: ', OLD.Nama_Kegiatan, ', Tanggal: ', OLD.Tanggal, ', Tempat: ', OLD.Tempat, ', Jenis: ', OLD.Jenis_Kegiatan, ', PJ_ID: ', IFNULL(OLD.ID_Penanggung_Jawab, 'NULL'));
-            SET detail_baru_str = CONCAT('ID: ', NEW.ID_Kegiatan, ', Nama: ', NEW.Nama_Kegiatan, ', Tanggal: ', NEW.Tanggal, ', Tempat: ', NEW.Tempat, ', Jenis: ', NEW.Jenis_Kegiatan, ', PJ_ID: ', IFNULL(NEW.ID_Penanggung_Jawab, 'NULL'));
-            IF detail_lama_str <> detail_baru_str THEN
-                INSERT INTO Log_Perubahan_Kegiatan (ID_Kegiatan_Ref, Aksi, Detail_Lama, Detail_Baru)
-                VALUES (NEW.ID_Kegiatan, 'UPDATE', detail_lama_str, detail_baru_str);
-            END IF;
-        END
-        """
-        self._execute_ddl_block(trigger_update_ddl)
-
-        trigger_delete_ddl = """
-        CREATE TRIGGER IF NOT EXISTS TRG_Kegiatan_Before_Delete
-        BEFORE DELETE ON Kegiatan
-        FOR EACH ROW
-        BEGIN
-            INSERT INTO Log_Perubahan_Kegiatan (ID_Kegiatan_Ref, Aksi, Detail_Lama)
-            VALUES (OLD.ID_Kegiatan, 'DELETE',
-                    CONCAT('ID: ', OLD.ID_Kegiatan,
-                           ', Nama: ', OLD.Nama_Kegiatan,
-                           ', Tanggal: ', OLD.Tanggal,
-                           ', Tempat: ', OLD.Tempat,
-                           ', Jenis: ', OLD.Jenis_Kegiatan,
-                           ', PJ_ID: ', IFNULL(OLD.ID_Penanggung_Jawab, 'NULL'))
-                   );
-        END
-        """
-        self._execute_ddl_block(trigger_delete_ddl)
-
-        sp_tambah_ddl = """
-        CREATE PROCEDURE IF NOT EXISTS SP_TambahKegiatan (
-            IN p_ID_Kegiatan VARCHAR(10), IN p_Nama_Kegiatan VARCHAR(100), IN p_Tanggal VARCHAR(20),
-            IN p_Tempat VARCHAR(100), IN p_Jenis_Kegiatan VARCHAR(50), IN p_ID_Penanggung_Jawab INT
-        )
-        BEGIN
-            IF EXISTS (SELECT 1 FROM Kegiatan WHERE ID_Kegiatan = p_ID_Kegiatan) THEN
-                SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Error: ID Kegiatan sudah ada.';
-            ELSE
-                INSERT INTO Kegiatan (ID_Kegiatan, Nama_Kegiatan, Tanggal, Tempat, Jenis_Kegiatan, ID_Penanggung_Jawab)
-                VALUES (p_ID_Kegiatan, p_Nama_Kegiatan, p_Tanggal, p_Tempat, p_Jenis_Kegiatan, p_ID_Penanggung_Jawab);
-            END IF;
-        END
-        """
-        self._execute_ddl_block(sp_tambah_ddl)
-
-        sp_update_ddl = """
-        CREATE PROCEDURE IF NOT EXISTS SP_UpdateKegiatan (
-            IN p_ID_Kegiatan_Target VARCHAR(10), IN p_Nama_Kegiatan_Baru VARCHAR(100), IN p_Tanggal_Baru VARCHAR(20),
-            IN p_Tempat_Baru VARCHAR(100), IN p_Jenis_Kegiatan_Baru VARCHAR(50), IN p_ID_Penanggung_Jawab_Baru INT
-        )
-        BEGIN
-            UPDATE Kegiatan
-            SET Nama_Kegiatan = p_Nama_Kegiatan_Baru, Tanggal = p_Tanggal_Baru, Tempat = p_Tempat_Baru,
-                Jenis_Kegiatan = p_Jenis_Kegiatan_Baru, ID_Penanggung_Jawab = p_ID_Penanggung_Jawab_Baru
-            WHERE ID_Kegiatan = p_ID_Kegiatan_Target;
-        END
-        """
-        self._execute_ddl_block(sp_update_ddl)
-
-        sp_hapus_ddl = """
-        CREATE PROCEDURE IF NOT EXISTS SP_HapusKegiatan (
-            IN p_ID_Kegiatan VARCHAR(10)
-        )
-        BEGIN
-            DELETE FROM Kegiatan WHERE ID_Kegiatan = p_ID_Kegiatan;
-        END
+        on_error(exc) default menampilkan messagebox. Jika key diberikan, task lama
+        dengan key yang sama dibatalkan (hasilnya tidak akan dikirim).
         """
-        self._execute_ddl_block(sp_hapus_ddl)
-        
-        # Inisialisasi data awal
-        self._initialize_data_if_empty()
+        if self._closed:
+            raise RuntimeError("DbExecutor sudah ditutup.")
+        task = DbTask(key, on_success=on_success, on_error=on_error)
+        if key is not None:
+            previous = self._latest_by_key.get(key)
+            if previous is not None:
+                previous.cancel()
+            self._latest_by_key[key] = task
+        self._in_flight += 1
+        task.future = self._pool.submit(func, *args, **kwargs)
+        task.future.add_done_callback(lambda future, t=task: self._results.put(t)) # Thread-safe
+        self._notify_busy()
+        self._ensure_polling()
+        return task
+
+    def report(self, callback, *args):
+        """Menjadwalkan callback(*args) di thread Tk; aman dipanggil dari thread worker (mis. progress)."""
+        self._results.put((callback, args))
+
+    def _ensure_polling(self):
+        if not self._polling:
+            self._polling = True
+            self._root.after(self.POLL_INTERVAL_MS, self._poll)
+
+    def _poll(self):
+        """Dijalankan di thread Tk: mengirim hasil task yang sudah selesai ke callback-nya."""
+        delivered = False
+        while True:
+            try:
+                task = self._results.get_nowait()
+            except queue.Empty:
+                break
+            delivered = True
+            if isinstance(task, tuple): # Pesan dari report(), bukan task yang selesai
+                callback, args = task
+                try:
+                    callback(*args)
+                except Exception as callback_err:
+                    print(f"Error di callback progress: {callback_err}")
+                continue
+            self._in_flight -= 1
+            if task.key is not None and self._latest_by_key.get(task.key) is task:
+                del self._latest_by_key[task.key]
+            self._deliver(task)
+        if delivered:
+            self._notify_busy()
+        if self._in_flight > 0 and not self._closed:
+            self._root.after(self.POLL_INTERVAL_MS, self._poll)
+        else:
+            self._polling = False # Berhenti polling saat tidak ada task agar tidak membebani CPU
 
-    def _initialize_data_if_empty(self):
-        """Mengisi data awal jika tabel kosong."""
-        conn = None
-        cursor = None
-        try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-
-            cursor.execute("SELECT COUNT(*) FROM Role")
-            if cursor.fetchone()[0] == 0:
-                roles = [(1, 'Mahasiswa'), (2, 'Dosen'), (3, 'Staff')]
-                # Untuk INSERT banyak baris, is_many=True digunakan
-                self.execute_query("INSERT INTO Role (Role_ID, Nama_Role) VALUES (%s, %s)", params=roles, is_many=True)
-
-            cursor.execute("SELECT COUNT(*) FROM Pengguna")
-            if cursor.fetchone()[0] == 0:
-                pengguna_data = [
-                    Pengguna(101, "Paul Fajar", 1, "2025", "Paul_mhs", "PAULPASS"),
-                    Pengguna(102, "Dr. Zhafier", 2, "705", "Zhafier_dsn", "ZHAFPASS"),
-                    Pengguna(103, "Vijaypal Singh", 3, "2252", "Jay_staff", "JAYPASS")
-                ]
-                pengguna_tuples = [(p.id_entitas, p.nama, p.role_id, p.nim_nip, p.username, p._password) for p in pengguna_data]
-                self.execute_query("INSERT INTO Pengguna (ID_Pengguna, Nama, Role_ID, NIM_NIP, Username, Password) VALUES (%s, %s, %s, %s, %s, %s)", params=pengguna_tuples, is_many=True)
-
-            cursor.execute("SELECT COUNT(*) FROM Kegiatan")
-            if cursor.fetchone()[0] == 0:
-                kegiatan_awal = [
-                    Kegiatan("K001", "Seminar AI", "10-05-2025", "Aula FT", "Seminar", 101),
-                    Kegiatan("K002", "Praktikum IoT", "15-05-2025", "Lab Jaringan Komputer", "Praktikum", 102),
-                    Kegiatan("K003", "Rapat Dosen Bulanan", "20-05-2025", "Ruang Dosen", "Rapat Dosen", 103),
-                ]
-                for keg in kegiatan_awal:
-                    # Memanggil Stored Procedure untuk menambah kegiatan, bukan INSERT langsung
-                    self.call_stored_procedure("SP_TambahKegiatan",
-                                                (keg.id_entitas, keg.nama_kegiatan,
-                                                 keg.tanggal, keg.tempat,
-                                                 keg.jenis_kegiatan, keg.id_penanggung_jawab))
-            
-            conn.commit() # Commit setelah semua data awal dimasukkan
-            print("Data awal berhasil diinisialisasi jika diperlukan.")
-        except mysql.connector.Error as err_init_data:
-            print(f"Error saat mengisi data awal: {err_init_data}")
-            if conn: conn.rollback()
-        finally:
-            if cursor: cursor.close()
-            if conn and conn.is_connected(): conn.close()
-
-    # ... (metode lain seperti tambah_kegiatan_obj_db, dll. tetap sama)
-    # ... (pastikan semua pemanggilan ke execute_query dari metode lain sudah sesuai,
-    #      misalnya tidak menggunakan is_ddl_multi lagi jika tidak perlu)
-
-    def tambah_kegiatan_obj_db(self, kegiatan_obj: 'Kegiatan'): # Tambahkan type hint jika Kegiatan belum didefinisikan
-        """Menambah kegiatan ke DB menggunakan objek Kegiatan via Stored Procedure."""
+    def _deliver(self, task):
+        if task.cancelled or task.future.cancelled():
+            return
+        exc = task.future.exception()
         try:
-            self.call_stored_procedure("SP_TambahKegiatan",
-                                   (kegiatan_obj.id_entitas, kegiatan_obj.nama_kegiatan,
-                                    kegiatan_obj.tanggal, kegiatan_obj.tempat,
-                                    kegiatan_obj.jenis_kegiatan, kegiatan_obj.id_penanggung_jawab))
-        except mysql.connector.Error as e:
-            # Tangani error spesifik dari SP, misal duplikasi ID
-            if e.sqlstate == '45000': # SQLSTATE yang kita set di SP untuk error custom
-                raise mysql.connector.Error(msg=e.msg, errno=e.errno, sqlstate=e.sqlstate) # Re-raise dengan pesan dari SP
-            else:
-                raise # Re-raise error lain
-
-    def update_kegiatan_obj_db(self, kegiatan_obj: 'Kegiatan'):
-        """Mengupdate kegiatan di DB menggunakan objek Kegiatan via Stored Procedure."""
-        return self.call_stored_procedure("SP_UpdateKegiatan",
-                                   (kegiatan_obj.id_entitas, kegiatan_obj.nama_kegiatan,
-                                    kegiatan_obj.tanggal, kegiatan_obj.tempat,
-                                    kegiatan_obj.jenis_kegiatan, kegiatan_obj.id_penanggung_jawab))
-
-    def hapus_kegiatan_db(self, id_keg: str):
-        return self.call_stored_procedure("SP_HapusKegiatan", (id_keg,))
-
-    def get_semua_kegiatan_obj_db(self):
-        query = """
-            SELECT ID_Kegiatan, Nama_Kegiatan, Tanggal, Tempat, Jenis_Kegiatan,
-                   ID_Penanggung_Jawab, Nama_Penanggung_Jawab 
-            FROM View_Detail_Kegiatan
-            ORDER BY STR_TO_DATE(Tanggal, '%d-%m-%Y') DESC, Nama_Kegiatan ASC
-        """
-        rows = self.execute_query(query, fetch_all=True)
-        kegiatan_list = []
-        if rows:
-            for row in rows:
-                # Pastikan urutan indeks sesuai dengan kolom yang di-SELECT dari view
-                # ID_Kegiatan=row[0], Nama_Kegiatan=row[1], Tanggal=row[2], Tempat=row[3], Jenis_Kegiatan=row[4],
-                # ID_Penanggung_Jawab=row[5], Nama_Penanggung_Jawab=row[6]
-                keg = Kegiatan(id_kegiatan=row[0], nama_kegiatan=row[1], tanggal=row[2],
-                               tempat=row[3], jenis_kegiatan=row[4], id_penanggung_jawab=row[5])
-                kegiatan_list.append({'objek': keg, 'nama_pj': row[6]})
-        return kegiatan_list
-
-
-    def get_semua_pengguna_obj_db(self):
-        query = "SELECT ID_Pengguna, Nama, Role_ID, NIM_NIP, Username FROM Pengguna ORDER BY Nama"
-        rows = self.execute_query(query, fetch_all=True)
-        if rows:
-            # Pastikan kelas Pengguna sudah didefinisikan
-            return [Pengguna(id_pengguna=row[0], nama=row[1], role_id=row[2], nim_nip=row[3], username=row[4]) for row in rows]
-        return []
-
-    def verify_user_credentials(self, username, password):
-        query = "SELECT ID_Pengguna, Nama, Role_ID, NIM_NIP, Username FROM Pengguna WHERE Username = %s AND Password = %s"
-        user_data = self.execute_query(query, (username, password), fetch_one=True)
-        if user_data:
-            # Pastikan kelas Pengguna sudah didefinisikan
-            return Pengguna(user_data[0], user_data[1], user_data[2], user_data[3], user_data[4])
-        return None
-
-
-    def get_roles_db(self):
-        query = "SELECT Role_ID, Nama_Role FROM Role ORDER BY Nama_Role"
-        return self.execute_query(query, fetch_all=True)
-
-    def check_username_exists(self, username):
-        query = "SELECT 1 FROM Pengguna WHERE Username = %s"
-        return self.execute_query(query, (username,), fetch_one=True) is not None
-
-    def check_nimid_exists(self, nim_nip):
-        query = "SELECT 1 FROM Pengguna WHERE NIM_NIP = %s"
-        return self.execute_query(query, (nim_nip,), fetch_one=True) is not None
-
-    def get_max_pengguna_id(self):
-        query = "SELECT MAX(ID_Pengguna) FROM Pengguna"
-        result = self.execute_query(query, fetch_one=True)
-        return result[0] if result and result[0] is not None else 0
-
-    def add_user_obj_db(self, pengguna_obj: 'Pengguna'): # Tambahkan type hint
-        query = """
-            INSERT INTO Pengguna (ID_Pengguna, Nama, Role_ID, NIM_NIP, Username, Password)
-            VALUES (%s, %s, %s, %s, %s, %s)
-        """
-        self.execute_query(query, (pengguna_obj.id_entitas, pengguna_obj.nama, pengguna_obj.role_id,
-                                   pengguna_obj.nim_nip, pengguna_obj.username, pengguna_obj._password))
-
+            if exc is not None:
+                if task.on_error is not None:
+                    task.on_error(exc)
+                else:
+                    self._default_error_handler(exc)
+            elif task.on_success is not None:
+                task.on_success(task.future.result())
+        except Exception as callback_err:
+            print(f"Error di callback task database: {callback_err}")
+
+    def _default_error_handler(self, exc):
+        if isinstance(exc, DatabaseError):
+            messagebox.showerror("Error Database", f"Operasi database gagal: {exc}", parent=self._root)
+        else:
+            messagebox.showerror("Error", f"Terjadi kesalahan: {exc}", parent=self._root)
 
-    def get_activity_log_db(self):
-        query = """
-            SELECT ID_Log, Timestamp_Aksi, Aksi, ID_Kegiatan_Ref, Detail_Lama, Detail_Baru
-            FROM Log_Perubahan_Kegiatan
-            ORDER BY Timestamp_Aksi DESC
-        """
-        return self.execute_query(query, fetch_all=True)
+    def shutdown(self):
+        """Membatalkan task yang belum berjalan dan menghentikan worker."""
+        self._closed = True
+        for task in list(self._latest_by_key.values()):
+            task.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
 
 # --- Kelas Dasar untuk Dialog UI ---
 class BaseDialog:
@@ -611,8 +623,9 @@ class BaseDialog:
 
 # --- Kelas untuk Jendela Login (Mewarisi BaseDialog) ---
 class LoginDialog(BaseDialog):
-    def __init__(self, parent_root, db_manager: DatabaseManager, open_signup_callback):
+    def __init__(self, parent_root, db_manager: DatabaseManager, open_signup_callback, db_executor: DbExecutor = None):
         self.db_manager = db_manager
+        self.db_executor = db_executor or DbExecutor(parent_root)
         self.open_signup_callback = open_signup_callback
         self.login_successful = False # Tetap ada untuk kompatibilitas logika di main
         super().__init__(parent_root, "Login Aplikasi Manajemen Kegiatan", "1080x720")
@@ -657,8 +670,8 @@ class LoginDialog(BaseDialog):
 
         self.password_entry.bind("<Return>", self._attempt_login)
 
-        login_button = ttk.Button(center_frame, text="Login", command=self._attempt_login, style="Login.TButton")
-        login_button.grid(row=4, column=0, pady=10, sticky="ew")
+        self.login_button = ttk.Button(center_frame, text="Login", command=self._attempt_login, style="Login.TButton")
+        self.login_button.grid(row=4, column=0, pady=10, sticky="ew")
 
         signup_label = ttk.Label(center_frame, text="Belum punya akun? Daftar di sini", style="Link.TLabel", cursor="hand2")
         signup_label.grid(row=5, column=0, pady=(10,0))
@@ -681,26 +694,47 @@ class LoginDialog(BaseDialog):
         if not username or not password:
             messagebox.showerror("Login Gagal", "Username dan Password harus diisi.", parent=self.top)
             return
+        if str(self.login_button.cget("state")) == "disabled":
+            return # Verifikasi sebelumnya masih berjalan
+
+        # Verifikasi berjalan di worker; tombol dinonaktifkan sebagai indikator proses
+        self._set_sedang_login(True)
+        self.db_executor.submit(self.db_manager.verify_user_credentials, username, password,
+                                on_success=self._on_login_result, on_error=self._on_login_error, key="login")
+
+    def _set_sedang_login(self, sedang_login):
+        self.login_button.config(state="disabled" if sedang_login else "normal",
+                                 text="Memverifikasi..." if sedang_login else "Login")
+        self.top.config(cursor="watch" if sedang_login else "")
+
+    def _on_login_result(self, user_obj):
+        if not self.top.winfo_exists():
+            return # Dialog sudah ditutup sebelum hasil verifikasi datang
+        self._set_sedang_login(False)
+        if user_obj: # Jika objek Pengguna dikembalikan, login berhasil
+            messagebox.showinfo("Login Berhasil", f"Login berhasil! Selamat datang {user_obj.nama}.", parent=self.top)
+            self.login_successful = True
+            self.result = user_obj # Simpan objek pengguna jika perlu diakses setelah dialog
+            self.top.destroy()
+        else:
+            messagebox.showerror("Login Gagal", "Username atau password salah.", parent=self.top)
 
-        try:
-            user_obj = self.db_manager.verify_user_credentials(username, password)
-            if user_obj: # Jika objek Pengguna dikembalikan, login berhasil
-                messagebox.showinfo("Login Berhasil", f"Login berhasil! Selamat datang {user_obj.nama}.", parent=self.top)
-                self.login_successful = True
-                self.result = user_obj # Simpan objek pengguna jika perlu diakses setelah dialog
-                self.top.destroy()
-            else:
-                messagebox.showerror("Login Gagal", "Username atau password salah.", parent=self.top)
-        except mysql.connector.Error as db_err:
-            messagebox.showerror("Error Database", f"Tidak dapat terhubung ke database: {db_err}", parent=self.top)
-        except Exception as e:
-            messagebox.showerror("Error", f"Terjadi kesalahan: {e}", parent=self.top)
+    def _on_login_error(self, err):
+        if not self.top.winfo_exists():
+            return
+        self._set_sedang_login(False)
+        if isinstance(err, DatabaseError):
+            messagebox.showerror("Error Database", f"Tidak dapat terhubung ke database: {err}", parent=self.top)
+        else:
+            messagebox.showerror("Error", f"Terjadi kesalahan: {err}", parent=self.top)
 
 
 # --- Kelas untuk Jendela Signup (Mewarisi BaseDialog) ---
 class SignupDialog(BaseDialog):
-    def __init__(self, parent_root, db_manager: DatabaseManager):
+    def __init__(self, parent_root, db_manager: DatabaseManager, db_executor: DbExecutor = None):
         self.db_manager = db_manager
+        self.db_executor = db_executor or DbExecutor(parent_root)
+        self.role_map = {}
         self.signup_successful = False
         super().__init__(parent_root, "Pendaftaran Pengguna Baru", "500x500") # Geometri disesuaikan
 
@@ -753,8 +787,8 @@ class SignupDialog(BaseDialog):
         button_frame = ttk.Frame(form_frame, style="TFrame") # Pastikan TFrame ada
         button_frame.grid(row=row_idx, column=0, columnspan=2, pady=20)
 
-        signup_button = ttk.Button(button_frame, text="Daftar", command=self._attempt_signup, style="Signup.TButton")
-        signup_button.pack(side=tk.LEFT, padx=10)
+        self.signup_button = ttk.Button(button_frame, text="Daftar", command=self._attempt_signup, style="Signup.TButton")
+        self.signup_button.pack(side=tk.LEFT, padx=10)
 
         cancel_button = ttk.Button(button_frame, text="Batal", command=self._on_close, style="Signup.TButton")
         cancel_button.pack(side=tk.LEFT, padx=10)
@@ -764,21 +798,29 @@ class SignupDialog(BaseDialog):
 
 
     def _load_roles(self):
-        try:
-            roles_data = self.db_manager.get_roles_db()
-            if roles_data:
-                self.role_map = {nama_role: role_id for role_id, nama_role in roles_data}
-                self.role_combo["values"] = list(self.role_map.keys())
-                if self.role_combo["values"]:
-                    self.role_combo.current(0) # Pilih item pertama jika ada
-            else:
-                self.role_combo["values"] = []
-                self.role_map = {}
-        except mysql.connector.Error as db_err:
-            messagebox.showerror("Error Database", f"Gagal memuat role: {db_err}", parent=self.top)
+        self.role_combo["values"] = []
+        self.db_executor.submit(self.db_manager.get_roles_db, on_success=self._tampilkan_roles,
+                                on_error=self._on_load_roles_error, key="muat_roles")
+
+    def _tampilkan_roles(self, roles_data):
+        if not self.top.winfo_exists():
+            return
+        if roles_data:
+            self.role_map = {nama_role: role_id for role_id, nama_role in roles_data}
+            self.role_combo["values"] = list(self.role_map.keys())
+            if self.role_combo["values"]:
+                self.role_combo.current(0) # Pilih item pertama jika ada
+        else:
             self.role_combo["values"] = []
             self.role_map = {}
 
+    def _on_load_roles_error(self, err):
+        if not self.top.winfo_exists():
+            return
+        messagebox.showerror("Error Database", f"Gagal memuat role: {err}", parent=self.top)
+        self.role_combo["values"] = []
+        self.role_map = {}
+
     def _attempt_signup(self, event=None):
         nama = self._nama_entry.get().strip()
         nim_nip = self._nimid_entry.get().strip()
@@ -803,105 +845,475 @@ class SignupDialog(BaseDialog):
         if role_id is None:
             messagebox.showerror("Pendaftaran Gagal", "Role tidak valid.", parent=self.top)
             return
+        if str(self.signup_button.cget("state")) == "disabled":
+            return # Pendaftaran sebelumnya masih berjalan
+
+        self.signup_button.config(state="disabled")
+        self.top.config(cursor="watch")
+        self.db_executor.submit(self._daftarkan_pengguna, nama, nim_nip, username, password, role_id,
+                                on_success=self._on_signup_result, on_error=self._on_signup_error, key="signup")
 
+    def _daftarkan_pengguna(self, nama, nim_nip, username, password, role_id):
+        """Dijalankan di thread worker. Mengembalikan (status, objek Pengguna atau None)."""
+        # Satu INSERT: ID dari auto-increment, duplikasi ditolak constraint UNIQUE
         try:
-            if self.db_manager.check_username_exists(username):
-                messagebox.showerror("Pendaftaran Gagal", f"Username '{username}' sudah digunakan.", parent=self.top)
-                return
-            if self.db_manager.check_nimid_exists(nim_nip):
-                messagebox.showerror("Pendaftaran Gagal", f"NIM/NIP '{nim_nip}' sudah terdaftar.", parent=self.top)
-                return
+            new_user = self.db_manager.daftarkan_pengguna_db(nama, role_id, nim_nip, username, password)
+        except PenggunaSudahAdaError as e:
+            return ("username_ada" if e.kolom == "Username" else "nimnip_ada"), None
+        return "ok", new_user
 
-            max_id = self.db_manager.get_max_pengguna_id()
-            new_id_pengguna = max_id + 1
-            
-            # Membuat objek Pengguna baru
-            new_user = Pengguna(new_id_pengguna, nama, role_id, nim_nip, username, password)
-            self.db_manager.add_user_obj_db(new_user) # Menggunakan metode baru dengan objek
+    def _selesai_signup(self):
+        self.signup_button.config(state="normal")
+        self.top.config(cursor="")
 
-            messagebox.showinfo("Pendaftaran Berhasil", "Pengguna baru berhasil didaftarkan! Silakan login.", parent=self.top)
-            self.signup_successful = True
-            self.result = new_user # Simpan objek pengguna jika perlu
-            self._on_close()
+    def _on_signup_result(self, hasil):
+        if not self.top.winfo_exists():
+            return
+        self._selesai_signup()
+        status, new_user = hasil
+        if status == "username_ada":
+            messagebox.showerror("Pendaftaran Gagal", f"Username '{self._username_entry.get().strip()}' sudah digunakan.", parent=self.top)
+            return
+        if status == "nimnip_ada":
+            messagebox.showerror("Pendaftaran Gagal", f"NIM/NIP '{self._nimid_entry.get().strip()}' sudah terdaftar.", parent=self.top)
+            return
 
-        except mysql.connector.Error as db_err:
-            messagebox.showerror("Error Database", f"Gagal mendaftarkan pengguna: {db_err}", parent=self.top)
-        except Exception as e:
-            messagebox.showerror("Error", f"Terjadi kesalahan: {e}", parent=self.top)
+        messagebox.showinfo("Pendaftaran Berhasil", "Pengguna baru berhasil didaftarkan! Silakan login.", parent=self.top)
+        self.signup_successful = True
+        self.result = new_user # Simpan objek pengguna jika perlu
+        self._on_close()
+
+    def _on_signup_error(self, err):
+        if not self.top.winfo_exists():
+            return
+        self._selesai_signup()
+        if isinstance(err, DatabaseError):
+            messagebox.showerror("Error Database", f"Gagal mendaftarkan pengguna: {err}", parent=self.top)
+        else:
+            messagebox.showerror("Error", f"Terjadi kesalahan: {err}", parent=self.top)
 
 
 # --- Kelas untuk Jendela Riwayat Aktivitas (Mewarisi BaseDialog) ---
 class ActivityLogDialog(BaseDialog):
-    def __init__(self, parent, db_manager: DatabaseManager):
+    # Label singkat kolom Kegiatan untuk menampilkan diff log
+    LABEL_KOLOM = {"ID_Kegiatan": "ID", "Nama_Kegiatan": "Nama", "Tanggal": "Tanggal", "Tempat": "Tempat",
+                   "Jenis_Kegiatan": "Jenis", "ID_Penanggung_Jawab": "PJ_ID",
+                   "Jam_Mulai": "Mulai", "Jam_Selesai": "Selesai"}
+    SEMUA_AKSI = "Semua"
+
+    def __init__(self, parent, db_manager: DatabaseManager, db_executor: DbExecutor = None):
         self.db_manager = db_manager
-        super().__init__(parent, "📜 Riwayat Aktivitas Kegiatan", "950x500")
+        self.db_executor = db_executor or DbExecutor(parent)
+        # State pagination log aktif (keyset pagination, filter di sisi server)
+        self._filter = {}
+        self._next_cursor = None
+        self._sedang_memuat = False
+        self._mode_arsip = False
+        super().__init__(parent, "📜 Riwayat Aktivitas Kegiatan", "950x560")
 
     def _build_ui(self):
+        label_style = f"{self.__class__.__name__}.TLabel"
+        button_style = f"{self.__class__.__name__}.TButton"
+
+        filter_frame = ttk.Frame(self.top, padding=(10, 10, 10, 0))
+        filter_frame.pack(fill=tk.X)
+        ttk.Label(filter_frame, text="Aksi:", style=label_style).pack(side=tk.LEFT)
+        self.aksi_combo = ttk.Combobox(filter_frame, values=[self.SEMUA_AKSI] + list(AKSI_LOG), state="readonly",
+                                       width=9, font=FONT_STYLE)
+        self.aksi_combo.current(0)
+        self.aksi_combo.pack(side=tk.LEFT, padx=(3, 10))
+        ttk.Label(filter_frame, text="ID Kegiatan:", style=label_style).pack(side=tk.LEFT)
+        self.id_kegiatan_entry = ttk.Entry(filter_frame, width=12, font=FONT_STYLE)
+        self.id_kegiatan_entry.pack(side=tk.LEFT, padx=(3, 10))
+        ttk.Label(filter_frame, text="Dari:", style=label_style).pack(side=tk.LEFT)
+        self.dari_entry = ttk.Entry(filter_frame, width=11, font=FONT_STYLE)
+        self.dari_entry.pack(side=tk.LEFT, padx=(3, 10))
+        ttk.Label(filter_frame, text="Sampai:", style=label_style).pack(side=tk.LEFT)
+        self.sampai_entry = ttk.Entry(filter_frame, width=11, font=FONT_STYLE)
+        self.sampai_entry.pack(side=tk.LEFT, padx=(3, 10))
+        ttk.Button(filter_frame, text="🔍 Terapkan", command=self._load_log_data, style=button_style).pack(side=tk.LEFT)
+        for entry in (self.id_kegiatan_entry, self.dari_entry, self.sampai_entry):
+            entry.bind("<Return>", lambda e: self._load_log_data())
+
         log_frame = ttk.LabelFrame(self.top, text="Log Perubahan Data Kegiatan", padding="10")
         log_frame.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
 
-        columns = ("id_log", "timestamp", "aksi", "id_keg_ref", "detail_lama", "detail_baru")
-        self.log_tree = ttk.Treeview(log_frame, columns=columns, show="headings")
-
         col_configs = {
             "id_log": {"text": "ID Log", "width": 60, "anchor": "center"},
             "timestamp": {"text": "Waktu", "width": 150, "anchor": "w"},
             "aksi": {"text": "Aksi", "width": 80, "anchor": "w"},
             "id_keg_ref": {"text": "ID Kegiatan", "width": 100, "anchor": "center"},
+            "aktor": {"text": "Oleh", "width": 120, "anchor": "w"},
             "detail_lama": {"text": "Data Lama", "width": 250, "anchor": "w"},
             "detail_baru": {"text": "Data Baru", "width": 250, "anchor": "w"}
         }
-        for col, config in col_configs.items():
-            self.log_tree.heading(col, text=config["text"])
-            self.log_tree.column(col, width=config["width"], anchor=config["anchor"])
-
+        # Tabel virtual menyimpan dict log mentah; teks kolom baru dibuat saat barisnya terlihat,
+        # dan halaman berikutnya diminta saat scroll mendekati akhir data
+        self.log_tree = VirtualTreeview(log_frame, col_configs, show_xscroll=True, row_formatter=self._format_baris_log,
+                                        on_near_end=self._muat_halaman_berikutnya)
+        self.log_tree.pack(expand=True, fill=tk.BOTH)
 
-        scrollbar_y = ttk.Scrollbar(log_frame, orient="vertical", command=self.log_tree.yview)
-        scrollbar_x = ttk.Scrollbar(log_frame, orient="horizontal", command=self.log_tree.xview)
-        self.log_tree.configure(yscrollcommand=scrollbar_y.set, xscrollcommand=scrollbar_x.set)
-
-        self.log_tree.grid(row=0, column=0, sticky="nsew")
-        scrollbar_y.grid(row=0, column=1, sticky="ns")
-        scrollbar_x.grid(row=1, column=0, sticky="ew")
-
-        log_frame.grid_rowconfigure(0, weight=1)
-        log_frame.grid_columnconfigure(0, weight=1)
+        self.status_label = ttk.Label(self.top, text="", style=label_style)
+        self.status_label.pack(anchor="w", padx=10)
 
         button_frame = ttk.Frame(self.top, style="TFrame") # Pastikan TFrame ada
         button_frame.pack(pady=10)
 
-        refresh_button = ttk.Button(button_frame, text="🔄 Muat Ulang", command=self._load_log_data, style=f"{self.__class__.__name__}.TButton")
+        refresh_button = ttk.Button(button_frame, text="🔄 Muat Ulang", command=self._load_log_data, style=button_style)
         refresh_button.pack(side=tk.LEFT, padx=5)
 
-        close_button = ttk.Button(button_frame, text="Tutup", command=self._on_close, style=f"{self.__class__.__name__}.TButton")
+        arsip_button = ttk.Button(button_frame, text="🗄️ Lihat Arsip", command=self._load_arsip_data, style=button_style)
+        arsip_button.pack(side=tk.LEFT, padx=5)
+
+        close_button = ttk.Button(button_frame, text="Tutup", command=self._on_close, style=button_style)
         close_button.pack(side=tk.LEFT, padx=5)
 
         self._load_log_data()
 
+    def _baca_filter(self):
+        """Filter dari form sebagai kwargs get_log_page_db/iter_arsip_log_db, atau None jika tidak valid."""
+        aksi = self.aksi_combo.get()
+        dari = self.dari_entry.get().strip() or None
+        sampai = self.sampai_entry.get().strip() or None
+        try:
+            parse_tanggal(dari)
+            parse_tanggal(sampai)
+        except ValueError as e:
+            messagebox.showerror("Tanggal Tidak Valid", str(e), parent=self.top)
+            return None
+        return {'aksi': None if aksi == self.SEMUA_AKSI else aksi,
+                'id_kegiatan': self.id_kegiatan_entry.get().strip() or None,
+                'tanggal_mulai': dari, 'tanggal_selesai': sampai}
+
     def _load_log_data(self):
-        for item in self.log_tree.get_children():
-            self.log_tree.delete(item)
+        """Memuat halaman pertama log aktif sesuai filter (juga dipakai tombol Muat Ulang)."""
+        filter_log = self._baca_filter()
+        if filter_log is None:
+            return
+        self._filter = filter_log
+        self._mode_arsip = False
+        self._next_cursor = None
+        self._sedang_memuat = True
+        self.top.config(cursor="watch")
+        # Key yang sama: filter baru membatalkan pemuatan halaman (atau arsip) yang masih berjalan
+        self.db_executor.submit(self.db_manager.get_log_page_db, page_size=DEFAULT_PAGE_SIZE, **self._filter,
+                                on_success=lambda hasil: self._tampilkan_halaman_log(hasil, ganti=True),
+                                on_error=self._on_load_log_error, key="muat_log")
+
+    def _muat_halaman_berikutnya(self):
+        """Dipanggil VirtualTreeview saat viewport mendekati baris terakhir yang sudah dimuat."""
+        if self._mode_arsip or self._sedang_memuat or not self._next_cursor:
+            return
+        self._sedang_memuat = True
+        self.db_executor.submit(self.db_manager.get_log_page_db, page_size=DEFAULT_PAGE_SIZE,
+                                cursor=self._next_cursor, **self._filter,
+                                on_success=lambda hasil: self._tampilkan_halaman_log(hasil, ganti=False),
+                                on_error=self._on_load_log_error, key="muat_log")
+
+    def _load_arsip_data(self):
+        # Arsip baru didekompresi saat diminta, dengan filter yang sama dengan log aktif
+        filter_log = self._baca_filter()
+        if filter_log is None:
+            return
+        self._filter = filter_log
+        self._sedang_memuat = True
+        self.top.config(cursor="watch")
+        self.db_executor.submit(self._ambil_arsip, on_success=self._tampilkan_arsip,
+                                on_error=self._on_load_log_error, key="muat_log")
+
+    def _ambil_arsip(self):
+        """Dijalankan di thread worker: maksimal DEFAULT_LOG_LIMIT log terbaru dari segmen arsip."""
+        return list(itertools.islice(self.db_manager.iter_arsip_log_db(**self._filter), DEFAULT_LOG_LIMIT))
+
+    def _format_baris_log(self, values):
+        """row_formatter VirtualTreeview: (dict log,) -> nilai kolom, hanya untuk baris yang terlihat."""
+        log = values[0]
+        if log is None:
+            return ("", "Tidak ada data log.", "", "", "", "", "")
+        waktu = log['waktu']
+        if isinstance(waktu, datetime.datetime):
+            waktu = waktu.strftime("%Y-%m-%d %H:%M:%S")
+        aktor = log['nama_aktor'] or (f"ID {log['id_aktor']}" if log['id_aktor'] is not None else "-")
+        if log['perubahan'] is not None:
+            data_lama, data_baru = self._format_perubahan(log['perubahan'])
+        else: # Log lama (sebelum log terstruktur) masih berupa teks utuh
+            data_lama, data_baru = log['detail_lama'] or "", log['detail_baru'] or ""
+        return (log['id_log'], waktu, log['aksi'], log['id_kegiatan'] or "", aktor, data_lama, data_baru)
+
+    @classmethod
+    def _format_perubahan(cls, perubahan):
+        """dict {kolom: [lama, baru]} -> (teks data lama, teks data baru), hanya kolom yang tercatat."""
+        lama, baru = [], []
+        for kolom, (nilai_lama, nilai_baru) in perubahan.items():
+            label = cls.LABEL_KOLOM.get(kolom, kolom)
+            if kolom == "Tanggal": # Tanggal disimpan ISO di JSON, ditampilkan dd-mm-yyyy
+                nilai_lama, nilai_baru = (format_tanggal(parse_tanggal(v)) if v else v for v in (nilai_lama, nilai_baru))
+            elif kolom in ("Jam_Mulai", "Jam_Selesai"): # HH:MM:SS (SQLite) atau HH:MM:SS.ffffff (MySQL) -> HH:MM
+                nilai_lama, nilai_baru = (format_jam(parse_jam(v)) if v else v for v in (nilai_lama, nilai_baru))
+            if nilai_lama is not None:
+                lama.append(f"{label}: {nilai_lama}")
+            if nilai_baru is not None:
+                baru.append(f"{label}: {nilai_baru}")
+        return ", ".join(lama), ", ".join(baru)
+
+    def _isi_tabel(self, logs, ganti):
+        rows = [(log['id_log'], (log,)) for log in logs] # ID_Log sebagai key baris
+        if not ganti:
+            self.log_tree.append_rows(rows)
+        elif rows:
+            self.log_tree.set_rows(rows)
+        else:
+            self.log_tree.set_rows([("kosong", (None,))])
+
+    def _tampilkan_halaman_log(self, hasil, ganti):
+        if not self.top.winfo_exists():
+            return
+        self.top.config(cursor="")
+        self._sedang_memuat = False
+        self._next_cursor = hasil['next_cursor']
+        self._isi_tabel(hasil['items'], ganti)
+        jumlah = len(self.log_tree) if hasil['items'] or not ganti else 0
+        lanjut = " (gulir ke bawah untuk memuat lebih banyak)" if self._next_cursor else ""
+        self.status_label.config(text=f"{jumlah} log dimuat{lanjut}.")
+
+    def _tampilkan_arsip(self, logs):
+        if not self.top.winfo_exists():
+            return
+        self.top.config(cursor="")
+        self._sedang_memuat = False
+        self._mode_arsip = True
+        self._next_cursor = None
+        self._isi_tabel(logs, ganti=True)
+        batas = f" (dibatasi {DEFAULT_LOG_LIMIT} terbaru)" if len(logs) >= DEFAULT_LOG_LIMIT else ""
+        self.status_label.config(text=f"Arsip: {len(logs)} log{batas}.")
+
+    def _on_load_log_error(self, err):
+        if not self.top.winfo_exists():
+            return
+        self.top.config(cursor="")
+        self._sedang_memuat = False
+        if isinstance(err, DatabaseError):
+            messagebox.showerror("Error Database", f"Gagal memuat riwayat aktivitas: {err}", parent=self.top)
+        else:
+            messagebox.showerror("Error", f"Terjadi kesalahan saat memuat log: {err}", parent=self.top)
+
+
+# --- Kelas untuk Dialog Impor Massal (Mewarisi BaseDialog) ---
+class ImporKegiatanDialog(BaseDialog):
+    def __init__(self, parent, db_manager: DatabaseManager, db_executor: DbExecutor = None, on_data_berubah=None,
+                 aktor_id=None):
+        self.db_manager = db_manager
+        self.aktor_id = aktor_id # Pengguna yang login, dicatat di log audit
+        self.db_executor = db_executor or DbExecutor(parent)
+        self.on_data_berubah = on_data_berubah # Dipanggil jika ada kegiatan yang benar-benar disimpan
+        self.importer = None # ImporKegiatan yang sedang berjalan
+        self.hasil = None # HasilImpor terakhir
+        super().__init__(parent, "📥 Impor Kegiatan dari CSV/XLSX", "560x280")
+
+    def _build_ui(self):
+        frame = ttk.Frame(self.top, padding="15")
+        frame.pack(expand=True, fill=tk.BOTH)
+        label_style = f"{self.__class__.__name__}.TLabel"
+        button_style = f"{self.__class__.__name__}.TButton"
+
+        ttk.Label(frame, text="File:", style=label_style).grid(row=0, column=0, sticky="w", pady=5)
+        self.path_var = tk.StringVar()
+        ttk.Entry(frame, textvariable=self.path_var, width=45, font=FONT_STYLE).grid(row=0, column=1, sticky="ew", padx=5)
+        ttk.Button(frame, text="Pilih...", command=self._pilih_file, style=button_style).grid(row=0, column=2)
+
+        self.dry_run_var = tk.BooleanVar(value=True) # Default dry-run agar file dicek dulu
+        ttk.Checkbutton(frame, text="Dry-run (validasi saja, tidak menyimpan)", variable=self.dry_run_var).grid(
+            row=1, column=0, columnspan=3, sticky="w", pady=5)
+
+        self.progress = ttk.Progressbar(frame, mode="determinate", maximum=100)
+        self.progress.grid(row=2, column=0, columnspan=3, sticky="ew", pady=10)
+        self.status_label = ttk.Label(frame, text="Kolom: ID Kegiatan, Nama Kegiatan, Tanggal, Tempat, Jenis Kegiatan, Penanggung Jawab (nama atau NIM/NIP), opsional Jam Mulai dan Jam Selesai",
+                                      style=label_style, wraplength=520)
+        self.status_label.grid(row=3, column=0, columnspan=3, sticky="w")
+        frame.columnconfigure(1, weight=1)
+
+        button_frame = ttk.Frame(self.top)
+        button_frame.pack(pady=10)
+        self.mulai_button = ttk.Button(button_frame, text="Mulai Impor", command=self._mulai_impor, style=button_style)
+        self.mulai_button.pack(side=tk.LEFT, padx=5)
+        self.laporan_button = ttk.Button(button_frame, text="Simpan Laporan Ditolak", command=self._simpan_laporan,
+                                         style=button_style, state="disabled")
+        self.laporan_button.pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Tutup", command=self._on_close, style=button_style).pack(side=tk.LEFT, padx=5)
+
+    def _pilih_file(self):
+        path = filedialog.askopenfilename(parent=self.top, title="Pilih file kegiatan",
+                                          filetypes=[("CSV / Excel", "*.csv *.xlsx"), ("Semua file", "*.*")])
+        if path:
+            self.path_var.set(path)
+
+    def _mulai_impor(self):
+        path = self.path_var.get().strip()
+        if not path:
+            messagebox.showwarning("Impor", "Pilih file yang akan diimpor.", parent=self.top)
+            return
+        self.importer = ImporKegiatan(self.db_manager, dry_run=self.dry_run_var.get(), aktor_id=self.aktor_id)
+        self.mulai_button.config(state="disabled")
+        self.laporan_button.config(state="disabled")
+        self.progress["value"] = 0
+        self.status_label.config(text="Memproses...")
+        self.db_executor.submit(self.importer.jalankan, path, on_progress=self._laporkan_progress,
+                                on_success=self._on_impor_selesai, on_error=self._on_impor_gagal, key="impor")
+
+    def _laporkan_progress(self, diproses, total, hasil):
+        """Dipanggil di thread worker; pembaruan widget diteruskan ke thread Tk."""
+        self.db_executor.report(self._tampilkan_progress, diproses, total, len(hasil.ditolak))
+
+    def _tampilkan_progress(self, diproses, total, jumlah_ditolak):
+        if not self.top.winfo_exists():
+            return
+        self.progress["value"] = (diproses * 100 / total) if total else 0
+        self.status_label.config(text=f"{diproses}/{total} baris diproses, {jumlah_ditolak} ditolak...")
+
+    def _on_impor_selesai(self, hasil):
+        self.hasil = hasil
+        if not hasil.dry_run and hasil.jumlah_diimpor and self.on_data_berubah:
+            self.on_data_berubah() # Tetap dipanggil walau dialog sudah ditutup
+        if not self.top.winfo_exists():
+            return
+        self.progress["value"] = 100
+        self.status_label.config(text=hasil.ringkasan())
+        self.mulai_button.config(state="normal")
+        if hasil.ditolak:
+            self.laporan_button.config(state="normal")
+
+    def _on_impor_gagal(self, err):
+        if not self.top.winfo_exists():
+            return
+        self.mulai_button.config(state="normal")
+        self.status_label.config(text="Impor gagal.")
+        if isinstance(err, DatabaseError):
+            messagebox.showerror("Error Database", f"Impor gagal: {err}", parent=self.top)
+        else:
+            messagebox.showerror("Impor Gagal", str(err), parent=self.top)
+
+    def _simpan_laporan(self):
+        if not self.hasil or not self.hasil.ditolak:
+            return
+        path = filedialog.asksaveasfilename(parent=self.top, title="Simpan laporan baris ditolak",
+                                            defaultextension=".csv", initialfile="impor_ditolak.csv",
+                                            filetypes=[("CSV", "*.csv")])
+        if path:
+            try:
+                self.hasil.tulis_laporan_ditolak(path)
+            except OSError as e:
+                messagebox.showerror("Error", f"Gagal menyimpan laporan: {e}", parent=self.top)
+
+    def _on_close(self):
+        if self.importer is not None:
+            self.importer.batalkan() # Chunk yang sedang berjalan tetap selesai, sisanya dihentikan
+        super()._on_close()
+
+
+# --- Kelas untuk Dialog Ekspor Data (Mewarisi BaseDialog) ---
+class EksporDialog(BaseDialog):
+    SUMBER = {"Daftar Kegiatan": "kegiatan", "Riwayat Aktivitas": "log"}
+    FORMAT = {"CSV (.csv)": "csv", "JSON Lines (.jsonl)": "jsonl"}
+
+    def __init__(self, parent, db_manager: DatabaseManager, db_executor: DbExecutor = None):
+        self.db_manager = db_manager
+        self.db_executor = db_executor or DbExecutor(parent)
+        self._berhenti = False # Diset saat dialog ditutup agar ekspor di worker berhenti
+        super().__init__(parent, "📤 Ekspor Data", "460x260")
+
+    def _build_ui(self):
+        frame = ttk.Frame(self.top, padding="15")
+        frame.pack(expand=True, fill=tk.BOTH)
+        label_style = f"{self.__class__.__name__}.TLabel"
+        button_style = f"{self.__class__.__name__}.TButton"
+
+        ttk.Label(frame, text="Data:", style=label_style).grid(row=0, column=0, sticky="w", pady=5)
+        self.sumber_combo = ttk.Combobox(frame, values=list(self.SUMBER.keys()), state="readonly", font=FONT_STYLE)
+        self.sumber_combo.current(0)
+        self.sumber_combo.grid(row=0, column=1, sticky="ew", pady=5)
+
+        ttk.Label(frame, text="Format:", style=label_style).grid(row=1, column=0, sticky="w", pady=5)
+        self.format_combo = ttk.Combobox(frame, values=list(self.FORMAT.keys()), state="readonly", font=FONT_STYLE)
+        self.format_combo.current(0)
+        self.format_combo.grid(row=1, column=1, sticky="ew", pady=5)
+
+        ttk.Label(frame, text="Dari (dd-mm-yyyy):", style=label_style).grid(row=2, column=0, sticky="w", pady=5)
+        self.dari_entry = ttk.Entry(frame, font=FONT_STYLE)
+        self.dari_entry.grid(row=2, column=1, sticky="ew", pady=5)
+        ttk.Label(frame, text="Sampai (dd-mm-yyyy):", style=label_style).grid(row=3, column=0, sticky="w", pady=5)
+        self.sampai_entry = ttk.Entry(frame, font=FONT_STYLE)
+        self.sampai_entry.grid(row=3, column=1, sticky="ew", pady=5)
+
+        self.status_label = ttk.Label(frame, text="Kosongkan tanggal untuk mengekspor semua data.", style=label_style)
+        self.status_label.grid(row=4, column=0, columnspan=2, sticky="w", pady=5)
+        frame.columnconfigure(1, weight=1)
+
+        button_frame = ttk.Frame(self.top)
+        button_frame.pack(pady=10)
+        self.ekspor_button = ttk.Button(button_frame, text="Ekspor...", command=self._mulai_ekspor, style=button_style)
+        self.ekspor_button.pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Tutup", command=self._on_close, style=button_style).pack(side=tk.LEFT, padx=5)
+
+    def _mulai_ekspor(self):
+        sumber = self.SUMBER[self.sumber_combo.get()]
+        format_file = self.FORMAT[self.format_combo.get()]
+        dari = self.dari_entry.get().strip() or None
+        sampai = self.sampai_entry.get().strip() or None
         try:
-            log_data = self.db_manager.get_activity_log_db()
-            if log_data:
-                for row in log_data:
-                    formatted_row = list(row)
-                    if isinstance(row[1], datetime.datetime):
-                        formatted_row[1] = row[1].strftime("%Y-%m-%d %H:%M:%S")
-                    self.log_tree.insert("", tk.END, values=formatted_row)
-            else:
-                self.log_tree.insert("", tk.END, values=("", "Tidak ada data log.", "", "", "", ""))
-        except mysql.connector.Error as db_err:
-            messagebox.showerror("Error Database", f"Gagal memuat riwayat aktivitas: {db_err}", parent=self.top)
-        except Exception as e:
-            messagebox.showerror("Error", f"Terjadi kesalahan saat memuat log: {e}", parent=self.top)
+            parse_tanggal(dari)
+            parse_tanggal(sampai)
+        except ValueError as e:
+            messagebox.showerror("Tanggal Tidak Valid", str(e), parent=self.top)
+            return
+        path = filedialog.asksaveasfilename(parent=self.top, title="Simpan hasil ekspor",
+                                            defaultextension=f".{format_file}", initialfile=f"{sumber}.{format_file}",
+                                            filetypes=[(self.format_combo.get(), f"*.{format_file}")])
+        if not path:
+            return
+        self.ekspor_button.config(state="disabled")
+        self.status_label.config(text="Mengekspor...")
+        self.db_executor.submit(ekspor_data.ekspor, self.db_manager, sumber, path, format_file=format_file,
+                                tanggal_mulai=dari, tanggal_selesai=sampai,
+                                on_progress=lambda n: self.db_executor.report(self._tampilkan_progress, n),
+                                should_stop=lambda: self._berhenti,
+                                on_success=lambda n: self._on_ekspor_selesai(n, path),
+                                on_error=self._on_ekspor_gagal, key="ekspor")
+
+    def _tampilkan_progress(self, jumlah):
+        if self.top.winfo_exists():
+            self.status_label.config(text=f"{jumlah} baris ditulis...")
+
+    def _on_ekspor_selesai(self, jumlah, path):
+        if not self.top.winfo_exists():
+            return
+        self.ekspor_button.config(state="normal")
+        self.status_label.config(text=f"Selesai: {jumlah} baris ditulis.")
+        messagebox.showinfo("Ekspor Selesai", f"{jumlah} baris diekspor ke:\n{path}", parent=self.top)
+
+    def _on_ekspor_gagal(self, err):
+        if not self.top.winfo_exists():
+            return
+        self.ekspor_button.config(state="normal")
+        self.status_label.config(text="Ekspor gagal.")
+        if isinstance(err, DatabaseError):
+            messagebox.showerror("Error Database", f"Ekspor gagal: {err}", parent=self.top)
+        else:
+            messagebox.showerror("Ekspor Gagal", str(err), parent=self.top)
+
+    def _on_close(self):
+        self._berhenti = True
+        super()._on_close()
 
 
 # --- Kelas Aplikasi Utama ---
 class KegiatanApp:
-    def __init__(self, root, db_manager: DatabaseManager):
+    SEMUA_FILTER = "Semua" # Pilihan combobox filter yang berarti tidak difilter
+
+    def __init__(self, root, db_manager: DatabaseManager, db_executor: DbExecutor = None, cache: EntitasCache = None):
         self.root = root
         self.db_manager = db_manager
+        self.db_executor = db_executor or DbExecutor(root) # Semua query dijalankan di thread worker
+        self.cache = cache or EntitasCache(db_manager) # Identity map Kegiatan/Pengguna, write-through ke DB
         self.current_user: Pengguna = None # Akan diisi setelah login
         self.selected_kegiatan_obj_for_update: Kegiatan = None # Menyimpan objek Kegiatan yang dipilih
         
@@ -911,8 +1323,16 @@ class KegiatanApp:
 
         self._setup_styles()
         
-        self.pengguna_obj_map = {} # Map: display_name -> objek Pengguna
-        self.pengguna_id_to_display_map = {} # Map: id_pengguna -> display_name
+        # State pagination daftar kegiatan (keyset pagination)
+        self.page_size = DEFAULT_PAGE_SIZE
+        self._next_page_cursor = None
+        self._sedang_memuat_halaman = False
+        self._sedang_menyimpan = False # True selama tambah/update/hapus berjalan di worker
+        self._batas_urutan_dimuat = None # Key urutan baris terakhir yang sudah dimuat (None = belum ada halaman)
+        self._filter_kegiatan = {} # kwargs filter get_kegiatan_page_db yang sedang aktif ({} = semua kegiatan)
+        self._teks_pencarian = "" # Teks pencarian aktif; tidak kosong = tabel berisi hasil cari_kegiatan_db
+        self._pencarian_after_id = None
+        self._poll_after_id = None
 
         self._build_ui()
 
@@ -938,7 +1358,9 @@ class KegiatanApp:
         self._create_table_frame()
 
         self._load_pengguna_ui() # Memuat data pengguna untuk combobox
+        self._muat_opsi_filter_ui() # Pilihan jenis/tempat di filter bar
         self._tampilkan_semua_kegiatan_ui() # Menampilkan data kegiatan awal
+        self._jadwalkan_poll_perubahan()
 
     def _create_input_frame(self):
         input_frame = ttk.LabelFrame(self.root, text="Formulir Kegiatan")
@@ -948,7 +1370,7 @@ class KegiatanApp:
 
         self.labels_texts_map = {
             "id_kegiatan": "ID Kegiatan:", "nama_kegiatan": "Nama Kegiatan:",
-            "tanggal": "Tanggal:", "tempat": "Tempat:",
+            "tanggal": "Tanggal:", "tempat": "Tempat:", "jam": "Jam (HH:MM):",
             "jenis_kegiatan": "Jenis Kegiatan:", "pj": "Penanggung Jawab:"
         }
         self.entries = {}
@@ -998,6 +1420,19 @@ class KegiatanApp:
         self.entries["tempat"] = self.combo_tempat
         current_row_idx += 1
 
+        # Jam Mulai s.d. Jam Selesai: dipakai untuk cek bentrok ruangan
+        ttk.Label(form_fields_frame, text=self.labels_texts_map["jam"]).grid(row=current_row_idx, column=col_idx_label, sticky="w", padx=5, pady=5)
+        jam_frame = ttk.Frame(form_fields_frame)
+        jam_frame.grid(row=current_row_idx, column=col_idx_widget, sticky="ew", padx=5, pady=5)
+        self.entries["jam_mulai"] = ttk.Entry(jam_frame, font=FONT_STYLE, width=8)
+        self.entries["jam_mulai"].pack(side=tk.LEFT)
+        ttk.Label(jam_frame, text=" s.d. ").pack(side=tk.LEFT)
+        self.entries["jam_selesai"] = ttk.Entry(jam_frame, font=FONT_STYLE, width=8)
+        self.entries["jam_selesai"].pack(side=tk.LEFT)
+        self.btn_slot_kosong = self._styled_button(jam_frame, "🕒 Slot Kosong", self._tampilkan_slot_kosong)
+        self.btn_slot_kosong.pack(side=tk.LEFT, padx=(10, 0))
+        current_row_idx += 1
+
         # Jenis Kegiatan
         ttk.Label(form_fields_frame, text=self.labels_texts_map["jenis_kegiatan"]).grid(row=current_row_idx, column=col_idx_label, sticky="w", padx=5, pady=5)
         self.entries["jenis_kegiatan"] = ttk.Entry(form_fields_frame, font=FONT_STYLE, width=40)
@@ -1006,7 +1441,8 @@ class KegiatanApp:
 
         # Penanggung Jawab (Combobox)
         ttk.Label(form_fields_frame, text=self.labels_texts_map["pj"]).grid(row=current_row_idx, column=col_idx_label, sticky="w", padx=5, pady=5)
-        self.combo_pj = ttk.Combobox(form_fields_frame, state="readonly", width=37, font=FONT_STYLE)
+        # Type-ahead: ketik nama atau NIM/NIP, pilihan dicari di index awalan cache (tanpa query)
+        self.combo_pj = PickerPengguna(form_fields_frame, self.cache.cari_pengguna, width=37, font=FONT_STYLE)
         self.combo_pj.grid(row=current_row_idx, column=col_idx_widget, sticky="ew", padx=5, pady=5)
         self.entries["pj"] = self.combo_pj
         current_row_idx += 1
@@ -1045,41 +1481,117 @@ class KegiatanApp:
         self.btn_clear_form = self._styled_button(action_buttons_frame, "🧹 Bersihkan Form", self._clear_form_action)
         self.btn_clear_form.pack(side=tk.LEFT, padx=5)
 
-        self.btn_refresh_data = self._styled_button(action_buttons_frame, "🔄 Muat Ulang Data", self._tampilkan_semua_kegiatan_ui)
+        self.btn_refresh_data = self._styled_button(action_buttons_frame, "🔄 Muat Ulang Data", self._muat_ulang_data_ui)
         self.btn_refresh_data.pack(side=tk.LEFT, padx=5)
 
         self.btn_activity_log = self._styled_button(action_buttons_frame, "📜 Riwayat Aktivitas", self._open_activity_log_dialog)
         self.btn_activity_log.pack(side=tk.LEFT, padx=5)
 
+        self.btn_impor = self._styled_button(action_buttons_frame, "📥 Impor", self._open_impor_dialog)
+        self.btn_impor.pack(side=tk.LEFT, padx=5)
+
+        self.btn_ekspor = self._styled_button(action_buttons_frame, "📤 Ekspor", self._open_ekspor_dialog)
+        self.btn_ekspor.pack(side=tk.LEFT, padx=5)
+
+        # Indikator operasi database yang sedang berjalan di latar belakang
+        self.lbl_status_db = ttk.Label(action_buttons_frame, text="", width=14)
+        self.lbl_status_db.pack(side=tk.LEFT, padx=5)
+        self.db_executor.add_busy_listener(self._update_status_db)
+
+    def _update_status_db(self, jumlah_in_flight):
+        self.lbl_status_db.config(text=f"⏳ Memuat… ({jumlah_in_flight})" if jumlah_in_flight else "")
+        self.root.config(cursor="watch" if jumlah_in_flight else "")
+
+    def _id_aktor(self):
+        """ID pengguna yang login, dicatat di log audit sebagai pelaku perubahan."""
+        return self.current_user.id_entitas if self.current_user else None
+
+    def _set_tombol_aksi_aktif(self, aktif):
+        """Menonaktifkan tombol aksi selama operasi simpan berjalan agar tidak terkirim dua kali."""
+        self._sedang_menyimpan = not aktif
+        if not aktif:
+            for btn in (self.btn_simpan, self.btn_update, self.btn_hapus, self.btn_clear_form):
+                btn.config(state="disabled")
+            return
+        self.btn_hapus.config(state="normal")
+        self.btn_clear_form.config(state="normal")
+        # Tombol Tambah/Update mengikuti mode form (baru vs. edit)
+        if self.selected_kegiatan_obj_for_update:
+            self.btn_simpan.config(state="disabled")
+            self.btn_update.config(state="normal")
+        else:
+            self.btn_simpan.config(state="normal")
+            self.btn_update.config(state="disabled")
+
 
     def _create_table_frame(self):
         tabel_frame = ttk.LabelFrame(self.root, text="📋 Daftar Kegiatan (dari View)")
         tabel_frame.pack(fill='both', expand=True, padx=15, pady=10)
 
+        # Filter bar: penyaringan dilakukan database (get_kegiatan_page_db), bukan di tabel
+        filter_frame = ttk.Frame(tabel_frame)
+        filter_frame.pack(side="top", fill="x", pady=(5, 5))
+        ttk.Label(filter_frame, text="🔎 Cari:").pack(side=tk.LEFT)
+        self.entry_pencarian = ttk.Entry(filter_frame, width=20, font=FONT_STYLE)
+        self.entry_pencarian.pack(side=tk.LEFT, padx=(3, 8))
+        self.entry_pencarian.bind("<KeyRelease>", self._on_ketik_pencarian)
+        self.entry_pencarian.bind("<Escape>", lambda e: self._bersihkan_pencarian())
+        ttk.Label(filter_frame, text="Jenis:").pack(side=tk.LEFT)
+        self.combo_filter_jenis = ttk.Combobox(filter_frame, values=[self.SEMUA_FILTER], state="readonly", width=14,
+                                               font=FONT_STYLE)
+        self.combo_filter_jenis.pack(side=tk.LEFT, padx=(3, 8))
+        ttk.Label(filter_frame, text="Tempat:").pack(side=tk.LEFT)
+        self.combo_filter_tempat = ttk.Combobox(filter_frame, values=[self.SEMUA_FILTER] + self.tempat_options,
+                                                state="readonly", width=14, font=FONT_STYLE)
+        self.combo_filter_tempat.pack(side=tk.LEFT, padx=(3, 8))
+        ttk.Label(filter_frame, text="PJ:").pack(side=tk.LEFT)
+        self.combo_filter_pj = PickerPengguna(filter_frame, self.cache.cari_pengguna, width=18, font=FONT_STYLE)
+        self.combo_filter_pj.pack(side=tk.LEFT, padx=(3, 8)) # Kosong = semua penanggung jawab
+        for combo in (self.combo_filter_jenis, self.combo_filter_tempat):
+            combo.current(0)
+        ttk.Label(filter_frame, text="Dari:").pack(side=tk.LEFT)
+        self.entry_filter_dari = ttk.Entry(filter_frame, width=11, font=FONT_STYLE)
+        self.entry_filter_dari.pack(side=tk.LEFT, padx=(3, 8))
+        ttk.Label(filter_frame, text="Sampai:").pack(side=tk.LEFT)
+        self.entry_filter_sampai = ttk.Entry(filter_frame, width=11, font=FONT_STYLE)
+        self.entry_filter_sampai.pack(side=tk.LEFT, padx=(3, 8))
+        self._styled_button(filter_frame, "🔍 Terapkan", self._terapkan_filter_kegiatan).pack(side=tk.LEFT)
+        self._styled_button(filter_frame, "✖ Reset", self._reset_filter_kegiatan).pack(side=tk.LEFT, padx=(5, 0))
+        for entry in (self.entry_filter_dari, self.entry_filter_sampai):
+            entry.bind("<Return>", lambda e: self._terapkan_filter_kegiatan())
+
         columns_info = {
             "id": {"text": "ID Keg.", "width": 80, "anchor": "w"},
             "nama": {"text": "Nama Kegiatan", "width": 250, "anchor": "w"},
-            "tanggal": {"text": "Tanggal", "width": 100, "anchor": "center"},
+            # sort_key: diurutkan sebagai tanggal, bukan sebagai string dd-mm-yyyy
+            "tanggal": {"text": "Tanggal", "width": 100, "anchor": "center", "sort_key": parse_tanggal},
             "tempat": {"text": "Tempat", "width": 180, "anchor": "w"},
             "jenis": {"text": "Jenis Keg.", "width": 120, "anchor": "w"},
             "pj_nama": {"text": "P. Jawab", "width": 150, "anchor": "w"},
-            "pj_id": {"text": "ID PJ", "width": 0, "anchor": "w"} # Kolom tersembunyi
+            "pj_id": {"text": "ID PJ", "width": 0, "anchor": "w"}, # Kolom tersembunyi
+            "waktu": {"text": "Waktu", "width": 100, "anchor": "center"}
         }
-        self.tree = ttk.Treeview(tabel_frame, columns=list(columns_info.keys()), show="headings")
-
-        for col_id, info in columns_info.items():
-            self.tree.heading(col_id, text=info["text"])
-            self.tree.column(col_id, anchor=info["anchor"], width=info["width"],
-                             minwidth=info["width"] if info["width"] > 50 else 50,
-                             stretch=tk.NO if info["width"] == 0 else tk.YES)
-
-
+        for info in columns_info.values():
+            info["minwidth"] = info["width"] if info["width"] > 50 else 50
+            info["stretch"] = tk.NO if info["width"] == 0 else tk.YES
+
+        # Tabel virtual: hanya baris yang terlihat yang dibuat sebagai item Treeview,
+        # halaman berikutnya dimuat saat viewport mendekati akhir data
+        self.tree = VirtualTreeview(tabel_frame, columns_info, on_near_end=self._muat_halaman_berikutnya_ui,
+                                    default_order_key=self._urutan_baris_kegiatan)
         self.tree.pack(side="left", fill="both", expand=True)
         self.tree.bind("<<TreeviewSelect>>", self._on_tree_select)
 
-        scrollbar = ttk.Scrollbar(tabel_frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscroll=scrollbar.set)
-        scrollbar.pack(side=tk.RIGHT, fill="y")
+    @staticmethod
+    def _urutan_baris_kegiatan(values):
+        """Key urutan baris tabel, sama dengan ORDER BY Tanggal DESC, Nama ASC, ID ASC di DB."""
+        id_keg, nama, tanggal_str = values[0], values[1], values[2]
+        try:
+            tanggal = parse_tanggal(tanggal_str)
+        except ValueError:
+            tanggal = None
+        # Tanggal NULL diletakkan di akhir, seperti urutan DESC di database
+        return (tanggal is None, -tanggal.toordinal() if tanggal else 0, nama, id_keg)
 
     def _clear_form_fields(self):
         self.entries["id_kegiatan"].config(state="normal")
@@ -1087,93 +1599,91 @@ class KegiatanApp:
         self.entries["nama_kegiatan"].delete(0, tk.END)
         self.cal_tanggal.selection_set(datetime.date.today()) # Reset tanggal ke hari ini
         self.combo_tempat.set('')
+        self.entries["jam_mulai"].delete(0, tk.END)
+        self.entries["jam_selesai"].delete(0, tk.END)
         self.entries["jenis_kegiatan"].delete(0, tk.END)
-        self.combo_pj.set('')
+        self.combo_pj.kosongkan()
         self.selected_kegiatan_obj_for_update = None # Reset objek yang dipilih
 
     def _clear_form_action(self):
+        if self._sedang_menyimpan:
+            return # Form dikunci sampai operasi simpan selesai
         self._clear_form_fields()
         self.entries["id_kegiatan"].config(state="normal")
         self.btn_simpan.config(state="normal")
         self.btn_update.config(state="disabled")
         if self.tree.selection():
-            self.tree.selection_remove(self.tree.selection()[0])
+            self.tree.selection_remove()
 
     def _on_tree_select(self, event=None):
+        if self._sedang_menyimpan:
+            return # Form dikunci sampai operasi simpan selesai
         selected_items = self.tree.selection()
         if not selected_items:
             self._clear_form_action()
             return
 
-        item_id = selected_items[0] # ID internal treeview, bukan ID kegiatan
-        item_values = self.tree.item(item_id, "values")
-
-        if not item_values or len(item_values) < 7:
-            print("Error: Data item tidak lengkap dari treeview.")
+        id_kegiatan = selected_items[0] # Key baris = ID Kegiatan
+        keg_obj = self.cache.kegiatan(id_kegiatan)
+        if keg_obj is not None:
+            self._isi_form_kegiatan(keg_obj)
+            return
+        # Entri sudah diinvalidasi (diubah dari luar): ambil ulang di worker, form diisi setelahnya
+        self.db_executor.submit(self.cache.kegiatan, id_kegiatan, muat=True,
+                                on_success=lambda obj: self._on_kegiatan_terpilih_dimuat(id_kegiatan, obj),
+                                on_error=lambda err: self._tampilkan_error_db("Gagal memuat kegiatan", err),
+                                key="muat_kegiatan_terpilih")
+
+    def _on_kegiatan_terpilih_dimuat(self, id_kegiatan, keg_obj):
+        if self.tree.selection() != (id_kegiatan,) or self._sedang_menyimpan:
+            return # Pilihan sudah berpindah selama query berjalan
+        if keg_obj is None:
+            messagebox.showwarning("⚠️ Peringatan", f"Kegiatan ID: {id_kegiatan} sudah tidak ada.", parent=self.root)
+            self.tree.delete_row(id_kegiatan)
             self._clear_form_action()
             return
+        self._isi_form_kegiatan(keg_obj)
 
+    def _isi_form_kegiatan(self, keg_obj):
+        """Mengisi form dari objek Kegiatan di cache (tanpa query)."""
         self._clear_form_fields()
+        self.selected_kegiatan_obj_for_update = keg_obj
 
-        id_keg_val, nama_keg_val, tgl_val, tempat_val, jenis_val, _, pj_id_val_hidden = item_values
-        
-        # Cari objek Kegiatan yang sesuai dari data yang sudah dimuat
-        # Ini asumsi bahwa ID kegiatan (id_keg_val) unik dan ada di self.kegiatan_data_cache
-        # Jika tidak ada cache, Anda perlu query lagi ke DB atau simpan objek saat memuat tree
-        self.selected_kegiatan_obj_for_update = Kegiatan(id_keg_val, nama_keg_val, tgl_val, tempat_val, jenis_val, int(pj_id_val_hidden) if pj_id_val_hidden and pj_id_val_hidden != 'None' else None)
-
-
-        self.entries["id_kegiatan"].insert(0, id_keg_val)
+        self.entries["id_kegiatan"].insert(0, keg_obj.id_entitas)
         self.entries["id_kegiatan"].config(state="readonly")
-        self.entries["nama_kegiatan"].insert(0, nama_keg_val)
-
-        try:
-            if tgl_val:
-                date_obj = datetime.datetime.strptime(tgl_val, "%d-%m-%Y").date()
-                self.cal_tanggal.selection_set(date_obj)
-            else: # Jika tgl_val kosong atau None
-                self.cal_tanggal.selection_set(datetime.date.today())
-        except ValueError:
-            print(f"Format tanggal salah dari tree: {tgl_val}")
-            self.cal_tanggal.selection_set(datetime.date.today()) # Default ke hari ini
+        self.entries["nama_kegiatan"].insert(0, keg_obj.nama_kegiatan)
+        self.cal_tanggal.selection_set(keg_obj.tanggal or datetime.date.today())
 
-        if tempat_val in self.tempat_options:
-            self.combo_tempat.set(tempat_val)
+        if keg_obj.tempat in self.tempat_options:
+            self.combo_tempat.set(keg_obj.tempat)
         else:
             self.combo_tempat.set('') # Kosongkan jika tidak ada di opsi
+        self.entries["jam_mulai"].insert(0, format_jam(keg_obj.jam_mulai))
+        self.entries["jam_selesai"].insert(0, format_jam(keg_obj.jam_selesai))
 
-        self.entries["jenis_kegiatan"].insert(0, jenis_val)
+        self.entries["jenis_kegiatan"].insert(0, keg_obj.jenis_kegiatan)
 
-        if pj_id_val_hidden and pj_id_val_hidden != 'None' and pj_id_val_hidden.strip():
-            try:
-                pj_id_int = int(pj_id_val_hidden)
-                pj_display_text = self.pengguna_id_to_display_map.get(pj_id_int)
-                if pj_display_text:
-                    self.combo_pj.set(pj_display_text)
-                else:
-                    self.combo_pj.set('') # PJ tidak ditemukan
-            except ValueError:
-                self.combo_pj.set('')
-                print(f"ID PJ tidak valid: {pj_id_val_hidden}")
-        else:
-            self.combo_pj.set('') # Tidak ada PJ
+        pj_obj = self.cache.pengguna(keg_obj.id_penanggung_jawab)
+        self.combo_pj.set_pengguna(pj_obj) # Kosong jika PJ tidak ditemukan
 
         self.btn_simpan.config(state="disabled")
         self.btn_update.config(state="normal")
 
     def _load_pengguna_ui(self):
-        try:
-            pengguna_list_obj = self.db_manager.get_semua_pengguna_obj_db() # Dapat list objek Pengguna
-            if pengguna_list_obj:
-                self.pengguna_obj_map = {p_obj.get_display_name(): p_obj for p_obj in pengguna_list_obj}
-                self.pengguna_id_to_display_map = {p_obj.id_entitas: p_obj.get_display_name() for p_obj in pengguna_list_obj}
-                self.combo_pj["values"] = list(self.pengguna_obj_map.keys())
-            else:
-                self.combo_pj["values"] = []
-                self.pengguna_obj_map = {}
-                self.pengguna_id_to_display_map = {}
-        except mysql.connector.Error as err:
-            messagebox.showerror("Error Database", f"Gagal memuat data pengguna: {err}", parent=self.root)
+        self.db_executor.submit(self.cache.semua_pengguna, on_success=self._tampilkan_pengguna,
+                                on_error=lambda err: self._tampilkan_error_db("Gagal memuat data pengguna", err),
+                                key="muat_pengguna")
+
+    def _tampilkan_pengguna(self, pengguna_list_obj):
+        """Index awalan pengguna sudah diperbarui cache di worker; saran picker yang sedang diketik ikut disegarkan."""
+        for picker in (self.combo_pj, self.combo_filter_pj):
+            picker.perbarui_saran()
+
+    def _tampilkan_error_db(self, judul, err):
+        if isinstance(err, DatabaseError):
+            messagebox.showerror("Error Database", f"{judul}: {err}", parent=self.root)
+        else:
+            messagebox.showerror("❌ Kesalahan Umum", f"{judul}: {err}", parent=self.root)
 
 
     def _get_form_data_as_kegiatan_object(self, for_update=False):
@@ -1184,37 +1694,74 @@ class KegiatanApp:
 
         nama = self.entries["nama_kegiatan"].get().strip()
         
-        tanggal_obj_from_cal = self.cal_tanggal.get_date() # Ini adalah objek datetime.date
-        tanggal_str = ""
-        if isinstance(tanggal_obj_from_cal, datetime.date):
-            tanggal_str = tanggal_obj_from_cal.strftime("%d-%m-%Y")
-        elif isinstance(tanggal_obj_from_cal, str) and tanggal_obj_from_cal: # Jika get_date() mengembalikan string
-             try:
-                parsed_date = datetime.datetime.strptime(tanggal_obj_from_cal, "%d-%m-%Y").date()
-                tanggal_str = parsed_date.strftime("%d-%m-%Y")
-             except ValueError:
-                messagebox.showerror("Error Tanggal", f"Format tanggal dari kalender ('{tanggal_obj_from_cal}') tidak valid.", parent=self.root)
-                return None # Indikasi error
-        else: # tanggal_obj_from_cal adalah None atau tipe tidak dikenal
+        tanggal_obj_from_cal = self.cal_tanggal.get_date() # Bisa berupa datetime.date atau string dd-mm-yyyy
+        if not tanggal_obj_from_cal:
             messagebox.showwarning("Validasi Gagal", "Tanggal harus dipilih.", parent=self.root)
             return None # Indikasi error
-
+        try:
+            tanggal_obj = parse_tanggal(tanggal_obj_from_cal) # Kegiatan membawa datetime.date, bukan string
+        except ValueError:
+            messagebox.showerror("Error Tanggal", f"Format tanggal dari kalender ('{tanggal_obj_from_cal}') tidak valid.", parent=self.root)
+            return None # Indikasi error
 
         tempat = self.combo_tempat.get().strip()
         jenis = self.entries["jenis_kegiatan"].get().strip()
-        pj_display_name = self.combo_pj.get()
+        pj_teks = self.combo_pj.get().strip()
 
-        if not all([id_keg, nama, tanggal_str, tempat, jenis, pj_display_name]):
+        if not all([id_keg, nama, tanggal_obj, tempat, jenis, pj_teks]):
             messagebox.showwarning("⚠️ Validasi Gagal", "Semua kolom formulir harus diisi.", parent=self.root)
             return None
 
-        selected_pengguna_obj = self.pengguna_obj_map.get(pj_display_name)
-        if not selected_pengguna_obj:
-            messagebox.showerror("Error Internal", "Penanggung jawab tidak valid.", parent=self.root)
+        try:
+            jam_mulai = parse_jam(self.entries["jam_mulai"].get())
+            jam_selesai = parse_jam(self.entries["jam_selesai"].get())
+        except ValueError as e:
+            messagebox.showerror("Error Jam", str(e), parent=self.root)
+            return None
+        if (jam_mulai is None) != (jam_selesai is None):
+            messagebox.showwarning("⚠️ Validasi Gagal", "Isi jam mulai dan jam selesai, atau kosongkan keduanya.", parent=self.root)
+            return None
+        if jam_mulai is not None and jam_mulai >= jam_selesai:
+            messagebox.showwarning("⚠️ Validasi Gagal", "Jam selesai harus setelah jam mulai.", parent=self.root)
+            return None
+
+        id_pj = self.combo_pj.id_terpilih
+        if id_pj is None:
+            messagebox.showwarning("⚠️ Validasi Gagal", "Pilih penanggung jawab dari daftar saran (ketik nama atau NIM/NIP).",
+                                   parent=self.root)
             return None
-        id_pj = selected_pengguna_obj.id_entitas
 
-        return Kegiatan(id_keg, nama, tanggal_str, tempat, jenis, id_pj)
+        return Kegiatan(id_keg, nama, tanggal_obj, tempat, jenis, id_pj, jam_mulai, jam_selesai)
+
+    def _tampilkan_slot_kosong(self):
+        """Mencari jam kosong ruangan terpilih pada tanggal di kalender (query di worker)."""
+        tempat = self.combo_tempat.get().strip()
+        if not tempat:
+            messagebox.showwarning("⚠️ Peringatan", "Pilih tempat terlebih dahulu.", parent=self.root)
+            return
+        try:
+            tanggal = parse_tanggal(self.cal_tanggal.get_date())
+        except ValueError as e:
+            messagebox.showerror("Error Tanggal", str(e), parent=self.root)
+            return
+        self.db_executor.submit(self.db_manager.get_slot_kosong_db, tempat, tanggal,
+                                on_success=lambda slot: self._on_slot_kosong(tempat, tanggal, slot),
+                                on_error=lambda err: self._tampilkan_error_db("Gagal mencari slot kosong", err),
+                                key="slot_kosong")
+
+    def _on_slot_kosong(self, tempat, tanggal, slot):
+        judul = f"{tempat}, {format_tanggal(tanggal)}"
+        if not slot:
+            messagebox.showinfo("🕒 Slot Kosong", f"Tidak ada jam kosong di {judul}.", parent=self.root)
+            return
+        daftar = "\n".join(f"• {format_jam(mulai)}-{format_jam(selesai)}" for mulai, selesai in slot)
+        messagebox.showinfo("🕒 Slot Kosong", f"Jam kosong di {judul}:\n{daftar}", parent=self.root)
+
+    def _tampilkan_bentrok(self, err):
+        daftar = "\n".join(f"• {k.id_entitas} {k.nama_kegiatan} ({k.waktu_str})" for k in err.bentrok) or err.msg
+        messagebox.showwarning("⏰ Jadwal Bentrok",
+                               f"Ruangan sudah dipakai pada jam tersebut:\n{daftar}\n\n"
+                               "Gunakan '🕒 Slot Kosong' untuk melihat jam yang masih tersedia.", parent=self.root)
 
 
     def _tambah_kegiatan(self):
@@ -1222,18 +1769,28 @@ class KegiatanApp:
         if not kegiatan_baru:
             return # Validasi gagal atau error saat ambil data form
 
-        try:
-            self.db_manager.tambah_kegiatan_obj_db(kegiatan_baru)
-            messagebox.showinfo("✅ Sukses", f"Kegiatan '{kegiatan_baru.nama_kegiatan}' berhasil ditambahkan.", parent=self.root)
-            self._tampilkan_semua_kegiatan_ui()
-            self._clear_form_action()
-        except mysql.connector.Error as db_err:
-            if db_err.errno == 1062 or (hasattr(db_err, 'msg') and 'ID Kegiatan sudah ada.' in db_err.msg) :
+        self._set_tombol_aksi_aktif(False)
+        self.db_executor.submit(self.cache.tambah_kegiatan, kegiatan_baru, aktor_id=self._id_aktor(),
+                                on_success=self._on_tambah_berhasil,
+                                on_error=lambda err: self._on_tambah_gagal(kegiatan_baru, err))
+
+    def _on_tambah_berhasil(self, kegiatan_baru):
+        self._set_tombol_aksi_aktif(True)
+        messagebox.showinfo("✅ Sukses", f"Kegiatan '{kegiatan_baru.nama_kegiatan}' berhasil ditambahkan.", parent=self.root)
+        self._terapkan_kegiatan_ke_tabel(kegiatan_baru) # Hanya baris baru yang disisipkan
+        self._clear_form_action()
+
+    def _on_tambah_gagal(self, kegiatan_baru, err):
+        self._set_tombol_aksi_aktif(True)
+        if isinstance(err, JadwalBentrokError):
+            self._tampilkan_bentrok(err)
+        elif isinstance(err, DatabaseError):
+            if err.errno == 1062 or (hasattr(err, 'msg') and 'ID Kegiatan sudah ada.' in err.msg) :
                  messagebox.showerror("❌ Error Duplikasi", f"ID Kegiatan '{kegiatan_baru.id_entitas}' sudah terdaftar atau ada error SP terkait duplikasi.", parent=self.root)
             else:
-                 messagebox.showerror("❌ Error Database", f"Gagal menambah kegiatan: {db_err}", parent=self.root)
-        except Exception as e:
-            messagebox.showerror("❌ Kesalahan Umum", f"Terjadi kesalahan tak terduga: {e}", parent=self.root)
+                 messagebox.showerror("❌ Error Database", f"Gagal menambah kegiatan: {err}", parent=self.root)
+        else:
+            messagebox.showerror("❌ Kesalahan Umum", f"Terjadi kesalahan tak terduga: {err}", parent=self.root)
 
 
     def _update_kegiatan(self):
@@ -1245,15 +1802,25 @@ class KegiatanApp:
         if not kegiatan_update:
             return # Validasi gagal
 
-        try:
-            self.db_manager.update_kegiatan_obj_db(kegiatan_update)
-            messagebox.showinfo("✅ Sukses", f"Kegiatan (ID: {kegiatan_update.id_entitas}) berhasil diperbarui.", parent=self.root)
-            self._tampilkan_semua_kegiatan_ui()
-            self._clear_form_action()
-        except mysql.connector.Error as db_err:
-             messagebox.showerror("❌ Error Database", f"Gagal memperbarui kegiatan: {db_err}", parent=self.root)
-        except Exception as e:
-            messagebox.showerror("❌ Kesalahan Umum", f"Terjadi kesalahan tak terduga saat update: {e}", parent=self.root)
+        self._set_tombol_aksi_aktif(False)
+        self.db_executor.submit(self.cache.update_kegiatan, kegiatan_update, aktor_id=self._id_aktor(),
+                                on_success=self._on_update_berhasil,
+                                on_error=self._on_update_gagal)
+
+    def _on_update_berhasil(self, kegiatan_update):
+        self._set_tombol_aksi_aktif(True)
+        messagebox.showinfo("✅ Sukses", f"Kegiatan (ID: {kegiatan_update.id_entitas}) berhasil diperbarui.", parent=self.root)
+        self._terapkan_kegiatan_ke_tabel(kegiatan_update) # Hanya baris ini yang diperbarui di tempat
+        self._clear_form_action()
+
+    def _on_update_gagal(self, err):
+        self._set_tombol_aksi_aktif(True)
+        if isinstance(err, JadwalBentrokError):
+            self._tampilkan_bentrok(err)
+        elif isinstance(err, DatabaseError):
+             messagebox.showerror("❌ Error Database", f"Gagal memperbarui kegiatan: {err}", parent=self.root)
+        else:
+            messagebox.showerror("❌ Kesalahan Umum", f"Terjadi kesalahan tak terduga saat update: {err}", parent=self.root)
 
     def _hapus_kegiatan(self):
         selected_items = self.tree.selection()
@@ -1264,79 +1831,350 @@ class KegiatanApp:
             messagebox.showwarning("⚠️ Peringatan", "Hanya bisa menghapus satu kegiatan dalam satu waktu.", parent=self.root)
             return
 
-        id_keg_to_delete = self.tree.item(selected_items[0], "values")[0]
-        nama_keg_to_delete = self.tree.item(selected_items[0], "values")[1]
+        id_keg_to_delete = selected_items[0] # Key baris = ID Kegiatan
+        nama_keg_to_delete = self.tree.get_values(id_keg_to_delete)[1]
 
 
         if not messagebox.askyesno("❓ Konfirmasi Hapus", f"Anda yakin ingin menghapus kegiatan '{nama_keg_to_delete}' (ID: {id_keg_to_delete})?", parent=self.root):
             return
 
-        try:
-            self.db_manager.hapus_kegiatan_db(id_keg_to_delete)
-            messagebox.showinfo("🗑️ Sukses", f"Kegiatan ID: {id_keg_to_delete} berhasil dihapus.", parent=self.root)
-            self._tampilkan_semua_kegiatan_ui()
-            self._clear_form_action()
-        except mysql.connector.Error as err:
-            messagebox.showerror("❌ Error Database", f"Gagal menghapus ID {id_keg_to_delete}: {err}", parent=self.root)
+        self._set_tombol_aksi_aktif(False)
+        self.db_executor.submit(self.cache.hapus_kegiatan, id_keg_to_delete, aktor_id=self._id_aktor(),
+                                on_success=lambda _: self._on_hapus_berhasil(id_keg_to_delete),
+                                on_error=lambda err: self._on_hapus_gagal(id_keg_to_delete, err))
+
+    def _on_hapus_berhasil(self, id_keg_to_delete):
+        self._set_tombol_aksi_aktif(True)
+        messagebox.showinfo("🗑️ Sukses", f"Kegiatan ID: {id_keg_to_delete} berhasil dihapus.", parent=self.root)
+        self.tree.delete_row(id_keg_to_delete) # Hanya baris ini yang dihapus dari tabel
+        self._clear_form_action()
+
+    def _on_hapus_gagal(self, id_keg_to_delete, err):
+        self._set_tombol_aksi_aktif(True)
+        self._tampilkan_error_db(f"Gagal menghapus ID {id_keg_to_delete}", err)
 
 
     def _tampilkan_semua_kegiatan_ui(self):
-        for row in self.tree.get_children():
-            self.tree.delete(row)
+        """Mengosongkan tabel lalu memuat halaman pertama; halaman lain dimuat saat pengguna scroll."""
+        if self._teks_pencarian:
+            self._jalankan_pencarian() # Mode pencarian: tabel berisi hasil terurut relevansi
+            return
+        self.tree.clear()
+        self._batas_urutan_dimuat = None
+        self._next_page_cursor = None
+        self._sedang_memuat_halaman = False # Pemuatan halaman lama akan dibatalkan oleh submit berikut
+        self._muat_halaman_kegiatan_ui(cursor=None)
+
+    def _muat_halaman_berikutnya_ui(self):
+        if self._next_page_cursor and not self._sedang_memuat_halaman:
+            self._muat_halaman_kegiatan_ui(cursor=self._next_page_cursor)
+
+    def _muat_halaman_kegiatan_ui(self, cursor):
+        """Mengambil satu halaman di worker lalu menambahkannya ke akhir Treeview di thread Tk."""
+        self._sedang_memuat_halaman = True
+        # Key "muat_kegiatan" dipakai bersama muat ulang: pemuatan yang lebih baru membatalkan yang lama
+        self.db_executor.submit(self._ambil_halaman_kegiatan, cursor, dict(self._filter_kegiatan),
+                                on_success=self._tampilkan_halaman_kegiatan,
+                                on_error=self._on_muat_kegiatan_gagal, key="muat_kegiatan")
+
+    def _ambil_halaman_kegiatan(self, cursor, filter_kegiatan):
+        """Dijalankan di thread worker: query satu halaman dan siapkan baris tampilannya."""
+        if cursor is None:
+            self.cache.sinkronkan() # Titik awal change feed diambil sebelum halaman pertama dibaca
+        # get_kegiatan_page_db mengembalikan {'items': KegiatanBatch, 'next_cursor': token}
+        page = self.db_manager.get_kegiatan_page_db(page_size=self.page_size, cursor=cursor, **filter_kegiatan)
+        batch = self.cache.simpan_batch(page['items'])
+        # Baris tampilan dibentuk langsung dari kolom batch (tanggal diformat dd-mm-yyyy), tanpa objek Kegiatan
+        rows = [(batch.id_kegiatan(pos), batch.tuple_tampilan(pos)) for pos in range(len(batch))]
+        return page, rows
+
+    def _tampilkan_halaman_kegiatan(self, hasil):
+        page, rows = hasil
+        self.tree.append_rows(rows) # Key baris = ID Kegiatan
+        if rows:
+            self._batas_urutan_dimuat = self._urutan_baris_kegiatan(rows[-1][1])
+        self._next_page_cursor = page['next_cursor']
+        self._sedang_memuat_halaman = False
+
+    def _on_muat_kegiatan_gagal(self, err):
+        self._sedang_memuat_halaman = False
+        self._tampilkan_error_db("Gagal memuat daftar kegiatan", err)
+
+    def _terapkan_kegiatan_ke_tabel(self, keg_obj):
+        """Menyisipkan/memperbarui satu baris kegiatan di tabel tanpa query ulang (cache sudah write-through)."""
+        self._tambah_opsi_filter(keg_obj)
+        if self._teks_pencarian:
+            self._jalankan_pencarian(segarkan=True) # Relevansi baris baru hanya diketahui indeks full-text
+            return
+        if not keg_obj.cocok_filter(**self._filter_kegiatan):
+            if self.tree.exists(keg_obj.id_entitas): # Setelah diubah tidak lagi lolos filter yang aktif
+                self.tree.delete_row(keg_obj.id_entitas)
+            return
+        nama_pj = self.cache.nama_pengguna(keg_obj.id_penanggung_jawab)
+        self.tree.upsert_row(keg_obj.id_entitas, keg_obj.to_tuple_for_display(nama_pj=nama_pj))
+
+    # --- Filter daftar kegiatan ---
+    def _muat_opsi_filter_ui(self):
+        self.db_executor.submit(self.db_manager.get_opsi_filter_kegiatan_db, on_success=self._tampilkan_opsi_filter,
+                                on_error=lambda err: print(f"Peringatan: Gagal memuat pilihan filter - {err}"),
+                                key="opsi_filter")
+
+    def _tampilkan_opsi_filter(self, opsi):
+        self.combo_filter_jenis["values"] = [self.SEMUA_FILTER] + opsi['jenis']
+        # Tempat baku tetap bisa dipilih walau belum pernah dipakai kegiatan mana pun
+        tempat = sorted(set(self.tempat_options) | set(opsi['tempat']))
+        self.combo_filter_tempat["values"] = [self.SEMUA_FILTER] + tempat
+
+    def _tambah_opsi_filter(self, keg_obj):
+        """Jenis/tempat baru dari form langsung muncul di pilihan filter tanpa query ulang."""
+        for combo, nilai in ((self.combo_filter_jenis, keg_obj.jenis_kegiatan), (self.combo_filter_tempat, keg_obj.tempat)):
+            values = list(combo["values"])
+            if nilai and nilai not in values:
+                combo["values"] = values[:1] + sorted(values[1:] + [nilai])
+
+    def _baca_filter_kegiatan(self):
+        """Filter dari filter bar sebagai kwargs get_kegiatan_page_db, atau None jika tidak valid."""
+        pilihan = lambda combo: None if combo.get() in ("", self.SEMUA_FILTER) else combo.get()
         try:
-            # get_semua_kegiatan_obj_db mengembalikan list dict {'objek':Kegiatan, 'nama_pj':str}
-            kegiatan_data_list = self.db_manager.get_semua_kegiatan_obj_db()
-            if kegiatan_data_list:
-                self.kegiatan_data_cache = {} # Untuk menyimpan objek kegiatan jika perlu diakses nanti
-                for data_item in kegiatan_data_list:
-                    keg_obj = data_item['objek']
-                    nama_pj = data_item['nama_pj']
-                    self.kegiatan_data_cache[keg_obj.id_entitas] = keg_obj # Cache objeknya
-                    
-                    # Pastikan tanggal adalah string yang diformat
-                    tanggal_display = keg_obj.tanggal
-                    if isinstance(keg_obj.tanggal, datetime.date):
-                        tanggal_display = keg_obj.tanggal.strftime("%d-%m-%Y")
-                    
-                    display_values = keg_obj.to_tuple_for_display(nama_pj=nama_pj)
-                    self.tree.insert("", "end", values=display_values) # iid tidak di-set, akan otomatis
+            mulai = parse_tanggal(self.entry_filter_dari.get().strip() or None)
+            selesai = parse_tanggal(self.entry_filter_sampai.get().strip() or None)
+        except ValueError as e:
+            messagebox.showerror("Tanggal Tidak Valid", str(e), parent=self.root)
+            return None
+        if mulai and selesai and mulai > selesai:
+            messagebox.showerror("Tanggal Tidak Valid", "Tanggal 'Dari' tidak boleh setelah tanggal 'Sampai'.",
+                                 parent=self.root)
+            return None
+        id_pj = self.combo_filter_pj.id_terpilih
+        if id_pj is None and self.combo_filter_pj.get().strip():
+            messagebox.showerror("PJ Tidak Ditemukan", "Pilih penanggung jawab dari daftar saran, atau kosongkan.",
+                                 parent=self.root)
+            return None
+        filter_kegiatan = {'jenis': pilihan(self.combo_filter_jenis), 'tempat': pilihan(self.combo_filter_tempat),
+                           'id_penanggung_jawab': id_pj,
+                           'tanggal_mulai': mulai, 'tanggal_selesai': selesai}
+        return {kunci: nilai for kunci, nilai in filter_kegiatan.items() if nilai is not None}
+
+    def _terapkan_filter_kegiatan(self):
+        filter_kegiatan = self._baca_filter_kegiatan()
+        if filter_kegiatan is None:
+            return
+        self._filter_kegiatan = filter_kegiatan
+        self._tampilkan_semua_kegiatan_ui() # Halaman pertama hasil filter; halaman lama dibatalkan
+
+    def _reset_filter_kegiatan(self):
+        for combo in (self.combo_filter_jenis, self.combo_filter_tempat):
+            combo.current(0)
+        self.combo_filter_pj.kosongkan()
+        self.entry_filter_dari.delete(0, tk.END)
+        self.entry_filter_sampai.delete(0, tk.END)
+        self._terapkan_filter_kegiatan()
+
+    # --- Pencarian full-text ---
+    def _on_ketik_pencarian(self, event=None):
+        """Debounce: setiap ketukan menunda pencarian; query hanya dikirim saat pengguna berhenti mengetik."""
+        if self._pencarian_after_id is not None:
+            self.root.after_cancel(self._pencarian_after_id)
+        self._pencarian_after_id = self.root.after(JEDA_PENCARIAN_MS, self._on_jeda_pencarian)
+
+    def _on_jeda_pencarian(self):
+        self._pencarian_after_id = None
+        teks = self.entry_pencarian.get().strip()
+        if teks == self._teks_pencarian:
+            return # Mis. tombol panah/Shift: teks tidak berubah, tidak perlu query
+        self._teks_pencarian = teks
+        self._tampilkan_semua_kegiatan_ui() # Teks kosong kembali ke daftar berhalaman biasa
+
+    def _bersihkan_pencarian(self):
+        self.entry_pencarian.delete(0, tk.END)
+        self._on_jeda_pencarian()
+
+    def _jalankan_pencarian(self, segarkan=False):
+        """Query pencarian di worker; segarkan=True mempertahankan scroll dan seleksi (diff per baris)."""
+        self._next_page_cursor = None # Hasil pencarian tidak berhalaman
+        self._batas_urutan_dimuat = None
+        self._sedang_memuat_halaman = True
+        # Key yang sama dengan pemuatan halaman: pencarian baru membatalkan hasil pencarian yang sudah basi
+        self.db_executor.submit(self._ambil_hasil_pencarian, self._teks_pencarian, dict(self._filter_kegiatan),
+                                on_success=lambda hasil: self._tampilkan_hasil_pencarian(hasil, segarkan),
+                                on_error=self._on_muat_kegiatan_gagal, key="muat_kegiatan")
+
+    def _ambil_hasil_pencarian(self, teks, filter_kegiatan):
+        """Dijalankan di thread worker: pencarian full-text lalu siapkan baris tampilannya."""
+        self.cache.sinkronkan()
+        items = self.db_manager.cari_kegiatan_db(teks, limit=self.page_size, **filter_kegiatan)
+        objek_list = self.cache.simpan_kegiatan([item['objek'] for item in items])
+        rows = [(keg_obj.id_entitas, keg_obj.to_tuple_for_display(nama_pj=item['nama_pj']))
+                for keg_obj, item in zip(objek_list, items)]
+        return teks, rows
+
+    def _tampilkan_hasil_pencarian(self, hasil, segarkan=False):
+        teks, rows = hasil
+        self._sedang_memuat_halaman = False
+        if teks != self._teks_pencarian:
+            return # Teks sudah berubah lagi; hasil untuk teks baru akan menyusul
+        if segarkan:
+            self.tree.reconcile(rows)
+        else:
+            self.tree.set_rows(rows) # Urutan relevansi dari database
+
+    def _muat_ulang_data_ui(self):
+        """Merekonsiliasi baris yang sudah dimuat dengan database lewat diff per baris."""
+        if self._teks_pencarian:
+            self._jalankan_pencarian(segarkan=True)
+            self._muat_opsi_filter_ui()
+            return
+        target = max(len(self.tree), self.page_size) # Muat ulang sebanyak baris yang sudah terlihat
+        self._sedang_memuat_halaman = True
+        self.db_executor.submit(self._ambil_kegiatan_sampai, target, dict(self._filter_kegiatan),
+                                on_success=self._rekonsiliasi_kegiatan,
+                                on_error=self._on_muat_kegiatan_gagal, key="muat_kegiatan")
+        self._muat_opsi_filter_ui()
+
+    def _ambil_kegiatan_sampai(self, target, filter_kegiatan):
+        """Dijalankan di thread worker: mengambil halaman berurutan sampai target baris terpenuhi."""
+        self.cache.sinkronkan() # Buang entri yang diubah terminal lain sejak sinkronisasi terakhir
+        pengguna_list = self.cache.semua_pengguna() # Query hanya jika ada pengguna baru
+        halaman = []
+        jumlah = 0
+        cursor = None
+        while jumlah < target:
+            page = self.db_manager.get_kegiatan_page_db(page_size=min(target - jumlah, MAX_PAGE_SIZE), cursor=cursor,
+                                                        **filter_kegiatan)
+            halaman.append(page['items'])
+            jumlah += len(page['items'])
+            cursor = page['next_cursor']
+            if not cursor:
+                break
+        batch = self.cache.simpan_batch(KegiatanBatch.gabung(halaman), ganti_semua=True)
+        rows = [(batch.id_kegiatan(pos), batch.tuple_tampilan(pos)) for pos in range(len(batch))]
+        return pengguna_list, rows, cursor
+
+    def _rekonsiliasi_kegiatan(self, hasil):
+        pengguna_list, rows, cursor = hasil
+        self._tampilkan_pengguna(pengguna_list)
+        self.tree.reconcile(rows)
+        self._batas_urutan_dimuat = self._urutan_baris_kegiatan(rows[-1][1]) if rows else None
+        self._next_page_cursor = cursor
+        self._sedang_memuat_halaman = False
+
+    # --- Change feed: perubahan dari terminal lain ---
+    def _jadwalkan_poll_perubahan(self):
+        self._poll_after_id = self.root.after(INTERVAL_POLL_PERUBAHAN_MS, self._poll_perubahan)
+
+    def _poll_perubahan(self):
+        """Menanyakan log baru (ID_Log > terakhir dilihat) di worker; poll berikutnya dijadwalkan setelah selesai."""
+        self._poll_after_id = None
+        self.db_executor.submit(self._ambil_perubahan, dict(self._filter_kegiatan), on_success=self._terapkan_perubahan,
+                                on_error=self._on_poll_perubahan_gagal, key="poll_perubahan")
+
+    def _ambil_perubahan(self, filter_kegiatan):
+        """Dijalankan di thread worker: satu query log jika tidak ada perubahan, plus satu query IN jika ada."""
+        perubahan = self.cache.tarik_perubahan()
+        pengguna_list = None if self.cache.pengguna_lengkap else self.cache.semua_pengguna()
+        if perubahan is None:
+            return None, pengguna_list
+        rows = {}
+        keluar = set() # Berubah tetapi tidak lolos filter aktif: dikeluarkan dari tabel jika sedang tampil
+        for id_kegiatan, item in perubahan['berubah'].items():
+            if item['objek'].cocok_filter(**filter_kegiatan):
+                rows[id_kegiatan] = item['objek'].to_tuple_for_display(nama_pj=item['nama_pj'])
             else:
-                 self.kegiatan_data_cache = {}
-        except mysql.connector.Error as err:
-            messagebox.showerror("Error Database", f"Gagal memuat daftar kegiatan: {err}", parent=self.root)
+                keluar.add(id_kegiatan)
+        return (rows, perubahan['terhapus'], keluar, filter_kegiatan), pengguna_list
+
+    def _terapkan_perubahan(self, hasil):
+        perubahan, pengguna_list = hasil
+        self._jadwalkan_poll_perubahan()
+        if pengguna_list is not None:
+            self._tampilkan_pengguna(pengguna_list)
+        if perubahan is None: # Terlalu banyak perubahan sekaligus (mis. impor massal): rekonsiliasi penuh
+            self._muat_ulang_data_ui()
+            return
+        rows, terhapus, keluar, filter_kegiatan = perubahan
+        if filter_kegiatan != self._filter_kegiatan:
+            return # Filter diganti selama poll berjalan; tabel sedang dimuat ulang dari database
+        if not rows and not terhapus and not keluar:
+            return
+        for id_kegiatan in terhapus | keluar:
+            if self.tree.exists(id_kegiatan):
+                self.tree.delete_row(id_kegiatan)
+        if self._teks_pencarian:
+            if rows: # Urutan relevansi baris yang berubah hanya diketahui indeks full-text: tanya ulang
+                self._jalankan_pencarian(segarkan=True)
+        else:
+            for id_kegiatan, values in rows.items():
+                # Baris di luar halaman yang sudah dimuat akan datang bersama halamannya nanti
+                dalam_jendela = (self._next_page_cursor is None or self._batas_urutan_dimuat is None
+                                 or self._urutan_baris_kegiatan(values) <= self._batas_urutan_dimuat)
+                if dalam_jendela or self.tree.exists(id_kegiatan):
+                    self.tree.upsert_row(id_kegiatan, values)
+        terpilih = self.selected_kegiatan_obj_for_update
+        if terpilih is not None and terpilih.id_entitas in terhapus and not self._sedang_menyimpan:
+            self._clear_form_action() # Kegiatan yang sedang diedit dihapus di terminal lain
+
+    def _on_poll_perubahan_gagal(self, err):
+        self._jadwalkan_poll_perubahan() # Gangguan koneksi sesaat: coba lagi pada interval berikutnya
+        print(f"Peringatan: Polling perubahan gagal - {err}")
+
+    def _open_impor_dialog(self):
+        # Baris hasil impor disisipkan ke tabel lewat rekonsiliasi
+        impor_dialog = ImporKegiatanDialog(self.root, self.db_manager, self.db_executor,
+                                           on_data_berubah=self._muat_ulang_data_ui, aktor_id=self._id_aktor())
+        impor_dialog.show()
+
+    def _open_ekspor_dialog(self):
+        ekspor_dialog = EksporDialog(self.root, self.db_manager, self.db_executor)
+        ekspor_dialog.show()
 
     def _open_activity_log_dialog(self):
-        log_dialog = ActivityLogDialog(self.root, self.db_manager)
+        log_dialog = ActivityLogDialog(self.root, self.db_manager, self.db_executor)
         log_dialog.show() # Menggunakan metode show dari BaseDialog
 
 # --- Titik Masuk Aplikasi ---
 def main():
+    DB_BACKEND = "mysql" # "mysql" atau "sqlite" (tanpa server, cocok untuk komputer lab single-user)
     DB_HOST = "localhost"
     DB_USER = "root"
     DB_PASS = "" # Isi password database Anda jika ada
     DB_NAME = "ManajemenKegiatanDTEI_VTS_OOP" # Nama DB bisa disesuaikan
+    DB_SQLITE_PATH = "manajemen_kegiatan.db" # Dipakai jika DB_BACKEND = "sqlite"
+    LOG_RETENSI_HARI = DEFAULT_RETENSI_LOG_HARI # Log lebih tua dari ini dipindah ke arsip terkompresi
 
     main_root = tk.Tk()
     main_root.withdraw() # Sembunyikan jendela utama awal
+    db_executor = DbExecutor(main_root) # Thread worker untuk query agar UI tetap responsif
 
-    db_manager = DatabaseManager(DB_HOST, DB_USER, DB_PASS, DB_NAME)
+    try:
+        if DB_BACKEND == "sqlite":
+            backend = SQLiteBackend(DB_SQLITE_PATH)
+        else:
+            backend = MySQLBackend(DB_HOST, DB_USER, DB_PASS, DB_NAME)
+    except DatabaseError as e:
+        messagebox.showerror("Kritikal: Backend Database", f"Aplikasi tidak dapat dimulai.\nError: {e}")
+        main_root.destroy()
+        db_executor.shutdown()
+        return
+    db_manager = DatabaseManager(backend=backend)
 
     try:
-        print(f"Menginisialisasi database '{DB_NAME}'...")
+        print(f"Menginisialisasi database {backend.describe()}...")
         db_manager.initialize_database()
         print("Inisialisasi database selesai.")
     except Exception as e:
         messagebox.showerror("Kritikal: Inisialisasi Database Gagal", f"Aplikasi tidak dapat dimulai.\nError: {e}")
         print(f"Kritikal: Inisialisasi Database Gagal - {e}")
         main_root.destroy()
+        db_executor.shutdown()
+        db_manager.close()
         return # Keluar dari fungsi main
 
     def do_open_signup():
-        signup_dialog = SignupDialog(main_root, db_manager)
+        signup_dialog = SignupDialog(main_root, db_manager, db_executor)
         signup_dialog.show() # Tampilkan dialog signup
 
     # Proses Login
-    login_dialog = LoginDialog(main_root, db_manager, do_open_signup)
+    login_dialog = LoginDialog(main_root, db_manager, do_open_signup, db_executor)
     # login_dialog.show() # Tidak perlu karena kita cek login_successful secara manual
 
     # Modifikasi loop login agar parent_root tidak hancur prematur
@@ -1345,20 +2183,29 @@ def main():
     if hasattr(login_dialog, 'login_successful') and login_dialog.login_successful:
         current_user_obj = login_dialog.result # Ambil objek Pengguna dari hasil dialog
         main_root.deiconify() # Tampilkan jendela utama
-        app = KegiatanApp(main_root, db_manager)
+        app = KegiatanApp(main_root, db_manager, db_executor)
         app.current_user = current_user_obj # Set pengguna yang login di aplikasi utama
+        # Retensi log berjalan di worker setelah aplikasi tampil, tidak menunda startup
+        def arsipkan_dan_rawat():
+            # VACUUM hanya jika retensi benar-benar mengosongkan baris
+            if db_manager.arsipkan_log_db(LOG_RETENSI_HARI):
+                db_manager.rawat_database_db()
+        db_executor.submit(arsipkan_dan_rawat,
+                           on_error=lambda err: print(f"Peringatan: Arsip log/pemeliharaan database gagal - {err}"))
         print(f"Pengguna login: {current_user_obj.get_details_string()}") # Polimorfisme contoh
         
         # Contoh penggunaan polimorfisme dengan objek Kegiatan
-        # if app.kegiatan_data_cache:
-        #    first_keg_id = list(app.kegiatan_data_cache.keys())[0]
-        #    first_keg_obj = app.kegiatan_data_cache[first_keg_id]
+        # if app.tree.keys():
+        #    first_keg_obj = app.cache.kegiatan(app.tree.keys()[0])
         #    print(f"Detail kegiatan pertama: {first_keg_obj.get_details_string()}")
 
         main_root.mainloop()
+        print(f"Statistik pool koneksi: {db_manager.get_pool_stats()}")
     else:
         print("Login gagal atau jendela login ditutup. Aplikasi keluar.")
         main_root.destroy() # Hancurkan root jika login tidak berhasil
+    db_executor.shutdown() # Hentikan worker sebelum pool ditutup
+    db_manager.close() # Tutup semua koneksi yang masih ada di pool
 
 
 if __name__ == "__main__":
@@ -0,0 +1,266 @@
+"""Identity map Kegiatan dan Pengguna di depan DatabaseManager.
+
+Objek disimpan per ID sehingga seleksi tabel, pengisian form, dan pencarian
+penanggung jawab cukup membaca memori. Penulisan lewat cache bersifat
+write-through: database diubah dulu, lalu entri cache diperbarui. Perubahan
+dari luar (terminal lain, impor massal) terdeteksi lewat high-water mark
+Log_Perubahan_Kegiatan.ID_Log untuk Kegiatan dan MAX(ID_Pengguna) untuk
+Pengguna. Pengguna juga diindeks per awalan kata nama dan NIM/NIP untuk
+picker type-ahead (cari_pengguna). Hasil listing besar (KegiatanBatch) disimpan
+sebagai referensi (batch, posisi); objek Kegiatan baru dibuat saat diminta.
+Modul ini tidak bergantung pada Tkinter.
+"""
+import threading
+
+from database import DEFAULT_FETCH_BATCH
+from indeks_prefiks import IndeksPrefiks
+
+JUMLAH_SARAN_PENGGUNA = 10 # Hasil teratas yang ditampilkan picker type-ahead
+
+
+class EntitasCache:
+    """Cache write-through Kegiatan dan Pengguna yang aman dipakai dari thread worker dan thread Tk.
+
+    Atribut versi adalah penghitung perubahan: naik setiap kali isi cache berubah,
+    sehingga pemakai bisa tahu apakah data turunannya perlu dibangun ulang.
+    """
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self._lock = threading.RLock()
+        self._kegiatan = {} # Map: ID_Kegiatan -> objek Kegiatan, atau tuple (KegiatanBatch, posisi) yang belum dibuat
+        self._pengguna = {} # Map: ID_Pengguna -> objek Pengguna
+        self._pengguna_lengkap = False # True jika _pengguna berisi seluruh tabel Pengguna
+        self._indeks_pengguna = IndeksPrefiks() # Awalan kata nama dan NIM/NIP -> ID_Pengguna
+        self._high_water_log = None # ID_Log terbesar yang sudah tercermin di cache Kegiatan
+        self._high_water_pengguna = None # MAX(ID_Pengguna) saat daftar pengguna dimuat
+        self.versi = 0
+
+    def _naikkan_versi(self):
+        self.versi += 1
+
+    # --- Kegiatan ---
+    def kegiatan(self, id_kegiatan, muat=False):
+        """Objek Kegiatan dari cache; jika muat=True dan tidak ada, diambil dari database (panggil dari worker)."""
+        with self._lock:
+            keg_obj = self._objek_entri(id_kegiatan)
+        if keg_obj is None and muat:
+            data = self.db_manager.get_kegiatan_by_ids_db([id_kegiatan]).get(id_kegiatan)
+            if data:
+                keg_obj = self.simpan_kegiatan([data['objek']])[0]
+        return keg_obj
+
+    def simpan_kegiatan(self, kegiatan_list, ganti_semua=False):
+        """Memasukkan objek hasil query ke cache dan mengembalikan objek kanoniknya (identity map).
+
+        Objek yang nilainya sama dengan entri lama tidak diganti, sehingga referensi
+        yang sudah dipegang UI tetap identik. ganti_semua=True membuang entri lain.
+        """
+        hasil = []
+        with self._lock:
+            lama = self._kegiatan
+            if ganti_semua:
+                self._kegiatan = {}
+            berubah = ganti_semua and len(lama) != len(kegiatan_list)
+            for keg_obj in kegiatan_list:
+                entri = lama.get(keg_obj.id_entitas)
+                if entri is None or self._nilai_entri(entri) != self._nilai_kegiatan(keg_obj):
+                    entri = keg_obj
+                    berubah = True
+                elif isinstance(entri, tuple):
+                    entri = entri[0].objek(entri[1])
+                self._kegiatan[keg_obj.id_entitas] = entri
+                hasil.append(entri)
+            if berubah:
+                self._naikkan_versi()
+        return hasil
+
+    def simpan_batch(self, batch, ganti_semua=False):
+        """Seperti simpan_kegiatan untuk KegiatanBatch, tanpa membuat objek per baris.
+
+        Entri baru atau berubah disimpan sebagai (batch, posisi) dan baru menjadi
+        objek Kegiatan saat kegiatan() dipanggil untuk ID itu; entri lama yang
+        nilainya sama tetap dipakai. Mengembalikan batch agar bisa dirangkai.
+        """
+        with self._lock:
+            lama = self._kegiatan
+            if ganti_semua:
+                self._kegiatan = {}
+            berubah = ganti_semua and len(lama) != len(batch)
+            for pos, id_kegiatan in enumerate(batch.id_list):
+                entri = lama.get(id_kegiatan)
+                if entri is None or self._nilai_entri(entri) != batch.nilai(pos):
+                    entri = (batch, pos)
+                    berubah = True
+                self._kegiatan[id_kegiatan] = entri
+            if berubah:
+                self._naikkan_versi()
+        return batch
+
+    def _objek_entri(self, id_kegiatan):
+        """Objek Kegiatan untuk ID; entri (batch, posisi) dibuat dan diganti objeknya. Pemanggil memegang _lock."""
+        entri = self._kegiatan.get(id_kegiatan)
+        if isinstance(entri, tuple):
+            entri = entri[0].objek(entri[1])
+            self._kegiatan[id_kegiatan] = entri
+        return entri
+
+    @classmethod
+    def _nilai_entri(cls, entri):
+        if isinstance(entri, tuple):
+            return entri[0].nilai(entri[1])
+        return cls._nilai_kegiatan(entri)
+
+    @staticmethod
+    def _nilai_kegiatan(keg_obj):
+        return (keg_obj.nama_kegiatan, keg_obj.tanggal, keg_obj.tempat, keg_obj.jenis_kegiatan,
+                keg_obj.id_penanggung_jawab, keg_obj.jam_mulai, keg_obj.jam_selesai)
+
+    def buang_kegiatan(self, id_list=None):
+        """Menginvalidasi entri Kegiatan tertentu, atau seluruhnya jika id_list None."""
+        with self._lock:
+            if id_list is None:
+                self._kegiatan = {}
+            else:
+                for id_kegiatan in id_list:
+                    self._kegiatan.pop(id_kegiatan, None)
+            self._naikkan_versi()
+
+    def tambah_kegiatan(self, kegiatan_obj, aktor_id=None):
+        """Write-through: INSERT ke database lalu simpan objeknya di cache."""
+        self.db_manager.tambah_kegiatan_obj_db(kegiatan_obj, aktor_id=aktor_id)
+        return self.simpan_kegiatan([kegiatan_obj])[0]
+
+    def update_kegiatan(self, kegiatan_obj, aktor_id=None):
+        """Write-through: UPDATE di database lalu ganti entri cache."""
+        self.db_manager.update_kegiatan_obj_db(kegiatan_obj, aktor_id=aktor_id)
+        return self.simpan_kegiatan([kegiatan_obj])[0]
+
+    def hapus_kegiatan(self, id_kegiatan, aktor_id=None):
+        """Write-through: DELETE di database lalu buang entri cache."""
+        self.db_manager.hapus_kegiatan_db(id_kegiatan, aktor_id=aktor_id)
+        self.buang_kegiatan([id_kegiatan])
+
+    # --- Pengguna ---
+    @property
+    def pengguna_lengkap(self):
+        """False jika daftar pengguna belum dimuat atau ada pengguna baru di database."""
+        return self._pengguna_lengkap
+
+    def pengguna(self, id_pengguna):
+        """Objek Pengguna dari cache (tanpa query)."""
+        with self._lock:
+            return self._pengguna.get(id_pengguna)
+
+    def nama_pengguna(self, id_pengguna):
+        p_obj = self.pengguna(id_pengguna)
+        return p_obj.nama if p_obj else None
+
+    def semua_pengguna(self, muat_ulang=False):
+        """Daftar Pengguna urut nama; query hanya saat cache belum lengkap (panggil dari worker).
+
+        Setelah pemuatan pertama hanya pengguna baru (ID_Pengguna > high-water mark)
+        yang diambil dan disisipkan ke index, kecuali muat_ulang=True.
+        """
+        with self._lock:
+            if self._pengguna_lengkap and not muat_ulang:
+                return sorted(self._pengguna.values(), key=lambda p: p.nama)
+            high_water_lama = None if muat_ulang else self._high_water_pengguna
+        if high_water_lama is not None:
+            pengguna_baru = self.db_manager.get_pengguna_setelah_id_db(high_water_lama)
+            with self._lock:
+                for p_obj in pengguna_baru:
+                    self._simpan_pengguna(p_obj)
+                self._pengguna_lengkap = True
+                if pengguna_baru:
+                    self._naikkan_versi()
+                return sorted(self._pengguna.values(), key=lambda p: p.nama)
+        high_water = self.db_manager.get_pengguna_high_water_db()
+        pengguna_list = self.db_manager.get_semua_pengguna_obj_db()
+        with self._lock:
+            self._pengguna = {p_obj.id_entitas: p_obj for p_obj in pengguna_list}
+            self._indeks_pengguna.bangun((p_obj.id_entitas, self._kata_kunci_pengguna(p_obj))
+                                        for p_obj in pengguna_list)
+            self._pengguna_lengkap = True
+            self._high_water_pengguna = high_water
+            self._naikkan_versi()
+        return pengguna_list
+
+    @staticmethod
+    def _kata_kunci_pengguna(p_obj):
+        return [p_obj.nama, p_obj.nim_nip]
+
+    def _simpan_pengguna(self, p_obj):
+        """Menyimpan satu pengguna di map dan index awalan; pemanggil memegang _lock."""
+        self._pengguna[p_obj.id_entitas] = p_obj
+        self._indeks_pengguna.tambah(p_obj.id_entitas, self._kata_kunci_pengguna(p_obj))
+        if self._high_water_pengguna is not None:
+            self._high_water_pengguna = max(self._high_water_pengguna, p_obj.id_entitas)
+
+    def cari_pengguna(self, teks, limit=JUMLAH_SARAN_PENGGUNA):
+        """Pengguna yang nama atau NIM/NIP-nya berawalan kata-kata teks, urut nama (tanpa query).
+
+        Aman dipanggil dari thread Tk di setiap ketukan: hanya bisect di index memori.
+        """
+        with self._lock:
+            hasil = [self._pengguna[id_pengguna] for id_pengguna in self._indeks_pengguna.cari(teks, limit)]
+        return sorted(hasil, key=lambda p: p.nama)
+
+    def tambah_pengguna(self, nama, role_id, nim_nip, username, password):
+        """Write-through: daftarkan pengguna (ID dari database) lalu simpan di cache.
+
+        PenggunaSudahAdaError dari daftarkan_pengguna_db diteruskan ke pemanggil.
+        """
+        pengguna_obj = self.db_manager.daftarkan_pengguna_db(nama, role_id, nim_nip, username, password)
+        with self._lock:
+            self._simpan_pengguna(pengguna_obj)
+            self._naikkan_versi()
+        return pengguna_obj
+
+    # --- Invalidasi ---
+    def sinkronkan(self, batch_size=DEFAULT_FETCH_BATCH):
+        """Membuang entri yang diubah di luar cache ini; dipanggil dari worker.
+
+        Kegiatan: hanya ID yang muncul di log setelah high-water mark yang dibuang.
+        Jika log baru lebih banyak dari batch_size, seluruh cache Kegiatan dibuang.
+        Pengguna: daftar dianggap tidak lengkap jika MAX(ID_Pengguna) bertambah.
+        Mengembalikan set ID Kegiatan yang diinvalidasi (None berarti seluruhnya).
+        """
+        with self._lock:
+            high_water = self._high_water_log
+        dibuang = set()
+        if high_water is None:
+            high_water_baru = self.db_manager.get_log_high_water_db() # Cache baru: mulai dari posisi sekarang
+        else:
+            perubahan = self.db_manager.get_perubahan_sejak_db(high_water, limit=batch_size)
+            high_water_baru = perubahan[-1][0] if perubahan else high_water
+            if len(perubahan) >= batch_size:
+                dibuang = None
+                high_water_baru = self.db_manager.get_log_high_water_db()
+            else:
+                dibuang = {id_kegiatan for _, id_kegiatan, _ in perubahan if id_kegiatan is not None}
+        if dibuang is None or dibuang:
+            self.buang_kegiatan(dibuang)
+
+        max_pengguna = self.db_manager.get_pengguna_high_water_db()
+        with self._lock:
+            self._high_water_log = max(high_water_baru, self._high_water_log or 0)
+            if self._high_water_pengguna is not None and max_pengguna != self._high_water_pengguna:
+                self._pengguna_lengkap = False
+        return dibuang
+
+    def tarik_perubahan(self, batch_size=DEFAULT_FETCH_BATCH):
+        """Change feed: menerapkan log baru (ID_Log > high-water mark) ke cache; dipanggil dari worker.
+
+        Kegiatan yang berubah diambil ulang sekaligus dalam satu query IN dan
+        disimpan di cache. Mengembalikan {'berubah': {id: {'objek', 'nama_pj'}},
+        'terhapus': set ID}, atau None jika perubahan terlalu banyak sehingga
+        pemakai sebaiknya memuat ulang penuh.
+        """
+        dibuang = self.sinkronkan(batch_size=batch_size)
+        if dibuang is None:
+            return None
+        data = self.db_manager.get_kegiatan_by_ids_db(list(dibuang)) if dibuang else {}
+        objek_list = self.simpan_kegiatan([item['objek'] for item in data.values()])
+        berubah = {keg_obj.id_entitas: {'objek': keg_obj, 'nama_pj': data[keg_obj.id_entitas]['nama_pj']}
+                   for keg_obj in objek_list}
+        return {'berubah': berubah, 'terhapus': dibuang - berubah.keys()}
@@ -0,0 +1,2512 @@
+"""Lapisan database: pool koneksi, backend MySQL/SQLite, dan DatabaseManager.
+
+Modul ini tidak bergantung pada Tkinter sehingga bisa dipakai oleh GUI
+(baru.py) maupun skrip tanpa tampilan.
+"""
+import base64
+import datetime
+import itertools
+import json
+import re
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from collections import deque
+from contextlib import contextmanager
+
+try:
+    import mysql.connector
+    from mysql.connector import errorcode
+except ImportError: # Driver MySQL opsional jika hanya memakai backend SQLite
+    mysql = None
+    errorcode = None
+
+from entitas import Pengguna, Kegiatan, KegiatanBatch, parse_tanggal, parse_jam
+from kata_sandi import PasswordHasher
+
+# Kode error yang dipakai bersama oleh semua backend (mengikuti kode MySQL)
+ER_DUP_ENTRY = 1062 # Duplikasi primary key / unique key
+ER_SIGNAL_EXCEPTION = 1644 # Error custom dari SIGNAL di stored procedure
+SQLSTATE_CUSTOM_ERROR = '45000'
+
+DEFAULT_PAGE_SIZE = 100 # Ukuran halaman default untuk listing kegiatan
+MAX_PAGE_SIZE = 1000
+DEFAULT_FETCH_BATCH = 1000 # Jumlah baris per fetchmany saat streaming (ekspor)
+
+DEFAULT_LOG_LIMIT = 1000 # Jumlah log terbaru yang ditampilkan di riwayat aktivitas
+AKSI_LOG = ("INSERT", "UPDATE", "DELETE") # Nilai kolom Log_Perubahan_Kegiatan.Aksi
+DEFAULT_RETENSI_LOG_HARI = 365 # Log yang lebih tua dipindahkan ke arsip terkompresi
+
+# Kolom Kegiatan yang dicatat di log audit terstruktur (kolom Perubahan berisi JSON {kolom: [lama, baru]})
+KOLOM_AUDIT_KEGIATAN_AWAL = ("ID_Kegiatan", "Nama_Kegiatan", "Tanggal", "Tempat", "Jenis_Kegiatan", "ID_Penanggung_Jawab")
+KOLOM_JADWAL_KEGIATAN = ("Jam_Mulai", "Jam_Selesai") # Ditambahkan migrasi 8
+KOLOM_AUDIT_KEGIATAN = KOLOM_AUDIT_KEGIATAN_AWAL + KOLOM_JADWAL_KEGIATAN
+
+# Jam operasional ruangan untuk pencarian slot kosong
+JAM_BUKA_DEFAULT = datetime.time(7, 0)
+JAM_TUTUP_DEFAULT = datetime.time(21, 0)
+PESAN_JADWAL_BENTROK = "Error: Jadwal bentrok" # Awalan pesan SIGNAL dari SP saat ruangan sudah terpakai
+
+MAKS_KATA_PENCARIAN = 8 # Kata selebihnya dari teks pencarian diabaikan
+
+
+class DatabaseError(Exception):
+    """Error database yang seragam untuk semua backend (MySQL maupun SQLite)."""
+    def __init__(self, msg, errno=None, sqlstate=None):
+        super().__init__(msg)
+        self.msg = msg
+        self.errno = errno
+        self.sqlstate = sqlstate
+
+    def __str__(self):
+        if self.errno is not None:
+            return f"{self.errno} ({self.sqlstate or 'HY000'}): {self.msg}"
+        return str(self.msg)
+
+class PenggunaSudahAdaError(DatabaseError):
+    """Pendaftaran ditolak constraint UNIQUE; kolom berisi 'Username' atau 'NIM_NIP'."""
+    def __init__(self, msg, kolom, errno=ER_DUP_ENTRY, sqlstate='23000'):
+        super().__init__(msg, errno=errno, sqlstate=sqlstate)
+        self.kolom = kolom
+
+class JadwalBentrokError(DatabaseError):
+    """Ruangan sudah dipakai kegiatan lain pada jam yang tumpang tindih.
+
+    bentrok berisi objek Kegiatan yang bertabrakan (diambil setelah SP menolak).
+    """
+    def __init__(self, msg, bentrok=(), errno=ER_SIGNAL_EXCEPTION, sqlstate=SQLSTATE_CUSTOM_ERROR):
+        super().__init__(msg, errno=errno, sqlstate=sqlstate)
+        self.bentrok = list(bentrok)
+
+# --- Kelas Pool Koneksi ---
+class PoolTimeoutError(DatabaseError):
+    """Dilempar jika tidak ada koneksi yang bebas sampai batas waktu checkout habis."""
+    pass
+
+class ConnectionPool:
+    """Pool koneksi terbatas dan thread-safe.
+
+    Koneksi yang sudah dikembalikan disimpan dan dipakai ulang sehingga setiap
+    query tidak perlu melakukan handshake baru ke server database.
+    """
+    def __init__(self, connect_func, is_alive_func=None, reset_func=None, max_size=5,
+                 max_idle_seconds=300, checkout_timeout=10):
+        if max_size < 1:
+            raise ValueError("Ukuran pool minimal 1.")
+        self._connect_func = connect_func # Fungsi pembuat koneksi baru
+        self._is_alive_func = is_alive_func # Fungsi health check koneksi (opsional)
+        self._reset_func = reset_func # Dipanggil saat koneksi dikembalikan, mis. rollback transaksi yang menggantung
+        self._max_size = max_size
+        self._max_idle_seconds = max_idle_seconds
+        self._checkout_timeout = checkout_timeout
+
+        self._cond = threading.Condition(threading.Lock())
+        self._idle = deque() # Isi: (koneksi, waktu_terakhir_dipakai)
+        self._size = 0 # Jumlah koneksi yang sedang hidup (idle + dipinjam)
+        self._closed = False
+        self._stats = {"checkouts": 0, "waits": 0, "created": 0, "reused": 0,
+                       "evicted": 0, "discarded": 0}
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+    def _close_quietly(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _evict_idle_locked(self):
+        """Membuang koneksi yang terlalu lama menganggur. Dipanggil saat lock dipegang."""
+        if self._max_idle_seconds is None:
+            return []
+        batas = time.monotonic() - self._max_idle_seconds
+        evicted = []
+        # Koneksi terlama ada di sisi kiri deque
+        while self._idle and self._idle[0][1] < batas:
+            conn, _ = self._idle.popleft()
+            self._size -= 1
+            self._stats["evicted"] += 1
+            evicted.append(conn)
+        return evicted
+
+    def _is_alive(self, conn):
+        if self._is_alive_func is None:
+            return True
+        try:
+            return bool(self._is_alive_func(conn))
+        except Exception:
+            return False
+
+    def acquire(self):
+        """Meminjam koneksi dari pool (dipakai ulang jika ada, dibuat jika masih ada slot)."""
+        deadline = time.monotonic() + self._checkout_timeout if self._checkout_timeout is not None else None
+        sudah_menunggu = False
+        while True:
+            conn = None
+            buat_baru = False
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("Pool koneksi sudah ditutup.")
+                to_close = self._evict_idle_locked()
+                if self._idle:
+                    conn, _ = self._idle.pop() # LIFO: koneksi yang paling baru dipakai
+                elif self._size < self._max_size:
+                    self._size += 1 # Reservasi slot sebelum membuat koneksi di luar lock
+                    buat_baru = True
+                else:
+                    if not sudah_menunggu:
+                        self._stats["waits"] += 1
+                        sudah_menunggu = True
+                    sisa = None if deadline is None else deadline - time.monotonic()
+                    if sisa is not None and sisa <= 0:
+                        raise PoolTimeoutError(
+                            f"Tidak ada koneksi bebas dalam {self._checkout_timeout} detik "
+                            f"(ukuran pool: {self._max_size}).")
+                    self._cond.wait(sisa)
+            for old_conn in to_close:
+                self._close_quietly(old_conn)
+
+            if buat_baru:
+                try:
+                    conn = self._connect_func()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._stats["created"] += 1
+                    self._stats["checkouts"] += 1
+                return conn
+
+            if conn is not None:
+                # Health check saat checkout, dilakukan di luar lock karena bisa berupa ping ke server
+                if self._is_alive(conn):
+                    with self._cond:
+                        self._stats["reused"] += 1
+                        self._stats["checkouts"] += 1
+                    return conn
+                self._close_quietly(conn)
+                with self._cond:
+                    self._size -= 1
+                    self._stats["discarded"] += 1
+                    self._cond.notify()
+
+    def release(self, conn, discard=False):
+        """Mengembalikan koneksi ke pool. Koneksi rusak (discard=True) langsung ditutup."""
+        if conn is None:
+            return
+        if not discard and self._reset_func is not None:
+            try:
+                self._reset_func(conn)
+            except Exception:
+                discard = True
+        with self._cond:
+            if discard or self._closed:
+                self._size -= 1
+                if discard:
+                    self._stats["discarded"] += 1
+                to_close = [conn]
+            else:
+                self._idle.append((conn, time.monotonic()))
+                to_close = self._evict_idle_locked()
+            self._cond.notify()
+        for old_conn in to_close:
+            self._close_quietly(old_conn)
+
+    @contextmanager
+    def connection(self):
+        """Context manager: `with pool.connection() as conn: ...`"""
+        conn = self.acquire()
+        try:
+            yield conn
+        except Exception:
+            self.release(conn, discard=not self._is_alive(conn))
+            raise
+        else:
+            self.release(conn)
+
+    def stats(self):
+        """Mengembalikan salinan statistik pool."""
+        with self._cond:
+            data = dict(self._stats)
+            data["size"] = self._size
+            data["idle"] = len(self._idle)
+            data["in_use"] = self._size - len(self._idle)
+            data["max_size"] = self._max_size
+        return data
+
+    def close_all(self):
+        """Menutup semua koneksi idle dan menolak checkout berikutnya."""
+        with self._cond:
+            self._closed = True
+            idle_conns = [conn for conn, _ in self._idle]
+            self._size -= len(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for conn in idle_conns:
+            self._close_quietly(conn)
+
+
+# --- Backend Database ---
+class Migrasi:
+    """Satu perubahan skema bernomor versi yang dicatat di tabel Schema_Versi.
+
+    langkah berisi string DDL/DML atau callable(conn, cursor). Migrasi dengan
+    transaksional=False mengatur commit-nya sendiri (mis. membangun ulang tabel
+    di SQLite yang butuh foreign_keys OFF di luar transaksi).
+    """
+    def __init__(self, versi, deskripsi, langkah, transaksional=True):
+        self.versi = versi
+        self.deskripsi = deskripsi
+        self.langkah = langkah
+        self.transaksional = transaksional
+
+    def __repr__(self):
+        return f"Migrasi({self.versi}, {self.deskripsi!r})"
+
+
+def _kata_pencarian(teks):
+    """Kata (huruf/angka Unicode, huruf kecil) dari teks pencarian, paling banyak MAKS_KATA_PENCARIAN."""
+    return re.findall(r"\w+", (teks or "").lower())[:MAKS_KATA_PENCARIAN]
+
+
+class DatabaseBackend:
+    """Kelas dasar backend database.
+
+    Setiap backend menyediakan cara membuat koneksi, dialek SQL (DDL dan
+    placeholder), pemanggilan stored procedure, serta penerjemahan error
+    driver menjadi DatabaseError.
+    """
+    name = "base"
+    driver_errors = () # Tuple kelas error milik driver
+    transactional_ddl = False # True jika DDL bisa di-rollback bersama DML dalam satu transaksi
+
+    def describe(self):
+        """Deskripsi singkat target database untuk log."""
+        return self.name
+
+    def connect(self):
+        raise NotImplementedError("Backend harus mengimplementasikan connect")
+
+    def is_alive(self, conn):
+        return True
+
+    def reset(self, conn):
+        """Mengakhiri transaksi yang masih terbuka sebelum koneksi dipakai ulang."""
+        conn.rollback()
+
+    def adapt_query(self, query):
+        """Menyesuaikan query ber-placeholder %s dengan dialek backend."""
+        return query
+
+    def execute(self, cursor, query, params=None):
+        cursor.execute(self.adapt_query(query), params)
+
+    def executemany(self, cursor, query, params):
+        cursor.executemany(self.adapt_query(query), params)
+
+    def call_procedure(self, cursor, proc_name, args):
+        raise NotImplementedError("Backend harus mengimplementasikan call_procedure")
+
+    # Akhiran SELECT jadwal di dalam transaksi tulis jadwal (MySQL: FOR UPDATE, seperti di SP)
+    kunci_baca_jadwal = ""
+
+    def mulai_transaksi_jadwal(self, cursor):
+        """Memulai transaksi tulis dengan kunci yang sama seperti SP_TambahKegiatan, untuk cek bentrok + INSERT."""
+        pass
+
+    def translate_error(self, err):
+        """Mengubah error driver menjadi DatabaseError."""
+        return DatabaseError(str(err))
+
+    def is_existing_object_error(self, err):
+        """True jika error DDL terjadi karena objeknya sudah ada."""
+        return "already exists" in (err.msg or "").lower()
+
+    def schema_statements(self):
+        """Daftar DDL (tabel, log, view, trigger, prosedur) sesuai dialek backend."""
+        raise NotImplementedError("Backend harus mengimplementasikan schema_statements")
+
+    def schema_version_ddl(self):
+        """DDL tabel metadata versi skema."""
+        return """CREATE TABLE IF NOT EXISTS Schema_Versi (
+                Versi INT PRIMARY KEY,
+                Deskripsi VARCHAR(255) NOT NULL,
+                Waktu_Diterapkan TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )"""
+
+    def set_aktor(self, conn, aktor_id):
+        """Menandai pengguna yang melakukan perubahan pada koneksi ini (dibaca oleh trigger audit)."""
+        pass
+
+    def audit_log_statements(self):
+        """DDL migrasi log audit terstruktur: kolom Perubahan (JSON diff) dan ID_Pengguna_Aktor."""
+        return []
+
+    def arsip_log_statements(self):
+        """DDL migrasi retensi log: index (Timestamp_Aksi, ID_Log) dan tabel arsip segmen terkompresi."""
+        return []
+
+    def log_filter_index_statements(self):
+        """DDL migrasi index filter riwayat aktivitas: per Aksi dan per ID_Kegiatan_Ref, terurut waktu."""
+        return []
+
+    def pengguna_auto_increment_statements(self):
+        """Langkah migrasi agar ID_Pengguna dibuat oleh database saat INSERT tanpa ID."""
+        return []
+
+    def pengguna_unik_statements(self):
+        """Langkah migrasi index UNIQUE Pengguna(Username) dan Pengguna(NIM_NIP) untuk tabel lama tanpa constraint."""
+        return []
+
+    def jadwal_kegiatan_statements(self):
+        """DDL migrasi jam mulai/selesai kegiatan: kolom, index jadwal ruangan, view, trigger audit, prosedur."""
+        return []
+
+    def filter_kegiatan_index_statements(self):
+        """DDL migrasi index filter daftar kegiatan: per Jenis, Tempat, dan PJ, diikuti urutan halaman."""
+        return []
+
+    def pencarian_kegiatan_statements(self):
+        """DDL migrasi indeks full-text atas Nama_Kegiatan, Tempat, dan Jenis_Kegiatan."""
+        return []
+
+    def kegiatan_rowid_tetap_statements(self):
+        """Langkah migrasi agar baris Kegiatan punya kunci integer yang tidak berubah (kunci indeks full-text)."""
+        return []
+
+    def pemeliharaan_statements(self):
+        """Perintah pemeliharaan berkala (di luar transaksi), dijalankan berurutan oleh rawat_database_db."""
+        return []
+
+    def ekspresi_pencarian(self, teks):
+        """Teks ketikan pengguna -> query full-text dialek backend, atau None jika tidak ada kata yang bisa dicari."""
+        raise NotImplementedError("Backend harus mengimplementasikan ekspresi_pencarian")
+
+    def sumber_pencarian_kegiatan(self, ekspresi):
+        """Subquery (ID_Cocok, Skor_Cocok) kegiatan yang cocok beserta parameternya; skor besar = lebih relevan."""
+        raise NotImplementedError("Backend harus mengimplementasikan sumber_pencarian_kegiatan")
+
+    def begin(self, cursor):
+        """Memulai transaksi eksplisit (dipakai bila transactional_ddl True)."""
+        cursor.execute("BEGIN")
+
+    def migrate_tanggal_to_date(self, conn, batch_size=500):
+        """Mengonversi kolom Kegiatan.Tanggal lama (teks dd-mm-yyyy) menjadi DATE.
+
+        Mengembalikan jumlah baris yang dikonversi (0 jika sudah bertipe DATE).
+        """
+        return 0
+
+    def close(self):
+        """Melepas sumber daya milik backend (jika ada)."""
+        pass
+
+
+class MySQLBackend(DatabaseBackend):
+    """Backend MySQL/MariaDB melalui mysql.connector."""
+    name = "mysql"
+
+    def __init__(self, host, user, password, database_name):
+        if mysql is None:
+            raise DatabaseError("Modul mysql-connector-python tidak terpasang. Gunakan backend SQLite atau pasang drivernya.")
+        self._host = host
+        self._user = user
+        self._password = password
+        self._database_name = database_name
+        self.driver_errors = (mysql.connector.Error,)
+
+    def describe(self):
+        return f"MySQL '{self._database_name}' di {self._host}"
+
+    def connect(self):
+        """Membuat dan mengembalikan koneksi database."""
+        try:
+            return mysql.connector.connect(
+                host=self._host,
+                user=self._user,
+                password=self._password,
+                database=self._database_name
+            )
+        except mysql.connector.Error as err:
+            if err.errno == errorcode.ER_BAD_DB_ERROR:
+                try:
+                    temp_conn = mysql.connector.connect(host=self._host, user=self._user, password=self._password)
+                    temp_cursor = temp_conn.cursor()
+                    temp_cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self._database_name} CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
+                    temp_conn.commit()
+                    temp_cursor.close()
+                    temp_conn.close()
+                    return mysql.connector.connect(
+                        host=self._host, user=self._user, password=self._password, database=self._database_name
+                    )
+                except mysql.connector.Error as create_err:
+                    raise DatabaseError(f"Gagal membuat atau terhubung ke database '{self._database_name}': {create_err}",
+                                        errno=create_err.errno, sqlstate=create_err.sqlstate) from create_err
+            else:
+                raise DatabaseError(f"Koneksi database gagal: {err}", errno=err.errno, sqlstate=err.sqlstate) from err
+
+    def is_alive(self, conn):
+        """Health check koneksi MySQL (ping ringan ke server)."""
+        return conn.is_connected()
+
+    def call_procedure(self, cursor, proc_name, args):
+        cursor.callproc(proc_name, args)
+
+    kunci_baca_jadwal = " FOR UPDATE" # Mengunci rentang IDX_Kegiatan_Jadwal yang dibaca, seperti _sp_cek_bentrok
+
+    def mulai_transaksi_jadwal(self, cursor):
+        cursor.execute("START TRANSACTION")
+
+    def translate_error(self, err):
+        return DatabaseError(err.msg, errno=err.errno, sqlstate=err.sqlstate)
+
+    def is_existing_object_error(self, err):
+        # Daftar error number yang umum untuk objek yang sudah ada
+        existing_object_errors = [
+            errorcode.ER_TABLE_EXISTS_ERROR,
+            errorcode.ER_VIEW_EXISTS,
+            errorcode.ER_SP_ALREADY_EXISTS, # Stored Procedure
+            errorcode.ER_TRG_ALREADY_EXISTS, # Trigger
+            errorcode.ER_DB_CREATE_EXISTS, # Database
+            errorcode.ER_INDEX_EXISTS, # Jika ada CREATE INDEX eksplisit
+            errorcode.ER_DUP_KEYNAME # CREATE INDEX dengan nama yang sudah ada
+        ]
+        return err.errno in existing_object_errors or super().is_existing_object_error(err)
+
+    def set_aktor(self, conn, aktor_id):
+        # Variabel sesi MySQL; hidup selama koneksi sehingga dibersihkan lagi setelah perubahan
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SET @aktor_id = %s", (aktor_id,))
+        finally:
+            cursor.close()
+
+    def audit_log_statements(self):
+        return [
+            """ALTER TABLE Log_Perubahan_Kegiatan
+                ADD COLUMN Perubahan TEXT NULL,
+                ADD COLUMN ID_Pengguna_Aktor INT NULL""",
+        ] + self._audit_trigger_statements(KOLOM_AUDIT_KEGIATAN_AWAL)
+
+    def _audit_trigger_statements(self, kolom_audit):
+        """Trigger audit JSON untuk kolom_audit (dibuat ulang setiap kali kolom Kegiatan bertambah)."""
+        def json_kolom(prefix):
+            return ", ".join(f"'{k}', {prefix}.{k}" for k in kolom_audit)
+        # Perubahan UPDATE dibangun per kolom: hanya kolom yang benar-benar berubah yang disimpan
+        cek_update = "\n".join(
+            f"            IF NOT (OLD.{k} <=> NEW.{k}) THEN SET perubahan = JSON_SET(perubahan, '$.{k}', JSON_ARRAY(OLD.{k}, NEW.{k})); END IF;"
+            for k in kolom_audit)
+        return [
+            "DROP TRIGGER IF EXISTS TRG_Kegiatan_After_Insert",
+            "DROP TRIGGER IF EXISTS TRG_Kegiatan_After_Update",
+            "DROP TRIGGER IF EXISTS TRG_Kegiatan_Before_Delete",
+            f"""
+        CREATE TRIGGER TRG_Kegiatan_After_Insert
+        AFTER INSERT ON Kegiatan
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO Log_Perubahan_Kegiatan (ID_Kegiatan_Ref, Aksi, Perubahan, ID_Pengguna_Aktor)
+            VALUES (NEW.ID_Kegiatan, 'INSERT', JSON_OBJECT({json_kolom('NEW')}), @aktor_id);
+        END
+        """,
+            f"""
+        CREATE TRIGGER TRG_Kegiatan_After_Update
+        AFTER UPDATE ON Kegiatan
+        FOR EACH ROW
+        BEGIN
+            DECLARE perubahan JSON DEFAULT JSON_OBJECT();
+{cek_update}
+            IF JSON_LENGTH(perubahan) > 0 THEN
+                INSERT INTO Log_Perubahan_Kegiatan (ID_Kegiatan_Ref, Aksi, Perubahan, ID_Pengguna_Aktor)
+                VALUES (NEW.ID_Kegiatan, 'UPDATE', perubahan, @aktor_id);
+            END IF;
+        END
+        """,
+            f"""
+        CREATE TRIGGER TRG_Kegiatan_Before_Delete
+        BEFORE DELETE ON Kegiatan
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO Log_Perubahan_Kegiatan (ID_Kegiatan_Ref, Aksi, Perubahan, ID_Pengguna_Aktor)
+            VALUES (OLD.ID_Kegiatan, 'DELETE', JSON_OBJECT({json_kolom('OLD')}), @aktor_id);
+        END
+        """,
+        ]
+
+    def arsip_log_statements(self):
+        return [
+            # "N log terbaru" cukup membaca ujung index, tanpa mengurutkan seluruh riwayat
+            "CREATE INDEX IDX_Log_Waktu ON Log_Perubahan_Kegiatan (Timestamp_Aksi, ID_Log)",
+            """CREATE TABLE IF NOT EXISTS Arsip_Log_Kegiatan (
+                ID_Arsip INT AUTO_INCREMENT PRIMARY KEY,
+                Periode CHAR(7) NOT NULL,
+                Waktu_Awal TIMESTAMP NULL,
+                Waktu_Akhir TIMESTAMP NULL,
+                ID_Log_Awal INT NOT NULL,
+                ID_Log_Akhir INT NOT NULL,
+                Jumlah_Baris INT NOT NULL,
+                Data LONGBLOB NOT NULL,
+                Dibuat TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX IDX_Arsip_Waktu (Waktu_Awal, Waktu_Akhir)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci""",
+        ]
+
+    def log_filter_index_statements(self):
+        return [
+            # Filter kesetaraan di depan, urutan halaman (Timestamp_Aksi, ID_Log) di belakang:
+            # halaman berikutnya tetap berupa range scan tanpa filesort
+            "CREATE INDEX IDX_Log_Aksi_Waktu ON Log_Perubahan_Kegiatan (Aksi, Timestamp_Aksi, ID_Log)",
+            "CREATE INDEX IDX_Log_Kegiatan_Waktu ON Log_Perubahan_Kegiatan (ID_Kegiatan_Ref, Timestamp_Aksi, ID_Log)",
+        ]
+
+    def filter_kegiatan_index_statements(self):
+        return [
+            # Kolom filter di depan, urutan halaman (Tanggal DESC, Nama, ID) di belakang: halaman hasil
+            # filter dibaca berurutan dari index tanpa filesort, dan keyset cursor tetap berupa range scan
+            "CREATE INDEX IDX_Kegiatan_Jenis_Tanggal ON Kegiatan (Jenis_Kegiatan, Tanggal DESC, Nama_Kegiatan, ID_Kegiatan)",
+            "CREATE INDEX IDX_Kegiatan_Tempat_Tanggal ON Kegiatan (Tempat, Tanggal DESC, Nama_Kegiatan, ID_Kegiatan)",
+            "CREATE INDEX IDX_Kegiatan_PJ_Tanggal ON Kegiatan (ID_Penanggung_Jawab, Tanggal DESC, Nama_Kegiatan, ID_Kegiatan)",
+        ]
+
+    def pencarian_kegiatan_statements(self):
+        return ["CREATE FULLTEXT INDEX FTX_Kegiatan_Teks ON Kegiatan (Nama_Kegiatan, Tempat, Jenis_Kegiatan)"]
+
+    def ekspresi_pencarian(self, teks):
+        # Boolean mode: setiap kata wajib ada (+), sebagai awalan (*) agar cocok saat masih diketik.
+        # Kata berakhiran * tidak dibuang walau lebih pendek dari innodb_ft_min_token_size
+        kata_list = _kata_pencarian(teks)
+        return " ".join(f"+{kata}*" for kata in kata_list) if kata_list else None
+
+    def sumber_pencarian_kegiatan(self, ekspresi):
+        query = """SELECT ID_Kegiatan AS ID_Cocok,
+                       MATCH (Nama_Kegiatan, Tempat, Jenis_Kegiatan) AGAINST (%s IN BOOLEAN MODE) AS Skor_Cocok
+                FROM Kegiatan
+                WHERE MATCH (Nama_Kegiatan, Tempat, Jenis_Kegiatan) AGAINST (%s IN BOOLEAN MODE)"""
+        return query, [ekspresi, ekspresi]
+
+    def pengguna_auto_increment_statements(self):
+        def ubah_kolom(conn, cursor):
+            # Kegiatan.ID_Penanggung_Jawab mereferensikan kolom ini; MySQL menolak MODIFY selama FK dicek.
+            # Tipe kolom tidak berubah, jadi referensi tetap valid. AUTO_INCREMENT mulai dari MAX + 1.
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+            try:
+                cursor.execute("ALTER TABLE Pengguna MODIFY ID_Pengguna INT NOT NULL AUTO_INCREMENT")
+            finally:
+                cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+        return [ubah_kolom]
+
+    def pengguna_unik_statements(self):
+        def buat_index(kolom):
+            def langkah(conn, cursor):
+                # Tabel dari skema dasar sudah punya UNIQUE di kolom ini; index kedua hanya menambah biaya tulis
+                cursor.execute("""SELECT COUNT(*) FROM information_schema.STATISTICS
+                    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'Pengguna' AND COLUMN_NAME = %s
+                      AND NON_UNIQUE = 0 AND SEQ_IN_INDEX = 1""", (kolom,))
+                if cursor.fetchone()[0] == 0:
+                    cursor.execute(f"CREATE UNIQUE INDEX UQ_Pengguna_{kolom} ON Pengguna ({kolom})")
+            return langkah
+        return [buat_index("Username"), buat_index("NIM_NIP")]
+
+    def jadwal_kegiatan_statements(self):
+        return [
+            """ALTER TABLE Kegiatan
+                ADD COLUMN Jam_Mulai TIME NULL AFTER Tanggal,
+                ADD COLUMN Jam_Selesai TIME NULL AFTER Jam_Mulai""",
+            # Index interval per ruangan: seek (Tempat, Tanggal) lalu range Jam_Mulai < selesai.
+            # Cek bentrok membaca O(log n) + jumlah kegiatan ruangan itu pada hari yang sama.
+            "CREATE INDEX IDX_Kegiatan_Jadwal ON Kegiatan (Tempat, Tanggal, Jam_Mulai, Jam_Selesai)",
+            """
+        CREATE OR REPLACE VIEW View_Detail_Kegiatan AS
+        SELECT
+            K.ID_Kegiatan, K.Nama_Kegiatan, K.Tanggal, K.Tempat, K.Jenis_Kegiatan,
+            P.Nama AS Nama_Penanggung_Jawab, R.Nama_Role AS Role_Penanggung_Jawab,
+            K.ID_Penanggung_Jawab, K.Jam_Mulai, K.Jam_Selesai
+        FROM Kegiatan K
+        LEFT JOIN Pengguna P ON K.ID_Penanggung_Jawab = P.ID_Pengguna
+        LEFT JOIN Role R ON P.Role_ID = R.Role_ID
+        """,
+        ] + self._audit_trigger_statements(KOLOM_AUDIT_KEGIATAN) + [
+            "DROP PROCEDURE IF EXISTS SP_TambahKegiatan",
+            "DROP PROCEDURE IF EXISTS SP_UpdateKegiatan",
+            f"""
+        CREATE PROCEDURE SP_TambahKegiatan (
+            IN p_ID_Kegiatan VARCHAR(10), IN p_Nama_Kegiatan VARCHAR(100), IN p_Tanggal DATE,
+            IN p_Tempat VARCHAR(100), IN p_Jenis_Kegiatan VARCHAR(50), IN p_ID_Penanggung_Jawab INT,
+            IN p_Jam_Mulai TIME, IN p_Jam_Selesai TIME
+        )
+        BEGIN
+            IF EXISTS (SELECT 1 FROM Kegiatan WHERE ID_Kegiatan = p_ID_Kegiatan) THEN
+                SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Error: ID Kegiatan sudah ada.';
+            END IF;
+{self._sp_cek_bentrok("p_ID_Kegiatan", "p_Tanggal", "p_Tempat", "p_Jam_Mulai", "p_Jam_Selesai")}
+            INSERT INTO Kegiatan (ID_Kegiatan, Nama_Kegiatan, Tanggal, Jam_Mulai, Jam_Selesai, Tempat,
+                                  Jenis_Kegiatan, ID_Penanggung_Jawab)
+            VALUES (p_ID_Kegiatan, p_Nama_Kegiatan, p_Tanggal, p_Jam_Mulai, p_Jam_Selesai, p_Tempat,
+                    p_Jenis_Kegiatan, p_ID_Penanggung_Jawab);
+        END
+        """,
+            f"""
+        CREATE PROCEDURE SP_UpdateKegiatan (
+            IN p_ID_Kegiatan_Target VARCHAR(10), IN p_Nama_Kegiatan_Baru VARCHAR(100), IN p_Tanggal_Baru DATE,
+            IN p_Tempat_Baru VARCHAR(100), IN p_Jenis_Kegiatan_Baru VARCHAR(50), IN p_ID_Penanggung_Jawab_Baru INT,
+            IN p_Jam_Mulai_Baru TIME, IN p_Jam_Selesai_Baru TIME
+        )
+        BEGIN
+{self._sp_cek_bentrok("p_ID_Kegiatan_Target", "p_Tanggal_Baru", "p_Tempat_Baru", "p_Jam_Mulai_Baru", "p_Jam_Selesai_Baru")}
+            UPDATE Kegiatan
+            SET Nama_Kegiatan = p_Nama_Kegiatan_Baru, Tanggal = p_Tanggal_Baru, Tempat = p_Tempat_Baru,
+                Jenis_Kegiatan = p_Jenis_Kegiatan_Baru, ID_Penanggung_Jawab = p_ID_Penanggung_Jawab_Baru,
+                Jam_Mulai = p_Jam_Mulai_Baru, Jam_Selesai = p_Jam_Selesai_Baru
+            WHERE ID_Kegiatan = p_ID_Kegiatan_Target;
+        END
+        """,
+        ]
+
+    @staticmethod
+    def _sp_cek_bentrok(p_id, p_tanggal, p_tempat, p_mulai, p_selesai):
+        """Blok SP yang menolak jadwal tumpang tindih di ruangan yang sama.
+
+        SELECT ... FOR UPDATE mengunci rentang index (Tempat, Tanggal) sampai
+        transaksi CALL selesai, sehingga dua pemesanan bersamaan tidak bisa
+        sama-sama lolos cek lalu sama-sama tersimpan.
+        """
+        return f"""            IF {p_mulai} IS NOT NULL AND {p_selesai} IS NOT NULL THEN
+                BEGIN
+                    DECLARE v_bentrok VARCHAR(10) DEFAULT NULL;
+                    DECLARE v_pesan VARCHAR(255);
+                    SELECT ID_Kegiatan INTO v_bentrok FROM Kegiatan
+                    WHERE Tempat = {p_tempat} AND Tanggal = {p_tanggal}
+                      AND Jam_Mulai < {p_selesai} AND Jam_Selesai > {p_mulai}
+                      AND ID_Kegiatan <> {p_id}
+                    ORDER BY Jam_Mulai LIMIT 1 FOR UPDATE;
+                    IF v_bentrok IS NOT NULL THEN
+                        SET v_pesan = CONCAT('{PESAN_JADWAL_BENTROK} dengan kegiatan ', v_bentrok, ' di ', {p_tempat}, '.');
+                        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = v_pesan;
+                    END IF;
+                END;
+            END IF;"""
+
+    def migrate_tanggal_to_date(self, conn, batch_size=500):
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT COLUMN_NAME, DATA_TYPE FROM INFORMATION_SCHEMA.COLUMNS
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'Kegiatan'
+                  AND COLUMN_NAME IN ('Tanggal', 'Tanggal_Baru')
+            """)
+            kolom = {nama: tipe.lower() for nama, tipe in cursor.fetchall()}
+            if kolom.get('Tanggal') in (None, 'date'):
+                return 0
+
+            # Kolom bantu ditambahkan (INSTANT di MySQL 8) lalu diisi bertahap per batch primary key,
+            # sehingga tabel tidak dikunci lama dan migrasi bisa dilanjutkan jika sempat terputus.
+            if 'Tanggal_Baru' not in kolom:
+                cursor.execute("ALTER TABLE Kegiatan ADD COLUMN Tanggal_Baru DATE NULL AFTER Tanggal")
+            conn.commit()
+
+            total = 0
+            last_id = ''
+            while True:
+                cursor.execute("SELECT ID_Kegiatan FROM Kegiatan WHERE ID_Kegiatan > %s ORDER BY ID_Kegiatan LIMIT %s",
+                               (last_id, batch_size))
+                ids = [row[0] for row in cursor.fetchall()]
+                if not ids:
+                    break
+                cursor.execute("""
+                    UPDATE Kegiatan SET Tanggal_Baru = CASE
+                        WHEN Tanggal REGEXP '^[0-9]{2}-[0-9]{2}-[0-9]{4}$' THEN STR_TO_DATE(Tanggal, '%%d-%%m-%%Y')
+                        WHEN Tanggal REGEXP '^[0-9]{4}-[0-9]{2}-[0-9]{2}$' THEN STR_TO_DATE(Tanggal, '%%Y-%%m-%%d')
+                        ELSE NULL END
+                    WHERE ID_Kegiatan BETWEEN %s AND %s
+                """, (ids[0], ids[-1]))
+                conn.commit()
+                total += len(ids)
+                last_id = ids[-1]
+
+            # Pertukaran kolom dilakukan dalam satu ALTER agar pembaca tidak melihat keadaan setengah jadi
+            cursor.execute("ALTER TABLE Kegiatan DROP COLUMN Tanggal, CHANGE COLUMN Tanggal_Baru Tanggal DATE NULL")
+            conn.commit()
+            print(f"Info: Migrasi Kegiatan.Tanggal ke DATE selesai ({total} baris).")
+            return total
+        finally:
+            cursor.close()
+
+    def schema_statements(self):
+        # DDL untuk Tabel
+        base_tables_ddl = [
+            """CREATE TABLE IF NOT EXISTS Role (
+                Role_ID INT PRIMARY KEY,
+                Nama_Role VARCHAR(100) NOT NULL
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci""",
+            """CREATE TABLE IF NOT EXISTS Pengguna (
+                ID_Pengguna INT PRIMARY KEY,
+                Nama VARCHAR(100) NOT NULL,
+                Role_ID INT,
+                NIM_NIP VARCHAR(50) UNIQUE,
+                Username VARCHAR(50) UNIQUE NOT NULL,
+                Password VARCHAR(255) NOT NULL,
+                FOREIGN KEY (Role_ID) REFERENCES Role(Role_ID) ON DELETE SET NULL ON UPDATE CASCADE
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci""",
+            """CREATE TABLE IF NOT EXISTS Kegiatan (
+                ID_Kegiatan VARCHAR(10) PRIMARY KEY,
+                Nama_Kegiatan VARCHAR(100) NOT NULL,
+                Tanggal DATE,
+                Tempat VARCHAR(100),
+                Jenis_Kegiatan VARCHAR(50),
+                ID_Penanggung_Jawab INT,
+                FOREIGN KEY (ID_Penanggung_Jawab) REFERENCES Pengguna(ID_Pengguna) ON DELETE SET NULL ON UPDATE CASCADE
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci""",
+            # Index untuk listing terurut dan filter rentang tanggal (ID_Kegiatan sebagai tie-breaker)
+            """CREATE INDEX IDX_Kegiatan_Tanggal_Nama ON Kegiatan (Tanggal DESC, Nama_Kegiatan, ID_Kegiatan)"""
+        ]
+
+        # DDL untuk Log Table
+        log_table_ddl = """
+        CREATE TABLE IF NOT EXISTS Log_Perubahan_Kegiatan (
+            ID_Log INT AUTO_INCREMENT PRIMARY KEY,
+            ID_Kegiatan_Ref VARCHAR(10),
+            Aksi VARCHAR(50) NOT NULL,
+            Timestamp_Aksi TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            Detail_Lama TEXT,
+            Detail_Baru TEXT
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci"""
+
+        # DDL untuk View
+        view_ddl = """
+        CREATE OR REPLACE VIEW View_Detail_Kegiatan AS
+        SELECT
+            K.ID_Kegiatan, K.Nama_Kegiatan, K.Tanggal, K.Tempat, K.Jenis_Kegiatan,
+            P.Nama AS Nama_Penanggung_Jawab, R.Nama_Role AS Role_Penanggung_Jawab,
+            K.ID_Penanggung_Jawab
+        FROM Kegiatan K
+        LEFT JOIN Pengguna P ON K.ID_Penanggung_Jawab = P.ID_Pengguna
+        LEFT JOIN Role R ON P.Role_ID = R.Role_ID
+        """
+
+        # DDL untuk Triggers dan Stored Procedures
+        # Setiap DDL ini akan dieksekusi sebagai satu blok/perintah
+        trigger_insert_ddl = """
+        CREATE TRIGGER IF NOT EXISTS TRG_Kegiatan_After_Insert
+        AFTER INSERT ON Kegiatan
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO Log_Perubahan_Kegiatan (ID_Kegiatan_Ref, Aksi, Detail_Baru)
+            VALUES (NEW.ID_Kegiatan, 'INSERT',
+                    CONCAT('ID: ', NEW.ID_Kegiatan,
+                           ', Nama: ', NEW.Nama_Kegiatan,
+                           ', Tanggal: ', NEW.Tanggal,
+                           ', Tempat: ', NEW.Tempat,
+                           ', Jenis: ', NEW.Jenis_Kegiatan,
+                           ', PJ_ID: ', IFNULL(NEW.ID_Penanggung_Jawab, 'NULL'))
+                   );
+        END
+        """
+
+        trigger_update_ddl = """
+        CREATE TRIGGER IF NOT EXISTS TRG_Kegiatan_After_Update
+        AFTER UPDATE ON Kegiatan
+        FOR EACH ROW
+        BEGIN
+            DECLARE detail_lama_str TEXT;
+            DECLARE detail_baru_str TEXT;
+            SET detail_lama_str = CONCAT('ID: ', OLD.ID_Kegiatan, ', Nama: ', OLD.Nama_Kegiatan, ', Tanggal: ', OLD.Tanggal, ', Tempat: ', OLD.Tempat, ', Jenis: ', OLD.Jenis_Kegiatan, ', PJ_ID: ', IFNULL(OLD.ID_Penanggung_Jawab, 'NULL'));
+            SET detail_baru_str = CONCAT('ID: ', NEW.ID_Kegiatan, ', Nama: ', NEW.Nama_Kegiatan, ', Tanggal: ', NEW.Tanggal, ', Tempat: ', NEW.Tempat, ', Jenis: ', NEW.Jenis_Kegiatan, ', PJ_ID: ', IFNULL(NEW.ID_Penanggung_Jawab, 'NULL'));
+            IF detail_lama_str <> detail_baru_str THEN
+                INSERT INTO Log_Perubahan_Kegiatan (ID_Kegiatan_Ref, Aksi, Detail_Lama, Detail_Baru)
+                VALUES (NEW.ID_Kegiatan, 'UPDATE', detail_lama_str, detail_baru_str);
+            END IF;
+        END
+        """
+
+        trigger_delete_ddl = """
+        CREATE TRIGGER IF NOT EXISTS TRG_Kegiatan_Before_Delete
+        BEFORE DELETE ON Kegiatan
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO Log_Perubahan_Kegiatan (ID_Kegiatan_Ref, Aksi, Detail_Lama)
+            VALUES (OLD.ID_Kegiatan, 'DELETE',
+                    CONCAT('ID: ', OLD.ID_Kegiatan,
+                           ', Nama: ', OLD.Nama_Kegiatan,
+                           ', Tanggal: ', OLD.Tanggal,
+                           ', Tempat: ', OLD.Tempat,
+                           ', Jenis: ', OLD.Jenis_Kegiatan,
+                           ', PJ_ID: ', IFNULL(OLD.ID_Penanggung_Jawab, 'NULL'))
+                   );
+        END
+        """
+
+        sp_tambah_ddl = """
+        CREATE PROCEDURE IF NOT EXISTS SP_TambahKegiatan (
+            IN p_ID_Kegiatan VARCHAR(10), IN p_Nama_Kegiatan VARCHAR(100), IN p_Tanggal DATE,
+            IN p_Tempat VARCHAR(100), IN p_Jenis_Kegiatan VARCHAR(50), IN p_ID_Penanggung_Jawab INT
+        )
+        BEGIN
+            IF EXISTS (SELECT 1 FROM Kegiatan WHERE ID_Kegiatan = p_ID_Kegiatan) THEN
+                SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Error: ID Kegiatan sudah ada.';
+            ELSE
+                INSERT INTO Kegiatan (ID_Kegiatan, Nama_Kegiatan, Tanggal, Tempat, Jenis_Kegiatan, ID_Penanggung_Jawab)
+                VALUES (p_ID_Kegiatan, p_Nama_Kegiatan, p_Tanggal, p_Tempat, p_Jenis_Kegiatan, p_ID_Penanggung_Jawab);
+            END IF;
+        END
+        """
+
+        sp_update_ddl = """
+        CREATE PROCEDURE IF NOT EXISTS SP_UpdateKegiatan (
+            IN p_ID_Kegiatan_Target VARCHAR(10), IN p_Nama_Kegiatan_Baru VARCHAR(100), IN p_Tanggal_Baru DATE,
+            IN p_Tempat_Baru VARCHAR(100), IN p_Jenis_Kegiatan_Baru VARCHAR(50), IN p_ID_Penanggung_Jawab_Baru INT
+        )
+        BEGIN
+            UPDATE Kegiatan
+            SET Nama_Kegiatan = p_Nama_Kegiatan_Baru, Tanggal = p_Tanggal_Baru, Tempat = p_Tempat_Baru,
+                Jenis_Kegiatan = p_Jenis_Kegiatan_Baru, ID_Penanggung_Jawab = p_ID_Penanggung_Jawab_Baru
+            WHERE ID_Kegiatan = p_ID_Kegiatan_Target;
+        END
+        """
+
+        sp_hapus_ddl = """
+        CREATE PROCEDURE IF NOT EXISTS SP_HapusKegiatan (
+            IN p_ID_Kegiatan VARCHAR(10)
+        )
+        BEGIN
+            DELETE FROM Kegiatan WHERE ID_Kegiatan = p_ID_Kegiatan;
+        END
+        """
+        return base_tables_ddl + [log_table_ddl, view_ddl,
+                                  trigger_insert_ddl, trigger_update_ddl, trigger_delete_ddl,
+                                  sp_tambah_ddl, sp_update_ddl, sp_hapus_ddl]
+
+
+def _sqlite_convert_timestamp(value):
+    """Converter kolom TIMESTAMP SQLite ('YYYY-MM-DD HH:MM:SS') menjadi datetime."""
+    try:
+        return datetime.datetime.fromisoformat(value.decode())
+    except ValueError:
+        return value.decode()
+
+def _sqlite_convert_date(value):
+    """Converter kolom DATE SQLite ('YYYY-MM-DD') menjadi datetime.date."""
+    try:
+        return datetime.date.fromisoformat(value.decode())
+    except ValueError:
+        return value.decode()
+
+sqlite3.register_converter("TIMESTAMP", _sqlite_convert_timestamp)
+sqlite3.register_converter("DATE", _sqlite_convert_date)
+sqlite3.register_converter("TIME", lambda value: parse_jam(value.decode()))
+sqlite3.register_adapter(datetime.datetime, lambda value: value.isoformat(" ", timespec="seconds"))
+sqlite3.register_adapter(datetime.date, lambda value: value.isoformat())
+# HH:MM:SS dengan lebar tetap, sehingga perbandingan teks di SQLite sama dengan urutan waktu
+sqlite3.register_adapter(datetime.time, lambda value: value.isoformat(timespec="seconds"))
+
+
+class _KoneksiSQLite(sqlite3.Connection):
+    """Koneksi SQLite yang membawa ID pengguna aktor untuk fungsi SQL aktor_id()."""
+    aktor_id = None
+
+
+class SQLiteBackend(DatabaseBackend):
+    """Backend SQLite in-process (tanpa server), cocok untuk komputer lab single-user.
+
+    Stored procedure MySQL diganti dengan fungsi Python dengan nama yang sama,
+    sedangkan trigger audit memakai trigger native SQLite. Aktor perubahan dibaca
+    trigger lewat fungsi aplikasi aktor_id() yang didaftarkan di setiap koneksi.
+    """
+    name = "sqlite"
+    driver_errors = (sqlite3.Error,)
+    transactional_ddl = True # DDL SQLite ikut transaksi, migrasi bisa all-or-nothing
+
+    # PRAGMA yang diterapkan ke setiap koneksi baru
+    PRAGMAS = (
+        "PRAGMA foreign_keys = ON",
+        "PRAGMA synchronous = NORMAL", # Aman dipakai bersama WAL, jauh lebih sedikit fsync
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA cache_size = -16000", # Kira-kira 16 MB page cache per koneksi
+        "PRAGMA mmap_size = 134217728", # 128 MB memory-mapped I/O
+    )
+
+    def __init__(self, path="manajemen_kegiatan.db", busy_timeout=5.0):
+        self._path = path
+        self._busy_timeout = busy_timeout
+        self._uri = False
+        self._keepalive_conn = None
+        if path == ":memory:":
+            # Database memori dibagi antar koneksi pool lewat shared cache.
+            # Satu koneksi ditahan agar database tidak hilang saat pool kosong.
+            self._path = f"file:kegiatan_{uuid.uuid4().hex}?mode=memory&cache=shared"
+            self._uri = True
+            self._keepalive_conn = self.connect()
+        self._procedures = {
+            "SP_TambahKegiatan": self._sp_tambah_kegiatan,
+            "SP_UpdateKegiatan": self._sp_update_kegiatan,
+            "SP_HapusKegiatan": self._sp_hapus_kegiatan,
+        }
+
+    def describe(self):
+        return f"SQLite '{self._path}'"
+
+    def connect(self):
+        try:
+            conn = sqlite3.connect(self._path, timeout=self._busy_timeout, uri=self._uri,
+                                   detect_types=sqlite3.PARSE_DECLTYPES, factory=_KoneksiSQLite,
+                                   check_same_thread=False) # Aman karena pool hanya meminjamkan ke satu thread
+            conn.create_function("aktor_id", 0, lambda: conn.aktor_id)
+            if not self._uri:
+                conn.execute("PRAGMA journal_mode = WAL") # Pembaca tidak memblokir penulis
+            for pragma in self.PRAGMAS:
+                conn.execute(pragma)
+            return conn
+        except sqlite3.Error as err:
+            raise DatabaseError(f"Koneksi database SQLite gagal: {err}") from err
+
+    def is_alive(self, conn):
+        conn.execute("SELECT 1")
+        return True
+
+    def adapt_query(self, query):
+        return query.replace("%s", "?")
+
+    def execute(self, cursor, query, params=None):
+        cursor.execute(self.adapt_query(query), params if params is not None else ())
+
+    def call_procedure(self, cursor, proc_name, args):
+        procedure = self._procedures.get(proc_name)
+        if procedure is None:
+            raise DatabaseError(f"Prosedur '{proc_name}' tidak dikenal oleh backend SQLite.")
+        procedure(cursor, *args)
+
+    def mulai_transaksi_jadwal(self, cursor):
+        self._mulai_transaksi_tulis(cursor) # Kunci tulis database sudah dipegang, SELECT biasa cukup
+
+    def translate_error(self, err):
+        msg = str(err)
+        if isinstance(err, sqlite3.IntegrityError) and "UNIQUE constraint failed" in msg:
+            # Disamakan dengan kode duplikasi MySQL agar UI cukup memeriksa satu kode
+            return DatabaseError(msg, errno=ER_DUP_ENTRY, sqlstate='23000')
+        if isinstance(err, sqlite3.IntegrityError):
+            return DatabaseError(msg, sqlstate='23000')
+        return DatabaseError(msg)
+
+    def schema_version_ddl(self):
+        return """CREATE TABLE IF NOT EXISTS Schema_Versi (
+                Versi INTEGER PRIMARY KEY,
+                Deskripsi TEXT NOT NULL,
+                Waktu_Diterapkan TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+            )"""
+
+    def set_aktor(self, conn, aktor_id):
+        conn.aktor_id = aktor_id
+
+    def audit_log_statements(self):
+        return [
+            "ALTER TABLE Log_Perubahan_Kegiatan ADD COLUMN Perubahan TEXT",
+            "ALTER TABLE Log_Perubahan_Kegiatan ADD COLUMN ID_Pengguna_Aktor INTEGER",
+        ] + self._audit_trigger_statements(KOLOM_AUDIT_KEGIATAN_AWAL)
+
+    def _audit_trigger_statements(self, kolom_audit):
+        """Trigger audit JSON untuk kolom_audit (dibuat ulang setiap kali kolom Kegiatan bertambah)."""
+        def json_kolom(prefix):
+            return ", ".join(f"'{k}', {prefix}.{k}" for k in kolom_audit)
+        # Hanya kolom yang berubah: satu baris subquery per kolom, digabung json_group_object
+        perubahan_update = "\n                    UNION ALL ".join(
+            f"SELECT '{k}' AS kolom, json_array(OLD.{k}, NEW.{k}) AS nilai WHERE OLD.{k} IS NOT NEW.{k}"
+            for k in kolom_audit)
+        kolom_berubah = " OR ".join(f"OLD.{k} IS NOT NEW.{k}" for k in kolom_audit)
+        return [
+            "DROP TRIGGER IF EXISTS TRG_Kegiatan_After_Insert",
+            "DROP TRIGGER IF EXISTS TRG_Kegiatan_After_Update",
+            "DROP TRIGGER IF EXISTS TRG_Kegiatan_Before_Delete",
+            f"""CREATE TRIGGER TRG_Kegiatan_After_Insert
+            AFTER INSERT ON Kegiatan
+            FOR EACH ROW
+            BEGIN
+                INSERT INTO Log_Perubahan_Kegiatan (ID_Kegiatan_Ref, Aksi, Perubahan, ID_Pengguna_Aktor)
+                VALUES (NEW.ID_Kegiatan, 'INSERT', json_object({json_kolom('NEW')}), aktor_id());
+            END""",
+            f"""CREATE TRIGGER TRG_Kegiatan_After_Update
+            AFTER UPDATE ON Kegiatan
+            FOR EACH ROW
+            WHEN {kolom_berubah}
+            BEGIN
+                INSERT INTO Log_Perubahan_Kegiatan (ID_Kegiatan_Ref, Aksi, Perubahan, ID_Pengguna_Aktor)
+                VALUES (NEW.ID_Kegiatan, 'UPDATE',
+                    (SELECT json_group_object(kolom, json(nilai)) FROM (
+                    {perubahan_update})),
+                    aktor_id());
+            END""",
+            f"""CREATE TRIGGER TRG_Kegiatan_Before_Delete
+            BEFORE DELETE ON Kegiatan
+            FOR EACH ROW
+            BEGIN
+                INSERT INTO Log_Perubahan_Kegiatan (ID_Kegiatan_Ref, Aksi, Perubahan, ID_Pengguna_Aktor)
+                VALUES (OLD.ID_Kegiatan, 'DELETE', json_object({json_kolom('OLD')}), aktor_id());
+            END""",
+        ]
+
+    def arsip_log_statements(self):
+        return [
+            "CREATE INDEX IF NOT EXISTS IDX_Log_Waktu ON Log_Perubahan_Kegiatan (Timestamp_Aksi, ID_Log)",
+            """CREATE TABLE IF NOT EXISTS Arsip_Log_Kegiatan (
+                ID_Arsip INTEGER PRIMARY KEY AUTOINCREMENT,
+                Periode TEXT NOT NULL,
+                Waktu_Awal TIMESTAMP,
+                Waktu_Akhir TIMESTAMP,
+                ID_Log_Awal INTEGER NOT NULL,
+                ID_Log_Akhir INTEGER NOT NULL,
+                Jumlah_Baris INTEGER NOT NULL,
+                Data BLOB NOT NULL,
+                Dibuat TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+            )""",
+            "CREATE INDEX IF NOT EXISTS IDX_Arsip_Waktu ON Arsip_Log_Kegiatan (Waktu_Awal, Waktu_Akhir)",
+        ]
+
+    def log_filter_index_statements(self):
+        return [
+            "CREATE INDEX IF NOT EXISTS IDX_Log_Aksi_Waktu ON Log_Perubahan_Kegiatan (Aksi, Timestamp_Aksi, ID_Log)",
+            "CREATE INDEX IF NOT EXISTS IDX_Log_Kegiatan_Waktu ON Log_Perubahan_Kegiatan (ID_Kegiatan_Ref, Timestamp_Aksi, ID_Log)",
+        ]
+
+    def pengguna_unik_statements(self):
+        # Tabel Pengguna lama (sebelum Schema_Versi) dibuat tanpa UNIQUE; di tabel baru index ini
+        # berdampingan dengan autoindex constraint kolom
+        return [
+            "CREATE UNIQUE INDEX IF NOT EXISTS UQ_Pengguna_Username ON Pengguna (Username)",
+            "CREATE UNIQUE INDEX IF NOT EXISTS UQ_Pengguna_NIM_NIP ON Pengguna (NIM_NIP)",
+        ]
+
+    def filter_kegiatan_index_statements(self):
+        return [
+            "CREATE INDEX IF NOT EXISTS IDX_Kegiatan_Jenis_Tanggal ON Kegiatan (Jenis_Kegiatan, Tanggal DESC, Nama_Kegiatan, ID_Kegiatan)",
+            "CREATE INDEX IF NOT EXISTS IDX_Kegiatan_Tempat_Tanggal ON Kegiatan (Tempat, Tanggal DESC, Nama_Kegiatan, ID_Kegiatan)",
+            "CREATE INDEX IF NOT EXISTS IDX_Kegiatan_PJ_Tanggal ON Kegiatan (ID_Penanggung_Jawab, Tanggal DESC, Nama_Kegiatan, ID_Kegiatan)",
+        ]
+
+    def pencarian_kegiatan_statements(self):
+        kolom = "Nama_Kegiatan, Tempat, Jenis_Kegiatan"
+        return [
+            # Tabel FTS5 external content: teks tidak disimpan dua kali, baris FTS = rowid Kegiatan.
+            # prefix='2 3' menyimpan index awalan sehingga query "sem"* tidak memindai seluruh kosakata.
+            # rowid Kegiatan menjadi alias No_Kegiatan (INTEGER PRIMARY KEY) di migrasi 11, jadi tetap saat VACUUM
+            f"""CREATE VIRTUAL TABLE IF NOT EXISTS Kegiatan_FTS USING fts5(
+                {kolom}, content='Kegiatan', content_rowid='rowid',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )""",
+            f"""CREATE TRIGGER IF NOT EXISTS TRG_Kegiatan_FTS_Insert
+            AFTER INSERT ON Kegiatan
+            BEGIN
+                INSERT INTO Kegiatan_FTS (rowid, {kolom})
+                VALUES (new.rowid, new.Nama_Kegiatan, new.Tempat, new.Jenis_Kegiatan);
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS TRG_Kegiatan_FTS_Delete
+            AFTER DELETE ON Kegiatan
+            BEGIN
+                INSERT INTO Kegiatan_FTS (Kegiatan_FTS, rowid, {kolom})
+                VALUES ('delete', old.rowid, old.Nama_Kegiatan, old.Tempat, old.Jenis_Kegiatan);
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS TRG_Kegiatan_FTS_Update
+            AFTER UPDATE OF {kolom} ON Kegiatan
+            BEGIN
+                INSERT INTO Kegiatan_FTS (Kegiatan_FTS, rowid, {kolom})
+                VALUES ('delete', old.rowid, old.Nama_Kegiatan, old.Tempat, old.Jenis_Kegiatan);
+                INSERT INTO Kegiatan_FTS (rowid, {kolom})
+                VALUES (new.rowid, new.Nama_Kegiatan, new.Tempat, new.Jenis_Kegiatan);
+            END""",
+            "INSERT INTO Kegiatan_FTS (Kegiatan_FTS) VALUES ('rebuild')", # Mengindeks baris yang sudah ada
+        ]
+
+    def ekspresi_pencarian(self, teks):
+        # Setiap kata sebagai frasa berawalan ("sem"*), digabung AND implisit FTS5.
+        # Kata hanya berisi huruf/angka, jadi tidak ada sintaks FTS5 dari input pengguna
+        kata_list = _kata_pencarian(teks)
+        return " ".join(f'"{kata}"*' for kata in kata_list) if kata_list else None
+
+    def sumber_pencarian_kegiatan(self, ekspresi):
+        # bm25() negatif (makin kecil makin relevan), dibalik agar arahnya sama dengan skor MATCH MySQL.
+        # Bobot kolom mengikuti urutan tabel FTS: Nama_Kegiatan, Tempat, Jenis_Kegiatan
+        query = """SELECT K.ID_Kegiatan AS ID_Cocok, -bm25(Kegiatan_FTS, 10.0, 2.0, 5.0) AS Skor_Cocok
+                FROM Kegiatan_FTS
+                JOIN Kegiatan K ON K.rowid = Kegiatan_FTS.rowid
+                WHERE Kegiatan_FTS MATCH %s"""
+        return query, [ekspresi]
+
+    def kegiatan_rowid_tetap_statements(self):
+        return [self._tambah_no_kegiatan]
+
+    def _tambah_no_kegiatan(self, conn, cursor):
+        """Membangun ulang Kegiatan dengan No_Kegiatan INTEGER PRIMARY KEY dan ID_Kegiatan UNIQUE.
+
+        Tabel ber-PK TEXT memakai rowid implisit yang boleh dinomori ulang oleh
+        VACUUM (termasuk VACUUM dari luar aplikasi), padahal Kegiatan_FTS terikat
+        ke rowid itu. Alias rowid eksplisit tidak pernah berubah dan terisi otomatis
+        oleh INSERT yang tidak menyebut kolomnya, jadi semua jalur INSERT tetap
+        sama. Nomor diambil dari rowid lama; index, trigger, dan view dibuat ulang
+        dari sqlite_master, lalu indeks FTS dibangun ulang sekali.
+        """
+        cursor.execute("PRAGMA table_info(Kegiatan)")
+        kolom = [row[1] for row in cursor.fetchall()]
+        if "No_Kegiatan" in kolom:
+            return
+        kolom_lama = ", ".join(kolom)
+        conn.commit()
+        cursor.execute("PRAGMA foreign_keys = OFF") # Tidak berlaku di dalam transaksi
+        try:
+            cursor.execute("BEGIN IMMEDIATE") # Terminal lain tidak bisa menulis selama tabel dibangun ulang
+            cursor.execute("""SELECT type, name, sql FROM sqlite_master
+                WHERE sql IS NOT NULL AND (type = 'view' OR (type IN ('index', 'trigger') AND tbl_name = 'Kegiatan'))""")
+            urutan = {'index': 0, 'view': 1, 'trigger': 2}
+            objek = sorted(cursor.fetchall(), key=lambda row: urutan[row[0]])
+            for tipe, nama, _ in objek:
+                if tipe == 'view': # View yang menunjuk tabel yang dihapus membuat RENAME gagal
+                    cursor.execute(f"DROP VIEW {nama}")
+            cursor.execute("""CREATE TABLE Kegiatan_Baru (
+                No_Kegiatan INTEGER PRIMARY KEY,
+                ID_Kegiatan TEXT NOT NULL UNIQUE,
+                Nama_Kegiatan TEXT NOT NULL,
+                Tanggal DATE,
+                Tempat TEXT,
+                Jenis_Kegiatan TEXT,
+                ID_Penanggung_Jawab INTEGER,
+                Jam_Mulai TIME,
+                Jam_Selesai TIME,
+                FOREIGN KEY (ID_Penanggung_Jawab) REFERENCES Pengguna(ID_Pengguna) ON DELETE SET NULL ON UPDATE CASCADE
+            )""")
+            cursor.execute(f"INSERT INTO Kegiatan_Baru (No_Kegiatan, {kolom_lama}) SELECT rowid, {kolom_lama} FROM Kegiatan")
+            cursor.execute("DROP TABLE Kegiatan") # Index dan trigger Kegiatan ikut terhapus
+            cursor.execute("ALTER TABLE Kegiatan_Baru RENAME TO Kegiatan")
+            for _, _, sql in objek:
+                cursor.execute(sql)
+            # Menyelaraskan indeks yang mungkin sudah rusak oleh VACUUM sebelum migrasi ini
+            cursor.execute("INSERT INTO Kegiatan_FTS (Kegiatan_FTS) VALUES ('rebuild')")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.execute("PRAGMA foreign_keys = ON")
+
+    def pemeliharaan_statements(self):
+        return ["VACUUM", "PRAGMA optimize"]
+
+    def jadwal_kegiatan_statements(self):
+        return [
+            "ALTER TABLE Kegiatan ADD COLUMN Jam_Mulai TIME",
+            "ALTER TABLE Kegiatan ADD COLUMN Jam_Selesai TIME",
+            # Index interval per ruangan: seek (Tempat, Tanggal) lalu range Jam_Mulai < selesai
+            "CREATE INDEX IF NOT EXISTS IDX_Kegiatan_Jadwal ON Kegiatan (Tempat, Tanggal, Jam_Mulai, Jam_Selesai)",
+            "DROP VIEW IF EXISTS View_Detail_Kegiatan",
+            """CREATE VIEW View_Detail_Kegiatan AS
+            SELECT
+                K.ID_Kegiatan, K.Nama_Kegiatan, K.Tanggal, K.Tempat, K.Jenis_Kegiatan,
+                P.Nama AS Nama_Penanggung_Jawab, R.Nama_Role AS Role_Penanggung_Jawab,
+                K.ID_Penanggung_Jawab, K.Jam_Mulai, K.Jam_Selesai
+            FROM Kegiatan K
+            LEFT JOIN Pengguna P ON K.ID_Penanggung_Jawab = P.ID_Pengguna
+            LEFT JOIN Role R ON P.Role_ID = R.Role_ID""",
+        ] + self._audit_trigger_statements(KOLOM_AUDIT_KEGIATAN)
+
+    def _kegiatan_table_ddl(self, table_name="Kegiatan", if_not_exists=True):
+        return f"""CREATE TABLE {'IF NOT EXISTS ' if if_not_exists else ''}{table_name} (
+                ID_Kegiatan TEXT PRIMARY KEY,
+                Nama_Kegiatan TEXT NOT NULL,
+                Tanggal DATE,
+                Tempat TEXT,
+                Jenis_Kegiatan TEXT,
+                ID_Penanggung_Jawab INTEGER,
+                FOREIGN KEY (ID_Penanggung_Jawab) REFERENCES Pengguna(ID_Pengguna) ON DELETE SET NULL ON UPDATE CASCADE
+            )"""
+
+    def migrate_tanggal_to_date(self, conn, batch_size=500):
+        cursor = conn.cursor()
+        try:
+            cursor.execute("PRAGMA table_info(Kegiatan)")
+            kolom = {row[1]: (row[2] or "").upper() for row in cursor.fetchall()}
+            if not kolom or kolom.get('Tanggal') == 'DATE':
+                return 0
+            konversi = ("CASE WHEN Tanggal LIKE '__-__-____' "
+                        "THEN substr(Tanggal, 7, 4) || '-' || substr(Tanggal, 4, 2) || '-' || substr(Tanggal, 1, 2) "
+                        "ELSE Tanggal END")
+            # SQLite tidak bisa mengubah tipe kolom, jadi tabel dibangun ulang dalam satu transaksi.
+            # View dan trigger yang bergantung ikut dihapus dan dibuat ulang oleh schema_statements.
+            conn.commit()
+            cursor.execute("PRAGMA foreign_keys = OFF")
+            cursor.execute("BEGIN")
+            cursor.execute("DROP VIEW IF EXISTS View_Detail_Kegiatan")
+            cursor.execute("DROP TABLE IF EXISTS Kegiatan_Migrasi")
+            cursor.execute(self._kegiatan_table_ddl("Kegiatan_Migrasi", if_not_exists=False))
+            cursor.execute(f"""
+                INSERT INTO Kegiatan_Migrasi (ID_Kegiatan, Nama_Kegiatan, Tanggal, Tempat, Jenis_Kegiatan, ID_Penanggung_Jawab)
+                SELECT ID_Kegiatan, Nama_Kegiatan, {konversi}, Tempat, Jenis_Kegiatan, ID_Penanggung_Jawab FROM Kegiatan
+            """)
+            total = cursor.rowcount
+            cursor.execute("DROP TABLE Kegiatan")
+            cursor.execute("ALTER TABLE Kegiatan_Migrasi RENAME TO Kegiatan")
+            conn.commit()
+            print(f"Info: Migrasi Kegiatan.Tanggal ke DATE selesai ({total} baris).")
+            return total
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.execute("PRAGMA foreign_keys = ON")
+            cursor.close()
+
+    # Padanan stored procedure MySQL di sisi Python
+    def _sp_tambah_kegiatan(self, cursor, id_kegiatan, nama_kegiatan, tanggal, tempat, jenis_kegiatan, id_penanggung_jawab,
+                            jam_mulai=None, jam_selesai=None):
+        self._mulai_transaksi_tulis(cursor)
+        cursor.execute("SELECT 1 FROM Kegiatan WHERE ID_Kegiatan = ?", (id_kegiatan,))
+        if cursor.fetchone():
+            raise DatabaseError("Error: ID Kegiatan sudah ada.", errno=ER_SIGNAL_EXCEPTION, sqlstate=SQLSTATE_CUSTOM_ERROR)
+        kolom = ["ID_Kegiatan", "Nama_Kegiatan", "Tanggal", "Tempat", "Jenis_Kegiatan", "ID_Penanggung_Jawab"]
+        nilai = [id_kegiatan, nama_kegiatan, tanggal, tempat, jenis_kegiatan, id_penanggung_jawab]
+        if jam_mulai is not None or jam_selesai is not None: # Kolom jam baru ada setelah migrasi 8
+            self._cek_bentrok_jadwal(cursor, id_kegiatan, tanggal, tempat, jam_mulai, jam_selesai)
+            kolom += KOLOM_JADWAL_KEGIATAN
+            nilai += [jam_mulai, jam_selesai]
+        cursor.execute(f"INSERT INTO Kegiatan ({', '.join(kolom)}) VALUES ({', '.join('?' * len(kolom))})", nilai)
+
+    def _sp_update_kegiatan(self, cursor, id_kegiatan_target, nama_kegiatan, tanggal, tempat, jenis_kegiatan, id_penanggung_jawab,
+                            jam_mulai, jam_selesai):
+        self._mulai_transaksi_tulis(cursor)
+        self._cek_bentrok_jadwal(cursor, id_kegiatan_target, tanggal, tempat, jam_mulai, jam_selesai)
+        cursor.execute("""
+            UPDATE Kegiatan
+            SET Nama_Kegiatan = ?, Tanggal = ?, Tempat = ?, Jenis_Kegiatan = ?, ID_Penanggung_Jawab = ?,
+                Jam_Mulai = ?, Jam_Selesai = ?
+            WHERE ID_Kegiatan = ?
+        """, (nama_kegiatan, tanggal, tempat, jenis_kegiatan, id_penanggung_jawab, jam_mulai, jam_selesai,
+              id_kegiatan_target))
+
+    @staticmethod
+    def _mulai_transaksi_tulis(cursor):
+        """BEGIN IMMEDIATE: kunci tulis diambil sebelum cek, sehingga cek dan INSERT/UPDATE atomik."""
+        if not cursor.connection.in_transaction: # Di dalam migrasi transaksi sudah berjalan
+            cursor.execute("BEGIN IMMEDIATE")
+
+    @staticmethod
+    def _cek_bentrok_jadwal(cursor, id_kegiatan, tanggal, tempat, jam_mulai, jam_selesai):
+        """Padanan blok cek bentrok di SP MySQL (memakai IDX_Kegiatan_Jadwal)."""
+        if tanggal is None or jam_mulai is None or jam_selesai is None:
+            return
+        cursor.execute("""
+            SELECT ID_Kegiatan FROM Kegiatan
+            WHERE Tempat = ? AND Tanggal = ? AND Jam_Mulai < ? AND Jam_Selesai > ? AND ID_Kegiatan <> ?
+            ORDER BY Jam_Mulai LIMIT 1
+        """, (tempat, tanggal, jam_selesai, jam_mulai, id_kegiatan))
+        row = cursor.fetchone()
+        if row:
+            raise DatabaseError(f"{PESAN_JADWAL_BENTROK} dengan kegiatan {row[0]} di {tempat}.",
+                                errno=ER_SIGNAL_EXCEPTION, sqlstate=SQLSTATE_CUSTOM_ERROR)
+
+    def _sp_hapus_kegiatan(self, cursor, id_kegiatan):
+        cursor.execute("DELETE FROM Kegiatan WHERE ID_Kegiatan = ?", (id_kegiatan,))
+
+    def schema_statements(self):
+        detail_new = ("'ID: ' || NEW.ID_Kegiatan || ', Nama: ' || NEW.Nama_Kegiatan || ', Tanggal: ' || NEW.Tanggal"
+                      " || ', Tempat: ' || NEW.Tempat || ', Jenis: ' || NEW.Jenis_Kegiatan"
+                      " || ', PJ_ID: ' || IFNULL(NEW.ID_Penanggung_Jawab, 'NULL')")
+        detail_old = detail_new.replace("NEW.", "OLD.")
+        return [
+            """CREATE TABLE IF NOT EXISTS Role (
+                Role_ID INTEGER PRIMARY KEY,
+                Nama_Role TEXT NOT NULL
+            )""",
+            """CREATE TABLE IF NOT EXISTS Pengguna (
+                ID_Pengguna INTEGER PRIMARY KEY,
+                Nama TEXT NOT NULL,
+                Role_ID INTEGER,
+                NIM_NIP TEXT UNIQUE,
+                Username TEXT UNIQUE NOT NULL,
+                Password TEXT NOT NULL,
+                FOREIGN KEY (Role_ID) REFERENCES Role(Role_ID) ON DELETE SET NULL ON UPDATE CASCADE
+            )""",
+            self._kegiatan_table_ddl(),
+            """CREATE INDEX IF NOT EXISTS IDX_Kegiatan_Tanggal_Nama ON Kegiatan (Tanggal DESC, Nama_Kegiatan, ID_Kegiatan)""",
+            """CREATE TABLE IF NOT EXISTS Log_Perubahan_Kegiatan (
+                ID_Log INTEGER PRIMARY KEY AUTOINCREMENT,
+                ID_Kegiatan_Ref TEXT,
+                Aksi TEXT NOT NULL,
+                Timestamp_Aksi TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+                Detail_Lama TEXT,
+                Detail_Baru TEXT
+            )""",
+            """CREATE VIEW IF NOT EXISTS View_Detail_Kegiatan AS
+            SELECT
+                K.ID_Kegiatan, K.Nama_Kegiatan, K.Tanggal, K.Tempat, K.Jenis_Kegiatan,
+                P.Nama AS Nama_Penanggung_Jawab, R.Nama_Role AS Role_Penanggung_Jawab,
+                K.ID_Penanggung_Jawab
+            FROM Kegiatan K
+            LEFT JOIN Pengguna P ON K.ID_Penanggung_Jawab = P.ID_Pengguna
+            LEFT JOIN Role R ON P.Role_ID = R.Role_ID""",
+            f"""CREATE TRIGGER IF NOT EXISTS TRG_Kegiatan_After_Insert
+            AFTER INSERT ON Kegiatan
+            FOR EACH ROW
+            BEGIN
+                INSERT INTO Log_Perubahan_Kegiatan (ID_Kegiatan_Ref, Aksi, Detail_Baru)
+                VALUES (NEW.ID_Kegiatan, 'INSERT', {detail_new});
+            END""",
+            # WHEN menggantikan perbandingan string CONCAT: log hanya ditulis jika ada kolom yang berubah
+            f"""CREATE TRIGGER IF NOT EXISTS TRG_Kegiatan_After_Update
+            AFTER UPDATE ON Kegiatan
+            FOR EACH ROW
+            WHEN OLD.ID_Kegiatan IS NOT NEW.ID_Kegiatan OR OLD.Nama_Kegiatan IS NOT NEW.Nama_Kegiatan
+                 OR OLD.Tanggal IS NOT NEW.Tanggal OR OLD.Tempat IS NOT NEW.Tempat
+                 OR OLD.Jenis_Kegiatan IS NOT NEW.Jenis_Kegiatan
+                 OR OLD.ID_Penanggung_Jawab IS NOT NEW.ID_Penanggung_Jawab
+            BEGIN
+                INSERT INTO Log_Perubahan_Kegiatan (ID_Kegiatan_Ref, Aksi, Detail_Lama, Detail_Baru)
+                VALUES (NEW.ID_Kegiatan, 'UPDATE', {detail_old}, {detail_new});
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS TRG_Kegiatan_Before_Delete
+            BEFORE DELETE ON Kegiatan
+            FOR EACH ROW
+            BEGIN
+                INSERT INTO Log_Perubahan_Kegiatan (ID_Kegiatan_Ref, Aksi, Detail_Lama)
+                VALUES (OLD.ID_Kegiatan, 'DELETE', {detail_old});
+            END""",
+        ]
+
+    def close(self):
+        """Menutup koneksi penahan database memori (jika ada)."""
+        if self._keepalive_conn is not None:
+            self._keepalive_conn.close()
+            self._keepalive_conn = None
+
+
+# --- Kelas untuk Manajemen Database ---
+class DatabaseManager:
+    def __init__(self, host=None, user=None, password=None, database_name=None, backend=None,
+                 pool_size=5, pool_idle_timeout=300, pool_timeout=10, password_hasher=None):
+        # Backend default adalah MySQL agar pemanggilan lama DatabaseManager(host, user, password, db) tetap berlaku
+        if backend is None:
+            backend = MySQLBackend(host, user, password, database_name)
+        self._backend = backend
+        # Koneksi dipinjam dari pool, bukan dibuat ulang untuk setiap query
+        self._pool = ConnectionPool(self._backend.connect, is_alive_func=self._backend.is_alive,
+                                    reset_func=self._backend.reset,
+                                    max_size=pool_size, max_idle_seconds=pool_idle_timeout,
+                                    checkout_timeout=pool_timeout)
+        # Parameter biaya hash kata sandi; kalibrasi dengan `python kata_sandi.py --target-ms ...`
+        self._password_hasher = password_hasher or PasswordHasher()
+
+    @property
+    def backend(self):
+        return self._backend
+
+    def get_pool_stats(self):
+        """Statistik pool: checkouts, waits, created vs reused, dll."""
+        return self._pool.stats()
+
+    def close(self):
+        """Menutup semua koneksi di pool. Dipanggil saat aplikasi selesai."""
+        self._pool.close_all()
+        self._backend.close()
+
+    def _rollback_quietly(self, conn):
+        """Rollback transaksi; mengembalikan False jika koneksi ternyata sudah rusak."""
+        try:
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _lepas_aktor(self, conn, aktor_id):
+        """Menghapus tanda aktor dari koneksi sebelum kembali ke pool; False jika koneksi rusak."""
+        if aktor_id is None:
+            return True
+        try:
+            self._backend.set_aktor(conn, None)
+            return True
+        except Exception:
+            return False
+
+    def execute_query(self, query, params=None, fetch_one=False, fetch_all=False, is_many=False, is_ddl=False,
+                      aktor_id=None):
+        """Mengeksekusi query SQL dengan koneksi pinjaman dari pool.
+
+        aktor_id (ID pengguna) dicatat oleh trigger audit untuk DML pada tabel Kegiatan.
+        """
+        conn = None
+        broken = False
+        try:
+            conn = self._pool.acquire()
+            if aktor_id is not None:
+                self._backend.set_aktor(conn, aktor_id)
+            cursor = conn.cursor() # Buat cursor di awal
+
+            if is_many and params: # Untuk executemany
+                self._backend.executemany(cursor, query, params)
+            else: # Query DDL tunggal (CREATE TABLE, TRIGGER, SP) maupun DML standar
+                self._backend.execute(cursor, query, params)
+
+            # Commit jika query adalah DML yang mengubah data atau DDL
+            if query.strip().upper().startswith(("INSERT", "UPDATE", "DELETE")) or is_ddl:
+                conn.commit()
+
+            # Fetch results jika diperlukan (biasanya bukan untuk DDL)
+            if fetch_one:
+                result = cursor.fetchone()
+                cursor.close()
+                return result
+            if fetch_all:
+                result = cursor.fetchall()
+                cursor.close()
+                return result
+            
+            # Return lastrowid untuk INSERT atau rowcount untuk operasi lain
+            if cursor.lastrowid and query.strip().upper().startswith("INSERT"):
+                last_id = cursor.lastrowid
+                cursor.close()
+                return last_id
+            
+            rowcount = cursor.rowcount
+            cursor.close()
+            return rowcount
+
+        except Exception as err:
+            if conn and not self._rollback_quietly(conn):
+                broken = True # Koneksi putus, jangan dikembalikan ke pool
+            if isinstance(err, self._backend.driver_errors):
+                raise self._backend.translate_error(err) from err
+            raise # Re-raise error untuk ditangani di level lebih tinggi
+        finally:
+            if conn:
+                broken = broken or not self._lepas_aktor(conn, aktor_id)
+                self._pool.release(conn, discard=broken)
+
+
+    def iter_query(self, query, params=None, batch_size=DEFAULT_FETCH_BATCH):
+        """Generator baris hasil SELECT yang diambil per fetchmany(batch_size).
+
+        Koneksi dipinjam dari pool selama generator berjalan dan dikembalikan saat
+        habis atau ditutup. Cursor MySQL default tidak di-buffer dan cursor SQLite
+        bersifat lazy, sehingga hasil besar tidak pernah dimuat utuh ke memori.
+        """
+        conn = None
+        cursor = None
+        broken = False
+        try:
+            conn = self._pool.acquire()
+            cursor = conn.cursor()
+            self._backend.execute(cursor, query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row
+        except Exception as err:
+            if conn and not self._rollback_quietly(conn):
+                broken = True
+            if isinstance(err, self._backend.driver_errors):
+                raise self._backend.translate_error(err) from err
+            raise
+        finally:
+            if cursor:
+                try:
+                    cursor.close()
+                except Exception:
+                    broken = True # Cursor MySQL yang berhenti di tengah masih menyisakan hasil yang belum dibaca
+            if conn:
+                self._pool.release(conn, discard=broken)
+
+    def call_stored_procedure(self, proc_name, args=(), aktor_id=None):
+        conn = None
+        cursor = None
+        broken = False
+        try:
+            conn = self._pool.acquire()
+            if aktor_id is not None:
+                self._backend.set_aktor(conn, aktor_id)
+            cursor = conn.cursor()
+            self._backend.call_procedure(cursor, proc_name, args)
+            conn.commit()
+            
+            rowcount = cursor.rowcount # Berguna untuk SP non-SELECT atau untuk mengetahui status
+            return rowcount
+        except Exception as err:
+            if conn and not self._rollback_quietly(conn):
+                broken = True
+            if isinstance(err, self._backend.driver_errors):
+                raise self._backend.translate_error(err) from err
+            raise
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                broken = broken or not self._lepas_aktor(conn, aktor_id)
+                self._pool.release(conn, discard=broken)
+
+    def _daftar_migrasi(self):
+        """Seluruh migrasi skema berurutan. Migrasi baru selalu ditambahkan di akhir dengan versi berikutnya."""
+        backend = self._backend
+        return [
+            # Database lama (Tanggal bertipe teks) dikonversi dulu sebelum index dan view dibuat
+            Migrasi(1, "Konversi Kegiatan.Tanggal ke DATE",
+                    [lambda conn, cursor: backend.migrate_tanggal_to_date(conn)], transaksional=False),
+            Migrasi(2, "Skema dasar: tabel, index, log, view, trigger, prosedur", backend.schema_statements()),
+            Migrasi(3, "Data awal role dan pengguna", [self._isi_data_awal]),
+            # Kegiatan awal diisi setelah trigger audit terstruktur terpasang, agar log-nya berformat JSON
+            Migrasi(4, "Log audit terstruktur: JSON diff kolom yang berubah dan aktor",
+                    backend.audit_log_statements() + [self._isi_kegiatan_awal]),
+            Migrasi(5, "Retensi log: index waktu dan tabel arsip terkompresi", backend.arsip_log_statements()),
+            Migrasi(6, "Index filter riwayat aktivitas per aksi dan per kegiatan", backend.log_filter_index_statements()),
+            # SQLite: ID_Pengguna INTEGER PRIMARY KEY sudah merupakan alias rowid yang terisi otomatis
+            # Duplikat lama dicek paling awal, sebelum ALTER MySQL yang commit implisit
+            Migrasi(7, "ID_Pengguna auto-increment dan index UNIQUE Username/NIM_NIP untuk pendaftaran atomik",
+                    [self._cek_duplikat_pengguna] + backend.pengguna_auto_increment_statements()
+                    + backend.pengguna_unik_statements()),
+            Migrasi(8, "Jam mulai/selesai kegiatan dan index jadwal ruangan", backend.jadwal_kegiatan_statements()),
+            Migrasi(9, "Index filter daftar kegiatan per jenis, tempat, dan penanggung jawab",
+                    backend.filter_kegiatan_index_statements()),
+            Migrasi(10, "Indeks full-text nama, tempat, dan jenis kegiatan", backend.pencarian_kegiatan_statements()),
+            Migrasi(11, "Kunci integer tetap Kegiatan untuk indeks full-text", backend.kegiatan_rowid_tetap_statements(),
+                    transaksional=False),
+        ]
+
+    def get_schema_version(self):
+        """Versi skema yang tercatat di database (0 jika belum pernah dimigrasi)."""
+        try:
+            row = self.execute_query("SELECT MAX(Versi) FROM Schema_Versi", fetch_one=True)
+        except DatabaseError:
+            return 0 # Tabel Schema_Versi belum ada
+        return (row[0] or 0) if row else 0
+
+    def initialize_database(self):
+        """Menerapkan migrasi yang belum tercatat; jika skema sudah terbaru cukup satu query versi."""
+        migrasi = self._daftar_migrasi()
+        versi_terbaru = migrasi[-1].versi
+        versi_sekarang = self.get_schema_version()
+        if versi_sekarang >= versi_terbaru:
+            print(f"Info: Skema database sudah versi {versi_sekarang}, tidak ada migrasi.")
+            return
+
+        pending = [m for m in migrasi if m.versi > versi_sekarang]
+        conn = None
+        cursor = None
+        broken = False
+        backend = self._backend
+        try:
+            conn = self._pool.acquire()
+            cursor = conn.cursor()
+            backend.execute(cursor, backend.schema_version_ddl())
+            conn.commit()
+
+            # Migrasi transaksional yang berurutan dikumpulkan agar bisa diterapkan dalam satu transaksi
+            batch = []
+            for m in pending:
+                if m.transaksional:
+                    batch.append(m)
+                    continue
+                self._terapkan_batch_migrasi(conn, cursor, batch)
+                batch = []
+                self._terapkan_batch_migrasi(conn, cursor, [m])
+            self._terapkan_batch_migrasi(conn, cursor, batch)
+            print(f"Info: Skema database dimigrasi dari versi {versi_sekarang} ke {versi_terbaru}.")
+        except Exception as err:
+            if conn and not self._rollback_quietly(conn):
+                broken = True
+            if isinstance(err, backend.driver_errors):
+                raise backend.translate_error(err) from err
+            raise
+        finally:
+            if cursor: cursor.close()
+            if conn: self._pool.release(conn, discard=broken)
+
+    def _terapkan_batch_migrasi(self, conn, cursor, batch):
+        """Menerapkan sekumpulan migrasi beserta baris Schema_Versi-nya.
+
+        Pada backend dengan DDL transaksional (SQLite) seluruh batch berada dalam
+        satu transaksi; di MySQL DDL melakukan commit implisit sehingga setiap
+        migrasi dicatat segera setelah langkahnya selesai.
+        """
+        if not batch:
+            return
+        backend = self._backend
+        satu_transaksi = backend.transactional_ddl and all(m.transaksional for m in batch)
+        if satu_transaksi:
+            backend.begin(cursor)
+        for m in batch:
+            print(f"Info: Menerapkan migrasi {m.versi}: {m.deskripsi}")
+            for langkah in m.langkah:
+                if callable(langkah):
+                    langkah(conn, cursor)
+                else:
+                    self._execute_ddl_block(cursor, langkah)
+            backend.execute(cursor, "INSERT INTO Schema_Versi (Versi, Deskripsi) VALUES (%s, %s)", (m.versi, m.deskripsi))
+            if not satu_transaksi:
+                conn.commit()
+        if satu_transaksi:
+            conn.commit()
+
+    def _execute_ddl_block(self, cursor, ddl_string):
+        """Mengeksekusi satu blok DDL; objek yang sudah ada (database sebelum ada Schema_Versi) dilewati."""
+        ddl_string = ddl_string.strip()
+        if not ddl_string: # Pastikan string tidak kosong
+            return
+        try:
+            self._backend.execute(cursor, ddl_string)
+        except self._backend.driver_errors as driver_err:
+            e = self._backend.translate_error(driver_err)
+            if self._backend.is_existing_object_error(e):
+                print(f"Info: Objek DDL sudah ada atau operasi serupa sudah dilakukan, dilewati. Detail: {str(e)[:150]}")
+            else:
+                # Cetak query yang bermasalah untuk debugging
+                print(f"Error saat eksekusi DDL block: {e}\nQuery Bermasalah:\n{ddl_string[:500]}{'...' if len(ddl_string) > 500 else ''}")
+                raise # Re-raise error jika bukan karena objek sudah ada
+
+    def _isi_data_awal(self, conn, cursor):
+        """Mengisi role dan pengguna awal jika tabel kosong (dijalankan sekali sebagai migrasi)."""
+        backend = self._backend
+        backend.execute(cursor, "SELECT COUNT(*) FROM Role")
+        if cursor.fetchone()[0] == 0:
+            roles = [(1, 'Mahasiswa'), (2, 'Dosen'), (3, 'Staff')]
+            backend.executemany(cursor, "INSERT INTO Role (Role_ID, Nama_Role) VALUES (%s, %s)", roles)
+
+        backend.execute(cursor, "SELECT COUNT(*) FROM Pengguna")
+        if cursor.fetchone()[0] == 0:
+            # (ID, Nama, Role_ID, NIM_NIP, Username, password awal); yang disimpan hanya hash password-nya
+            pengguna_data = [
+                (101, "Paul Fajar", 1, "2025", "Paul_mhs", "PAULPASS"),
+                (102, "Dr. Zhafier", 2, "705", "Zhafier_dsn", "ZHAFPASS"),
+                (103, "Vijaypal Singh", 3, "2252", "Jay_staff", "JAYPASS")
+            ]
+            pengguna_tuples = [data[:5] + (self._password_hasher.hash(data[5]),) for data in pengguna_data]
+            backend.executemany(cursor, "INSERT INTO Pengguna (ID_Pengguna, Nama, Role_ID, NIM_NIP, Username, Password) VALUES (%s, %s, %s, %s, %s, %s)", pengguna_tuples)
+        print("Data awal berhasil diinisialisasi jika diperlukan.")
+
+    def _isi_kegiatan_awal(self, conn, cursor):
+        """Mengisi kegiatan contoh jika tabel kosong; bagian dari migrasi 4 (setelah trigger audit JSON).
+
+        Database yang sudah berisi kegiatan dari versi lama tidak disentuh.
+        """
+        backend = self._backend
+        backend.execute(cursor, "SELECT COUNT(*) FROM Kegiatan")
+        if cursor.fetchone()[0] == 0:
+            kegiatan_awal = [
+                Kegiatan("K001", "Seminar AI", datetime.date(2025, 5, 10), "Aula FT", "Seminar", 101),
+                Kegiatan("K002", "Praktikum IoT", datetime.date(2025, 5, 15), "Lab Jaringan Komputer", "Praktikum", 102),
+                Kegiatan("K003", "Rapat Dosen Bulanan", datetime.date(2025, 5, 20), "Ruang Dosen", "Rapat Dosen", 103),
+            ]
+            for keg in kegiatan_awal:
+                # Memanggil Stored Procedure untuk menambah kegiatan, bukan INSERT langsung
+                backend.call_procedure(cursor, "SP_TambahKegiatan",
+                                       (keg.id_entitas, keg.nama_kegiatan,
+                                        keg.tanggal, keg.tempat,
+                                        keg.jenis_kegiatan, keg.id_penanggung_jawab))
+
+    def _cek_duplikat_pengguna(self, conn, cursor):
+        """Menyiapkan index UNIQUE pengguna (migrasi 7): menolak database lama yang berisi Username/NIM_NIP duplikat.
+
+        Kredensial tidak diubah otomatis. Jika ada duplikat, migrasi dibatalkan
+        dengan DatabaseError yang mendaftar setiap nilai beserta ID pemiliknya,
+        agar admin memutuskan sendiri akun mana yang diganti lalu menjalankan
+        aplikasi lagi.
+        """
+        backend = self._backend
+        konflik = []
+        for kolom in ("Username", "NIM_NIP"):
+            # NULL tidak ikut: index UNIQUE mengizinkan NULL berulang
+            backend.execute(cursor, f"""SELECT P.{kolom}, P.ID_Pengguna, P.Nama FROM Pengguna P
+                WHERE P.{kolom} IN (SELECT {kolom} FROM Pengguna GROUP BY {kolom} HAVING COUNT(*) > 1)
+                ORDER BY P.{kolom}, P.ID_Pengguna""")
+            for nilai, grup in itertools.groupby(cursor.fetchall(), key=lambda row: row[0]):
+                pemilik = ", ".join(f"ID {row[1]} ({row[2]})" for row in grup)
+                konflik.append(f"  {kolom} '{nilai}': {pemilik}")
+        if konflik:
+            raise DatabaseError("Migrasi 7 dibatalkan: Username/NIM_NIP berikut dipakai lebih dari satu pengguna. "
+                                "Ubah atau hapus akun duplikat, lalu jalankan aplikasi lagi.\n" + "\n".join(konflik))
+
+    def tambah_kegiatan_obj_db(self, kegiatan_obj: 'Kegiatan', aktor_id=None):
+        """Menambah kegiatan ke DB menggunakan objek Kegiatan via Stored Procedure.
+
+        SP menolak jadwal yang bentrok dengan kegiatan lain di ruangan yang sama
+        (JadwalBentrokError); cek dan INSERT berada dalam satu transaksi.
+        """
+        # Error dari SP (SQLSTATE 45000, mis. duplikasi ID) sudah berupa DatabaseError dengan pesan dari SP
+        self._panggil_sp_kegiatan("SP_TambahKegiatan", kegiatan_obj, aktor_id)
+
+    def _panggil_sp_kegiatan(self, proc_name, kegiatan_obj, aktor_id):
+        try:
+            return self.call_stored_procedure(proc_name,
+                                              (kegiatan_obj.id_entitas, kegiatan_obj.nama_kegiatan,
+                                               kegiatan_obj.tanggal, kegiatan_obj.tempat,
+                                               kegiatan_obj.jenis_kegiatan, kegiatan_obj.id_penanggung_jawab,
+                                               kegiatan_obj.jam_mulai, kegiatan_obj.jam_selesai),
+                                              aktor_id=aktor_id)
+        except DatabaseError as e:
+            if e.sqlstate != SQLSTATE_CUSTOM_ERROR or not (e.msg or "").startswith(PESAN_JADWAL_BENTROK):
+                raise
+            # Rincian bentrok diambil hanya saat SP menolak, untuk ditampilkan ke pengguna
+            raise JadwalBentrokError(e.msg, bentrok=self.cari_bentrok_jadwal_db(kegiatan_obj)) from e
+
+    def tambah_kegiatan_batch_db(self, kegiatan_list, aktor_id=None, ukuran_grup=200):
+        """Menyisipkan banyak kegiatan sekaligus: satu koneksi, satu transaksi, satu executemany.
+
+        Dipakai oleh impor massal. INSERT ini tidak lewat SP, tetapi cek bentrok
+        jadwal dan INSERT berada di satu transaksi tulis dengan kunci yang sama
+        (BEGIN IMMEDIATE di SQLite, SELECT ... FOR UPDATE di MySQL), sehingga
+        pemesanan dari terminal lain tidak bisa menyelip di antara keduanya.
+        Kegiatan yang bentrok dengan jadwal tersimpan tidak disisipkan.
+        Mengembalikan (jumlah_disimpan, map ID -> list Kegiatan bentrok). Jika satu
+        baris melanggar constraint (mis. ID ganda) seluruh batch di-rollback.
+        """
+        if not kegiatan_list:
+            return 0, {}
+        query = """
+            INSERT INTO Kegiatan (ID_Kegiatan, Nama_Kegiatan, Tanggal, Tempat, Jenis_Kegiatan, ID_Penanggung_Jawab,
+                                  Jam_Mulai, Jam_Selesai)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """
+        conn = None
+        cursor = None
+        broken = False
+        backend = self._backend
+        try:
+            conn = self._pool.acquire()
+            if aktor_id is not None:
+                backend.set_aktor(conn, aktor_id)
+            cursor = conn.cursor()
+            backend.mulai_transaksi_jadwal(cursor)
+
+            def baca_terkunci(query_jadwal, params):
+                backend.execute(cursor, query_jadwal + backend.kunci_baca_jadwal, params)
+                return cursor.fetchall()
+            bentrok = self._cari_bentrok_batch(baca_terkunci, kegiatan_list, ukuran_grup)
+            params = [(k.id_entitas, k.nama_kegiatan, k.tanggal, k.tempat, k.jenis_kegiatan, k.id_penanggung_jawab,
+                       k.jam_mulai, k.jam_selesai)
+                      for k in kegiatan_list if k.id_entitas not in bentrok]
+            if params:
+                backend.executemany(cursor, query, params)
+            conn.commit()
+            return len(params), bentrok
+        except Exception as err:
+            if conn and not self._rollback_quietly(conn):
+                broken = True
+            if isinstance(err, backend.driver_errors):
+                raise backend.translate_error(err) from err
+            raise
+        finally:
+            if cursor: cursor.close()
+            if conn:
+                broken = broken or not self._lepas_aktor(conn, aktor_id)
+                self._pool.release(conn, discard=broken)
+
+    def cari_bentrok_batch_db(self, kegiatan_list, ukuran_grup=200):
+        """Map ID -> list Kegiatan tersimpan yang jadwalnya bentrok, untuk banyak kegiatan sekaligus.
+
+        Hanya membaca (tanpa kunci), mis. untuk dry-run impor; tambah_kegiatan_batch_db
+        mengulang cek yang sama di dalam transaksi tulisnya. Bentrok antar kegiatan
+        di dalam kegiatan_list sendiri tidak diperiksa di sini.
+        """
+        return self._cari_bentrok_batch(lambda query, params: self.execute_query(query, params, fetch_all=True),
+                                        kegiatan_list, ukuran_grup)
+
+    def _cari_bentrok_batch(self, baca, kegiatan_list, ukuran_grup):
+        """Inti cek bentrok massal; baca(query, params) menjalankan SELECT jadwal dan mengembalikan barisnya.
+
+        Kegiatan berjam dikelompokkan per (Tempat, Tanggal); jadwal setiap
+        ukuran_grup ruangan-hari dibaca dengan satu query (seek IDX_Kegiatan_Jadwal
+        per kelompok), lalu tumpang tindih dihitung di memori dengan
+        Kegiatan.bentrok_dengan.
+        """
+        kelompok = {}
+        for keg in kegiatan_list:
+            if keg.punya_jadwal:
+                kelompok.setdefault((keg.tempat, keg.tanggal), []).append(keg)
+        kunci_list = list(kelompok)
+        bentrok = {}
+        for awal in range(0, len(kunci_list), ukuran_grup):
+            potongan = kunci_list[awal:awal + ukuran_grup]
+            kondisi = " OR ".join(["(Tempat = %s AND Tanggal = %s)"] * len(potongan))
+            query = f"""
+                SELECT {self._KOLOM_KEGIATAN} FROM Kegiatan
+                WHERE Jam_Mulai IS NOT NULL AND ({kondisi})
+                ORDER BY Jam_Mulai"""
+            params = tuple(nilai for kunci in potongan for nilai in kunci)
+            for row in baca(query, params) or []:
+                tersimpan = self._baris_ke_kegiatan(row)
+                for keg in kelompok.get((tersimpan.tempat, tersimpan.tanggal), []):
+                    if keg.bentrok_dengan(tersimpan):
+                        bentrok.setdefault(keg.id_entitas, []).append(tersimpan)
+        return bentrok
+
+    def get_id_kegiatan_terdaftar_db(self, id_list):
+        """Mengembalikan set ID dari id_list yang sudah ada di tabel Kegiatan (satu query IN)."""
+        if not id_list:
+            return set()
+        placeholders = ", ".join(["%s"] * len(id_list))
+        rows = self.execute_query(f"SELECT ID_Kegiatan FROM Kegiatan WHERE ID_Kegiatan IN ({placeholders})",
+                                  tuple(id_list), fetch_all=True)
+        return {row[0] for row in rows or []}
+
+    def get_kegiatan_by_ids_db(self, id_list):
+        """Map ID -> {'objek': Kegiatan, 'nama_pj': str} untuk ID yang masih ada (satu query IN)."""
+        if not id_list:
+            return {}
+        placeholders = ", ".join(["%s"] * len(id_list))
+        query = f"""
+            SELECT {self._KOLOM_DETAIL_KEGIATAN}
+            FROM View_Detail_Kegiatan
+            WHERE ID_Kegiatan IN ({placeholders})
+        """
+        rows = self.execute_query(query, tuple(id_list), fetch_all=True)
+        return {row[0]: self._baris_detail_ke_item(row) for row in rows or []}
+
+    # Kolom View_Detail_Kegiatan untuk listing, urutannya dipakai _baris_detail_ke_item
+    _KOLOM_DETAIL_KEGIATAN = ("ID_Kegiatan, Nama_Kegiatan, Tanggal, Tempat, Jenis_Kegiatan, "
+                              "ID_Penanggung_Jawab, Jam_Mulai, Jam_Selesai, Nama_Penanggung_Jawab")
+
+    @classmethod
+    def _baris_detail_ke_item(cls, row):
+        """Baris _KOLOM_DETAIL_KEGIATAN -> {'objek': Kegiatan, 'nama_pj': str}."""
+        return {'objek': cls._baris_ke_kegiatan(row), 'nama_pj': row[8]}
+
+    def update_kegiatan_obj_db(self, kegiatan_obj: 'Kegiatan', aktor_id=None):
+        """Mengupdate kegiatan di DB menggunakan objek Kegiatan via Stored Procedure (cek bentrok sama dengan tambah)."""
+        return self._panggil_sp_kegiatan("SP_UpdateKegiatan", kegiatan_obj, aktor_id)
+
+    # Kolom Kegiatan untuk query jadwal ruangan, urutannya dipakai _baris_ke_kegiatan
+    _KOLOM_KEGIATAN = ("ID_Kegiatan, Nama_Kegiatan, Tanggal, Tempat, Jenis_Kegiatan, ID_Penanggung_Jawab, "
+                       "Jam_Mulai, Jam_Selesai")
+
+    @staticmethod
+    def _baris_ke_kegiatan(row):
+        return Kegiatan(id_kegiatan=row[0], nama_kegiatan=row[1], tanggal=row[2], tempat=row[3],
+                        jenis_kegiatan=row[4], id_penanggung_jawab=row[5], jam_mulai=row[6], jam_selesai=row[7])
+
+    def cari_bentrok_jadwal_db(self, kegiatan_obj: 'Kegiatan'):
+        """Kegiatan lain di ruangan dan tanggal yang sama yang jamnya tumpang tindih dengan kegiatan_obj.
+
+        Interval [mulai, selesai) dicari lewat IDX_Kegiatan_Jadwal: seek ke
+        (Tempat, Tanggal) lalu range Jam_Mulai < selesai, jadi biayanya
+        O(log n) ditambah jumlah kegiatan ruangan itu pada hari tersebut.
+        """
+        if not kegiatan_obj.punya_jadwal:
+            return []
+        query = f"""
+            SELECT {self._KOLOM_KEGIATAN} FROM Kegiatan
+            WHERE Tempat = %s AND Tanggal = %s AND Jam_Mulai < %s AND Jam_Selesai > %s AND ID_Kegiatan <> %s
+            ORDER BY Jam_Mulai
+        """
+        rows = self.execute_query(query, (kegiatan_obj.tempat, kegiatan_obj.tanggal, kegiatan_obj.jam_selesai,
+                                          kegiatan_obj.jam_mulai, kegiatan_obj.id_entitas), fetch_all=True)
+        return [self._baris_ke_kegiatan(row) for row in rows or []]
+
+    def get_jadwal_ruangan_db(self, tempat, tanggal):
+        """Kegiatan berjam di satu ruangan pada satu tanggal, urut jam mulai (range scan IDX_Kegiatan_Jadwal)."""
+        query = f"""
+            SELECT {self._KOLOM_KEGIATAN} FROM Kegiatan
+            WHERE Tempat = %s AND Tanggal = %s AND Jam_Mulai IS NOT NULL
+            ORDER BY Jam_Mulai, Jam_Selesai
+        """
+        rows = self.execute_query(query, (tempat, parse_tanggal(tanggal)), fetch_all=True)
+        return [self._baris_ke_kegiatan(row) for row in rows or []]
+
+    def get_slot_kosong_db(self, tempat, tanggal, jam_buka=JAM_BUKA_DEFAULT, jam_tutup=JAM_TUTUP_DEFAULT,
+                           durasi_menit=0):
+        """Rentang jam kosong [(mulai, selesai), ...] ruangan pada tanggal itu, di antara jam_buka dan jam_tutup.
+
+        Jadwal yang sudah urut jam mulai disapu sekali sambil menyimpan jam
+        selesai terjauh, sehingga kegiatan yang saling tumpang tindih (data lama)
+        tetap dihitung benar. Slot lebih pendek dari durasi_menit dibuang.
+        """
+        jam_buka, jam_tutup = parse_jam(jam_buka), parse_jam(jam_tutup)
+        menit = lambda jam: jam.hour * 60 + jam.minute
+        slot = []
+        terpakai_sampai = jam_buka
+        for keg in self.get_jadwal_ruangan_db(tempat, tanggal):
+            if keg.jam_mulai > terpakai_sampai:
+                slot.append((terpakai_sampai, min(keg.jam_mulai, jam_tutup)))
+            terpakai_sampai = max(terpakai_sampai, keg.jam_selesai)
+            if terpakai_sampai >= jam_tutup:
+                break
+        if terpakai_sampai < jam_tutup:
+            slot.append((terpakai_sampai, jam_tutup))
+        return [(mulai, selesai) for mulai, selesai in slot
+                if mulai < selesai and menit(selesai) - menit(mulai) >= durasi_menit]
+
+    def hapus_kegiatan_db(self, id_keg: str, aktor_id=None):
+        return self.call_stored_procedure("SP_HapusKegiatan", (id_keg,), aktor_id=aktor_id)
+
+    def get_semua_kegiatan_obj_db(self, tanggal_mulai=None, tanggal_selesai=None, jenis=None, tempat=None,
+                                  id_penanggung_jawab=None):
+        """Daftar kegiatan terurut (tanggal terbaru dulu), opsional difilter (lihat _filter_kegiatan).
+
+        Tanggal bertipe DATE sehingga urutan dan filter rentang memakai index
+        IDX_Kegiatan_Tanggal_Nama, tanpa parsing string per baris. Hasilnya
+        KegiatanBatch (kolom paralel, objek Kegiatan dibuat saat diminta); iterasi
+        menghasilkan item {'objek': Kegiatan, 'nama_pj': str}.
+        """
+        conditions, params = self._filter_kegiatan(jenis, tempat, id_penanggung_jawab, tanggal_mulai, tanggal_selesai)
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"""
+            SELECT {self._KOLOM_DETAIL_KEGIATAN}
+            FROM View_Detail_Kegiatan
+            {where_clause}
+            ORDER BY Tanggal DESC, Nama_Kegiatan ASC, ID_Kegiatan ASC
+        """
+        rows = self.execute_query(query, tuple(params) if params else None, fetch_all=True)
+        return KegiatanBatch.dari_baris(rows or [])
+
+
+    @staticmethod
+    def _filter_rentang_tanggal(kolom, tanggal_mulai=None, tanggal_selesai=None, kolom_waktu=False):
+        """Klausa WHERE rentang tanggal inklusif beserta parameternya.
+
+        Untuk kolom TIMESTAMP (kolom_waktu=True) batas akhir menjadi < hari berikutnya,
+        sehingga seluruh hari terakhir ikut dan index tetap bisa dipakai.
+        """
+        conditions = []
+        params = []
+        if tanggal_mulai is not None:
+            mulai = parse_tanggal(tanggal_mulai)
+            conditions.append(f"{kolom} >= %s")
+            params.append(datetime.datetime.combine(mulai, datetime.time()) if kolom_waktu else mulai)
+        if tanggal_selesai is not None:
+            selesai = parse_tanggal(tanggal_selesai)
+            if kolom_waktu:
+                conditions.append(f"{kolom} < %s")
+                params.append(datetime.datetime.combine(selesai + datetime.timedelta(days=1), datetime.time()))
+            else:
+                conditions.append(f"{kolom} <= %s")
+                params.append(selesai)
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where_clause, params
+
+    @classmethod
+    def _filter_kegiatan(cls, jenis=None, tempat=None, id_penanggung_jawab=None, tanggal_mulai=None,
+                         tanggal_selesai=None):
+        """Kondisi WHERE (digabung dengan AND) dan parameter filter daftar kegiatan.
+
+        jenis/tempat: nilai kolom persis; id_penanggung_jawab: ID_Pengguna PJ;
+        tanggal_mulai/tanggal_selesai: rentang tanggal inklusif. Nilai kosong
+        berarti tidak difilter. Setiap kolom filter punya index dengan urutan
+        halaman di belakangnya (migrasi 9), jadi penyaringan terjadi di database.
+        """
+        where_clause, params = cls._filter_rentang_tanggal("Tanggal", tanggal_mulai, tanggal_selesai)
+        if tanggal_mulai is not None and tanggal_selesai is not None and params[0] > params[1]:
+            raise ValueError("Tanggal awal filter tidak boleh setelah tanggal akhir")
+        conditions = [where_clause[len("WHERE "):]] if where_clause else []
+        if jenis and jenis.strip():
+            conditions.append("Jenis_Kegiatan = %s")
+            params.append(jenis.strip())
+        if tempat and tempat.strip():
+            conditions.append("Tempat = %s")
+            params.append(tempat.strip())
+        if id_penanggung_jawab not in (None, ""):
+            try:
+                id_penanggung_jawab = int(id_penanggung_jawab)
+            except (TypeError, ValueError):
+                raise ValueError(f"ID penanggung jawab tidak valid: '{id_penanggung_jawab}'") from None
+            conditions.append("ID_Penanggung_Jawab = %s")
+            params.append(id_penanggung_jawab)
+        return conditions, params
+
+    def cari_kegiatan_db(self, teks, limit=DEFAULT_PAGE_SIZE, jenis=None, tempat=None, id_penanggung_jawab=None,
+                         tanggal_mulai=None, tanggal_selesai=None):
+        """Pencarian full-text atas Nama_Kegiatan, Tempat, dan Jenis_Kegiatan, terurut relevansi.
+
+        Setiap kata di teks harus cocok sebagai awalan kata (cocok untuk search-as-you-type).
+        Filter sama dengan get_kegiatan_page_db. Mengembalikan list item seperti
+        get_semua_kegiatan_obj_db ditambah 'skor' (besar = lebih relevan); list
+        kosong jika teks tidak berisi kata.
+        """
+        ekspresi = self._backend.ekspresi_pencarian(teks)
+        if ekspresi is None:
+            return []
+        limit = max(1, min(int(limit or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+        sumber, params = self._backend.sumber_pencarian_kegiatan(ekspresi)
+        conditions, filter_params = self._filter_kegiatan(jenis, tempat, id_penanggung_jawab, tanggal_mulai,
+                                                          tanggal_selesai)
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        # Kandidat dicari lewat indeks full-text; view hanya di-join untuk baris yang cocok
+        query = f"""
+            SELECT {self._KOLOM_DETAIL_KEGIATAN}, Skor_Cocok
+            FROM ({sumber}) F
+            JOIN View_Detail_Kegiatan V ON V.ID_Kegiatan = F.ID_Cocok
+            {where_clause}
+            ORDER BY Skor_Cocok DESC, Tanggal DESC, Nama_Kegiatan ASC, ID_Kegiatan ASC
+            LIMIT %s
+        """
+        rows = self.execute_query(query, tuple(params + filter_params + [limit]), fetch_all=True) or []
+        hasil = []
+        for row in rows:
+            item = self._baris_detail_ke_item(row)
+            item['skor'] = float(row[9] or 0)
+            hasil.append(item)
+        return hasil
+
+    def get_opsi_filter_kegiatan_db(self):
+        """Nilai Jenis_Kegiatan dan Tempat yang ada di database, untuk pilihan filter.
+
+        DISTINCT atas kolom terdepan index filter dibaca dari index saja.
+        """
+        hasil = {}
+        for kunci, kolom in (("jenis", "Jenis_Kegiatan"), ("tempat", "Tempat")):
+            rows = self.execute_query(f"SELECT DISTINCT {kolom} FROM Kegiatan WHERE {kolom} IS NOT NULL "
+                                      f"ORDER BY {kolom}", fetch_all=True)
+            hasil[kunci] = [row[0] for row in rows or [] if row[0]]
+        return hasil
+
+    # Kolom ekspor, urutannya sama dengan SELECT di iter_*_ekspor_db
+    KOLOM_EKSPOR_KEGIATAN = ("ID_Kegiatan", "Nama_Kegiatan", "Tanggal", "Jam_Mulai", "Jam_Selesai", "Tempat",
+                             "Jenis_Kegiatan", "ID_Penanggung_Jawab", "Nama_Penanggung_Jawab", "Role_Penanggung_Jawab")
+    KOLOM_EKSPOR_LOG = ("ID_Log", "Timestamp_Aksi", "Aksi", "ID_Kegiatan_Ref", "ID_Pengguna_Aktor", "Perubahan",
+                        "Detail_Lama", "Detail_Baru")
+
+    def iter_kegiatan_ekspor_db(self, tanggal_mulai=None, tanggal_selesai=None, batch_size=DEFAULT_FETCH_BATCH):
+        """Streaming baris View_Detail_Kegiatan (kolom KOLOM_EKSPOR_KEGIATAN) untuk ekspor."""
+        where_clause, params = self._filter_rentang_tanggal("Tanggal", tanggal_mulai, tanggal_selesai)
+        query = f"""
+            SELECT {', '.join(self.KOLOM_EKSPOR_KEGIATAN)}
+            FROM View_Detail_Kegiatan
+            {where_clause}
+            ORDER BY Tanggal DESC, Nama_Kegiatan ASC, ID_Kegiatan ASC
+        """
+        return self.iter_query(query, tuple(params) if params else None, batch_size=batch_size)
+
+    def iter_log_ekspor_db(self, tanggal_mulai=None, tanggal_selesai=None, batch_size=DEFAULT_FETCH_BATCH):
+        """Streaming baris Log_Perubahan_Kegiatan (kolom KOLOM_EKSPOR_LOG) berurutan ID_Log."""
+        where_clause, params = self._filter_rentang_tanggal("Timestamp_Aksi", tanggal_mulai, tanggal_selesai,
+                                                            kolom_waktu=True)
+        # Urutan primary key: tidak perlu mengurutkan seluruh riwayat sebelum baris pertama dikirim
+        query = f"""
+            SELECT {', '.join(self.KOLOM_EKSPOR_LOG)}
+            FROM Log_Perubahan_Kegiatan
+            {where_clause}
+            ORDER BY ID_Log ASC
+        """
+        return self.iter_query(query, tuple(params) if params else None, batch_size=batch_size)
+
+    @staticmethod
+    def _encode_page_cursor(tanggal, nama, id_kegiatan):
+        """Token cursor halaman: posisi (tanggal, nama, id) baris terakhir yang sudah dikirim."""
+        payload = json.dumps([tanggal.isoformat() if tanggal else None, nama, id_kegiatan])
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def _decode_page_cursor(token):
+        try:
+            tanggal, nama, id_kegiatan = json.loads(base64.urlsafe_b64decode(token.encode("ascii")).decode("utf-8"))
+            return (datetime.date.fromisoformat(tanggal) if tanggal else None), nama, id_kegiatan
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Cursor halaman tidak valid: {token}") from e
+
+    def get_kegiatan_page_db(self, page_size=DEFAULT_PAGE_SIZE, cursor=None, jenis=None, tempat=None,
+                             id_penanggung_jawab=None, tanggal_mulai=None, tanggal_selesai=None):
+        """Mengambil satu halaman kegiatan dengan keyset (seek) pagination.
+
+        Urutan sama dengan get_semua_kegiatan_obj_db: Tanggal DESC, Nama ASC, ID ASC.
+        Mengembalikan dict {'items': KegiatanBatch, 'next_cursor': token atau None};
+        items sama seperti hasil get_semua_kegiatan_obj_db. Halaman berikutnya dicari
+        lewat index (tanpa OFFSET), jadi biayanya tetap walau halaman sudah jauh.
+        Filter (jenis, tempat, id_penanggung_jawab, rentang tanggal) diterapkan di
+        SQL; cursor hanya berlaku untuk filter yang sama dengan halaman sebelumnya.
+        """
+        page_size = max(1, min(int(page_size or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+        conditions, params = self._filter_kegiatan(jenis, tempat, id_penanggung_jawab, tanggal_mulai, tanggal_selesai)
+        if cursor:
+            tanggal, nama, id_kegiatan = self._decode_page_cursor(cursor)
+            # Baris dengan Tanggal NULL berada di akhir urutan DESC
+            setelah_baris = "(Nama_Kegiatan > %s OR (Nama_Kegiatan = %s AND ID_Kegiatan > %s))"
+            if tanggal is None:
+                conditions.append(f"Tanggal IS NULL AND {setelah_baris}")
+                params.extend([nama, nama, id_kegiatan])
+            else:
+                conditions.append(f"(Tanggal < %s OR Tanggal IS NULL OR (Tanggal = %s AND {setelah_baris}))")
+                params.extend([tanggal, tanggal, nama, nama, id_kegiatan])
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"""
+            SELECT {self._KOLOM_DETAIL_KEGIATAN}
+            FROM View_Detail_Kegiatan
+            {where_clause}
+            ORDER BY Tanggal DESC, Nama_Kegiatan ASC, ID_Kegiatan ASC
+            LIMIT %s
+        """
+        params.append(page_size + 1) # Satu baris ekstra untuk mengetahui apakah masih ada halaman berikutnya
+        rows = self.execute_query(query, tuple(params), fetch_all=True) or []
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        items = KegiatanBatch.dari_baris(rows)
+        next_cursor = None
+        if has_more and items:
+            nama, tanggal = items.nilai(-1)[:2] # Dari kolom, tanpa membuat objek baris terakhir
+            next_cursor = self._encode_page_cursor(tanggal, nama, items.id_kegiatan(-1))
+        return {'items': items, 'next_cursor': next_cursor}
+
+    def get_semua_pengguna_obj_db(self):
+        query = "SELECT ID_Pengguna, Nama, Role_ID, NIM_NIP, Username FROM Pengguna ORDER BY Nama"
+        rows = self.execute_query(query, fetch_all=True)
+        if rows:
+            # Pastikan kelas Pengguna sudah didefinisikan
+            return [Pengguna(id_pengguna=row[0], nama=row[1], role_id=row[2], nim_nip=row[3], username=row[4]) for row in rows]
+        return []
+
+    def verify_user_credentials(self, username, password):
+        """Pengguna jika username dan password cocok, selain itu None.
+
+        Hash dihitung di luar koneksi pool (koneksi sudah kembali saat scrypt
+        berjalan). Baris yang masih teks polos atau dibuat dengan biaya lama
+        di-hash ulang dengan parameter sekarang setelah login berhasil.
+        Panggil dari thread worker: satu verifikasi sengaja memakan waktu.
+        """
+        query = "SELECT ID_Pengguna, Nama, Role_ID, NIM_NIP, Username, Password FROM Pengguna WHERE Username = %s"
+        user_data = self.execute_query(query, (username,), fetch_one=True)
+        hasher = self._password_hasher
+        if not user_data:
+            hasher.hash_dummy(password) # Waktu respons sama dengan username yang terdaftar
+            return None
+        tersimpan = user_data[5]
+        if not hasher.verifikasi(password, tersimpan):
+            return None
+        if hasher.perlu_rehash(tersimpan):
+            self._rehash_password(user_data[0], tersimpan, password)
+        return Pengguna(user_data[0], user_data[1], user_data[2], user_data[3], user_data[4])
+
+    def _rehash_password(self, id_pengguna, tersimpan, password):
+        """Mengganti nilai Password lama dengan hash baru; kegagalan tidak menggagalkan login."""
+        # "AND Password = nilai lama": jika password diganti di sesi lain sementara itu, baris tidak ditimpa
+        query = "UPDATE Pengguna SET Password = %s WHERE ID_Pengguna = %s AND Password = %s"
+        try:
+            self.execute_query(query, (self._password_hasher.hash(password), id_pengguna, tersimpan))
+        except DatabaseError as e:
+            print(f"Rehash password pengguna {id_pengguna} gagal, dicoba lagi pada login berikutnya: {e}")
+
+
+    def get_roles_db(self):
+        query = "SELECT Role_ID, Nama_Role FROM Role ORDER BY Nama_Role"
+        return self.execute_query(query, fetch_all=True)
+
+    def get_pengguna_setelah_id_db(self, id_pengguna):
+        """Pengguna dengan ID_Pengguna > id_pengguna (pendaftar baru), urut ID; untuk penyegaran inkremental."""
+        query = ("SELECT ID_Pengguna, Nama, Role_ID, NIM_NIP, Username FROM Pengguna "
+                 "WHERE ID_Pengguna > %s ORDER BY ID_Pengguna")
+        rows = self.execute_query(query, (id_pengguna,), fetch_all=True)
+        return [Pengguna(id_pengguna=row[0], nama=row[1], role_id=row[2], nim_nip=row[3], username=row[4])
+                for row in rows or []]
+
+    def get_pengguna_high_water_db(self):
+        """ID_Pengguna terbesar (0 jika kosong); penanda pendaftar baru untuk cache, bukan untuk membuat ID."""
+        result = self.execute_query("SELECT MAX(ID_Pengguna) FROM Pengguna", fetch_one=True)
+        return result[0] if result and result[0] is not None else 0
+
+    def daftarkan_pengguna_db(self, nama, role_id, nim_nip, username, password):
+        """Mendaftarkan pengguna baru dengan satu INSERT dan mengembalikan objek Pengguna-nya.
+
+        ID diberikan database (auto-increment), keunikan Username dan NIM_NIP
+        dijaga index UNIQUE (migrasi 7 untuk database lama), sehingga dua pendaftaran bersamaan tidak bisa
+        mendapat ID yang sama atau lolos cek duplikasi. Konflik dilempar sebagai
+        PenggunaSudahAdaError dengan kolom yang bentrok. Hash dihitung sebelum
+        koneksi dipinjam dari pool.
+        """
+        query = """
+            INSERT INTO Pengguna (Nama, Role_ID, NIM_NIP, Username, Password)
+            VALUES (%s, %s, %s, %s, %s)
+        """
+        password_hash = self._password_hasher.hash(password)
+        try:
+            id_pengguna = self.execute_query(query, (nama, role_id, nim_nip, username, password_hash))
+        except DatabaseError as e:
+            kolom = self._kolom_duplikat_pengguna(e)
+            if kolom is None:
+                raise
+            raise PenggunaSudahAdaError(e.msg, kolom) from e
+        return Pengguna(id_pengguna, nama, role_id, nim_nip, username)
+
+    @staticmethod
+    def _kolom_duplikat_pengguna(err):
+        """'Username' / 'NIM_NIP' jika err adalah pelanggaran UNIQUE kolom tersebut, selain itu None.
+
+        MySQL: "Duplicate entry 'x' for key 'Pengguna.Username'"; SQLite:
+        "UNIQUE constraint failed: Pengguna.Username". Hanya bagian nama key yang
+        diperiksa agar nilai yang diinput pengguna tidak ikut tercocokkan.
+        """
+        if err.errno != ER_DUP_ENTRY:
+            return None
+        msg = err.msg or ""
+        for penanda in ("for key", "constraint failed:"):
+            if penanda in msg:
+                msg = msg.rsplit(penanda, 1)[1]
+                break
+        for kolom in ("Username", "NIM_NIP"):
+            if kolom.lower() in msg.lower():
+                return kolom
+        return None
+
+
+    def get_activity_log_db(self, limit=DEFAULT_LOG_LIMIT):
+        """Riwayat aktivitas terbaru dulu (maksimal limit baris) sebagai list dict.
+
+        ORDER BY ... LIMIT dilayani dari ujung index IDX_Log_Waktu, sehingga
+        biayanya tidak bergantung pada panjang riwayat.
+
+        'perubahan' sudah berupa dict {kolom: [lama, baru]} (INSERT: lama None,
+        DELETE: baru None). Baris lama sebelum log terstruktur hanya punya
+        'detail_lama'/'detail_baru' teks.
+        """
+        query = """
+            SELECT L.ID_Log, L.Timestamp_Aksi, L.Aksi, L.ID_Kegiatan_Ref, L.ID_Pengguna_Aktor, P.Nama,
+                   L.Perubahan, L.Detail_Lama, L.Detail_Baru
+            FROM Log_Perubahan_Kegiatan L
+            LEFT JOIN Pengguna P ON L.ID_Pengguna_Aktor = P.ID_Pengguna
+            ORDER BY L.Timestamp_Aksi DESC, L.ID_Log DESC
+            LIMIT %s
+        """
+        return [self._baris_log_ke_dict(row) for row in self.execute_query(query, (limit,), fetch_all=True) or []]
+
+    def get_log_high_water_db(self):
+        """ID_Log terbesar (0 jika log kosong); ID_Log naik monoton sehingga menjadi penanda versi data Kegiatan."""
+        row = self.execute_query("SELECT MAX(ID_Log) FROM Log_Perubahan_Kegiatan", fetch_one=True)
+        return (row[0] or 0) if row else 0
+
+    def get_perubahan_sejak_db(self, id_log_terakhir, limit=DEFAULT_FETCH_BATCH):
+        """Log dengan ID_Log > id_log_terakhir, urut naik, maksimal limit baris.
+
+        Mengembalikan list (ID_Log, ID_Kegiatan_Ref, Aksi). Dilayani oleh range scan
+        primary key, jadi murah walau dipanggil berkala.
+        """
+        query = """
+            SELECT ID_Log, ID_Kegiatan_Ref, Aksi
+            FROM Log_Perubahan_Kegiatan
+            WHERE ID_Log > %s
+            ORDER BY ID_Log ASC
+            LIMIT %s
+        """
+        return [tuple(row) for row in self.execute_query(query, (id_log_terakhir, limit), fetch_all=True) or []]
+
+    @staticmethod
+    def _encode_log_cursor(waktu, id_log):
+        """Token cursor halaman log: posisi (Timestamp_Aksi, ID_Log) baris terakhir yang sudah dikirim."""
+        payload = json.dumps([waktu.isoformat(" ") if isinstance(waktu, datetime.datetime) else str(waktu), id_log])
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def _decode_log_cursor(token):
+        try:
+            waktu, id_log = json.loads(base64.urlsafe_b64decode(token.encode("ascii")).decode("utf-8"))
+            return datetime.datetime.fromisoformat(waktu), int(id_log)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Cursor halaman log tidak valid: {token}") from e
+
+    def get_log_page_db(self, page_size=DEFAULT_PAGE_SIZE, cursor=None, aksi=None, id_kegiatan=None,
+                        tanggal_mulai=None, tanggal_selesai=None):
+        """Satu halaman riwayat aktivitas (terbaru dulu) dengan filter di sisi server.
+
+        aksi: 'INSERT'/'UPDATE'/'DELETE'; id_kegiatan: ID_Kegiatan_Ref persis;
+        tanggal_mulai/tanggal_selesai: rentang tanggal inklusif. Tiap filter punya
+        index dengan urutan halaman di belakangnya (IDX_Log_Aksi_Waktu,
+        IDX_Log_Kegiatan_Waktu, IDX_Log_Waktu), dan halaman berikutnya dicari
+        lewat keyset (Timestamp_Aksi, ID_Log) tanpa OFFSET.
+        Mengembalikan {'items': [dict seperti get_activity_log_db], 'next_cursor': token atau None}.
+        """
+        page_size = max(1, min(int(page_size or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+        where_clause, params = self._filter_rentang_tanggal("L.Timestamp_Aksi", tanggal_mulai, tanggal_selesai,
+                                                            kolom_waktu=True)
+        conditions = [where_clause[len("WHERE "):]] if where_clause else []
+        if aksi:
+            aksi = aksi.upper()
+            if aksi not in AKSI_LOG:
+                raise ValueError(f"Aksi log tidak dikenal: '{aksi}' (pilih {', '.join(AKSI_LOG)})")
+            conditions.append("L.Aksi = %s")
+            params.append(aksi)
+        if id_kegiatan:
+            conditions.append("L.ID_Kegiatan_Ref = %s")
+            params.append(id_kegiatan)
+        if cursor:
+            # Timestamp_Aksi selalu terisi oleh DEFAULT kolom, jadi tidak perlu cabang IS NULL
+            waktu, id_log = self._decode_log_cursor(cursor)
+            conditions.append("(L.Timestamp_Aksi < %s OR (L.Timestamp_Aksi = %s AND L.ID_Log < %s))")
+            params.extend([waktu, waktu, id_log])
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"""
+            SELECT L.ID_Log, L.Timestamp_Aksi, L.Aksi, L.ID_Kegiatan_Ref, L.ID_Pengguna_Aktor, P.Nama,
+                   L.Perubahan, L.Detail_Lama, L.Detail_Baru
+            FROM Log_Perubahan_Kegiatan L
+            LEFT JOIN Pengguna P ON L.ID_Pengguna_Aktor = P.ID_Pengguna
+            {where_clause}
+            ORDER BY L.Timestamp_Aksi DESC, L.ID_Log DESC
+            LIMIT %s
+        """
+        params.append(page_size + 1) # Satu baris ekstra untuk mengetahui apakah masih ada halaman berikutnya
+        rows = self.execute_query(query, tuple(params), fetch_all=True) or []
+        has_more = len(rows) > page_size
+        items = [self._baris_log_ke_dict(row) for row in rows[:page_size]]
+        next_cursor = None
+        if has_more and items:
+            next_cursor = self._encode_log_cursor(items[-1]['waktu'], items[-1]['id_log'])
+        return {'items': items, 'next_cursor': next_cursor}
+
+    @staticmethod
+    def _baris_log_ke_dict(row):
+        id_log, waktu, aksi, id_kegiatan, id_aktor, nama_aktor, perubahan, detail_lama, detail_baru = row
+        perubahan = json.loads(perubahan) if perubahan else None
+        if perubahan and aksi == 'INSERT':
+            perubahan = {kolom: [None, nilai] for kolom, nilai in perubahan.items()}
+        elif perubahan and aksi == 'DELETE':
+            perubahan = {kolom: [nilai, None] for kolom, nilai in perubahan.items()}
+        return {'id_log': id_log, 'waktu': waktu, 'aksi': aksi, 'id_kegiatan': id_kegiatan,
+                'id_aktor': id_aktor, 'nama_aktor': nama_aktor, 'perubahan': perubahan,
+                'detail_lama': detail_lama, 'detail_baru': detail_baru}
+
+    # --- Retensi dan arsip log ---
+    # Kolom yang disimpan per baris di segmen arsip (JSON Lines terkompresi zlib)
+    KOLOM_ARSIP_LOG = ("ID_Log", "Timestamp_Aksi", "Aksi", "ID_Kegiatan_Ref", "ID_Pengguna_Aktor", "Perubahan",
+                       "Detail_Lama", "Detail_Baru")
+
+    def rawat_database_db(self):
+        """Pemeliharaan database: SQLite di-VACUUM lalu PRAGMA optimize.
+
+        Dipanggil setelah retensi log memindahkan baris, saat ada ruang kosong
+        untuk dikembalikan. Indeks full-text tidak perlu dibangun ulang karena
+        terikat ke No_Kegiatan, yang tidak berubah oleh VACUUM. MySQL tidak punya
+        langkah di sini.
+        """
+        for statement in self._backend.pemeliharaan_statements():
+            self.execute_query(statement, is_ddl=True)
+
+    def arsipkan_log_db(self, retensi_hari=DEFAULT_RETENSI_LOG_HARI, batch_size=DEFAULT_FETCH_BATCH):
+        """Memindahkan log yang lebih tua dari retensi_hari ke Arsip_Log_Kegiatan.
+
+        Log dikelompokkan per bulan; setiap bulan menjadi satu segmen JSON Lines
+        terkompresi zlib yang disisipkan dan dihapus dari tabel log dalam satu
+        transaksi. Mengembalikan jumlah baris log yang diarsipkan.
+        """
+        batas = datetime.datetime.combine(datetime.date.today() - datetime.timedelta(days=retensi_hari), datetime.time())
+        row = self.execute_query("SELECT MIN(Timestamp_Aksi) FROM Log_Perubahan_Kegiatan WHERE Timestamp_Aksi < %s",
+                                 (batas,), fetch_one=True)
+        awal = row[0] if row else None
+        if isinstance(awal, str): # Jaga-jaga jika driver mengembalikan teks
+            awal = datetime.datetime.fromisoformat(awal)
+        total = 0
+        while awal is not None and awal < batas:
+            bulan_awal = datetime.datetime(awal.year, awal.month, 1)
+            bulan_berikut = datetime.datetime(awal.year + (awal.month == 12), awal.month % 12 + 1, 1)
+            total += self._arsipkan_segmen_log(bulan_awal, min(bulan_berikut, batas), batch_size)
+            awal = bulan_berikut
+        if total:
+            print(f"Info: {total} baris log lebih tua dari {retensi_hari} hari dipindahkan ke arsip.")
+        return total
+
+    def _arsipkan_segmen_log(self, waktu_awal, waktu_akhir, batch_size):
+        """Satu segmen arsip untuk rentang [waktu_awal, waktu_akhir) dalam satu transaksi."""
+        conn = None
+        cursor = None
+        broken = False
+        backend = self._backend
+        try:
+            conn = self._pool.acquire()
+            cursor = conn.cursor()
+            backend.execute(cursor, f"""
+                SELECT {', '.join(self.KOLOM_ARSIP_LOG)} FROM Log_Perubahan_Kegiatan
+                WHERE Timestamp_Aksi >= %s AND Timestamp_Aksi < %s
+                ORDER BY ID_Log
+            """, (waktu_awal, waktu_akhir))
+            # Dikompres sambil dibaca per batch, jadi satu bulan log tidak perlu ditampung sebagai teks utuh
+            kompresor = zlib.compressobj(9)
+            potongan = []
+            jumlah, id_awal, id_akhir, ts_awal, ts_akhir = 0, None, None, None, None
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    baris = dict(zip(self.KOLOM_ARSIP_LOG, row))
+                    waktu = baris["Timestamp_Aksi"]
+                    if isinstance(waktu, datetime.datetime):
+                        baris["Timestamp_Aksi"] = waktu.isoformat(sep=" ")
+                    potongan.append(kompresor.compress((json.dumps(baris, ensure_ascii=False) + "\n").encode("utf-8")))
+                    id_awal = baris["ID_Log"] if id_awal is None else min(id_awal, baris["ID_Log"])
+                    id_akhir = baris["ID_Log"] if id_akhir is None else max(id_akhir, baris["ID_Log"])
+                    ts_awal = waktu if ts_awal is None else min(ts_awal, waktu)
+                    ts_akhir = waktu if ts_akhir is None else max(ts_akhir, waktu)
+                    jumlah += 1
+            if not jumlah:
+                return 0
+            potongan.append(kompresor.flush())
+            backend.execute(cursor, """
+                INSERT INTO Arsip_Log_Kegiatan (Periode, Waktu_Awal, Waktu_Akhir, ID_Log_Awal, ID_Log_Akhir, Jumlah_Baris, Data)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """, (waktu_awal.strftime("%Y-%m"), ts_awal, ts_akhir, id_awal, id_akhir, jumlah, b"".join(potongan)))
+            # Batas ID memastikan hanya baris yang sudah masuk segmen yang dihapus
+            backend.execute(cursor, """
+                DELETE FROM Log_Perubahan_Kegiatan
+                WHERE Timestamp_Aksi >= %s AND Timestamp_Aksi < %s AND ID_Log <= %s
+            """, (waktu_awal, waktu_akhir, id_akhir))
+            conn.commit()
+            return jumlah
+        except Exception as err:
+            if conn and not self._rollback_quietly(conn):
+                broken = True
+            if isinstance(err, backend.driver_errors):
+                raise backend.translate_error(err) from err
+            raise
+        finally:
+            if cursor: cursor.close()
+            if conn: self._pool.release(conn, discard=broken)
+
+    def get_daftar_arsip_log_db(self):
+        """Daftar segmen arsip (tanpa isi) sebagai list dict, terbaru dulu."""
+        query = """
+            SELECT ID_Arsip, Periode, Waktu_Awal, Waktu_Akhir, ID_Log_Awal, ID_Log_Akhir, Jumlah_Baris, LENGTH(Data)
+            FROM Arsip_Log_Kegiatan
+            ORDER BY Waktu_Akhir DESC, ID_Arsip DESC
+        """
+        return [{'id_arsip': r[0], 'periode': r[1], 'waktu_awal': r[2], 'waktu_akhir': r[3], 'id_log_awal': r[4],
+                 'id_log_akhir': r[5], 'jumlah_baris': r[6], 'ukuran_byte': r[7]}
+                for r in self.execute_query(query, fetch_all=True) or []]
+
+    def iter_arsip_log_db(self, tanggal_mulai=None, tanggal_selesai=None, aksi=None, id_kegiatan=None):
+        """Generator log dari arsip (format sama dengan get_activity_log_db), terbaru dulu.
+
+        Hanya segmen yang rentang waktunya beririsan dengan filter yang dibaca
+        dan didekompresi, satu segmen pada satu waktu. Filter aksi dan
+        id_kegiatan diterapkan per baris setelah dekompresi.
+        """
+        aksi = aksi.upper() if aksi else None
+        where_clause, params = "", []
+        kondisi = []
+        if tanggal_mulai is not None:
+            kondisi.append("Waktu_Akhir >= %s")
+            params.append(datetime.datetime.combine(parse_tanggal(tanggal_mulai), datetime.time()))
+        if tanggal_selesai is not None:
+            kondisi.append("Waktu_Awal < %s")
+            params.append(datetime.datetime.combine(parse_tanggal(tanggal_selesai) + datetime.timedelta(days=1), datetime.time()))
+        if kondisi:
+            where_clause = f"WHERE {' AND '.join(kondisi)}"
+        segmen = self.execute_query(f"SELECT ID_Arsip FROM Arsip_Log_Kegiatan {where_clause} ORDER BY Waktu_Akhir DESC, ID_Arsip DESC",
+                                    tuple(params) if params else None, fetch_all=True) or []
+        nama_pengguna = {p.id_entitas: p.nama for p in self.get_semua_pengguna_obj_db()}
+        mulai = params[0] if tanggal_mulai is not None else None
+        selesai = params[-1] if tanggal_selesai is not None else None
+        for (id_arsip,) in segmen:
+            for log in self.baca_arsip_log_db(id_arsip, nama_pengguna):
+                waktu = log['waktu']
+                if waktu is not None and ((mulai and waktu < mulai) or (selesai and waktu >= selesai)):
+                    continue
+                if (aksi and log['aksi'] != aksi) or (id_kegiatan and log['id_kegiatan'] != id_kegiatan):
+                    continue
+                yield log
+
+    def baca_arsip_log_db(self, id_arsip, nama_pengguna=None):
+        """Mendekompresi satu segmen arsip menjadi list dict log, terbaru dulu."""
+        row = self.execute_query("SELECT Data FROM Arsip_Log_Kegiatan WHERE ID_Arsip = %s", (id_arsip,), fetch_one=True)
+        if not row:
+            return []
+        if nama_pengguna is None:
+            nama_pengguna = {p.id_entitas: p.nama for p in self.get_semua_pengguna_obj_db()}
+        logs = []
+        for baris in zlib.decompress(bytes(row[0])).decode("utf-8").splitlines():
+            d = json.loads(baris)
+            waktu = datetime.datetime.fromisoformat(d["Timestamp_Aksi"]) if d["Timestamp_Aksi"] else None
+            logs.append(self._baris_log_ke_dict((d["ID_Log"], waktu, d["Aksi"], d["ID_Kegiatan_Ref"],
+                                                 d["ID_Pengguna_Aktor"], nama_pengguna.get(d["ID_Pengguna_Aktor"]),
+                                                 d["Perubahan"], d["Detail_Lama"], d["Detail_Baru"])))
+        logs.reverse() # Segmen disimpan urut ID_Log naik
+        return logs
+
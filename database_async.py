@@ -0,0 +1,150 @@
+"""Varian asyncio dari DatabaseManager.
+
+AsyncDatabaseManager memiliki metode yang sama dengan DatabaseManager
+(get_semua_kegiatan_obj_db, verify_user_credentials, get_activity_log_db, ...)
+tetapi sebagai coroutine. Setiap panggilan dijalankan di thread pool yang
+ukurannya sama dengan pool koneksi, sehingga event loop tidak pernah terblokir
+dan query paralel tidak saling menunggu koneksi. Driver yang dipakai tetap
+driver sinkron (sqlite3 / mysql-connector), jadi perilaku dan hasilnya identik
+dengan DatabaseManager.
+
+Thread pool dipilih dengan sengaja, bukan driver async native. sqlite3 tidak
+punya driver async di pustaka standar (aiosqlite pun menjalankan satu thread
+per koneksi). Untuk MySQL, driver async berarti menulis ulang dialek backend,
+pemanggilan stored procedure, pool koneksi, dan penerjemahan error yang sudah
+dipakai bersama GUI, dan dua jalur kode itu bisa berbeda perilaku. sqlite3 dan
+mysql-connector melepas GIL selama menunggu jaringan/disk, dan batas
+konkurensi sebenarnya adalah ukuran pool koneksi. Karena itu, thread sebanyak
+ukuran pool memberi paralelisme yang sama tanpa duplikasi tersebut.
+Paritasnya diuji di tests/test_database_async.py.
+
+    adb = AsyncDatabaseManager(backend=SQLiteBackend("manajemen_kegiatan.db"))
+    roles, pengguna = await adb.kumpulkan(adb.get_roles_db(), adb.get_semua_pengguna_obj_db())
+    kegiatan = await adb.get_kegiatan_page_db(page_size=50, batas_waktu=2.0)
+"""
+import asyncio
+import concurrent.futures
+import functools
+import itertools
+
+from database import DatabaseError, DatabaseManager, DEFAULT_FETCH_BATCH
+
+DEFAULT_BATAS_WAKTU = 30.0 # Detik per panggilan; None berarti tanpa batas
+_BAWAAN = object() # Penanda "pakai batas waktu default manager"
+
+
+class QueryTimeoutError(DatabaseError):
+    """Panggilan database melewati batas waktu.
+
+    Query di thread worker tidak bisa dihentikan paksa; ia tetap selesai di
+    latar belakang dan koneksinya kembali ke pool seperti biasa.
+    """
+    pass
+
+
+class AsyncDatabaseManager:
+    """Pembungkus coroutine untuk DatabaseManager.
+
+    Semua metode publik DatabaseManager tersedia dengan nama yang sama dan
+    menerima argumen tambahan batas_waktu (detik). Metode generator iter_*
+    dibaca lewat stream() sebagai async generator.
+    """
+    def __init__(self, db_manager: DatabaseManager = None, max_workers=None, batas_waktu=DEFAULT_BATAS_WAKTU,
+                 **kwargs):
+        # kwargs diteruskan ke DatabaseManager jika db_manager tidak diberikan (backend=, pool_size=, ...)
+        self._db = db_manager or DatabaseManager(**kwargs)
+        self.batas_waktu = batas_waktu
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers or self._db.get_pool_stats()["max_size"], thread_name_prefix="db-async")
+
+    @property
+    def sync(self):
+        """DatabaseManager sinkron di baliknya (mis. untuk dipakai bersama GUI)."""
+        return self._db
+
+    @property
+    def backend(self):
+        return self._db.backend
+
+    async def _jalankan(self, func, args=(), kwargs=None, batas_waktu=_BAWAAN):
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, functools.partial(func, *args, **(kwargs or {})))
+        if batas_waktu is _BAWAAN:
+            batas_waktu = self.batas_waktu
+        if batas_waktu is None:
+            return await future
+        try:
+            return await asyncio.wait_for(future, batas_waktu)
+        except asyncio.TimeoutError:
+            nama = getattr(func, "__name__", "query")
+            raise QueryTimeoutError(f"{nama} melebihi batas waktu {batas_waktu} detik") from None
+
+    def __getattr__(self, nama):
+        # Hanya dipanggil untuk atribut yang tidak ada di kelas ini: teruskan ke DatabaseManager
+        if nama.startswith("_"):
+            raise AttributeError(nama)
+        attr = getattr(self._db, nama)
+        if not callable(attr):
+            return attr # Konstanta seperti KOLOM_EKSPOR_LOG
+        if nama.startswith("iter_"):
+            raise AttributeError(f"'{nama}' adalah generator; gunakan stream('{nama}', ...)")
+
+        @functools.wraps(attr)
+        async def metode(*args, batas_waktu=_BAWAAN, **kwargs):
+            return await self._jalankan(attr, args, kwargs, batas_waktu)
+        setattr(self, nama, metode) # Disimpan agar __getattr__ tidak dipanggil lagi untuk nama ini
+        return metode
+
+    async def stream(self, nama_metode, *args, ukuran_potongan=DEFAULT_FETCH_BATCH, batas_waktu=_BAWAAN, **kwargs):
+        """Async generator atas metode iter_* DatabaseManager.
+
+        Baris diambil per potongan di thread worker; koneksi dikembalikan ke pool
+        saat iterasi selesai atau dihentikan di tengah. batas_waktu berlaku per potongan;
+        jika terlewati, potongan yang sedang dibaca ditunggu selesai, generator ditutup,
+        lalu QueryTimeoutError dilempar.
+        """
+        if not nama_metode.startswith("iter_"):
+            raise ValueError(f"stream() hanya untuk metode iter_*, bukan '{nama_metode}'")
+        if batas_waktu is _BAWAAN:
+            batas_waktu = self.batas_waktu
+        loop = asyncio.get_running_loop()
+        rows = getattr(self._db, nama_metode)(*args, **kwargs) # Generator belum menjalankan query apa pun
+        ambil_potongan = lambda: list(itertools.islice(rows, ukuran_potongan))
+        tertunda = None # Potongan yang masih dibaca thread worker
+        try:
+            while True:
+                tertunda = loop.run_in_executor(self._executor, ambil_potongan)
+                try:
+                    # shield: saat batas waktu habis future tetap hidup dan bisa ditunggu di finally
+                    potongan = await asyncio.wait_for(asyncio.shield(tertunda), batas_waktu)
+                except asyncio.TimeoutError:
+                    raise QueryTimeoutError(f"{nama_metode} melebihi batas waktu {batas_waktu} detik") from None
+                tertunda = None
+                if not potongan:
+                    break
+                for row in potongan:
+                    yield row
+        finally:
+            if tertunda is not None:
+                # rows.close() selagi generator masih dijalankan worker gagal ("generator already executing")
+                # dan koneksinya baru kembali saat garbage collection; tunggu potongan itu selesai dulu
+                await asyncio.gather(tertunda, return_exceptions=True)
+            await self._jalankan(rows.close, batas_waktu=None)
+
+    async def kumpulkan(self, *coros, batas_waktu=None, return_exceptions=False):
+        """Fan-out: menjalankan beberapa panggilan bersamaan dan mengembalikan hasilnya berurutan.
+
+        batas_waktu di sini adalah tenggat total untuk seluruh kelompok.
+        """
+        gabungan = asyncio.gather(*coros, return_exceptions=return_exceptions)
+        if batas_waktu is None:
+            return await gabungan
+        try:
+            return await asyncio.wait_for(gabungan, batas_waktu)
+        except asyncio.TimeoutError:
+            raise QueryTimeoutError(f"Kelompok {len(coros)} query melebihi batas waktu {batas_waktu} detik") from None
+
+    async def close(self):
+        """Menunggu query yang berjalan selesai lalu menutup pool koneksi."""
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown, True)
+        self._db.close()
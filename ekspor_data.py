@@ -0,0 +1,119 @@
+"""Ekspor data kegiatan dan riwayat aktivitas ke CSV atau JSON Lines.
+
+Baris di-stream dari database (fetchmany per batch) langsung ke file, jadi
+ekspor riwayat bertahun-tahun tidak pernah menampung seluruh hasil di memori.
+Bisa dipakai dari aplikasi (KegiatanApp) maupun dari command line:
+
+    python ekspor_data.py log riwayat.jsonl --dari 01-01-2025 --sampai 31-12-2025 --sqlite manajemen_kegiatan.db
+"""
+import argparse
+import csv
+import datetime
+import json
+import os
+import sys
+
+from entitas import parse_jam
+from database import DatabaseError, DatabaseManager, MySQLBackend, SQLiteBackend, DEFAULT_FETCH_BATCH
+
+FORMAT_EKSPOR = ("csv", "jsonl")
+PROGRESS_SETIAP = 1000 # Laporan progress setiap N baris ditulis
+
+
+def _sumber_ekspor(db_manager, sumber):
+    """Mengembalikan (kolom, fungsi iterator) untuk sumber 'kegiatan' atau 'log'."""
+    if sumber == "kegiatan":
+        return db_manager.KOLOM_EKSPOR_KEGIATAN, db_manager.iter_kegiatan_ekspor_db
+    if sumber == "log":
+        return db_manager.KOLOM_EKSPOR_LOG, db_manager.iter_log_ekspor_db
+    raise ValueError(f"Sumber ekspor tidak dikenal: '{sumber}' (pilih 'kegiatan' atau 'log')")
+
+
+def tebak_format(path):
+    """Format dari ekstensi file: .jsonl/.json -> jsonl, selain itu csv."""
+    return "jsonl" if os.path.splitext(path)[1].lower() in (".jsonl", ".json") else "csv"
+
+
+def _nilai_json(kolom, value):
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, datetime.timedelta): # Kolom TIME dari mysql-connector
+        return parse_jam(value).isoformat()
+    if kolom == "Perubahan" and value:
+        return json.loads(value) # Diff log audit ditulis sebagai objek, bukan string JSON di dalam JSON
+    return value
+
+
+def ekspor(db_manager, sumber, path, format_file=None, tanggal_mulai=None, tanggal_selesai=None,
+           batch_size=DEFAULT_FETCH_BATCH, on_progress=None, should_stop=None):
+    """Menulis hasil ekspor ke path dan mengembalikan jumlah baris yang ditulis.
+
+    on_progress(jumlah_baris) dipanggil setiap PROGRESS_SETIAP baris;
+    should_stop() yang mengembalikan True menghentikan ekspor lebih awal.
+    """
+    format_file = format_file or tebak_format(path)
+    if format_file not in FORMAT_EKSPOR:
+        raise ValueError(f"Format ekspor tidak dikenal: '{format_file}'")
+    kolom, iter_func = _sumber_ekspor(db_manager, sumber)
+    rows = iter_func(tanggal_mulai=tanggal_mulai, tanggal_selesai=tanggal_selesai, batch_size=batch_size)
+
+    jumlah = 0
+    try:
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            if format_file == "csv":
+                writer = csv.writer(f)
+                writer.writerow(kolom)
+                tulis = writer.writerow
+            else:
+                tulis = lambda row: f.write(json.dumps({k: _nilai_json(k, v) for k, v in zip(kolom, row)},
+                                                       ensure_ascii=False) + "\n")
+            for row in rows:
+                tulis(row)
+                jumlah += 1
+                if jumlah % PROGRESS_SETIAP == 0:
+                    if on_progress:
+                        on_progress(jumlah)
+                    if should_stop and should_stop():
+                        break
+    finally:
+        rows.close() # Mengembalikan koneksi ke pool walau ekspor berhenti di tengah
+    if on_progress:
+        on_progress(jumlah)
+    return jumlah
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ekspor kegiatan atau riwayat aktivitas ke CSV/JSON Lines.")
+    parser.add_argument("sumber", choices=("kegiatan", "log"))
+    parser.add_argument("output", help="File tujuan (.csv atau .jsonl)")
+    parser.add_argument("--format", choices=FORMAT_EKSPOR, help="Default: ditebak dari ekstensi file")
+    parser.add_argument("--dari", help="Tanggal awal (dd-mm-yyyy atau yyyy-mm-dd), inklusif")
+    parser.add_argument("--sampai", help="Tanggal akhir (dd-mm-yyyy atau yyyy-mm-dd), inklusif")
+    parser.add_argument("--batch", type=int, default=DEFAULT_FETCH_BATCH, help="Baris per fetchmany")
+    parser.add_argument("--sqlite", metavar="PATH", help="Gunakan database SQLite ini alih-alih MySQL")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--database", default="ManajemenKegiatanDTEI_VTS_OOP")
+    args = parser.parse_args(argv)
+
+    try:
+        backend = SQLiteBackend(args.sqlite) if args.sqlite else MySQLBackend(args.host, args.user, args.password, args.database)
+    except DatabaseError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    db_manager = DatabaseManager(backend=backend, pool_size=1)
+    try:
+        jumlah = ekspor(db_manager, args.sumber, args.output, format_file=args.format,
+                        tanggal_mulai=args.dari, tanggal_selesai=args.sampai, batch_size=args.batch)
+        print(f"{jumlah} baris {args.sumber} diekspor ke {args.output}")
+        return 0
+    except (DatabaseError, ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db_manager.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
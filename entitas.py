@@ -0,0 +1,382 @@
+"""Kelas-kelas entitas data aplikasi manajemen kegiatan (Pengguna, Kegiatan, KegiatanBatch)."""
+import datetime
+import itertools
+import sys
+
+FORMAT_TANGGAL = "%d-%m-%Y" # Format tampilan tanggal di UI (dd-mm-yyyy)
+FORMAT_JAM = "%H:%M" # Format tampilan jam di UI (HH:MM)
+
+
+def parse_tanggal(value):
+    """Mengubah nilai tanggal (date, 'dd-mm-yyyy' atau 'yyyy-mm-dd') menjadi datetime.date."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    value = str(value).strip()
+    for fmt in (FORMAT_TANGGAL, "%Y-%m-%d"):
+        try:
+            return datetime.datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Format tanggal tidak dikenali: '{value}'")
+
+
+def format_tanggal(value):
+    """Mengubah datetime.date menjadi string dd-mm-yyyy untuk ditampilkan."""
+    if isinstance(value, datetime.date):
+        return value.strftime(FORMAT_TANGGAL)
+    return value if value is not None else ""
+
+
+def parse_jam(value):
+    """Mengubah nilai jam (time, timedelta kolom TIME MySQL, 'HH:MM' atau 'HH:MM:SS') menjadi datetime.time."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.time()
+    if isinstance(value, datetime.time):
+        return value
+    if isinstance(value, datetime.timedelta): # mysql-connector mengembalikan TIME sebagai timedelta
+        detik = int(value.total_seconds())
+        if not 0 <= detik < 24 * 3600:
+            raise ValueError(f"Jam di luar rentang satu hari: '{value}'")
+        return datetime.time(detik // 3600, detik % 3600 // 60, detik % 60)
+    value = str(value).strip()
+    for fmt in (FORMAT_JAM, "%H.%M", "%H:%M:%S"):
+        try:
+            return datetime.datetime.strptime(value, fmt).time()
+        except ValueError:
+            continue
+    try:
+        return datetime.time.fromisoformat(value) # Mis. '08:00:00.000000' dari JSON_OBJECT MySQL
+    except ValueError:
+        pass
+    raise ValueError(f"Format jam tidak dikenali: '{value}' (gunakan HH:MM)")
+
+
+def format_jam(value):
+    """Mengubah datetime.time menjadi string HH:MM untuk ditampilkan."""
+    if isinstance(value, datetime.time):
+        return value.strftime(FORMAT_JAM)
+    return value if value is not None else ""
+
+
+def format_rentang_jam(jam_mulai, jam_selesai):
+    """Rentang jam HH:MM-HH:MM untuk ditampilkan (kosong jika keduanya kosong)."""
+    if jam_mulai is None and jam_selesai is None:
+        return ""
+    return f"{format_jam(jam_mulai)}-{format_jam(jam_selesai)}"
+
+
+# --- Kelas Entitas ---
+# __slots__: atribut disimpan di slot tetap, bukan __dict__ per objek, sehingga
+# ribuan objek hasil query jauh lebih kecil dan lebih cepat dibuat
+class Entitas:
+    """Kelas dasar untuk semua entitas data (Pengguna, Kegiatan)."""
+    __slots__ = ("_id_entitas",)
+
+    def __init__(self, id_entitas):
+        self._id_entitas = id_entitas # Enkapsulasi: _id_entitas bersifat protected
+
+    @property
+    def id_entitas(self):
+        return self._id_entitas
+
+    # Metode ini akan di-override oleh subclass (Polimorfisme)
+    def get_details_string(self):
+        """Mengembalikan representasi string dari detail entitas."""
+        return f"ID: {self._id_entitas}"
+
+class Pengguna(Entitas):
+    """Merepresentasikan entitas Pengguna."""
+    __slots__ = ("_nama", "_role_id", "_nim_nip", "_username", "_password")
+
+    def __init__(self, id_pengguna, nama, role_id=None, nim_nip=None, username=None, password=None):
+        super().__init__(id_pengguna) # Pewarisan: memanggil constructor kelas induk
+        self._nama = nama
+        self._role_id = role_id
+        self._nim_nip = nim_nip
+        self._username = username
+        self._password = password # Password mentah dari form; DatabaseManager menyimpannya sebagai hash (kata_sandi.py)
+
+    # Enkapsulasi melalui properties
+    @property
+    def nama(self):
+        return self._nama
+
+    @property
+    def role_id(self):
+        return self._role_id
+
+    @property
+    def nim_nip(self):
+        return self._nim_nip
+
+    @property
+    def username(self):
+        return self._username
+    
+    # Contoh metode untuk enkapsulasi data
+    def get_display_name(self):
+        return f"{self._nama} (ID: {self.id_entitas})"
+
+    # Polimorfisme: Override metode dari kelas Entitas
+    def get_details_string(self):
+        return f"ID Pengguna: {self.id_entitas}, Nama: {self._nama}, Username: {self._username}, Role ID: {self._role_id}"
+
+class Kegiatan(Entitas):
+    """Merepresentasikan entitas Kegiatan."""
+    # Panjang maksimum kolom teks, mengikuti definisi VARCHAR di tabel Kegiatan
+    PANJANG_MAKS = {"id_kegiatan": 10, "nama_kegiatan": 100, "tempat": 100, "jenis_kegiatan": 50}
+    __slots__ = ("_nama_kegiatan", "_tanggal", "_tempat", "_jenis_kegiatan", "_id_penanggung_jawab",
+                 "_jam_mulai", "_jam_selesai")
+
+    def __init__(self, id_kegiatan, nama_kegiatan, tanggal, tempat, jenis_kegiatan, id_penanggung_jawab=None,
+                 jam_mulai=None, jam_selesai=None):
+        super().__init__(id_kegiatan) # Pewarisan
+        self._nama_kegiatan = nama_kegiatan
+        self._tanggal = parse_tanggal(tanggal) # Selalu disimpan sebagai datetime.date
+        self._tempat = tempat
+        self._jenis_kegiatan = jenis_kegiatan
+        self._id_penanggung_jawab = id_penanggung_jawab
+        # Jam pemakaian ruangan (datetime.time); kegiatan lama tanpa jam tidak ikut cek bentrok jadwal
+        self._jam_mulai = parse_jam(jam_mulai)
+        self._jam_selesai = parse_jam(jam_selesai)
+
+    # Enkapsulasi melalui properties
+    @property
+    def nama_kegiatan(self):
+        return self._nama_kegiatan
+
+    @property
+    def tanggal(self):
+        return self._tanggal
+    
+    @tanggal.setter
+    def tanggal(self, value):
+        self._tanggal = parse_tanggal(value)
+
+    @property
+    def tanggal_str(self):
+        """Tanggal dalam format tampilan dd-mm-yyyy."""
+        return format_tanggal(self._tanggal)
+
+    @property
+    def tempat(self):
+        return self._tempat
+
+    @property
+    def jenis_kegiatan(self):
+        return self._jenis_kegiatan
+
+    @property
+    def id_penanggung_jawab(self):
+        return self._id_penanggung_jawab
+
+    @property
+    def jam_mulai(self):
+        return self._jam_mulai
+
+    @property
+    def jam_selesai(self):
+        return self._jam_selesai
+
+    @property
+    def punya_jadwal(self):
+        """True jika tanggal, jam mulai, dan jam selesai terisi (ikut cek bentrok ruangan)."""
+        return self._tanggal is not None and self._jam_mulai is not None and self._jam_selesai is not None
+
+    @property
+    def waktu_str(self):
+        """Rentang jam HH:MM-HH:MM untuk ditampilkan (kosong jika belum dijadwalkan)."""
+        return format_rentang_jam(self._jam_mulai, self._jam_selesai)
+
+    def bentrok_dengan(self, other):
+        """True jika kedua kegiatan memakai ruangan yang sama pada jam yang tumpang tindih.
+
+        Interval bersifat setengah terbuka [mulai, selesai): kegiatan yang selesai
+        pukul 10:00 tidak bentrok dengan kegiatan yang mulai pukul 10:00.
+        """
+        return (self.punya_jadwal and other.punya_jadwal and self.id_entitas != other.id_entitas
+                and self._tempat == other.tempat and self._tanggal == other.tanggal
+                and self._jam_mulai < other.jam_selesai and other.jam_mulai < self._jam_selesai)
+
+    def cocok_filter(self, jenis=None, tempat=None, id_penanggung_jawab=None, tanggal_mulai=None, tanggal_selesai=None):
+        """True jika kegiatan ini lolos filter yang sama dengan DatabaseManager._filter_kegiatan.
+
+        Dipakai untuk baris yang datang tanpa query (change feed, tambah/update lokal).
+        """
+        if jenis and self._jenis_kegiatan != jenis.strip():
+            return False
+        if tempat and self._tempat != tempat.strip():
+            return False
+        if id_penanggung_jawab not in (None, "") and self._id_penanggung_jawab != int(id_penanggung_jawab):
+            return False
+        if tanggal_mulai is not None and (self._tanggal is None or self._tanggal < parse_tanggal(tanggal_mulai)):
+            return False
+        if tanggal_selesai is not None and (self._tanggal is None or self._tanggal > parse_tanggal(tanggal_selesai)):
+            return False
+        return True
+
+    # Polimorfisme: Override metode dari kelas Entitas
+    def get_details_string(self):
+        return (f"ID Kegiatan: {self.id_entitas}, Nama: {self._nama_kegiatan}, "
+                f"Tanggal: {self._tanggal}, Tempat: {self._tempat}, "
+                f"Jenis: {self._jenis_kegiatan}, PJ ID: {self._id_penanggung_jawab}, Waktu: {self.waktu_str or '-'}")
+
+    def validasi(self):
+        """Memeriksa aturan data Kegiatan; mengembalikan list pesan kesalahan (kosong jika valid)."""
+        kesalahan = []
+        nilai = {"id_kegiatan": self.id_entitas, "nama_kegiatan": self._nama_kegiatan,
+                 "tempat": self._tempat, "jenis_kegiatan": self._jenis_kegiatan}
+        for kolom, isi in nilai.items():
+            if isi is None or str(isi).strip() == "":
+                kesalahan.append(f"{kolom} wajib diisi")
+            elif len(str(isi)) > self.PANJANG_MAKS[kolom]:
+                kesalahan.append(f"{kolom} melebihi {self.PANJANG_MAKS[kolom]} karakter")
+        if self._tanggal is None:
+            kesalahan.append("tanggal wajib diisi")
+        if self._id_penanggung_jawab is None:
+            kesalahan.append("penanggung jawab wajib diisi")
+        if (self._jam_mulai is None) != (self._jam_selesai is None):
+            kesalahan.append("jam mulai dan jam selesai harus diisi berpasangan")
+        elif self._jam_mulai is not None and self._jam_mulai >= self._jam_selesai:
+            kesalahan.append("jam selesai harus setelah jam mulai")
+        return kesalahan
+
+    def to_tuple_for_display(self, nama_pj="N/A"):
+        """Mengembalikan tuple data kegiatan untuk ditampilkan di Treeview."""
+        return self.tuple_tampilan(self.id_entitas, self._nama_kegiatan, self._tanggal, self._tempat,
+                                   self._jenis_kegiatan, nama_pj, self._id_penanggung_jawab,
+                                   self._jam_mulai, self._jam_selesai)
+
+    @staticmethod
+    def tuple_tampilan(id_kegiatan, nama_kegiatan, tanggal, tempat, jenis_kegiatan, nama_pj, id_penanggung_jawab,
+                       jam_mulai, jam_selesai):
+        """Tuple baris Treeview dari nilai kolom (dipakai juga KegiatanBatch tanpa membuat objek)."""
+        return (
+            id_kegiatan,
+            nama_kegiatan,
+            format_tanggal(tanggal), # Objek date diformat menjadi dd-mm-yyyy hanya saat ditampilkan
+            tempat,
+            jenis_kegiatan,
+            nama_pj,
+            id_penanggung_jawab,
+            format_rentang_jam(jam_mulai, jam_selesai) # Di akhir agar indeks kolom lama tidak bergeser
+        )
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _kolom_bersama(nilai, ubah=None):
+    """Tuple kolom di mana nilai yang sama memakai satu objek; ubah(v) dipanggil sekali per nilai unik."""
+    unik = {}
+    hasil = []
+    for value in nilai:
+        try:
+            hasil.append(unik[value])
+        except KeyError:
+            hasil.append(unik.setdefault(value, ubah(value) if ubah else value))
+    return tuple(hasil)
+
+
+class KegiatanBatch:
+    """Hasil query kegiatan dalam bentuk kolom (columnar), bukan satu objek per baris.
+
+    Setiap kolom disimpan sebagai tuple paralel. String yang berulang (Tempat,
+    Jenis, nama PJ) di-intern dan objek date/time yang sama dipakai bersama,
+    sehingga seribu baris "Aula B11" menunjuk ke satu string. Objek Kegiatan
+    baru dibuat saat diminta lewat objek(i) dan disimpan, jadi identitasnya
+    tetap. Iterasi dan indeks menghasilkan item {'objek': Kegiatan, 'nama_pj': str}
+    seperti list hasil query sebelumnya.
+    """
+    __slots__ = ("_id", "_nama", "_tanggal", "_tempat", "_jenis", "_id_pj", "_jam_mulai", "_jam_selesai",
+                 "_nama_pj", "_objek")
+
+    def __init__(self, id_kegiatan=(), nama_kegiatan=(), tanggal=(), tempat=(), jenis_kegiatan=(),
+                 id_penanggung_jawab=(), jam_mulai=(), jam_selesai=(), nama_pj=()):
+        self._id = tuple(id_kegiatan)
+        self._nama = tuple(nama_kegiatan)
+        self._tanggal = tuple(tanggal)
+        self._tempat = tuple(tempat)
+        self._jenis = tuple(jenis_kegiatan)
+        self._id_pj = tuple(id_penanggung_jawab)
+        self._jam_mulai = tuple(jam_mulai)
+        self._jam_selesai = tuple(jam_selesai)
+        self._nama_pj = tuple(nama_pj)
+        self._objek = None # List objek Kegiatan yang sudah dibuat; dialokasikan saat objek pertama diminta
+
+    @classmethod
+    def dari_baris(cls, rows):
+        """Dari baris (ID, Nama, Tanggal, Tempat, Jenis, ID_PJ, Jam_Mulai, Jam_Selesai, Nama_PJ)."""
+        if not rows:
+            return cls()
+        kolom = list(zip(*rows)) # Transpose sekali di C, lalu setiap kolom diolah utuh
+        return cls(kolom[0], kolom[1], _kolom_bersama(kolom[2], parse_tanggal), _kolom_bersama(kolom[3], _intern),
+                   _kolom_bersama(kolom[4], _intern), _kolom_bersama(kolom[5]),
+                   _kolom_bersama(kolom[6], parse_jam), _kolom_bersama(kolom[7], parse_jam),
+                   _kolom_bersama(kolom[8], _intern))
+
+    @classmethod
+    def gabung(cls, batch_list):
+        """Menyambung beberapa batch (mis. halaman berurutan) menjadi satu; linear terhadap jumlah baris."""
+        batch_list = list(batch_list)
+        if len(batch_list) == 1:
+            return batch_list[0]
+        return cls(*(tuple(itertools.chain.from_iterable(getattr(b, nama) for b in batch_list)) for nama in
+                     ("_id", "_nama", "_tanggal", "_tempat", "_jenis", "_id_pj", "_jam_mulai", "_jam_selesai",
+                      "_nama_pj")))
+
+    def __len__(self):
+        return len(self._id)
+
+    def __repr__(self):
+        return f"KegiatanBatch({len(self)} kegiatan)"
+
+    def __iter__(self):
+        for pos in range(len(self._id)):
+            yield self[pos]
+
+    def __getitem__(self, pos):
+        if isinstance(pos, slice):
+            return KegiatanBatch(self._id[pos], self._nama[pos], self._tanggal[pos], self._tempat[pos],
+                                 self._jenis[pos], self._id_pj[pos], self._jam_mulai[pos], self._jam_selesai[pos],
+                                 self._nama_pj[pos])
+        return {'objek': self.objek(pos), 'nama_pj': self._nama_pj[pos]}
+
+    @property
+    def id_list(self):
+        return self._id
+
+    def id_kegiatan(self, pos):
+        return self._id[pos]
+
+    def nama_pj(self, pos):
+        return self._nama_pj[pos]
+
+    def nilai(self, pos):
+        """(nama, tanggal, tempat, jenis, id_pj, jam_mulai, jam_selesai) baris ke-pos, tanpa membuat objek."""
+        return (self._nama[pos], self._tanggal[pos], self._tempat[pos], self._jenis[pos], self._id_pj[pos],
+                self._jam_mulai[pos], self._jam_selesai[pos])
+
+    def objek(self, pos):
+        """Objek Kegiatan baris ke-pos; dibuat sekali saat pertama diminta."""
+        pos = range(len(self._id))[pos] # Normalisasi indeks negatif (IndexError jika di luar jangkauan)
+        if self._objek is None:
+            self._objek = [None] * len(self._id)
+        keg_obj = self._objek[pos]
+        if keg_obj is None:
+            keg_obj = Kegiatan(self._id[pos], *self.nilai(pos))
+            self._objek[pos] = keg_obj
+        return keg_obj
+
+    def tuple_tampilan(self, pos):
+        """Tuple baris Treeview seperti Kegiatan.to_tuple_for_display, langsung dari kolom."""
+        return Kegiatan.tuple_tampilan(self._id[pos], self._nama[pos], self._tanggal[pos], self._tempat[pos],
+                                       self._jenis[pos], self._nama_pj[pos], self._id_pj[pos],
+                                       self._jam_mulai[pos], self._jam_selesai[pos])
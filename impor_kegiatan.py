@@ -0,0 +1,310 @@
+"""Impor massal kegiatan dari file CSV (dan XLSX jika openpyxl terpasang).
+
+Baris dibaca secara streaming, divalidasi dengan aturan entitas Kegiatan,
+penanggung jawab dicari berdasarkan NIM/NIP atau nama, jadwal yang bentrok
+(dengan kegiatan tersimpan maupun baris lain di file) ditolak, lalu disimpan per
+chunk lewat DatabaseManager.tambah_kegiatan_batch_db (cek bentrok dan
+executemany dalam satu transaksi tulis per chunk). Modul ini tidak bergantung
+pada Tkinter.
+"""
+import csv
+import os
+import re
+
+try:
+    import openpyxl
+except ImportError: # Dukungan XLSX opsional
+    openpyxl = None
+
+from entitas import Kegiatan, parse_jam, parse_tanggal
+from database import DatabaseError
+
+DEFAULT_CHUNK_SIZE = 500
+PROGRESS_SETIAP = 100 # Laporan progress setiap N baris dibaca
+
+# Nama kolom yang dikenali di baris header (sudah dinormalisasi: huruf kecil, non-alfanumerik -> '_')
+KOLOM_ALIAS = {
+    "id_kegiatan": ("id_kegiatan", "id_keg", "id"),
+    "nama_kegiatan": ("nama_kegiatan", "nama"),
+    "tanggal": ("tanggal", "tgl"),
+    "tempat": ("tempat", "lokasi", "ruang"),
+    "jenis_kegiatan": ("jenis_kegiatan", "jenis_keg", "jenis"),
+    "penanggung_jawab": ("penanggung_jawab", "p_jawab", "pj", "nama_pj", "nim_nip", "nim_nip_pj"),
+    "jam_mulai": ("jam_mulai", "mulai", "jam_awal"),
+    "jam_selesai": ("jam_selesai", "selesai", "jam_akhir"),
+}
+KOLOM_OPSIONAL = ("jam_mulai", "jam_selesai") # File lama tanpa jam tetap bisa diimpor
+
+
+def _normalisasi_header(nama):
+    return re.sub(r"[^0-9a-z]+", "_", str(nama or "").strip().lower()).strip("_")
+
+
+def _teks(value):
+    """Nilai sel menjadi string; angka bulat dari Excel (1.0) ditulis tanpa desimal."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _petakan_header(header):
+    """Mengembalikan map field -> indeks kolom; ValueError jika kolom wajib tidak ada."""
+    posisi = {}
+    for idx, nama in enumerate(header):
+        kunci = _normalisasi_header(nama)
+        for field, alias in KOLOM_ALIAS.items():
+            if kunci in alias and field not in posisi:
+                posisi[field] = idx
+    hilang = [field for field in KOLOM_ALIAS if field not in posisi and field not in KOLOM_OPSIONAL]
+    if hilang:
+        raise ValueError(f"Kolom wajib tidak ditemukan di header: {', '.join(hilang)}")
+    return posisi
+
+
+def _baca_csv(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        sampel = f.read(4096)
+        f.seek(0)
+        try:
+            dialek = csv.Sniffer().sniff(sampel, delimiters=",;\t") # Excel versi Indonesia sering memakai ';'
+        except csv.Error:
+            dialek = csv.excel
+        reader = csv.reader(f, dialek)
+        header = next(reader, None)
+        if header is None:
+            return
+        yield header
+        for row in reader:
+            yield row
+
+
+def _baca_xlsx(path):
+    if openpyxl is None:
+        raise ValueError("Impor XLSX membutuhkan modul openpyxl. Simpan file sebagai CSV atau pasang openpyxl.")
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True) # read_only: baris dibaca streaming
+    try:
+        for row in workbook.active.iter_rows(values_only=True):
+            yield list(row)
+    finally:
+        workbook.close()
+
+
+def baca_baris(path):
+    """Generator (nomor_baris, dict field -> nilai) dari file CSV/XLSX, tanpa memuat seluruh file."""
+    if os.path.splitext(path)[1].lower() in (".xlsx", ".xlsm"):
+        rows = _baca_xlsx(path)
+    else:
+        rows = _baca_csv(path)
+    header = next(rows, None)
+    if header is None:
+        return
+    posisi = _petakan_header(header)
+    for nomor, row in enumerate(rows, start=2): # Baris 1 adalah header
+        if not any(_teks(v) for v in row):
+            continue # Lewati baris kosong
+        yield nomor, {field: (row[idx] if idx < len(row) else None) for field, idx in posisi.items()}
+
+
+def hitung_baris(path):
+    """Perkiraan jumlah baris data (untuk progress bar)."""
+    if os.path.splitext(path)[1].lower() in (".xlsx", ".xlsm"):
+        if openpyxl is None:
+            return 0
+        workbook = openpyxl.load_workbook(path, read_only=True)
+        try:
+            return max((workbook.active.max_row or 1) - 1, 0)
+        finally:
+            workbook.close()
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return max(sum(1 for _ in f) - 1, 0)
+
+
+class HasilImpor:
+    """Ringkasan satu proses impor."""
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+        self.jumlah_dibaca = 0
+        self.jumlah_diimpor = 0 # Pada dry-run: jumlah baris yang akan diimpor
+        self.ditolak = [] # List (nomor_baris, data_mentah, alasan)
+        self.dibatalkan = False
+
+    def tolak(self, nomor, data, alasan):
+        self.ditolak.append((nomor, data, alasan))
+
+    def ringkasan(self):
+        mode = " (dry-run, tidak ada yang disimpan)" if self.dry_run else ""
+        status = " Dibatalkan." if self.dibatalkan else ""
+        return (f"{self.jumlah_dibaca} baris dibaca, {self.jumlah_diimpor} "
+                f"{'valid' if self.dry_run else 'diimpor'}, {len(self.ditolak)} ditolak{mode}.{status}")
+
+    def tulis_laporan_ditolak(self, path):
+        """Menulis baris yang ditolak beserta alasannya ke file CSV."""
+        with open(path, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Baris", "Alasan"] + list(KOLOM_ALIAS.keys()))
+            for nomor, data, alasan in sorted(self.ditolak, key=lambda r: r[0]):
+                writer.writerow([nomor, alasan] + [_teks(data.get(field)) for field in KOLOM_ALIAS])
+
+
+class ImporKegiatan:
+    """Mengimpor kegiatan dari file ke database per chunk.
+
+    on_progress(diproses, total, hasil) dipanggil setiap PROGRESS_SETIAP baris dari thread
+    pemanggil; UI meneruskannya ke thread Tk sendiri.
+    """
+    def __init__(self, db_manager, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False, aktor_id=None):
+        self.db_manager = db_manager
+        self.aktor_id = aktor_id # ID pengguna yang dicatat di log audit
+        self.chunk_size = max(1, int(chunk_size))
+        self.dry_run = dry_run
+        self._batal = False
+        self._pj_by_nimnip = {}
+        self._pj_by_nama = {}
+        self._jadwal_di_file = {} # (Tempat, Tanggal) -> list (nomor_baris, Kegiatan) yang sudah lolos
+
+    def batalkan(self):
+        """Menghentikan impor setelah chunk yang sedang berjalan (aman dipanggil dari thread lain)."""
+        self._batal = True
+
+    def _muat_pengguna(self):
+        self._pj_by_nimnip = {}
+        self._pj_by_nama = {}
+        for p_obj in self.db_manager.get_semua_pengguna_obj_db():
+            if p_obj.nim_nip:
+                self._pj_by_nimnip[str(p_obj.nim_nip).strip()] = p_obj
+            self._pj_by_nama.setdefault(p_obj.nama.strip().lower(), []).append(p_obj)
+
+    def _cari_pj(self, nilai):
+        """Mengembalikan (id_pengguna, None) atau (None, alasan)."""
+        nilai = _teks(nilai)
+        if not nilai:
+            return None, "penanggung jawab wajib diisi"
+        p_obj = self._pj_by_nimnip.get(nilai)
+        if p_obj:
+            return p_obj.id_entitas, None
+        kandidat = self._pj_by_nama.get(nilai.lower(), [])
+        if len(kandidat) == 1:
+            return kandidat[0].id_entitas, None
+        if len(kandidat) > 1:
+            return None, f"nama penanggung jawab '{nilai}' ambigu, gunakan NIM/NIP"
+        return None, f"penanggung jawab '{nilai}' tidak ditemukan"
+
+    def _validasi_baris(self, data):
+        """Mengembalikan (objek Kegiatan, None) atau (None, alasan penolakan)."""
+        id_pj, alasan = self._cari_pj(data.get("penanggung_jawab"))
+        if alasan:
+            return None, alasan
+        try:
+            tanggal = parse_tanggal(data.get("tanggal"))
+            jam_mulai = parse_jam(data.get("jam_mulai"))
+            jam_selesai = parse_jam(data.get("jam_selesai"))
+        except ValueError as e:
+            return None, str(e)
+        kegiatan = Kegiatan(_teks(data.get("id_kegiatan")), _teks(data.get("nama_kegiatan")), tanggal,
+                            _teks(data.get("tempat")), _teks(data.get("jenis_kegiatan")), id_pj,
+                            jam_mulai, jam_selesai)
+        kesalahan = kegiatan.validasi()
+        if kesalahan:
+            return None, "; ".join(kesalahan)
+        return kegiatan, None
+
+    def _bentrok_di_file(self, keg):
+        """(nomor_baris, Kegiatan) pertama di file yang sudah lolos dan jadwalnya bentrok dengan keg, atau None."""
+        for nomor, lain in self._jadwal_di_file.get((keg.tempat, keg.tanggal), []):
+            if keg.bentrok_dengan(lain):
+                return nomor, lain
+        return None
+
+    def _simpan_chunk(self, chunk, hasil):
+        """Menolak ID yang sudah terdaftar dan jadwal yang bentrok, lalu menyimpan sisanya dalam satu transaksi.
+
+        Cek bentrok awal (tanpa kunci) menentukan urutan penolakan dan cukup untuk
+        dry-run; tambah_kegiatan_batch_db mengulangnya di dalam transaksi tulis.
+        """
+        if not chunk:
+            return
+        kegiatan_list = [keg for _, _, keg in chunk]
+        terdaftar = self.db_manager.get_id_kegiatan_terdaftar_db([keg.id_entitas for keg in kegiatan_list])
+        bentrok_db = self.db_manager.cari_bentrok_batch_db(kegiatan_list)
+        siap = []
+        for nomor, data, keg in chunk:
+            if keg.id_entitas in terdaftar:
+                hasil.tolak(nomor, data, f"ID Kegiatan '{keg.id_entitas}' sudah terdaftar")
+                continue
+            if keg.id_entitas in bentrok_db:
+                hasil.tolak(nomor, data, self._alasan_bentrok_db(keg, bentrok_db))
+                continue
+            bentrok_file = self._bentrok_di_file(keg)
+            if bentrok_file:
+                nomor_lain, lain = bentrok_file
+                hasil.tolak(nomor, data, f"jadwal bentrok dengan baris {nomor_lain} ('{lain.id_entitas}') di file")
+                continue
+            if keg.punya_jadwal:
+                self._jadwal_di_file.setdefault((keg.tempat, keg.tanggal), []).append((nomor, keg))
+            siap.append((nomor, data, keg))
+        if not siap:
+            return
+        if self.dry_run:
+            hasil.jumlah_diimpor += len(siap)
+            return
+        try:
+            jumlah, bentrok_db = self.db_manager.tambah_kegiatan_batch_db([keg for _, _, keg in siap],
+                                                                         aktor_id=self.aktor_id)
+        except DatabaseError as err:
+            # Transaksi chunk sudah di-rollback; semua barisnya dilaporkan agar bisa diimpor ulang
+            for nomor, data, keg in siap:
+                hasil.tolak(nomor, data, f"gagal disimpan bersama chunk-nya: {err}")
+                self._lepas_jadwal(nomor, keg)
+            return
+        hasil.jumlah_diimpor += jumlah
+        # Cek ulang di dalam transaksi tulis: jadwal yang dipesan terminal lain setelah cek awal
+        for nomor, data, keg in siap:
+            if keg.id_entitas in bentrok_db:
+                hasil.tolak(nomor, data, self._alasan_bentrok_db(keg, bentrok_db))
+                self._lepas_jadwal(nomor, keg)
+
+    @staticmethod
+    def _alasan_bentrok_db(keg, bentrok_db):
+        lain = bentrok_db[keg.id_entitas][0]
+        return (f"jadwal bentrok dengan kegiatan '{lain.id_entitas}' "
+                f"({lain.jam_mulai:%H:%M}-{lain.jam_selesai:%H:%M}) di {keg.tempat}")
+
+    def _lepas_jadwal(self, nomor, keg):
+        """Slot jadwal baris yang akhirnya tidak tersimpan tidak lagi dihitung sebagai bentrok di file."""
+        if keg.punya_jadwal:
+            self._jadwal_di_file[(keg.tempat, keg.tanggal)].remove((nomor, keg))
+
+    def jalankan(self, path, on_progress=None):
+        """Mengimpor file dan mengembalikan HasilImpor."""
+        self._batal = False
+        hasil = HasilImpor(self.dry_run)
+        total = hitung_baris(path)
+        self._muat_pengguna()
+        self._jadwal_di_file = {}
+        id_di_file = set() # Deteksi ID ganda di dalam file yang sama
+        chunk = []
+        for nomor, data in baca_baris(path):
+            if self._batal:
+                hasil.dibatalkan = True
+                break
+            hasil.jumlah_dibaca += 1
+            if on_progress and hasil.jumlah_dibaca % PROGRESS_SETIAP == 0:
+                on_progress(hasil.jumlah_dibaca, total, hasil)
+            kegiatan, alasan = self._validasi_baris(data)
+            if kegiatan is not None and kegiatan.id_entitas in id_di_file:
+                kegiatan, alasan = None, f"ID Kegiatan '{kegiatan.id_entitas}' ganda di dalam file"
+            if alasan:
+                hasil.tolak(nomor, data, alasan)
+                continue
+            id_di_file.add(kegiatan.id_entitas)
+            chunk.append((nomor, data, kegiatan))
+            if len(chunk) >= self.chunk_size:
+                self._simpan_chunk(chunk, hasil)
+                chunk = []
+        if not hasil.dibatalkan:
+            self._simpan_chunk(chunk, hasil)
+        if on_progress:
+            on_progress(hasil.jumlah_dibaca, max(total, hasil.jumlah_dibaca), hasil)
+        return hasil
@@ -0,0 +1,88 @@
+"""Index awalan kata di memori untuk pencarian type-ahead (mis. memilih penanggung jawab).
+
+Setiap entri (ID) punya beberapa kata kunci, misalnya kata-kata nama dan
+NIM/NIP. Pasangan (kata, ID) disimpan dalam satu list terurut, sehingga semua
+kata berawalan "zha" berada berdampingan dan ditemukan dengan bisect dalam
+O(log n), lalu dibaca berurutan hanya sebanyak hasil yang diminta. Entri baru
+disisipkan di tempatnya (insort) tanpa membangun ulang index. Modul ini tidak
+bergantung pada Tkinter maupun database.
+"""
+import bisect
+import re
+import unicodedata
+
+
+def normalisasi_kata(teks):
+    """Kata huruf kecil tanpa diakritik dari teks ('Dr. Zhāfier' -> ['dr', 'zhafier'])."""
+    teks = unicodedata.normalize("NFKD", str(teks or ""))
+    teks = "".join(c for c in teks if not unicodedata.combining(c))
+    return re.findall(r"\w+", teks.lower())
+
+
+class IndeksPrefiks:
+    """List terurut (kata, ID) dengan pencarian awalan; tidak thread-safe (kunci di pemakai)."""
+    def __init__(self):
+        self._entri = [] # List terurut tuple (kata, id)
+        self._kata_per_id = {} # Map: id -> tuple kata miliknya (untuk hapus dan cek kata lain)
+
+    def __len__(self):
+        return len(self._kata_per_id)
+
+    def __contains__(self, id_entri):
+        return id_entri in self._kata_per_id
+
+    @staticmethod
+    def _kata_unik(teks_list):
+        kata = []
+        for teks in teks_list:
+            kata.extend(normalisasi_kata(teks))
+        return tuple(dict.fromkeys(kata)) # Buang duplikat, urutan tetap
+
+    def bangun(self, data):
+        """Mengganti seluruh isi index. data: iterable (id, [teks, ...]); satu kali sort."""
+        self._kata_per_id = {id_entri: self._kata_unik(teks_list) for id_entri, teks_list in data}
+        self._entri = sorted((kata, id_entri) for id_entri, kata_list in self._kata_per_id.items()
+                             for kata in kata_list)
+
+    def tambah(self, id_entri, teks_list):
+        """Menambah atau mengganti satu entri secara inkremental."""
+        if id_entri in self._kata_per_id:
+            self.hapus(id_entri)
+        kata_list = self._kata_unik(teks_list)
+        self._kata_per_id[id_entri] = kata_list
+        for kata in kata_list:
+            bisect.insort(self._entri, (kata, id_entri))
+
+    def hapus(self, id_entri):
+        for kata in self._kata_per_id.pop(id_entri, ()):
+            pos = bisect.bisect_left(self._entri, (kata, id_entri))
+            if pos < len(self._entri) and self._entri[pos] == (kata, id_entri):
+                del self._entri[pos]
+
+    def cari(self, teks, limit=10):
+        """ID yang setiap kata teks-nya menjadi awalan salah satu kata entri, paling banyak limit.
+
+        Rentang index dibaca untuk kata query terpanjang (rentang tersempit);
+        kata query lainnya dicek terhadap kata milik kandidat.
+        """
+        kata_query = normalisasi_kata(teks)
+        if not kata_query or limit <= 0:
+            return []
+        utama = max(kata_query, key=len)
+        lainnya = list(kata_query)
+        lainnya.remove(utama)
+        hasil = []
+        dilihat = set()
+        pos = bisect.bisect_left(self._entri, (utama,))
+        while pos < len(self._entri) and len(hasil) < limit:
+            kata, id_entri = self._entri[pos]
+            if not kata.startswith(utama):
+                break
+            pos += 1
+            if id_entri in dilihat:
+                continue
+            dilihat.add(id_entri)
+            kata_entri = self._kata_per_id[id_entri]
+            if all(any(k.startswith(q) for k in kata_entri) for q in lainnya):
+                hasil.append(id_entri)
+        return hasil
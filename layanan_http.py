@@ -0,0 +1,379 @@
+"""Layanan HTTP/JSON tanpa tampilan untuk data kegiatan dan riwayat aktivitas.
+
+Server asyncio (hanya pustaka standar) di atas AsyncDatabaseManager, sehingga
+portal departemen bisa membaca jadwal tanpa klien desktop. Endpoint:
+
+    GET    /kegiatan                 halaman kegiatan (?limit=&cursor=), atau semua
+                                     kegiatan dalam rentang (?dari=&sampai=); keduanya
+                                     bisa difilter ?jenis=&tempat=&pj=<ID_Pengguna>;
+                                     ?q=<teks> mencari full-text, terurut relevansi
+    GET    /kegiatan/<id>            satu kegiatan
+    POST   /kegiatan                 tambah kegiatan (body JSON)
+    PUT    /kegiatan/<id>            ubah kegiatan (body JSON)
+    DELETE /kegiatan/<id>            hapus kegiatan
+    GET    /log                      halaman riwayat aktivitas (?aksi=&id_kegiatan=&dari=&sampai=&limit=&cursor=)
+
+Secara default layanan hanya-baca: POST/PUT/DELETE dijawab 403. Dengan
+--izinkan-tulis, request tulis wajib membawa HTTP Basic auth berisi username
+dan password akun aplikasi; pengguna yang lolos verifikasi itulah yang dicatat
+sebagai pelaku perubahan di log audit. Basic auth mengirim password apa adanya,
+jadi pasang HTTPS (reverse proxy) jika layanan diakses dari luar komputer ini.
+Contoh menjalankan terhadap database SQLite lokal:
+
+    python layanan_http.py --sqlite manajemen_kegiatan.db --port 8080
+    python layanan_http.py --sqlite manajemen_kegiatan.db --izinkan-tulis
+"""
+import argparse
+import asyncio
+import base64
+import datetime
+import json
+import sys
+from http import HTTPStatus
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from entitas import Kegiatan, parse_tanggal, parse_jam
+from database import (DatabaseError, DatabaseManager, JadwalBentrokError, MySQLBackend, SQLiteBackend,
+                      DEFAULT_PAGE_SIZE, ER_DUP_ENTRY, ER_SIGNAL_EXCEPTION)
+from database_async import AsyncDatabaseManager, QueryTimeoutError, DEFAULT_BATAS_WAKTU
+
+MAKS_BODY = 1024 * 1024 # Batas ukuran body request (byte)
+MAKS_HEADER = 100 # Batas jumlah baris header per request
+BATAS_WAKTU_IDLE = 30 # Detik; koneksi keep-alive yang diam lebih lama ditutup
+HEADER_MINTA_LOGIN = {"WWW-Authenticate": 'Basic realm="Manajemen Kegiatan", charset="UTF-8"'}
+
+
+class HttpError(Exception):
+    """Error yang langsung dikirim ke klien sebagai respons JSON {'error': pesan}."""
+    def __init__(self, status, pesan, headers=None):
+        super().__init__(pesan)
+        self.status = status
+        self.pesan = pesan
+        self.headers = headers # Header tambahan respons (mis. WWW-Authenticate untuk 401)
+
+
+def _nilai_json(value):
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.time)):
+        return value.isoformat()
+    raise TypeError(f"Tipe {type(value).__name__} tidak bisa dijadikan JSON")
+
+
+def kegiatan_ke_dict(keg_obj, nama_pj=None):
+    return {"id_kegiatan": keg_obj.id_entitas, "nama_kegiatan": keg_obj.nama_kegiatan,
+            "tanggal": keg_obj.tanggal, "tempat": keg_obj.tempat, "jenis_kegiatan": keg_obj.jenis_kegiatan,
+            "id_penanggung_jawab": keg_obj.id_penanggung_jawab, "nama_penanggung_jawab": nama_pj,
+            "jam_mulai": keg_obj.jam_mulai, "jam_selesai": keg_obj.jam_selesai}
+
+
+def kegiatan_dari_dict(data, id_kegiatan=None):
+    """Body JSON -> objek Kegiatan tervalidasi; HttpError 400 jika tidak valid."""
+    if not isinstance(data, dict):
+        raise HttpError(HTTPStatus.BAD_REQUEST, "Body harus berupa objek JSON")
+    try:
+        tanggal = parse_tanggal(data.get("tanggal"))
+        jam_mulai, jam_selesai = parse_jam(data.get("jam_mulai")), parse_jam(data.get("jam_selesai"))
+    except ValueError as e:
+        raise HttpError(HTTPStatus.BAD_REQUEST, str(e))
+    id_pj = data.get("id_penanggung_jawab")
+    if id_pj is not None and not isinstance(id_pj, int):
+        raise HttpError(HTTPStatus.BAD_REQUEST, "id_penanggung_jawab harus berupa angka")
+    kegiatan = Kegiatan(id_kegiatan or str(data.get("id_kegiatan") or "").strip(),
+                        str(data.get("nama_kegiatan") or "").strip(), tanggal,
+                        str(data.get("tempat") or "").strip(), str(data.get("jenis_kegiatan") or "").strip(), id_pj,
+                        jam_mulai, jam_selesai)
+    kesalahan = kegiatan.validasi()
+    if kesalahan:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "; ".join(kesalahan))
+    return kegiatan
+
+
+class LayananKegiatan:
+    """Logika endpoint; setiap handler mengembalikan (status, objek JSON atau None).
+
+    izinkan_tulis=False membuat layanan hanya-baca. kredensial adalah
+    (username, password) dari header Authorization, atau None.
+    """
+    def __init__(self, adb: AsyncDatabaseManager, izinkan_tulis=False):
+        self.adb = adb
+        self.izinkan_tulis = izinkan_tulis
+
+    async def tangani(self, metode, path, query, body, kredensial=None):
+        bagian = [unquote(p) for p in path.strip("/").split("/") if p]
+        if bagian[:1] == ["kegiatan"] and len(bagian) <= 2:
+            id_kegiatan = bagian[1] if len(bagian) == 2 else None
+            if id_kegiatan is None:
+                if metode == "GET":
+                    return await self.daftar_kegiatan(query)
+                if metode == "POST":
+                    return await self.tambah_kegiatan(body, await self._aktor_penulis(kredensial))
+            else:
+                if metode == "GET":
+                    return await self.ambil_kegiatan(id_kegiatan)
+                if metode == "PUT":
+                    return await self.ubah_kegiatan(id_kegiatan, body, await self._aktor_penulis(kredensial))
+                if metode == "DELETE":
+                    return await self.hapus_kegiatan(id_kegiatan, await self._aktor_penulis(kredensial))
+            raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, f"Metode {metode} tidak didukung untuk {path}")
+        if bagian == ["log"]:
+            if metode == "GET":
+                return await self.daftar_log(query)
+            raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, f"Metode {metode} tidak didukung untuk {path}")
+        raise HttpError(HTTPStatus.NOT_FOUND, f"Path tidak dikenal: {path}")
+
+    async def _aktor_penulis(self, kredensial):
+        """ID pengguna yang melakukan perubahan; 403 jika layanan hanya-baca, 401 jika belum/gagal login."""
+        if not self.izinkan_tulis:
+            raise HttpError(HTTPStatus.FORBIDDEN, "Layanan berjalan hanya-baca (jalankan dengan --izinkan-tulis)")
+        if kredensial is None:
+            raise HttpError(HTTPStatus.UNAUTHORIZED, "Perubahan data membutuhkan login", HEADER_MINTA_LOGIN)
+        # Verifikasi memakai hash kata sandi yang sama dengan login aplikasi (sengaja lambat)
+        pengguna = await self.adb.verify_user_credentials(*kredensial)
+        if pengguna is None:
+            raise HttpError(HTTPStatus.UNAUTHORIZED, "Username atau password salah", HEADER_MINTA_LOGIN)
+        return pengguna.id_entitas
+
+    @staticmethod
+    def _limit(query):
+        try:
+            return int(query.get("limit", DEFAULT_PAGE_SIZE))
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "limit harus berupa angka")
+
+    async def daftar_kegiatan(self, query):
+        # Filter diteruskan ke SQL; nilai yang tidak valid (tanggal, pj) menjadi 400 lewat ValueError
+        filter_kegiatan = {'jenis': query.get("jenis"), 'tempat': query.get("tempat"),
+                           'id_penanggung_jawab': query.get("pj")}
+        if query.get("q", "").strip():
+            items = await self.adb.cari_kegiatan_db(query["q"], limit=self._limit(query), tanggal_mulai=query.get("dari"),
+                                                    tanggal_selesai=query.get("sampai"), **filter_kegiatan)
+            return HTTPStatus.OK, {"items": [dict(kegiatan_ke_dict(i['objek'], i['nama_pj']), skor=i['skor'])
+                                             for i in items]}
+        if "dari" in query or "sampai" in query:
+            items = await self.adb.get_semua_kegiatan_obj_db(tanggal_mulai=query.get("dari"),
+                                                             tanggal_selesai=query.get("sampai"), **filter_kegiatan)
+            return HTTPStatus.OK, {"items": [kegiatan_ke_dict(i['objek'], i['nama_pj']) for i in items]}
+        page = await self.adb.get_kegiatan_page_db(page_size=self._limit(query), cursor=query.get("cursor"),
+                                                   **filter_kegiatan)
+        return HTTPStatus.OK, {"items": [kegiatan_ke_dict(i['objek'], i['nama_pj']) for i in page['items']],
+                               "next_cursor": page['next_cursor']}
+
+    async def ambil_kegiatan(self, id_kegiatan):
+        data = (await self.adb.get_kegiatan_by_ids_db([id_kegiatan])).get(id_kegiatan)
+        if data is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, f"Kegiatan '{id_kegiatan}' tidak ditemukan")
+        return HTTPStatus.OK, kegiatan_ke_dict(data['objek'], data['nama_pj'])
+
+    async def tambah_kegiatan(self, body, aktor_id):
+        kegiatan = kegiatan_dari_dict(body)
+        try:
+            await self.adb.tambah_kegiatan_obj_db(kegiatan, aktor_id=aktor_id)
+        except JadwalBentrokError:
+            raise # Dijawab 409 dengan pesan bentrok oleh handler koneksi
+        except DatabaseError as err:
+            if err.errno in (ER_DUP_ENTRY, ER_SIGNAL_EXCEPTION):
+                raise HttpError(HTTPStatus.CONFLICT, f"ID Kegiatan '{kegiatan.id_entitas}' sudah terdaftar")
+            raise
+        return await self._kegiatan_tersimpan(kegiatan.id_entitas, HTTPStatus.CREATED)
+
+    async def ubah_kegiatan(self, id_kegiatan, body, aktor_id):
+        kegiatan = kegiatan_dari_dict(body, id_kegiatan=id_kegiatan)
+        if not await self.adb.get_id_kegiatan_terdaftar_db([id_kegiatan]):
+            raise HttpError(HTTPStatus.NOT_FOUND, f"Kegiatan '{id_kegiatan}' tidak ditemukan")
+        await self.adb.update_kegiatan_obj_db(kegiatan, aktor_id=aktor_id)
+        return await self._kegiatan_tersimpan(id_kegiatan, HTTPStatus.OK)
+
+    async def _kegiatan_tersimpan(self, id_kegiatan, status):
+        data = (await self.adb.get_kegiatan_by_ids_db([id_kegiatan])).get(id_kegiatan)
+        return status, kegiatan_ke_dict(data['objek'], data['nama_pj']) if data else None
+
+    async def hapus_kegiatan(self, id_kegiatan, aktor_id):
+        if not await self.adb.get_id_kegiatan_terdaftar_db([id_kegiatan]):
+            raise HttpError(HTTPStatus.NOT_FOUND, f"Kegiatan '{id_kegiatan}' tidak ditemukan")
+        await self.adb.hapus_kegiatan_db(id_kegiatan, aktor_id=aktor_id)
+        return HTTPStatus.NO_CONTENT, None
+
+    async def daftar_log(self, query):
+        page = await self.adb.get_log_page_db(page_size=self._limit(query), cursor=query.get("cursor"),
+                                              aksi=query.get("aksi"), id_kegiatan=query.get("id_kegiatan"),
+                                              tanggal_mulai=query.get("dari"), tanggal_selesai=query.get("sampai"))
+        return HTTPStatus.OK, page
+
+
+class ServerHttp:
+    """Server HTTP/1.1 minimal di atas asyncio.start_server dengan dukungan keep-alive."""
+    def __init__(self, layanan, host="127.0.0.1", port=8080):
+        self.layanan = layanan
+        self.host = host
+        self.port = port
+        self._server = None
+
+    async def mulai(self):
+        self._server = await asyncio.start_server(self._tangani_koneksi, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1] # Port sebenarnya jika port=0
+        return self._server
+
+    async def berhenti(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _tangani_koneksi(self, reader, writer):
+        try:
+            while True:
+                try:
+                    baris_awal = await asyncio.wait_for(reader.readline(), BATAS_WAKTU_IDLE)
+                except asyncio.TimeoutError:
+                    break
+                if not baris_awal.strip():
+                    break # Klien menutup koneksi
+                keep_alive = await self._tangani_request(baris_awal, reader, writer)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ValueError, asyncio.LimitOverrunError):
+            # readline melempar ValueError jika request line atau header melebihi batas buffer StreamReader
+            try:
+                self._tulis_respons(writer, HTTPStatus.BAD_REQUEST,
+                                    {"error": "Request line atau header terlalu panjang"}, False)
+                await writer.drain()
+            except ConnectionError:
+                pass
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _tangani_request(self, baris_awal, reader, writer):
+        """Memproses satu request; mengembalikan True jika koneksi boleh dipakai ulang."""
+        headers_respons = None
+        try:
+            metode, target, versi = baris_awal.decode("latin-1").split()
+        except ValueError:
+            self._tulis_respons(writer, HTTPStatus.BAD_REQUEST, {"error": "Request line tidak valid"}, False)
+            return False
+        headers = {}
+        for nomor in range(MAKS_HEADER + 1): # +1 untuk baris kosong penutup header
+            baris = await reader.readline()
+            if baris in (b"\r\n", b"\n", b""):
+                break
+            if nomor == MAKS_HEADER:
+                # Sisa header belum dibaca; koneksi ditutup agar sisanya tidak diproses sebagai request berikutnya
+                self._tulis_respons(writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                                    {"error": f"Jumlah header melebihi {MAKS_HEADER} baris"}, False)
+                return False
+            nama, _, nilai = baris.decode("latin-1").partition(":")
+            headers[nama.strip().lower()] = nilai.strip()
+        koneksi = headers.get("connection", "").lower()
+        keep_alive = koneksi != "close" if versi == "HTTP/1.1" else koneksi == "keep-alive"
+
+        try:
+            panjang = int(headers.get("content-length") or 0)
+            if panjang > MAKS_BODY:
+                raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Body terlalu besar")
+            body = None
+            if panjang:
+                try:
+                    body = json.loads(await reader.readexactly(panjang))
+                except ValueError:
+                    raise HttpError(HTTPStatus.BAD_REQUEST, "Body bukan JSON yang valid")
+            url = urlsplit(target)
+            status, hasil = await self.layanan.tangani(metode.upper(), url.path, dict(parse_qsl(url.query)),
+                                                       body, self._kredensial(headers))
+        except HttpError as e:
+            status, hasil = e.status, {"error": e.pesan}
+            headers_respons = e.headers
+            keep_alive = keep_alive and e.status != HTTPStatus.REQUEST_ENTITY_TOO_LARGE # Body tidak dibaca
+        except ValueError as e: # Filter/cursor/tanggal tidak valid dari lapisan database
+            status, hasil = HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        except QueryTimeoutError as e:
+            status, hasil = HTTPStatus.GATEWAY_TIMEOUT, {"error": str(e)}
+        except JadwalBentrokError as e:
+            status, hasil = HTTPStatus.CONFLICT, {"error": e.msg, "bentrok": [kegiatan_ke_dict(k) for k in e.bentrok]}
+        except DatabaseError as e:
+            if e.sqlstate and str(e.sqlstate).startswith("23"): # Pelanggaran constraint (mis. PJ tidak ada)
+                status, hasil = HTTPStatus.CONFLICT, {"error": e.msg}
+            else:
+                print(f"Error database saat {metode} {target}: {e}")
+                status, hasil = HTTPStatus.SERVICE_UNAVAILABLE, {"error": f"Database tidak dapat diakses: {e}"}
+        except Exception as e:
+            print(f"Error tak terduga saat {metode} {target}: {e}")
+            status, hasil = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Terjadi kesalahan internal"}
+        self._tulis_respons(writer, status, hasil, keep_alive, headers_respons)
+        return keep_alive
+
+    @staticmethod
+    def _kredensial(headers):
+        """(username, password) dari header Authorization: Basic, atau None jika header tidak ada."""
+        nilai = headers.get("authorization")
+        if not nilai:
+            return None
+        skema, _, token = nilai.partition(" ")
+        if skema.lower() != "basic":
+            raise HttpError(HTTPStatus.UNAUTHORIZED, "Hanya autentikasi Basic yang didukung", HEADER_MINTA_LOGIN)
+        try:
+            username, pemisah, password = base64.b64decode(token.strip(), validate=True).decode("utf-8").partition(":")
+        except ValueError: # binascii.Error dan UnicodeDecodeError turunan ValueError
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Header Authorization tidak valid")
+        if not pemisah:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Header Authorization tidak valid")
+        return username, password
+
+    @staticmethod
+    def _tulis_respons(writer, status, hasil, keep_alive, headers=None):
+        body = b"" if hasil is None else json.dumps(hasil, default=_nilai_json, ensure_ascii=False).encode("utf-8")
+        header = [f"HTTP/1.1 {status.value} {status.phrase}",
+                  f"Content-Length: {len(body)}",
+                  f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        header.extend(f"{nama}: {nilai}" for nama, nilai in (headers or {}).items())
+        if body:
+            header.append("Content-Type: application/json; charset=utf-8")
+        writer.write(("\r\n".join(header) + "\r\n\r\n").encode("latin-1") + body)
+
+
+async def jalankan_server(adb: AsyncDatabaseManager, host="127.0.0.1", port=8080, izinkan_tulis=False):
+    server = ServerHttp(LayananKegiatan(adb, izinkan_tulis=izinkan_tulis), host, port)
+    try:
+        await server.mulai()
+        mode = "baca-tulis (Basic auth)" if izinkan_tulis else "hanya-baca"
+        print(f"Layanan HTTP berjalan di http://{server.host}:{server.port} ({adb.backend.describe()}, {mode})")
+        await asyncio.Event().wait() # Berjalan sampai dihentikan (Ctrl+C)
+    finally:
+        await server.berhenti()
+        await adb.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Layanan HTTP/JSON untuk kegiatan dan riwayat aktivitas.")
+    parser.add_argument("--listen", default="127.0.0.1", help="Alamat yang didengarkan")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--pool", type=int, default=10, help="Ukuran pool koneksi (dan thread query)")
+    parser.add_argument("--batas-waktu", type=float, default=DEFAULT_BATAS_WAKTU, help="Batas waktu per query (detik)")
+    parser.add_argument("--izinkan-tulis", action="store_true",
+                        help="Aktifkan POST/PUT/DELETE (wajib login HTTP Basic dengan akun aplikasi)")
+    parser.add_argument("--sqlite", metavar="PATH", help="Gunakan database SQLite ini alih-alih MySQL")
+    parser.add_argument("--host", default="localhost", help="Host MySQL")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--database", default="ManajemenKegiatanDTEI_VTS_OOP")
+    args = parser.parse_args(argv)
+
+    try:
+        backend = SQLiteBackend(args.sqlite) if args.sqlite else MySQLBackend(args.host, args.user, args.password, args.database)
+        db_manager = DatabaseManager(backend=backend, pool_size=args.pool)
+        db_manager.initialize_database()
+    except DatabaseError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    try:
+        asyncio.run(jalankan_server(AsyncDatabaseManager(db_manager, batas_waktu=args.batas_waktu),
+                                    args.listen, args.port, izinkan_tulis=args.izinkan_tulis))
+    except KeyboardInterrupt:
+        print("Layanan HTTP dihentikan.")
+    except OSError as e: # Mis. port sudah dipakai
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
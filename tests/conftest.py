@@ -0,0 +1,24 @@
+"""Fixture bersama: database SQLite sementara yang sudah dimigrasi dan berisi data awal.
+
+Pengguna data awal: Paul_mhs/PAULPASS (101), Zhafier_dsn/ZHAFPASS (102),
+Jay_staff/JAYPASS (103); kegiatan K001-K003.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager, SQLiteBackend # noqa: E402
+from kata_sandi import PasswordHasher # noqa: E402
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    # Biaya scrypt rendah agar login di tes tidak lambat; logikanya sama dengan biaya default
+    db = DatabaseManager(backend=SQLiteBackend(str(tmp_path / "kegiatan.db")), pool_size=4,
+                         password_hasher=PasswordHasher(n=2 ** 10))
+    db.initialize_database()
+    yield db
+    db.close()
@@ -0,0 +1,172 @@
+"""Kasus yang sama dijalankan terhadap DatabaseManager dan AsyncDatabaseManager (paritas hasil dan error)."""
+import asyncio
+import datetime
+import sqlite3
+import time
+
+import pytest
+
+from database import DatabaseError, JadwalBentrokError
+from database_async import AsyncDatabaseManager, QueryTimeoutError
+from entitas import Kegiatan
+
+
+class _AsyncSebagaiSinkron:
+    """Memanggil AsyncDatabaseManager dengan antarmuka DatabaseManager: setiap coroutine dijalankan sampai selesai."""
+    def __init__(self, adb):
+        self.adb = adb
+
+    def __getattr__(self, nama):
+        metode = getattr(self.adb, nama)
+        return lambda *args, **kwargs: asyncio.run(metode(*args, **kwargs))
+
+
+@pytest.fixture(params=["sinkron", "async"])
+def db(request, db_manager):
+    if request.param == "sinkron":
+        yield db_manager
+        return
+    adb = AsyncDatabaseManager(db_manager)
+    yield _AsyncSebagaiSinkron(adb)
+    adb._executor.shutdown(wait=True) # db_manager ditutup oleh fixture conftest
+
+
+def _kegiatan(id_kegiatan, nama="Seminar IoT", tanggal=datetime.date(2025, 6, 1), tempat="Aula FT",
+              jam_mulai=None, jam_selesai=None):
+    return Kegiatan(id_kegiatan, nama, tanggal, tempat, "Seminar", 101, jam_mulai, jam_selesai)
+
+
+def _id_list(items):
+    return [item['objek'].id_entitas for item in items]
+
+
+def test_crud_kegiatan(db):
+    db.tambah_kegiatan_obj_db(_kegiatan("T001", jam_mulai="08:00", jam_selesai="10:00"), aktor_id=101)
+    data = db.get_kegiatan_by_ids_db(["T001", "TIDAKADA"])
+    assert list(data) == ["T001"]
+    keg = data["T001"]['objek']
+    assert (keg.nama_kegiatan, keg.tanggal, keg.jam_mulai) == ("Seminar IoT", datetime.date(2025, 6, 1),
+                                                                datetime.time(8, 0))
+    assert data["T001"]['nama_pj'] == "Paul Fajar"
+
+    with pytest.raises(DatabaseError):
+        db.tambah_kegiatan_obj_db(_kegiatan("T001"))
+    with pytest.raises(JadwalBentrokError) as info:
+        db.tambah_kegiatan_obj_db(_kegiatan("T002", jam_mulai="09:00", jam_selesai="11:00"))
+    assert [k.id_entitas for k in info.value.bentrok] == ["T001"]
+
+    db.update_kegiatan_obj_db(_kegiatan("T001", nama="Seminar IoT Lanjut", jam_mulai="13:00", jam_selesai="14:00"),
+                              aktor_id=102)
+    assert db.get_kegiatan_by_ids_db(["T001"])["T001"]['objek'].nama_kegiatan == "Seminar IoT Lanjut"
+    db.tambah_kegiatan_obj_db(_kegiatan("T002", jam_mulai="09:00", jam_selesai="11:00")) # Jam lama sudah kosong
+
+    db.hapus_kegiatan_db("T001", aktor_id=103)
+    assert db.get_id_kegiatan_terdaftar_db(["T001", "T002"]) == {"T002"}
+
+
+def test_halaman_sama_dengan_daftar_penuh(db):
+    for i in range(7):
+        db.tambah_kegiatan_obj_db(_kegiatan(f"P{i:03d}", nama=f"Rapat {i % 3}",
+                                            tanggal=datetime.date(2025, 7, 1 + i % 4)))
+    semua = _id_list(db.get_semua_kegiatan_obj_db())
+    assert len(semua) == 10
+    halaman, cursor = [], None
+    while True:
+        page = db.get_kegiatan_page_db(page_size=3, cursor=cursor)
+        halaman.extend(_id_list(page['items']))
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+    assert halaman == semua
+
+    tersaring = _id_list(db.get_semua_kegiatan_obj_db(tanggal_mulai="02-07-2025", tanggal_selesai="2025-07-03"))
+    assert tersaring == ["P006", "P002", "P001", "P005"] # Tanggal DESC, lalu nama
+    assert _id_list(db.get_kegiatan_page_db(page_size=100, tempat="Ruang Dosen")['items']) == ["K003"]
+    with pytest.raises(ValueError):
+        db.get_kegiatan_page_db(cursor="bukan-cursor")
+
+
+def test_pencarian_full_text(db):
+    db.tambah_kegiatan_obj_db(_kegiatan("S001", nama="Seminar Robotika Industri", tempat="Lab Robotika"))
+    db.tambah_kegiatan_obj_db(_kegiatan("S002", nama="Praktikum Robot Lengan", tempat="Kelas1"))
+    hasil = db.cari_kegiatan_db("robot")
+    assert set(_id_list(hasil)) == {"S001", "S002"}
+    assert _id_list(hasil)[0] == "S001" # Cocok di nama dan tempat: skor lebih tinggi
+    assert all(item['skor'] > 0 for item in hasil)
+    assert _id_list(db.cari_kegiatan_db("robot lengan")) == ["S002"]
+    assert _id_list(db.cari_kegiatan_db("robot", jenis="Praktikum")) == []
+    assert db.cari_kegiatan_db("  ") == []
+
+
+def test_indeks_pencarian_tetap_cocok_setelah_vacuum_dari_luar(db_manager, tmp_path):
+    for kode in ("S001", "S002", "S003"):
+        db_manager.tambah_kegiatan_obj_db(_kegiatan(kode, nama=f"Seminar Robotika {kode}"))
+    db_manager.hapus_kegiatan_db("K001") # Celah rowid yang bisa dirapatkan oleh VACUUM
+    db_manager.hapus_kegiatan_db("S001")
+    assert db_manager.execute_query("SELECT COUNT(*) FROM Kegiatan WHERE rowid != No_Kegiatan",
+                                    fetch_one=True) == (0,)
+    # VACUUM dari alat lain (mis. sqlite3 CLI) tanpa rebuild indeks full-text
+    conn = sqlite3.connect(str(tmp_path / "kegiatan.db"))
+    conn.execute("VACUUM")
+    conn.execute("INSERT INTO Kegiatan_FTS (Kegiatan_FTS) VALUES ('integrity-check')") # Gagal jika indeks tidak cocok
+    conn.close()
+    db_manager.rawat_database_db()
+    assert _id_list(db_manager.cari_kegiatan_db("robotika")) == ["S002", "S003"]
+    assert _id_list(db_manager.cari_kegiatan_db("rapat dosen")) == ["K003"]
+
+
+def test_log_aktivitas(db):
+    db.tambah_kegiatan_obj_db(_kegiatan("L001"), aktor_id=101)
+    db.update_kegiatan_obj_db(_kegiatan("L001", nama="Seminar IoT 2"), aktor_id=102)
+    db.hapus_kegiatan_db("L001", aktor_id=103)
+    log = db.get_activity_log_db(limit=3)
+    assert [(item['aksi'], item['id_kegiatan'], item['id_aktor']) for item in log] == [
+        ("DELETE", "L001", 103), ("UPDATE", "L001", 102), ("INSERT", "L001", 101)]
+    assert log[1]['perubahan'] == {"Nama_Kegiatan": ["Seminar IoT", "Seminar IoT 2"]}
+
+    page = db.get_log_page_db(page_size=1, id_kegiatan="L001")
+    assert [item['aksi'] for item in page['items']] == ["DELETE"]
+    page = db.get_log_page_db(page_size=5, id_kegiatan="L001", cursor=page['next_cursor'])
+    assert [item['aksi'] for item in page['items']] == ["UPDATE", "INSERT"] and page['next_cursor'] is None
+    assert [item['id_kegiatan'] for item in db.get_log_page_db(aksi="UPDATE")['items']] == ["L001"]
+
+
+def test_login(db):
+    pengguna = db.verify_user_credentials("Zhafier_dsn", "ZHAFPASS")
+    assert (pengguna.id_entitas, pengguna.nama) == (102, "Dr. Zhafier")
+    assert db.verify_user_credentials("Zhafier_dsn", "salah") is None
+    assert db.verify_user_credentials("tidak_ada", "ZHAFPASS") is None
+
+
+def test_stream_sama_dengan_iterator_sinkron(db_manager):
+    adb = AsyncDatabaseManager(db_manager)
+
+    async def kumpulkan_stream():
+        return [row async for row in adb.stream("iter_kegiatan_ekspor_db", ukuran_potongan=2)]
+    try:
+        assert asyncio.run(kumpulkan_stream()) == list(db_manager.iter_kegiatan_ekspor_db())
+    finally:
+        adb._executor.shutdown(wait=True)
+
+
+def test_stream_timeout_menunggu_potongan_lalu_menutup(db_manager):
+    adb = AsyncDatabaseManager(db_manager)
+
+    def iter_lambat():
+        rows = db_manager.iter_kegiatan_ekspor_db(batch_size=1)
+        try:
+            for row in rows:
+                time.sleep(0.5)
+                yield row
+        finally:
+            rows.close()
+    db_manager.iter_lambat = iter_lambat
+
+    async def kumpulkan_stream():
+        return [row async for row in adb.stream("iter_lambat", ukuran_potongan=1, batas_waktu=0.2)]
+    try:
+        with pytest.raises(QueryTimeoutError):
+            asyncio.run(kumpulkan_stream())
+        assert db_manager.get_pool_stats()["in_use"] == 0 # Koneksi sudah kembali, tanpa menunggu garbage collector
+    finally:
+        adb._executor.shutdown(wait=True)
@@ -0,0 +1,76 @@
+"""Impor CSV: kolom jam ikut disimpan dan jadwal bentrok ditolak per baris."""
+import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from entitas import Kegiatan
+from impor_kegiatan import ImporKegiatan
+
+
+def _tulis_csv(tmp_path, baris):
+    path = tmp_path / "impor.csv"
+    path.write_text("\n".join(["ID;Nama;Tanggal;Tempat;Jenis;PJ;Jam Mulai;Jam Selesai"] + baris) + "\n",
+                    encoding="utf-8")
+    return str(path)
+
+
+def test_impor_jam_dan_bentrok(db_manager, tmp_path):
+    db_manager.tambah_kegiatan_obj_db(Kegiatan("A001", "Kuliah Umum", datetime.date(2025, 8, 1), "Aula FT",
+                                               "Seminar", 101, "08:00", "10:00"))
+    path = _tulis_csv(tmp_path, [
+        "I001;Rapat Himpunan;2025-08-01;Aula FT;Rapat;2025;10:00;11:00",    # Mulai tepat saat A001 selesai
+        "I003;Diskusi;2025-08-01;Aula FT;Rapat;2252;10:30;12:00",           # Bentrok dengan I001 di chunk yang sama
+        "I002;Seminar Data;2025-08-01;Aula FT;Seminar;705;09:30;10:30",     # Bentrok dengan A001 di database
+        "I004;Praktikum;2025-08-01;Lab Jaringan Komputer;Praktikum;705;09:00;11:00",
+        "I005;Tanpa Jam;2025-08-01;Aula FT;Rapat;2025;;",
+        "I006;Jam Salah;2025-08-01;Aula FT;Rapat;2025;25:00;26:00",
+    ])
+    hasil = ImporKegiatan(db_manager, chunk_size=2, aktor_id=101).jalankan(path)
+
+    alasan = {nomor: teks for nomor, _, teks in hasil.ditolak}
+    assert sorted(alasan) == [3, 4, 7]
+    assert "bentrok dengan baris 2 ('I001')" in alasan[3]
+    assert "bentrok dengan kegiatan 'A001'" in alasan[4]
+    assert hasil.jumlah_diimpor == 3
+    data = db_manager.get_kegiatan_by_ids_db(["I001", "I004", "I005"])
+    assert (data["I001"]['objek'].jam_mulai, data["I001"]['objek'].jam_selesai) == (datetime.time(10, 0),
+                                                                                    datetime.time(11, 0))
+    assert data["I005"]['objek'].jam_mulai is None
+
+
+def test_dry_run_tetap_memeriksa_bentrok_antar_chunk(db_manager, tmp_path):
+    path = _tulis_csv(tmp_path, [
+        "D001;Rapat A;2025-08-02;Ruang Dosen;Rapat;2025;08:00;09:00",
+        "D002;Rapat B;2025-08-02;Ruang Dosen;Rapat;2025;08:30;09:30",
+    ])
+    hasil = ImporKegiatan(db_manager, chunk_size=1, dry_run=True).jalankan(path)
+    assert hasil.jumlah_diimpor == 1 and [nomor for nomor, _, _ in hasil.ditolak] == [3]
+    assert not db_manager.get_id_kegiatan_terdaftar_db(["D001", "D002"])
+
+
+def test_bentrok_dicek_ulang_di_transaksi_tulis(db_manager, tmp_path, monkeypatch):
+    path = _tulis_csv(tmp_path, ["R001;Rapat Prodi;2025-08-03;Aula FT;Rapat;2025;13:00;14:00"])
+    # Kegiatan lain dipesan setelah cek awal impor (dari terminal lain): cek awal tidak melihatnya
+    monkeypatch.setattr(db_manager, "cari_bentrok_batch_db", lambda *args, **kwargs: {})
+    db_manager.tambah_kegiatan_obj_db(Kegiatan("A002", "Sidang", datetime.date(2025, 8, 3), "Aula FT",
+                                               "Rapat", 102, "13:30", "15:00"))
+    hasil = ImporKegiatan(db_manager, aktor_id=101).jalankan(path)
+    assert hasil.jumlah_diimpor == 0
+    assert "bentrok dengan kegiatan 'A002'" in hasil.ditolak[0][2]
+    assert not db_manager.get_id_kegiatan_terdaftar_db(["R001"])
+
+
+def test_batch_bersamaan_tidak_memesan_slot_yang_sama(db_manager, monkeypatch):
+    cari_asli = db_manager._cari_bentrok_batch
+
+    def cari_lambat(*args):
+        hasil = cari_asli(*args)
+        time.sleep(0.2) # Memperlebar jeda antara cek dan INSERT; tanpa kunci tulis semua thread lolos cek
+        return hasil
+    monkeypatch.setattr(db_manager, "_cari_bentrok_batch", cari_lambat)
+
+    def pesan(i):
+        return db_manager.tambah_kegiatan_batch_db([Kegiatan(f"B00{i}", "Rapat", datetime.date(2025, 8, 4), "Aula FT",
+                                                             "Rapat", 101, "08:00", "09:00")])[0]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        assert sum(executor.map(pesan, range(4))) == 1
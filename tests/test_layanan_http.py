@@ -0,0 +1,140 @@
+"""Tes endpoint layanan_http lewat socket sungguhan terhadap database SQLite sementara."""
+import asyncio
+import base64
+import json
+
+from database_async import AsyncDatabaseManager
+from layanan_http import LayananKegiatan, ServerHttp, MAKS_HEADER
+
+KEGIATAN_BARU = {"id_kegiatan": "H001", "nama_kegiatan": "Seminar Robotika", "tanggal": "2025-06-05",
+                 "tempat": "Aula FT", "jenis_kegiatan": "Seminar", "id_penanggung_jawab": 102,
+                 "jam_mulai": "08:00", "jam_selesai": "10:00"}
+
+
+def _basic(username, password):
+    return {"Authorization": "Basic " + base64.b64encode(f"{username}:{password}".encode()).decode()}
+
+
+async def _kirim(port, metode, path, body=None, headers=None, mentah=None):
+    """Satu request HTTP/1.1 (Connection: close); mengembalikan (status, header dict, body JSON atau None)."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    if mentah is None:
+        data = b"" if body is None else json.dumps(body).encode("utf-8")
+        baris = [f"{metode} {path} HTTP/1.1", "Host: localhost", "Connection: close",
+                 f"Content-Length: {len(data)}"]
+        baris += [f"{nama}: {nilai}" for nama, nilai in (headers or {}).items()]
+        mentah = ("\r\n".join(baris) + "\r\n\r\n").encode("latin-1") + data
+    writer.write(mentah)
+    await writer.drain()
+    respons = await reader.read()
+    writer.close()
+    kepala, _, isi = respons.partition(b"\r\n\r\n")
+    baris_kepala = kepala.decode("latin-1").split("\r\n")
+    status = int(baris_kepala[0].split()[1])
+    header_respons = {}
+    for baris in baris_kepala[1:]:
+        nama, _, nilai = baris.partition(":")
+        header_respons[nama.strip().lower()] = nilai.strip()
+    return status, header_respons, (json.loads(isi) if isi else None)
+
+
+def _jalankan(db_manager, skenario, izinkan_tulis=False):
+    """Menjalankan skenario(port) dengan server di port acak, lalu menutupnya."""
+    async def utama():
+        adb = AsyncDatabaseManager(db_manager)
+        server = ServerHttp(LayananKegiatan(adb, izinkan_tulis=izinkan_tulis), "127.0.0.1", 0)
+        await server.mulai()
+        try:
+            return await skenario(server.port)
+        finally:
+            await server.berhenti()
+            adb._executor.shutdown(wait=True) # db_manager ditutup oleh fixture
+    return asyncio.run(utama())
+
+
+def test_daftar_dan_ambil_kegiatan(db_manager):
+    async def skenario(port):
+        status, _, hasil = await _kirim(port, "GET", "/kegiatan?limit=2")
+        assert status == 200
+        assert [k["id_kegiatan"] for k in hasil["items"]] == ["K003", "K002"]
+        assert hasil["next_cursor"]
+        status, _, hasil = await _kirim(port, "GET", "/kegiatan?limit=2&cursor=" + hasil["next_cursor"])
+        assert [k["id_kegiatan"] for k in hasil["items"]] == ["K001"]
+        status, _, hasil = await _kirim(port, "GET", "/kegiatan/K002")
+        assert status == 200 and hasil["nama_penanggung_jawab"] == "Dr. Zhafier"
+        status, _, _ = await _kirim(port, "GET", "/kegiatan/TIDAKADA")
+        assert status == 404
+        status, _, hasil = await _kirim(port, "GET", "/kegiatan?q=seminar")
+        assert status == 200 and [k["id_kegiatan"] for k in hasil["items"]] == ["K001"]
+        status, _, _ = await _kirim(port, "GET", "/kegiatan?pj=abc")
+        assert status == 400
+    _jalankan(db_manager, skenario)
+
+
+def test_tulis_ditolak_jika_hanya_baca(db_manager):
+    async def skenario(port):
+        status, _, _ = await _kirim(port, "POST", "/kegiatan", KEGIATAN_BARU, _basic("Paul_mhs", "PAULPASS"))
+        assert status == 403
+        status, _, _ = await _kirim(port, "DELETE", "/kegiatan/K001", headers=_basic("Paul_mhs", "PAULPASS"))
+        assert status == 403
+    _jalankan(db_manager, skenario)
+    assert db_manager.get_id_kegiatan_terdaftar_db(["H001", "K001"]) == {"K001"}
+
+
+def test_tulis_butuh_login(db_manager):
+    async def skenario(port):
+        status, header, _ = await _kirim(port, "POST", "/kegiatan", KEGIATAN_BARU)
+        assert status == 401 and header["www-authenticate"].startswith("Basic")
+        status, _, _ = await _kirim(port, "POST", "/kegiatan", KEGIATAN_BARU, _basic("Paul_mhs", "salah"))
+        assert status == 401
+        status, _, _ = await _kirim(port, "POST", "/kegiatan", KEGIATAN_BARU, {"Authorization": "Basic !!!"})
+        assert status == 400
+    _jalankan(db_manager, skenario, izinkan_tulis=True)
+    assert not db_manager.get_id_kegiatan_terdaftar_db(["H001"])
+
+
+def test_aktor_log_dari_pengguna_terautentikasi(db_manager):
+    async def skenario(port):
+        # X-Aktor-Id dari klien tidak lagi dipercaya; aktor = pengguna yang login
+        headers = dict(_basic("Paul_mhs", "PAULPASS"), **{"X-Aktor-Id": "103"})
+        status, _, hasil = await _kirim(port, "POST", "/kegiatan", KEGIATAN_BARU, headers)
+        assert status == 201 and hasil["jam_mulai"] == "08:00:00"
+        bentrok = dict(KEGIATAN_BARU, id_kegiatan="H002", jam_mulai="09:00", jam_selesai="11:00")
+        status, _, hasil = await _kirim(port, "POST", "/kegiatan", bentrok, headers)
+        assert status == 409 and [k["id_kegiatan"] for k in hasil["bentrok"]] == ["H001"]
+        ubah = dict(KEGIATAN_BARU, nama_kegiatan="Seminar Robotika Lanjut")
+        status, _, hasil = await _kirim(port, "PUT", "/kegiatan/H001", ubah, _basic("Jay_staff", "JAYPASS"))
+        assert status == 200 and hasil["nama_kegiatan"] == "Seminar Robotika Lanjut"
+        status, _, _ = await _kirim(port, "DELETE", "/kegiatan/H001", headers=_basic("Zhafier_dsn", "ZHAFPASS"))
+        assert status == 204
+        status, _, _ = await _kirim(port, "DELETE", "/kegiatan/H001", headers=_basic("Zhafier_dsn", "ZHAFPASS"))
+        assert status == 404
+        status, _, hasil = await _kirim(port, "GET", "/log?id_kegiatan=H001")
+        return hasil["items"]
+    log = _jalankan(db_manager, skenario, izinkan_tulis=True)
+    assert [(item["aksi"], item["id_aktor"]) for item in log] == [("DELETE", 102), ("UPDATE", 103), ("INSERT", 101)]
+
+
+def test_header_terlalu_panjang_dijawab_400(db_manager):
+    async def skenario(port):
+        mentah = b"GET /kegiatan HTTP/1.1\r\nX-Panjang: " + b"a" * 100_000 + b"\r\n\r\n"
+        status, _, hasil = await _kirim(port, None, None, mentah=mentah)
+        assert status == 400 and "terlalu panjang" in hasil["error"]
+        status, _, _ = await _kirim(port, None, None, mentah=b"GET /" + b"a" * 100_000 + b" HTTP/1.1\r\n\r\n")
+        assert status == 400
+    _jalankan(db_manager, skenario)
+
+
+def test_header_terlalu_banyak_dijawab_431(db_manager):
+    async def skenario(port):
+        baris = [f"X-Header-{i}: a" for i in range(MAKS_HEADER + 1)]
+        # Request kedua di koneksi yang sama tidak boleh dijawab: _kirim gagal parse jika ada dua body JSON
+        mentah = "GET /kegiatan HTTP/1.1\r\n" + "\r\n".join(baris) + "\r\n\r\nGET /kegiatan HTTP/1.1\r\n\r\n"
+        status, header_respons, hasil = await _kirim(port, None, None, mentah=mentah.encode("latin-1"))
+        assert status == 431 and header_respons["connection"] == "close"
+        assert "header" in hasil["error"]
+        baris = [f"X-Header-{i}: a" for i in range(MAKS_HEADER)]
+        mentah = "GET /kegiatan?limit=1 HTTP/1.1\r\nConnection: close\r\n" + "\r\n".join(baris[1:]) + "\r\n\r\n"
+        status, _, _ = await _kirim(port, None, None, mentah=mentah.encode("latin-1"))
+        assert status == 200 # Tepat MAKS_HEADER baris masih diterima
+    _jalankan(db_manager, skenario)
@@ -0,0 +1,64 @@
+"""Pendaftaran pengguna: ID dari database dan keunikan Username/NIM_NIP, termasuk database lama."""
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+from cache_entitas import EntitasCache
+from database import DatabaseError, DatabaseManager, PenggunaSudahAdaError, SQLiteBackend
+from kata_sandi import PasswordHasher
+
+DB_BAWAAN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "manajemen_kegiatan.db")
+
+
+def test_daftar_menolak_duplikat(db_manager):
+    baru = db_manager.daftarkan_pengguna_db("Budi", 1, "2201", "budi_mhs", "BUDIPASS")
+    assert baru.id_entitas > 103
+    with pytest.raises(PenggunaSudahAdaError) as info:
+        db_manager.daftarkan_pengguna_db("Budi Lain", 1, "2202", "budi_mhs", "BUDIPASS")
+    assert info.value.kolom == "Username"
+    with pytest.raises(PenggunaSudahAdaError) as info:
+        db_manager.daftarkan_pengguna_db("Budi Lain", 1, "2201", "budi_lain", "BUDIPASS")
+    assert info.value.kolom == "NIM_NIP"
+
+
+def test_cache_tambah_pengguna_lewat_pendaftaran(db_manager):
+    cache = EntitasCache(db_manager)
+    cache.semua_pengguna()
+    baru = cache.tambah_pengguna("Sari", 1, "2203", "sari_mhs", "SARIPASS")
+    assert db_manager.verify_user_credentials("sari_mhs", "SARIPASS").id_entitas == baru.id_entitas
+    assert [p.id_entitas for p in cache.cari_pengguna("Sari")] == [baru.id_entitas]
+    with pytest.raises(PenggunaSudahAdaError):
+        cache.tambah_pengguna("Sari Lain", 1, "2204", "sari_mhs", "SARIPASS")
+
+
+def test_migrasi_ditolak_jika_database_lama_berisi_duplikat(tmp_path):
+    path = str(tmp_path / "lama.db")
+    shutil.copy(DB_BAWAAN, path)
+    with sqlite3.connect(path) as conn: # Tabel Pengguna lama tanpa constraint UNIQUE
+        conn.execute("INSERT INTO Pengguna VALUES (201, 'Paul Kembar', 1, '2301', 'Paul_mhs', 'x')")
+        conn.execute("INSERT INTO Pengguna VALUES (202, 'NIM Kembar', 1, '2301', 'nim_kembar', 'x')")
+    conn.close()
+
+    db = DatabaseManager(backend=SQLiteBackend(path), pool_size=2, password_hasher=PasswordHasher(n=2 ** 10))
+    try:
+        with pytest.raises(DatabaseError) as info:
+            db.initialize_database()
+        pesan = str(info.value)
+        assert "Username 'Paul_mhs': ID 101 (Paul Fajar), ID 201 (Paul Kembar)" in pesan
+        assert "NIM_NIP '2301': ID 201 (Paul Kembar), ID 202 (NIM Kembar)" in pesan
+        assert db.get_schema_version() < 7
+        rows = db.execute_query("SELECT ID_Pengguna, Username, NIM_NIP FROM Pengguna WHERE ID_Pengguna > 200",
+                                fetch_all=True)
+        assert rows == [(201, "Paul_mhs", "2301"), (202, "nim_kembar", "2301")] # Tidak ada yang diubah otomatis
+
+        # Setelah admin merapikan, migrasi berjalan dan index UNIQUE menjaga pendaftaran berikutnya
+        db.execute_query("UPDATE Pengguna SET Username = 'paul_kembar', NIM_NIP = '2302' WHERE ID_Pengguna = 201")
+        db.initialize_database()
+        assert db.get_schema_version() >= 7
+        with pytest.raises(PenggunaSudahAdaError) as info:
+            db.daftarkan_pengguna_db("Paul Lagi", 1, "2303", "Paul_mhs", "PAULPASS")
+        assert info.value.kolom == "Username"
+    finally:
+        db.close()
@@ -0,0 +1,372 @@
+"""Benchmark DatabaseManager dan jalur refresh UI daftar kegiatan.
+
+Database diisi data sintetis (kegiatan, pengguna, dan baris log audit) dari
+generator acak ber-seed, sehingga dua run dengan argumen yang sama mengukur
+data yang persis sama. Setiap operasi diulang beberapa kali dan dilaporkan
+sebagai JSON (min, rata-rata, persentil, maks dalam milidetik). Hasil bisa
+disimpan sebagai baseline lalu dibandingkan pada run berikutnya:
+
+    python ukur_kinerja.py --kegiatan 20000 --simpan-baseline baseline.json
+    python ukur_kinerja.py --kegiatan 20000 --baseline baseline.json --output hasil.json
+
+Default memakai file SQLite sementara yang dihapus setelah selesai. MySQL
+(--mysql) harus memakai database khusus benchmark yang masih kosong, karena
+data sintetis ditulis ke sana dan tidak dihapus. Pengukuran
+_tampilkan_semua_kegiatan_ui membutuhkan Tkinter dengan display (root
+disembunyikan); tanpa display kasus itu dilewati dan dicatat alasannya.
+"""
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from entitas import Kegiatan
+from database import DatabaseError, DatabaseManager, MySQLBackend, SQLiteBackend
+from kata_sandi import PasswordHasher
+
+PERSENTIL = (50, 90, 95, 99)
+TOLERANSI_DEFAULT = 0.10 # p50 boleh 10% lebih lambat dari baseline sebelum dianggap regresi
+PASSWORD_BENCHMARK = "benchmark-kinerja"
+TANGGAL_AWAL = datetime.date(2023, 1, 1)
+RENTANG_HARI = 3 * 365
+BATAS_TUNGGU_UI_DETIK = 60
+
+# Kosakata generator data sintetis
+JENIS = ("Seminar", "Praktikum", "Rapat Dosen", "Lomba", "Kuliah Tamu", "Workshop", "Sidang")
+TEMPAT = ("Aula FT", "Aula B11", "Lab Jaringan Komputer", "Lab Elektronika", "Ruang Dosen", "Kelas1", "Kelas2",
+          "Kelas3", "Ruang Sidang", "Lab Sistem Tertanam")
+TOPIK = ("AI", "IoT", "Jaringan", "Basis Data", "Robotika", "Sistem Tenaga", "Keamanan Siber", "Mikrokontroler",
+         "Pemrograman", "Sinyal Digital", "Kontrol", "Cloud")
+NAMA_DEPAN = ("Ahmad", "Budi", "Citra", "Dewi", "Eko", "Fajar", "Gita", "Hadi", "Indah", "Joko", "Kartika", "Lestari")
+NAMA_BELAKANG = ("Pratama", "Saputra", "Wijaya", "Santoso", "Nugroho", "Kusuma", "Hidayat", "Permata", "Setiawan")
+
+
+class DataSintetis:
+    """Generator data benchmark yang deterministik untuk seed yang sama."""
+    def __init__(self, seed, id_pengguna_awal):
+        self._rng = random.Random(seed)
+        self._id_pengguna_awal = id_pengguna_awal
+
+    def pengguna(self, jumlah):
+        """Tuple baris Pengguna (ID, Nama, Role_ID, NIM_NIP, Username); password diisi pemanggil."""
+        rng = self._rng
+        hasil = []
+        for i in range(jumlah):
+            id_pengguna = self._id_pengguna_awal + i
+            nama = f"{rng.choice(NAMA_DEPAN)} {rng.choice(NAMA_BELAKANG)}"
+            hasil.append((id_pengguna, nama, rng.randint(1, 3), f"B{id_pengguna:07d}", f"bench_{id_pengguna}"))
+        return hasil
+
+    def kegiatan(self, jumlah, id_pengguna_list, awalan="B"):
+        """Objek Kegiatan tanpa jam (tidak ikut cek bentrok) dengan ID awalanNNNNNNN."""
+        rng = self._rng
+        hasil = []
+        for i in range(jumlah):
+            jenis = rng.choice(JENIS)
+            hasil.append(Kegiatan(f"{awalan}{i:07d}", f"{jenis} {rng.choice(TOPIK)} {rng.randint(1, 99)}",
+                                  TANGGAL_AWAL + datetime.timedelta(days=rng.randrange(RENTANG_HARI)),
+                                  rng.choice(TEMPAT), jenis, rng.choice(id_pengguna_list)))
+        return hasil
+
+    def kegiatan_terjadwal(self, jumlah, id_pengguna_list):
+        """Kegiatan berjam 08:00-09:00, satu hari per kegiatan setelah rentang data, jadi tidak pernah bentrok."""
+        rng = self._rng
+        tanggal_awal = TANGGAL_AWAL + datetime.timedelta(days=RENTANG_HARI)
+        return [Kegiatan(f"T{i:07d}", f"Uji Tulis {rng.choice(TOPIK)}", tanggal_awal + datetime.timedelta(days=i),
+                         rng.choice(TEMPAT), rng.choice(JENIS), rng.choice(id_pengguna_list),
+                         datetime.time(8, 0), datetime.time(9, 0))
+                for i in range(jumlah)]
+
+    def pilih(self, data):
+        return self._rng.choice(data)
+
+
+def _persentil(urut, p):
+    """Persentil p (0-100) dengan interpolasi linear dari list yang sudah urut."""
+    if len(urut) == 1:
+        return urut[0]
+    posisi = (len(urut) - 1) * p / 100.0
+    bawah = int(posisi)
+    atas = min(bawah + 1, len(urut) - 1)
+    return urut[bawah] + (urut[atas] - urut[bawah]) * (posisi - bawah)
+
+
+def ringkas(durasi_detik):
+    """Statistik satu kasus dalam milidetik: n, min, mean, p50/p90/p95/p99, max."""
+    urut = sorted(d * 1000.0 for d in durasi_detik)
+    hasil = {"n": len(urut), "min_ms": urut[0], "mean_ms": sum(urut) / len(urut)}
+    for p in PERSENTIL:
+        hasil[f"p{p}_ms"] = _persentil(urut, p)
+    hasil["max_ms"] = urut[-1]
+    return {kunci: round(nilai, 4) if isinstance(nilai, float) else nilai for kunci, nilai in hasil.items()}
+
+
+def ukur(func, ulangan, pemanasan=1):
+    """Durasi (detik) func() sebanyak ulangan, setelah beberapa panggilan pemanasan yang tidak dihitung."""
+    for _ in range(pemanasan):
+        func()
+    durasi = []
+    for _ in range(ulangan):
+        mulai = time.perf_counter()
+        func()
+        durasi.append(time.perf_counter() - mulai)
+    return durasi
+
+
+def isi_data(db_manager, data, jumlah_pengguna, jumlah_kegiatan, jumlah_log, password_hasher):
+    """Menulis pengguna, kegiatan, dan baris log audit sintetis; mengembalikan (username_list, id_pengguna_list)."""
+    # Satu hash dipakai semua pengguna benchmark: scrypt per baris akan mendominasi waktu seeding
+    password_hash = password_hasher.hash(PASSWORD_BENCHMARK)
+    pengguna = data.pengguna(jumlah_pengguna)
+    db_manager.execute_query("INSERT INTO Pengguna (ID_Pengguna, Nama, Role_ID, NIM_NIP, Username, Password) "
+                             "VALUES (%s, %s, %s, %s, %s, %s)",
+                             [baris + (password_hash,) for baris in pengguna], is_many=True)
+    id_pengguna_list = [baris[0] for baris in pengguna]
+    kegiatan = data.kegiatan(jumlah_kegiatan, id_pengguna_list)
+    aktor_id = id_pengguna_list[0]
+    for awal in range(0, len(kegiatan), 5000): # Trigger audit mencatat satu log INSERT per kegiatan
+        db_manager.tambah_kegiatan_batch_db(kegiatan[awal:awal + 5000], aktor_id=aktor_id)
+    # Sisa log audit dibuat dengan UPDATE nama pada kegiatan acak
+    sisa_log = max(0, jumlah_log - jumlah_kegiatan)
+    if sisa_log and kegiatan:
+        update = [(f"{keg.nama_kegiatan} (rev {i})", keg.id_entitas)
+                  for i, keg in enumerate(data.pilih(kegiatan) for _ in range(sisa_log))]
+        for awal in range(0, len(update), 5000):
+            db_manager.execute_query("UPDATE Kegiatan SET Nama_Kegiatan = %s WHERE ID_Kegiatan = %s",
+                                     update[awal:awal + 5000], is_many=True, aktor_id=aktor_id)
+    return [baris[4] for baris in pengguna], id_pengguna_list
+
+
+def ukur_ui(db_manager, ulangan):
+    """Durasi _tampilkan_semua_kegiatan_ui sampai halaman pertama tampil di Treeview, dengan root Tk tersembunyi.
+
+    Termasuk query di worker dan pengiriman hasil lewat polling DbExecutor,
+    yaitu jeda yang dirasakan pengguna. Mengembalikan (durasi, alasan_dilewati).
+    """
+    try:
+        import tkinter as tk
+        import baru # Butuh tkcalendar dan PIL, sama seperti aplikasinya
+        root = tk.Tk()
+    except (ImportError, RuntimeError) as e:
+        return None, f"Tkinter/dependensi UI tidak tersedia: {e}"
+    except Exception as e: # tk.TclError: tidak ada display
+        return None, f"Tk tidak bisa dibuat: {e}"
+    root.withdraw()
+    db_executor = baru.DbExecutor(root)
+    try:
+        app = baru.KegiatanApp(root, db_manager, db_executor)
+        root.withdraw() # KegiatanApp mengatur geometry; jendela tetap tersembunyi
+
+        def tunggu(kondisi):
+            batas = time.perf_counter() + BATAS_TUNGGU_UI_DETIK
+            while not kondisi():
+                if time.perf_counter() > batas:
+                    raise TimeoutError("Daftar kegiatan tidak selesai dimuat")
+                root.update()
+                time.sleep(0.001)
+
+        tunggu(lambda: db_executor.in_flight == 0) # Pemuatan awal (pengguna, opsi filter, halaman pertama)
+
+        def refresh():
+            app._tampilkan_semua_kegiatan_ui()
+            tunggu(lambda: not app._sedang_memuat_halaman)
+        return ukur(refresh, ulangan), None
+    finally:
+        db_executor.shutdown()
+        root.destroy()
+
+
+def jalankan(db_manager, hasher, args, buat_backend_baru=None):
+    """Menjalankan semua kasus; mengembalikan dict nama kasus -> statistik (atau {'dilewati': alasan})."""
+    hasil = {}
+
+    def catat(nama, durasi):
+        hasil[nama] = ringkas(durasi)
+        print(f"  {nama}: p50 {hasil[nama]['p50_ms']:.2f} ms (n={hasil[nama]['n']})", file=sys.stderr)
+
+    # initialize_database pada database baru (semua migrasi) hanya bisa diulang jika backend baru bisa dibuat
+    if buat_backend_baru is not None:
+        durasi = []
+        for _ in range(args.ulangan_init):
+            db_baru = DatabaseManager(backend=buat_backend_baru(), pool_size=1, password_hasher=hasher)
+            mulai = time.perf_counter()
+            db_baru.initialize_database()
+            durasi.append(time.perf_counter() - mulai)
+            db_baru.close()
+        catat("initialize_database_baru", durasi)
+        db_manager.initialize_database()
+    else:
+        mulai = time.perf_counter()
+        db_manager.initialize_database()
+        catat("initialize_database_baru", [time.perf_counter() - mulai])
+    # Skema sudah terbaru: jalur yang dilewati setiap kali aplikasi dibuka
+    catat("initialize_database_terbaru", ukur(db_manager.initialize_database, args.ulangan))
+
+    jumlah_awal = db_manager.execute_query("SELECT COUNT(*) FROM Kegiatan", fetch_one=True)[0]
+    if jumlah_awal > 3: # Lebih dari data awal migrasi: bukan database khusus benchmark
+        raise DatabaseError(f"Database sudah berisi {jumlah_awal} kegiatan; gunakan database kosong khusus benchmark.")
+    data = DataSintetis(args.seed, db_manager.get_pengguna_high_water_db() + 1)
+    print(f"Mengisi {args.pengguna} pengguna, {args.kegiatan} kegiatan, {args.log} log (seed {args.seed})...",
+          file=sys.stderr)
+    mulai = time.perf_counter()
+    username_list, id_pengguna_list = isi_data(db_manager, data, args.pengguna, args.kegiatan, args.log, hasher)
+    print(f"  Seeding selesai dalam {time.perf_counter() - mulai:.1f} s", file=sys.stderr)
+
+    catat("get_semua_kegiatan_obj_db", ukur(db_manager.get_semua_kegiatan_obj_db, args.ulangan))
+    catat("get_kegiatan_page_db", ukur(db_manager.get_kegiatan_page_db, args.ulangan))
+    catat("get_activity_log_db", ukur(db_manager.get_activity_log_db, args.ulangan))
+    catat("verify_user_credentials",
+          ukur(lambda: db_manager.verify_user_credentials(data.pilih(username_list), PASSWORD_BENCHMARK),
+               args.ulangan_login))
+
+    kegiatan_baru = iter(data.kegiatan_terjadwal(args.ulangan_tulis + 1, id_pengguna_list))
+    aktor_id = id_pengguna_list[0]
+    catat("tambah_kegiatan_obj_db",
+          ukur(lambda: db_manager.tambah_kegiatan_obj_db(next(kegiatan_baru), aktor_id=aktor_id), args.ulangan_tulis))
+
+    if args.tanpa_ui:
+        hasil["_tampilkan_semua_kegiatan_ui"] = {"dilewati": "--tanpa-ui"}
+    else:
+        durasi, alasan = ukur_ui(db_manager, args.ulangan_ui)
+        if durasi is None:
+            hasil["_tampilkan_semua_kegiatan_ui"] = {"dilewati": alasan}
+            print(f"  _tampilkan_semua_kegiatan_ui dilewati: {alasan}", file=sys.stderr)
+        else:
+            catat("_tampilkan_semua_kegiatan_ui", durasi)
+    return hasil
+
+
+def bandingkan(hasil, baseline, toleransi=TOLERANSI_DEFAULT):
+    """Rasio p50 hasil terhadap baseline per kasus; status 'regresi' jika lebih lambat dari toleransi."""
+    perbandingan = {}
+    for nama, statistik in hasil.items():
+        lama = baseline.get("hasil", {}).get(nama)
+        if "p50_ms" not in statistik or not lama or "p50_ms" not in lama:
+            continue
+        rasio = statistik["p50_ms"] / lama["p50_ms"] if lama["p50_ms"] else float("inf")
+        if rasio > 1 + toleransi:
+            status = "regresi"
+        elif rasio < 1 - toleransi:
+            status = "lebih_cepat"
+        else:
+            status = "sama"
+        perbandingan[nama] = {"baseline_p50_ms": lama["p50_ms"], "p50_ms": statistik["p50_ms"],
+                              "rasio": round(rasio, 3), "status": status}
+    return perbandingan
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark DatabaseManager dan refresh daftar kegiatan di UI.")
+    parser.add_argument("--kegiatan", type=int, default=10000, help="Jumlah kegiatan sintetis")
+    parser.add_argument("--pengguna", type=int, default=500, help="Jumlah pengguna sintetis")
+    parser.add_argument("--log", type=int, default=20000, help="Jumlah baris log audit (minimal sejumlah kegiatan)")
+    parser.add_argument("--seed", type=int, default=42, help="Seed generator data")
+    parser.add_argument("--ulangan", type=int, default=20, help="Ulangan untuk query baca")
+    parser.add_argument("--ulangan-init", type=int, default=3, help="Ulangan initialize_database pada database baru")
+    parser.add_argument("--ulangan-login", type=int, default=10, help="Ulangan verify_user_credentials")
+    parser.add_argument("--ulangan-tulis", type=int, default=200, help="Ulangan tambah_kegiatan_obj_db")
+    parser.add_argument("--ulangan-ui", type=int, default=10, help="Ulangan _tampilkan_semua_kegiatan_ui")
+    parser.add_argument("--tanpa-ui", action="store_true", help="Lewati pengukuran UI Tkinter")
+    parser.add_argument("--output", help="Tulis JSON hasil ke file ini (default: stdout)")
+    parser.add_argument("--baseline", help="File JSON hasil run sebelumnya untuk dibandingkan")
+    parser.add_argument("--simpan-baseline", metavar="PATH", help="Simpan hasil run ini sebagai baseline")
+    parser.add_argument("--toleransi", type=float, default=TOLERANSI_DEFAULT,
+                        help="Batas perlambatan p50 terhadap baseline (0.1 = 10%%)")
+    parser.add_argument("--sqlite", metavar="PATH",
+                        help="File SQLite benchmark (harus belum ada); default file sementara yang dihapus")
+    parser.add_argument("--mysql", action="store_true", help="Benchmark MySQL alih-alih SQLite")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--database", default="BenchmarkKegiatanDTEI", help="Database MySQL khusus benchmark")
+    args = parser.parse_args(argv)
+    if args.kegiatan < 1 or args.pengguna < 1:
+        parser.error("--kegiatan dan --pengguna minimal 1")
+
+    baseline = None
+    if args.baseline:
+        try:
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error: Baseline tidak bisa dibaca: {e}", file=sys.stderr)
+            return 1
+
+    folder_sementara = None
+    try:
+        if args.mysql:
+            backend = MySQLBackend(args.host, args.user, args.password, args.database)
+            buat_backend_baru = None # Database MySQL tidak dibuat ulang per ulangan
+        else:
+            if args.sqlite and os.path.exists(args.sqlite):
+                print(f"Error: {args.sqlite} sudah ada; benchmark butuh file baru.", file=sys.stderr)
+                return 1
+            folder_sementara = tempfile.mkdtemp(prefix="ukur_kinerja_")
+            nomor = iter(range(1_000_000))
+            buat_backend_baru = lambda: SQLiteBackend(os.path.join(folder_sementara, f"init_{next(nomor)}.db"))
+            backend = SQLiteBackend(args.sqlite or os.path.join(folder_sementara, "benchmark.db"))
+    except DatabaseError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    hasher = PasswordHasher() # Biaya hash default aplikasi, jadi verify_user_credentials mengukur login sebenarnya
+    db_manager = DatabaseManager(backend=backend, password_hasher=hasher)
+    print(f"Benchmark {backend.describe()}", file=sys.stderr)
+    try:
+        # Print informasi dari DatabaseManager dialihkan ke stderr agar stdout hanya berisi JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            hasil = jalankan(db_manager, hasher, args, buat_backend_baru)
+    except (DatabaseError, TimeoutError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db_manager.close()
+        if folder_sementara:
+            shutil.rmtree(folder_sementara, ignore_errors=True)
+
+    laporan = {
+        "meta": {
+            "backend": backend.name,
+            "seed": args.seed,
+            "kegiatan": args.kegiatan,
+            "pengguna": args.pengguna,
+            "log": max(args.log, args.kegiatan),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "waktu": datetime.datetime.now().isoformat(timespec="seconds"),
+        },
+        "hasil": hasil,
+    }
+    regresi = []
+    if baseline is not None:
+        laporan["perbandingan"] = bandingkan(hasil, baseline, args.toleransi)
+        if baseline.get("meta", {}).get("kegiatan") != args.kegiatan or baseline.get("meta", {}).get("seed") != args.seed:
+            print("Peringatan: jumlah data atau seed berbeda dengan baseline.", file=sys.stderr)
+        regresi = [nama for nama, p in laporan["perbandingan"].items() if p["status"] == "regresi"]
+    teks = json.dumps(laporan, indent=2, ensure_ascii=False)
+    try:
+        if args.simpan_baseline:
+            with open(args.simpan_baseline, "w", encoding="utf-8") as f:
+                f.write(teks + "\n")
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(teks + "\n")
+        else:
+            print(teks)
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if regresi:
+        print(f"Regresi (p50 > {1 + args.toleransi:.2f}x baseline): {', '.join(regresi)}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())